@@ -46,16 +46,26 @@ from .non_linear.abstract_search import Result
 from autofit.non_linear.grid.grid_search import GridSearch as SearchGridSearch
 # from autofit.non_linear.grid.sensitivity import Sensitivity
 from autofit.non_linear.grid.grid_search import GridSearchResult
+from autofit.non_linear.grid.grid_search import AdaptiveGridSearchResult
+from .non_linear.convergence import BestStagnation
+from .non_linear.convergence import EffectiveSampleSize
+from .non_linear.convergence import GelmanRubin
+from .non_linear.convergence import SwarmDiameter
 from .non_linear.initializer import InitializerBall
 from .non_linear.initializer import InitializerPrior
+from .non_linear.initializer import InitializerSamples
 from .non_linear.mcmc.emcee import Emcee
+from .non_linear.mcmc.parallel_tempering import ParallelTempering
 from .mock.mock_search import MockResult
 from .mock.mock_search import MockSearch
 from .non_linear.nest.dynesty import DynestyDynamic
 from .non_linear.nest.dynesty import DynestyStatic
 from .non_linear.nest.multi_nest import MultiNest
+from .non_linear.optimize.differential_evolution import DifferentialEvolution
+from .non_linear.optimize.multi_start import MultiStart
 from .non_linear.optimize.pyswarms import PySwarmsGlobal
 from .non_linear.optimize.pyswarms import PySwarmsLocal
+from .non_linear.smc.sequential_monte_carlo import SequentialMonteCarlo
 from .non_linear.paths import Paths
 from .non_linear.paths import convert_paths
 from .non_linear.paths import make_path
@@ -77,4 +87,4 @@ from .tools.pipeline import ResultsCollection
 
 conf.instance.register(__file__)
 
-__version__ = '0.73.1'
+__version__ = '0.73.1'
@@ -13,12 +13,14 @@ Example:
 """
 
 import os
+import posixpath
 from os import path
 import zipfile
 from collections import defaultdict
 from shutil import rmtree
 from typing import List, Union, Iterator, Tuple
 
+from autofit.non_linear.archive import ZipArchive
 from .phase_output import PhaseOutput
 from .predicate import AttributePredicate
 
@@ -283,7 +285,8 @@ class Aggregator(AbstractAggregator):
     def __init__(
             self,
             directory: str,
-            completed_only=False
+            completed_only=False,
+            unzip=True,
     ):
         """
         Class to aggregate phase results for all subdirectories in a given directory.
@@ -298,6 +301,9 @@ class Aggregator(AbstractAggregator):
         completed_only
             If `True` only phases with a .completed file (indicating the phase was completed)
             are included in the aggregator.
+        unzip
+            If `True` every .zip file is extracted and the phases are loaded from the extracted directories. If
+            `False`, phases in .zip files which have not been extracted are read directly from the .zip file.
         """
 
         # TODO : Progress bar here
@@ -307,17 +313,38 @@ class Aggregator(AbstractAggregator):
         self._directory = directory
         phases = []
 
+        archives = []
+
         for root, _, filenames in os.walk(directory):
             for filename in filenames:
                 if filename.endswith(".zip"):
-                    with zipfile.ZipFile(path.join(root, filename), "r") as f:
-                        f.extractall(path.join(root, filename[:-4]))
+                    if unzip:
+                        with zipfile.ZipFile(path.join(root, filename), "r") as f:
+                            f.extractall(path.join(root, filename[:-4]))
+                    elif not path.exists(path.join(root, filename[:-4])):
+                        archives.append(path.join(root, filename))
 
         for root, _, filenames in os.walk(directory):
             if "metadata" in filenames:
                 if not completed_only or ".completed" in filenames:
                     phases.append(PhaseOutput(root))
 
+        for zip_path in archives:
+            archive = ZipArchive(zip_path=zip_path, directory=zip_path[:-4])
+            names = archive.names
+            for name in names:
+                archive_directory, filename = posixpath.split(name)
+                if filename == "metadata":
+                    completed = posixpath.join(archive_directory, ".completed").lstrip("/")
+                    if not completed_only or completed in names:
+                        phases.append(
+                            PhaseOutput(
+                                path.join(archive.directory, *filter(len, archive_directory.split("/"))),
+                                archive=archive,
+                                archive_directory=archive_directory,
+                            )
+                        )
+
         if len(phases) == 0:
             print(f"\nNo phases found in {directory}\n")
         else:
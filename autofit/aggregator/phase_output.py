@@ -5,6 +5,7 @@ import pickle
 import dill
 
 from autofit.non_linear import abstract_search
+from autofit.non_linear.archive import ZipArchive
 
 
 class PhaseOutput:
@@ -12,7 +13,7 @@ class PhaseOutput:
     @DynamicAttrs
     """
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, archive: ZipArchive = None, archive_directory: str = ""):
         """
         Represents the output of a single phase. Comprises a metadata file and other dataset files.
 
@@ -20,20 +21,42 @@ class PhaseOutput:
         ----------
         directory
             The directory of the phase
+        archive
+            If input, the phase's files are read directly from this .zip archive instead of the directory.
+        archive_directory
+            The directory of the phase within the archive.
         """
         self.directory = directory
+        self.archive = archive
+        self.archive_directory = archive_directory
         self.__search = None
         self.__model = None
         self.file_path = os.path.join(directory, "metadata")
-        with open(self.file_path) as f:
-            self.text = f.read()
-            pairs = [
-                line.split("=")
-                for line
-                in self.text.split("\n")
-                if "=" in line
-            ]
-            self.__dict__.update({pair[0]: pair[1] for pair in pairs})
+        self.text = self.read("metadata").decode()
+        pairs = [
+            line.split("=")
+            for line
+            in self.text.split("\n")
+            if "=" in line
+        ]
+        self.__dict__.update({pair[0]: pair[1] for pair in pairs})
+
+    def read(self, *names: str) -> bytes:
+        """
+        Read a file of the phase output, from its directory or archive.
+
+        Parameters
+        ----------
+        names
+            The path of the file relative to the phase directory, e.g. ("pickles", "model.pickle").
+        """
+        if self.archive is None:
+            with open(os.path.join(self.directory, *names), "rb") as f:
+                return f.read()
+
+        return self.archive.read(
+            "/".join(filter(len, [self.archive_directory, *names]))
+        )
 
     @property
     def pickle_path(self):
@@ -44,18 +67,14 @@ class PhaseOutput:
         """
         Reads the model.results file
         """
-        with open(os.path.join(self.directory, "model.results")) as f:
-            return f.read()
+        return self.read("model.results").decode()
 
     @property
     def mask(self):
         """
         A pickled mask object
         """
-        with open(
-                os.path.join(self.pickle_path, "mask.pickle"), "rb"
-        ) as f:
-            return dill.load(f)
+        return dill.loads(self.read("pickles", "mask.pickle"))
 
     def __getattr__(self, item):
         """
@@ -64,10 +83,7 @@ class PhaseOutput:
         dataset.pickle, meta_dataset.pickle etc.
         """
         try:
-            with open(
-                    os.path.join(self.pickle_path, f"{item}.pickle"), "rb"
-            ) as f:
-                return pickle.load(f)
+            return pickle.loads(self.read("pickles", f"{item}.pickle"))
         except FileNotFoundError:
             pass
 
@@ -88,8 +104,7 @@ class PhaseOutput:
         """
         if self.__search is None:
             try:
-                with open(os.path.join(self.pickle_path, "search.pickle"), "r+b") as f:
-                    self.__search = pickle.loads(f.read())
+                self.__search = pickle.loads(self.read("pickles", "search.pickle"))
             except FileNotFoundError:
                 pass
         return self.__search
@@ -100,8 +115,7 @@ class PhaseOutput:
         The model that was used in this phase
         """
         if self.__model is None:
-            with open(os.path.join(self.pickle_path, "model.pickle"), "r+b") as f:
-                self.__model = pickle.loads(f.read())
+            self.__model = pickle.loads(self.read("pickles", "model.pickle"))
         return self.__model
 
     def __str__(self):
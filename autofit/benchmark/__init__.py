@@ -0,0 +1,9 @@
+from .benchmark import benchmark_search
+from .benchmark import benchmark_suite
+from .benchmark import default_searches
+from .targets import AbstractTarget
+from .targets import Gaussian
+from .targets import GaussianMixture
+from .targets import GaussianShells
+from .targets import Rosenbrock
+from .targets import default_targets
@@ -0,0 +1,237 @@
+import datetime as dt
+import json
+import logging
+import multiprocessing as mp
+import platform
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from autofit.benchmark import targets as targ
+from autofit.benchmark.targets import AbstractTarget
+from autofit.non_linear.abstract_search import NonLinearSearch
+from autofit.non_linear.paths import Paths
+from autofit.non_linear.samples import MCMCSamples, PDFSamples
+
+logger = logging.getLogger(__name__)
+
+SearchFactory = Callable[[Paths, int], NonLinearSearch]
+
+
+def default_searches() -> Dict[str, SearchFactory]:
+    """
+    The searches benchmarked by default, as functions creating each search from its `Paths` and number of cores.
+
+    The settings of every search are fixed here, rather than read from the config files, so that benchmarks remain
+    comparable when the default configs change. `MultiNest` parallelizes via MPI rather than a pool, so it ignores the
+    number of cores.
+    """
+    from autofit.non_linear.mcmc.emcee import Emcee
+    from autofit.non_linear.nest.dynesty import DynestyDynamic, DynestyStatic
+    from autofit.non_linear.nest.multi_nest import MultiNest
+    from autofit.non_linear.optimize.pyswarms import PySwarmsGlobal
+
+    return {
+        "DynestyStatic": lambda paths, number_of_cores: DynestyStatic(
+            paths, n_live_points=200, number_of_cores=number_of_cores
+        ),
+        "DynestyDynamic": lambda paths, number_of_cores: DynestyDynamic(
+            paths, number_of_cores=number_of_cores
+        ),
+        "Emcee": lambda paths, number_of_cores: Emcee(
+            paths,
+            nwalkers=50,
+            nsteps=1000,
+            auto_correlation_check_for_convergence=False,
+            number_of_cores=number_of_cores,
+        ),
+        "PySwarmsGlobal": lambda paths, number_of_cores: PySwarmsGlobal(
+            paths, n_particles=50, iters=500, number_of_cores=number_of_cores
+        ),
+        "MultiNest": lambda paths, number_of_cores: MultiNest(paths, n_live_points=200),
+    }
+
+
+def effective_sample_size_from(samples) -> Optional[float]:
+    """
+    The effective sample size of the samples of a search, or None for an optimizer (whose samples are not drawn from
+    the posterior).
+
+    For MCMC samples this is the number of samples divided by the largest integrated auto-correlation time of the
+    parameters, and for weighted samples (e.g. of a nested sampler) it is Kish's effective sample size of the weights.
+    """
+    from autofit.graphical.sampling import effective_sample_size
+
+    if isinstance(samples, MCMCSamples):
+        import emcee
+
+        chain = np.reshape(
+            np.asarray(samples.parameters), (samples.total_steps, samples.total_walkers, -1)
+        )
+        auto_correlation_times = emcee.autocorr.integrated_time(chain, quiet=True)
+
+        return float(chain.shape[0] * chain.shape[1] / np.max(auto_correlation_times))
+
+    if isinstance(samples, PDFSamples):
+        return float(effective_sample_size(np.asarray(samples.weights)))
+
+    return None
+
+
+def benchmark_search(
+        search: NonLinearSearch, target: AbstractTarget, number_of_cores: int = 1
+) -> dict:
+    """
+    Fit a benchmark target with a search, returning the metrics of its run.
+
+    The metrics are:
+
+    - `wall_time`: the time taken by `search.fit`, in seconds.
+    - `evaluations`: the number of likelihood evaluations, over every process of the search's pool.
+    - `evaluations_per_second`: the number of evaluations divided by the wall time.
+    - `overhead_per_evaluation`: the wall time not spent evaluating the likelihood (assuming the likelihood time is
+      shared evenly between the cores) divided by the number of evaluations, which is the time the search itself
+      spends per evaluation.
+    - `effective_sample_size` and `ess_per_second`: the effective sample size of the samples (see
+      `effective_sample_size_from`) and it divided by the wall time.
+    - `log_evidence` and `evidence_error`: the log evidence estimated by the search and its absolute difference from
+      the analytic log evidence of the target, where both are available.
+
+    Parameters
+    ----------
+    search
+        The search, whose output folder must not contain the results of a previous fit.
+    target
+        The analytic likelihood fitted by the search.
+    number_of_cores
+        The number of cores of the search, which is recorded in the metrics.
+    """
+    if number_of_cores > 1 and mp.get_start_method() != "fork":
+        logger.warning(
+            "Processes are not started via fork, so the likelihood evaluations of the pool are not counted."
+        )
+
+    targ.reset_counters()
+
+    start = time.perf_counter()
+    result = search.fit(model=target.model, analysis=target)
+    wall_time = time.perf_counter() - start
+
+    evaluations, likelihood_time = targ.counters()
+
+    samples = result.samples
+
+    effective_sample_size = effective_sample_size_from(samples=samples)
+    log_evidence = getattr(samples, "log_evidence", None)
+
+    evidence_error = None
+
+    if log_evidence is not None and target.log_evidence is not None:
+        evidence_error = abs(log_evidence - target.log_evidence)
+
+    return {
+        "target": target.name,
+        "dimensions": target.dimensions,
+        "number_of_cores": number_of_cores,
+        "wall_time": wall_time,
+        "evaluations": evaluations,
+        "evaluations_per_second": evaluations / wall_time,
+        "likelihood_time": likelihood_time,
+        "overhead_per_evaluation": (
+            (wall_time - likelihood_time / number_of_cores) / evaluations if evaluations > 0 else None
+        ),
+        "effective_sample_size": effective_sample_size,
+        "ess_per_second": None if effective_sample_size is None else effective_sample_size / wall_time,
+        "log_evidence": log_evidence,
+        "analytic_log_evidence": target.log_evidence,
+        "evidence_error": evidence_error,
+        "max_log_likelihood": float(max(samples.log_likelihoods)),
+    }
+
+
+def benchmark_suite(
+        filename: str,
+        searches: Optional[Dict[str, SearchFactory]] = None,
+        targets: Optional[Iterable[AbstractTarget]] = None,
+        number_of_cores_list: Iterable[int] = (1, 2),
+        seed: int = 1,
+) -> List[dict]:
+    """
+    Benchmark every search on every target at every number of cores, writing the metrics of every run (see
+    `benchmark_search`) to a JSON report.
+
+    Every run is output to a new folder, named by the time the suite began, in the output path of the config, and
+    numpy's random number generator is seeded with `seed` before every run so that the runs are reproducible. A run
+    which fails (e.g. because an optional dependency of a search is not installed) is recorded as skipped, with the
+    error, and the suite continues.
+
+    Parameters
+    ----------
+    filename
+        The path of the JSON report.
+    searches
+        The searches, as functions creating each search from its `Paths` and number of cores, keyed by name. If None,
+        the `default_searches` are used.
+    targets
+        The analytic likelihoods fitted by every search. If None, the `default_targets` are used.
+    number_of_cores_list
+        Every number of cores every search is run with.
+    seed
+        The seed of numpy's random number generator at the start of every run.
+    """
+    from autofit import __version__
+
+    searches = default_searches() if searches is None else searches
+    targets = targ.default_targets() if targets is None else list(targets)
+
+    created = dt.datetime.now()
+    path_prefix = f"benchmark_{created.strftime('%Y-%m-%d_%H-%M-%S')}"
+
+    results = []
+
+    for target in targets:
+        for search_name, search_from in searches.items():
+            for number_of_cores in number_of_cores_list:
+
+                logger.info(f"Benchmarking {search_name} on {target.name} with {number_of_cores} cores")
+
+                np.random.seed(seed)
+
+                try:
+                    search = search_from(
+                        Paths(
+                            name=f"{target.name}/{search_name}/cores_{number_of_cores}",
+                            path_prefix=path_prefix,
+                        ),
+                        number_of_cores,
+                    )
+                    result = benchmark_search(
+                        search=search, target=target, number_of_cores=number_of_cores
+                    )
+                except Exception as e:
+                    logger.warning(f"Benchmark of {search_name} on {target.name} failed: {e}")
+                    result = {
+                        "target": target.name,
+                        "dimensions": target.dimensions,
+                        "number_of_cores": number_of_cores,
+                        "skipped": f"{type(e).__name__}: {e}",
+                    }
+
+                results.append({"search": search_name, **result})
+
+                with open(filename, "w") as f:
+                    json.dump(
+                        {
+                            "created": created.isoformat(),
+                            "autofit": __version__,
+                            "python": platform.python_version(),
+                            "platform": platform.platform(),
+                            "cpu_count": mp.cpu_count(),
+                            "results": results,
+                        },
+                        f,
+                        indent=4,
+                    )
+
+    return results
@@ -0,0 +1,207 @@
+import multiprocessing as mp
+import time
+from typing import List, Optional
+
+import numpy as np
+from scipy.special import logsumexp
+
+from autofit.mapper.prior.prior import UniformPrior
+from autofit.mapper.prior_model.collection import CollectionPriorModel
+from autofit.mapper.prior_model.prior_model import PriorModel
+from autofit.non_linear.abstract_search import Analysis
+
+# The shared memory counters of the benchmark being run, stored as [evaluations, likelihood time] in one array so both
+# are updated under a single lock. They are a module attribute (rather than an attribute of a target) so that they are
+# inherited by the processes of a search's pool when they are forked, instead of being pickled.
+_counters = None
+
+
+def reset_counters():
+    """
+    Create new counters of the likelihood evaluations, and the time spent in them, of every target.
+
+    The counters are shared memory values inherited by processes forked after they are created, so the evaluations
+    performed by the pool of a search are counted if the pool is created after this function is called and processes
+    are started via fork (the default on Linux).
+    """
+    global _counters
+
+    _counters = mp.Array("d", 2)
+
+
+def counters() -> (int, float):
+    """The number of likelihood evaluations and the time spent in them since the counters were last reset."""
+    if _counters is None:
+        return 0, 0.0
+    with _counters.get_lock():
+        evaluations, likelihood_time = _counters[:]
+    return int(evaluations), likelihood_time
+
+
+class Coordinate:
+    def __init__(self, value=0.0):
+        """A single parameter of the model of a benchmark target."""
+        self.value = value
+
+
+class AbstractTarget(Analysis):
+
+    def __init__(self, dimensions: int, lower_limit: float, upper_limit: float):
+        """
+        An analytic likelihood, which is used to benchmark non-linear searches.
+
+        The model of a target has `dimensions` parameters, each with a `UniformPrior` between `lower_limit` and
+        `upper_limit`. Every evaluation of the likelihood is counted and timed (see `reset_counters`).
+
+        Parameters
+        ----------
+        dimensions
+            The number of parameters of the model.
+        lower_limit
+            The lower limit of the prior of every parameter.
+        upper_limit
+            The upper limit of the prior of every parameter.
+        """
+        self.dimensions = dimensions
+        self.lower_limit = lower_limit
+        self.upper_limit = upper_limit
+
+    @property
+    def name(self) -> str:
+        return f"{type(self).__name__.lower()}_{self.dimensions}d"
+
+    @property
+    def model(self) -> CollectionPriorModel:
+        """A model with one `Coordinate` component for every dimension of the target."""
+        return CollectionPriorModel(
+            **{
+                f"x{index}": PriorModel(
+                    Coordinate,
+                    value=UniformPrior(lower_limit=self.lower_limit, upper_limit=self.upper_limit),
+                )
+                for index in range(self.dimensions)
+            }
+        )
+
+    @property
+    def log_evidence(self) -> Optional[float]:
+        """The analytic log evidence of the target given its priors, or None if it is not known."""
+        return None
+
+    @property
+    def log_prior_volume(self) -> float:
+        return self.dimensions * np.log(self.upper_limit - self.lower_limit)
+
+    def log_likelihood_function(self, instance):
+
+        vector = np.asarray([coordinate.value for coordinate in instance])
+
+        start = time.perf_counter()
+        log_likelihood = self.log_likelihood_from(vector=vector)
+        elapsed = time.perf_counter() - start
+
+        if _counters is not None:
+            with _counters.get_lock():
+                _counters[0] += 1
+                _counters[1] += elapsed
+
+        return log_likelihood
+
+    def log_likelihood_from(self, vector: np.ndarray) -> float:
+        raise NotImplementedError()
+
+
+class Gaussian(AbstractTarget):
+
+    def __init__(self, dimensions: int = 10, sigma: float = 1.0):
+        """
+        A normalized isotropic Gaussian centred on the origin, whose log evidence is minus the log of the volume of
+        the priors.
+        """
+        super().__init__(dimensions=dimensions, lower_limit=-10.0 * sigma, upper_limit=10.0 * sigma)
+
+        self.sigma = sigma
+
+    @property
+    def log_evidence(self):
+        return -self.log_prior_volume
+
+    def log_likelihood_from(self, vector):
+        return float(
+            -0.5 * np.sum((vector / self.sigma) ** 2)
+            - 0.5 * self.dimensions * np.log(2.0 * np.pi * self.sigma ** 2)
+        )
+
+
+class GaussianMixture(AbstractTarget):
+
+    def __init__(self, dimensions: int = 2, modes: int = 4, sigma: float = 0.5, seed: int = 1):
+        """
+        An equally weighted mixture of normalized Gaussians, whose centres are drawn uniformly within the inner half
+        of the priors (using `seed`). Its log evidence is minus the log of the volume of the priors.
+        """
+        super().__init__(dimensions=dimensions, lower_limit=-10.0, upper_limit=10.0)
+
+        self.sigma = sigma
+        self.centres = np.random.RandomState(seed).uniform(-5.0, 5.0, size=(modes, dimensions))
+
+    @property
+    def name(self):
+        return f"gaussianmixture_{len(self.centres)}modes_{self.dimensions}d"
+
+    @property
+    def log_evidence(self):
+        return -self.log_prior_volume
+
+    def log_likelihood_from(self, vector):
+        log_likelihoods = (
+                -0.5 * np.sum(((vector - self.centres) / self.sigma) ** 2, axis=1)
+                - 0.5 * self.dimensions * np.log(2.0 * np.pi * self.sigma ** 2)
+        )
+        return float(logsumexp(log_likelihoods) - np.log(len(self.centres)))
+
+
+class GaussianShells(AbstractTarget):
+
+    def __init__(self, radius: float = 2.0, width: float = 0.1, separation: float = 7.0):
+        """
+        The two dimensional Gaussian shells of Feroz & Hobson (2008), two thin rings whose centres are `separation`
+        apart. For thin shells the log evidence is that of two rings of circumference 2 pi `radius`.
+        """
+        super().__init__(dimensions=2, lower_limit=-6.0, upper_limit=6.0)
+
+        self.radius = radius
+        self.width = width
+        self.centres = np.array([[-0.5 * separation, 0.0], [0.5 * separation, 0.0]])
+
+    @property
+    def log_evidence(self):
+        return np.log(2.0 * 2.0 * np.pi * self.radius) - self.log_prior_volume
+
+    def log_likelihood_from(self, vector):
+        distances = np.sqrt(np.sum((vector - self.centres) ** 2, axis=1))
+        log_likelihoods = (
+                -0.5 * ((distances - self.radius) / self.width) ** 2
+                - 0.5 * np.log(2.0 * np.pi * self.width ** 2)
+        )
+        return float(logsumexp(log_likelihoods))
+
+
+class Rosenbrock(AbstractTarget):
+
+    def __init__(self, dimensions: int = 2):
+        """
+        The Rosenbrock function, a curved narrow valley whose maximum is at 1 in every dimension, whose log evidence
+        is not known analytically.
+        """
+        super().__init__(dimensions=dimensions, lower_limit=-5.0, upper_limit=5.0)
+
+    def log_likelihood_from(self, vector):
+        return float(
+            -np.sum(100.0 * (vector[1:] - vector[:-1] ** 2) ** 2 + (1.0 - vector[:-1]) ** 2)
+        )
+
+
+def default_targets() -> List[AbstractTarget]:
+    """The targets benchmarked by default: Gaussian shells, Rosenbrock, a multimodal mixture and a 10D Gaussian."""
+    return [GaussianShells(), Rosenbrock(), GaussianMixture(), Gaussian(dimensions=10)]
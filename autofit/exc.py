@@ -47,4 +47,12 @@ class AggregatorException(Exception):
 
 
 class GridSearchException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class JobException(Exception):
+    """
+    Raised when a job performed in parallel raises an exception, or the process performing it dies
+    """
+
+    pass
@@ -249,6 +249,77 @@ class AbstractPriorModel(AbstractModel):
             )
         )
 
+    def vectors_from_unit_vectors(self, unit_vectors: np.ndarray) -> np.ndarray:
+        """
+        Map many unit hypercube vectors to physical vectors at once, with each prior transforming the column of its
+        parameter as an array.
+
+        Parameters
+        ----------
+        unit_vectors
+            An array of shape (number_of_vectors, prior_count)
+
+        Returns
+        -------
+        vectors
+            An array of the same shape with values output by priors
+        """
+        unit_vectors = np.asarray(unit_vectors, dtype=float)
+
+        if unit_vectors.shape[-1] == 0:
+            return unit_vectors.copy()
+
+        return np.stack(
+            [
+                np.broadcast_to(prior_tuple.prior.value_for(unit_vectors[:, index]), len(unit_vectors))
+                for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id)
+            ],
+            axis=-1,
+        ).reshape(unit_vectors.shape)
+
+    def unit_vectors_from_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Map many physical vectors to the unit hypercube vectors the priors transform to them, inverting
+        `vectors_from_unit_vectors`.
+
+        Parameters
+        ----------
+        vectors
+            An array of shape (number_of_vectors, prior_count)
+
+        Returns
+        -------
+        unit_vectors
+            An array of the same shape with values between 0 and 1
+        """
+        vectors = np.asarray(vectors, dtype=float)
+
+        if vectors.shape[-1] == 0:
+            return vectors.copy()
+
+        return np.stack(
+            [
+                np.broadcast_to(prior_tuple.prior.unit_value_for(vectors[:, index]), len(vectors))
+                for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id)
+            ],
+            axis=-1,
+        ).reshape(vectors.shape)
+
+    def vectors_within_limits(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Which of many physical vectors have every value within the limits of its prior, as a boolean array. Vectors
+        outside the limits raise a `PriorLimitException` when an instance is created from them.
+
+        Parameters
+        ----------
+        vectors
+            An array of shape (number_of_vectors, prior_count)
+        """
+        priors = [prior_tuple.prior for prior_tuple in self.prior_tuples_ordered_by_id]
+        lower_limits = np.array([prior.lower_limit for prior in priors], dtype=float)
+        upper_limits = np.array([prior.upper_limit for prior in priors], dtype=float)
+        return np.all((lower_limits <= vectors) & (vectors <= upper_limits), axis=1)
+
     def random_unit_vector_within_limits(self, lower_limit=0.0, upper_limit=1.0):
         """ Generate a random vector of unit values by drawing uniform random values between 0 and 1.
         Returns
@@ -16,9 +16,11 @@ from autofit import exc
 from autofit.mapper import model_mapper as mm
 from autofit.non_linear.initializer import Initializer
 from autofit.non_linear.log import logger
+from autofit.non_linear.parallel import allowed_cores
 from autofit.non_linear.paths import Paths, convert_paths
 from autofit.non_linear import samples as samps
 from autofit.non_linear.timer import Timer
+from autofit.non_linear.update_writer import UpdateWriter, atomic_file
 from autofit.text import formatter
 from autofit.text import text_util
 
@@ -68,6 +70,8 @@ class NonLinearSearch(ABC):
             " ", ""
         )
 
+        self.background_updates = conf.instance["general"]["output"]["background_updates"]
+
         if initializer is None:
             self.initializer = Initializer.from_config(config=self._config)
         else:
@@ -252,7 +256,17 @@ class NonLinearSearch(ABC):
             self.timer.paths = self.paths
             self.timer.start()
 
-            self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
+            try:
+                self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
+            except BaseException:
+                try:
+                    self.close_update_writer()
+                except Exception as e:
+                    logger.error(f"A background update failed whilst the non-linear search was failing: {e}")
+                raise
+
+            self.close_update_writer()
+
             open(self.paths.has_completed_path, "w+").close()
 
             samples = self.perform_update(
@@ -335,6 +349,13 @@ class NonLinearSearch(ABC):
         These task are performed every n updates, set by the relevent *task_every_update* variable, for example
         *visualize_every_update*
 
+        If *background_updates* is True in the general.ini config, the files of updates during the analysis are
+        output by a background thread (see `UpdateWriter`) so sampling continues whilst the samples are written. The
+        samples are still extracted from the sampler before this method returns, so they reflect the state of the
+        sampler when the update was performed. Visualization is always performed on the calling thread, as matplotlib
+        is not thread-safe. The final update (during_analysis=False) waits for all background updates to finish and is
+        then performed immediately.
+
         Parameters
         ----------
         model : ModelMapper
@@ -353,28 +374,80 @@ class NonLinearSearch(ABC):
         self.timer.update()
 
         samples = self.samples_via_sampler_from_model(model=model)
-        samples.write_table(filename=self.paths.samples_file)
-        samples.info_to_json(filename=self.paths.info_file)
 
-        self.save_samples(samples=samples)
+        if self.background_updates and during_analysis:
+            self.update_writer.submit(
+                self.output_update, samples=samples, during_analysis=during_analysis
+            )
+        else:
+            self.close_update_writer()
+            self.output_update(samples=samples, during_analysis=during_analysis)
+
+        self.visualize_update(analysis=analysis, samples=samples, during_analysis=during_analysis)
+
+        return samples
+
+    def visualize_update(self, analysis, samples, during_analysis):
+        """Perform the visualization task of `perform_update`, which is always called on the thread performing the
+        update because matplotlib is not thread-safe.
+
+        Parameters
+        ----------
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data.
+        samples : Samples
+            The samples of the non-linear search at the time the update was performed.
+        during_analysis : bool
+            If the update is during a non-linear search, in which case visualization is only performed after a certain
+            number of updates.
+        """
+        if not (self.should_visualize() or not during_analysis):
+            return
 
         try:
             instance = samples.max_log_likelihood_instance
         except exc.FitException:
-            return samples
+            return
+
+        analysis.visualize(paths=self.paths, instance=instance, during_analysis=during_analysis)
 
-        if self.should_visualize() or not during_analysis:
-            analysis.visualize(paths=self.paths, instance=instance, during_analysis=during_analysis)
+    def output_update(self, samples, during_analysis):
+        """Output the samples of an update to hard-disk and perform the model results tasks of `perform_update`.
+        Every file is written atomically, so a partially written file is never visible.
+
+        Parameters
+        ----------
+        samples : Samples
+            The samples of the non-linear search at the time the update was performed.
+        during_analysis : bool
+            If the update is during a non-linear search, in which case tasks are only performed after a certain number
+             of updates and only a subset of visualization may be performed.
+        """
+
+        with atomic_file(self.paths.samples_file) as filename:
+            samples.write_table(filename=filename)
+
+        with atomic_file(self.paths.info_file) as filename:
+            samples.info_to_json(filename=filename)
+
+        self.save_samples(samples=samples)
+
+        try:
+            samples.max_log_likelihood_instance
+        except exc.FitException:
+            return
 
         if self.should_output_model_results() or not during_analysis:
 
-            text_util.results_to_file(
-                samples=samples,
-                filename=self.paths.file_results,
-                during_analysis=during_analysis,
-            )
+            with atomic_file(self.paths.file_results) as filename:
+                text_util.results_to_file(
+                    samples=samples,
+                    filename=filename,
+                    during_analysis=during_analysis,
+                )
 
-            text_util.search_summary_to_file(samples=samples, filename=self.paths.file_search_summary)
+            with atomic_file(self.paths.file_search_summary) as filename:
+                text_util.search_summary_to_file(samples=samples, filename=filename)
 
         if not during_analysis and self.remove_state_files_at_end:
             try:
@@ -382,7 +455,20 @@ class NonLinearSearch(ABC):
             except FileNotFoundError:
                 pass
 
-        return samples
+    @property
+    def update_writer(self) -> UpdateWriter:
+        """The `UpdateWriter` which outputs updates in the background, which is created when first used so that it is
+        not pickled with the search."""
+        if getattr(self, "_update_writer", None) is None:
+            self._update_writer = UpdateWriter()
+        return self._update_writer
+
+    def close_update_writer(self):
+        """Wait for every update submitted to the background `UpdateWriter` to be output and stop its thread."""
+        update_writer = getattr(self, "_update_writer", None)
+
+        if update_writer is not None:
+            update_writer.close()
 
     def setup_log_file(self):
 
@@ -456,8 +542,9 @@ class NonLinearSearch(ABC):
         Save the final-result samples associated with the phase as a pickle
         """
 
-        with open(self.paths.make_samples_pickle_path(), "w+b") as f:
-            f.write(pickle.dumps(samples))
+        with atomic_file(self.paths.make_samples_pickle_path()) as filename:
+            with open(filename, "w+b") as f:
+                f.write(pickle.dumps(samples))
 
     def save_metadata(self):
         """
@@ -530,9 +617,40 @@ class NonLinearSearch(ABC):
 
             return pool, [id[1] for id in ids]
 
+    def pool_with_allowed_cores(self, pool, fitness_function):
+        """Return the pool of the search, replaced with a larger pool if the job performing the search has been allowed
+        more cores since the pool was made.
+
+        A search performed by a job with a `CoreBudget` (e.g. a cell of a `GridSearch` whose cores are shared) is
+        handed the cores freed by completed jobs once no jobs remain to be started. Searches call this after every
+        update, so the last long-running cells of a grid use the cores the rest of the grid no longer needs."""
+
+        number_of_cores = allowed_cores(self.number_of_cores)
+
+        if number_of_cores <= self.number_of_cores:
+            return pool
+
+        logger.info(f"Increasing the number of cores of the search from {self.number_of_cores} to {number_of_cores}.")
+
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+        self.number_of_cores = number_of_cores
+
+        pool, pool_ids = self.make_pool()
+        fitness_function.pool_ids = pool_ids
+
+        return pool
+
     def __eq__(self, other):
         return isinstance(other, NonLinearSearch) and self.__dict__ == other.__dict__
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_update_writer", None)
+        return state
+
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.paths.restore()
@@ -0,0 +1,176 @@
+import os
+import shutil
+import warnings
+import zipfile
+from os import path
+from typing import Dict, List
+
+COMPRESSED_EXTENSIONS = (
+    ".zip", ".gz", ".bz2", ".xz", ".npz", ".png", ".jpg", ".jpeg", ".gif", ".hdf", ".hdf5", ".h5",
+)
+
+
+class ZipArchive:
+    def __init__(
+            self,
+            zip_path: str,
+            directory: str,
+            store_threshold: int = 10 * 1024 ** 2,
+            max_superseded_fraction: float = 0.5,
+    ):
+        """
+        A ``.zip`` archive of a `NonLinearSearch` output directory, which is updated incrementally.
+
+        Every member of the archive records the size and modification time of the file it was written from (in its
+        zip comment). When the archive is updated only files which are new or have changed since they were archived
+        are written, and they are appended to the archive rather than rewriting it. Appending a changed file leaves
+        its previous version in the archive, which is superseded (the latest version is always used). The archive is
+        only rewritten when files are deleted from the directory or superseded members make up more than
+        `max_superseded_fraction` of the archive.
+
+        Files which are larger than `store_threshold` bytes, or which are already compressed (e.g. images and hdf5
+        files), are stored without compression, as deflating them is slow and does not reduce their size much.
+
+        Parameters
+        ----------
+        zip_path
+            The path of the ``.zip`` file.
+        directory
+            The directory which is archived, and which the archive is extracted to.
+        store_threshold
+            The size in bytes above which files are stored rather than deflated.
+        max_superseded_fraction
+            The fraction of the archive's size that superseded members can make up before the archive is rewritten.
+        """
+        self.zip_path = zip_path
+        self.directory = directory
+        self.store_threshold = store_threshold
+        self.max_superseded_fraction = max_superseded_fraction
+
+    @staticmethod
+    def stamp_from_file(filename: str) -> bytes:
+        """The size and modification time of a file, as stored in the comment of its archive member."""
+        stat = os.stat(filename)
+        return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+    def compress_type_for_file(self, filename: str) -> int:
+        if filename.lower().endswith(COMPRESSED_EXTENSIONS) or path.getsize(filename) > self.store_threshold:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def files_in_directory(self) -> Dict[str, str]:
+        """Every file in the directory, as a dictionary mapping its name in the archive to its full path."""
+        files = {}
+
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                full_path = path.join(root, filename)
+                name = path.relpath(full_path, self.directory).replace(os.sep, "/")
+                files[name] = full_path
+
+        return files
+
+    @staticmethod
+    def latest_members(f: zipfile.ZipFile) -> Dict[str, zipfile.ZipInfo]:
+        """The latest version of every member of an archive, which supersedes earlier members of the same name."""
+        return {info.filename: info for info in f.infolist()}
+
+    @property
+    def names(self) -> List[str]:
+        """The names of every file in the archive."""
+        with zipfile.ZipFile(self.zip_path, "r") as f:
+            return list(self.latest_members(f))
+
+    def read(self, name: str) -> bytes:
+        """
+        Read a file directly from the archive, without extracting it.
+
+        Raises a `FileNotFoundError` if the archive does not contain the file.
+        """
+        with zipfile.ZipFile(self.zip_path, "r") as f:
+            try:
+                return f.read(self.latest_members(f)[name])
+            except KeyError:
+                raise FileNotFoundError(f"{name} is not in the archive {self.zip_path}")
+
+    def write_file(self, f: zipfile.ZipFile, name: str, filename: str):
+        info = zipfile.ZipInfo.from_file(filename, arcname=name)
+        info.compress_type = self.compress_type_for_file(filename)
+        info.comment = self.stamp_from_file(filename)
+
+        with open(filename, "rb") as src, f.open(info, "w") as dst:
+            shutil.copyfileobj(src, dst, 1024 ** 2)
+
+    def write(self, files: Dict[str, str]):
+        """Write a new archive of the input files, which replaces the existing archive once it is complete."""
+        temporary_path = f"{self.zip_path}.tmp"
+
+        with zipfile.ZipFile(temporary_path, "w") as f:
+            for name, filename in files.items():
+                self.write_file(f=f, name=name, filename=filename)
+
+        os.replace(temporary_path, self.zip_path)
+
+    def update(self):
+        """
+        Update the archive so it contains every file in the directory, writing only those which are new or have
+        changed since they were archived.
+
+        If the directory is empty (e.g. its files were removed after a previous update) the archive is left unchanged.
+        """
+        files = self.files_in_directory()
+
+        if len(files) == 0:
+            return
+
+        if not path.exists(self.zip_path):
+            self.write(files=files)
+            return
+
+        with zipfile.ZipFile(self.zip_path, "r") as f:
+            infos = f.infolist()
+            members = self.latest_members(f)
+
+        changed = [
+            name for name, filename in files.items()
+            if name not in members or members[name].comment != self.stamp_from_file(filename)
+        ]
+        removed = [name for name in members if name not in files]
+
+        if len(changed) == 0 and len(removed) == 0:
+            return
+
+        superseded_size = sum(info.compress_size for info in infos) - sum(
+            members[name].compress_size for name in members if name not in changed
+        )
+
+        if len(removed) > 0 or superseded_size > self.max_superseded_fraction * path.getsize(self.zip_path):
+            self.write(files=files)
+            return
+
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="Duplicate name")
+            with zipfile.ZipFile(self.zip_path, "a") as f:
+                for name in changed:
+                    self.write_file(f=f, name=name, filename=files[name])
+
+    def extract(self):
+        """
+        Extract every file in the archive to the directory, skipping files which already exist with the same size and
+        modification time as when they were archived. Extracted files have their modification time restored, so
+        that the next update recognises them as unchanged.
+        """
+        with zipfile.ZipFile(self.zip_path, "r") as f:
+
+            for name, info in self.latest_members(f).items():
+
+                filename = path.join(self.directory, *name.split("/"))
+
+                if path.exists(filename) and self.stamp_from_file(filename) == info.comment:
+                    continue
+
+                f.extract(info, self.directory)
+
+                if info.comment:
+                    mtime_ns = int(info.comment.decode().split(":")[1])
+                    os.utime(filename, ns=(mtime_ns, mtime_ns))
@@ -0,0 +1,333 @@
+import pickle
+from typing import List
+
+import numpy as np
+
+
+class AbstractConvergence:
+    def __init__(self):
+        """
+        A cheap test of whether a `NonLinearSearch` has converged, which the search evaluates every time it performs
+        an update (every `iterations_per_update` iterations) and which terminates the search once it, and every other
+        convergence monitor passed to the search, has converged.
+
+        Monitors are updated incrementally with only the iterations performed since the previous update, so they never
+        need to read the full history of the search from the hard-disk. The `state` a monitor accumulates is output
+        to the checkpoint of the search, so a resumed search restores its monitors rather than replaying its history.
+        """
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every previous update, which a search does before it begins (or resumes) sampling.
+        """
+
+    @property
+    def state(self) -> dict:
+        """
+        The attributes the monitor has accumulated from its updates, keyed by name.
+        """
+        return {}
+
+    def load_state(self, state: dict):
+        """
+        Restore the attributes of a monitor from its `state`, as output to the checkpoint of a search.
+        """
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def update(self, points: np.ndarray, log_posteriors: np.ndarray) -> bool:
+        """
+        Update the monitor with the iterations performed since the previous update and return whether the search has
+        converged.
+
+        Parameters
+        ----------
+        points
+            The physical parameters of every particle / walker at every new iteration, with shape
+            (iterations, particles, parameters).
+        log_posteriors
+            The log posterior of every point, with shape (iterations, particles), or the log posterior of the best
+            solution found at every new iteration, with shape (iterations,).
+        """
+        raise NotImplementedError()
+
+
+def update_convergence(
+        convergence_monitors: List[AbstractConvergence], points, log_posteriors
+) -> bool:
+    """
+    Update every convergence monitor of a search with the iterations performed since its previous update, returning
+    `True` if every monitor has converged (and `False` if the search has no monitors).
+
+    Every monitor is updated, even once one is found not to have converged, so that none miss any iterations.
+    """
+    if len(convergence_monitors) == 0:
+        return False
+
+    converged = [
+        monitor.update(points=np.asarray(points), log_posteriors=np.asarray(log_posteriors))
+        for monitor in convergence_monitors
+    ]
+
+    return all(converged)
+
+
+def convergence_states_from(convergence_monitors: List[AbstractConvergence]) -> bytes:
+    """
+    The state of every convergence monitor of a search, pickled so that it can be output to the search's checkpoint.
+    """
+    return pickle.dumps(
+        [(type(monitor).__name__, monitor.state) for monitor in convergence_monitors]
+    )
+
+
+def load_convergence_states(convergence_monitors: List[AbstractConvergence], states: bytes) -> bool:
+    """
+    Restore every convergence monitor of a search from the states output to its checkpoint (see
+    `convergence_states_from`), returning whether they were restored.
+
+    The monitors are left unchanged, and `False` is returned, if the states were output by different monitors (e.g.
+    because the monitors passed to the search were changed before it was resumed).
+    """
+    if len(states) == 0:
+        return False
+
+    states = pickle.loads(states)
+
+    if [name for name, _ in states] != [type(monitor).__name__ for monitor in convergence_monitors]:
+        return False
+
+    for monitor, (_, state) in zip(convergence_monitors, states):
+        monitor.load_state(state=state)
+
+    return True
+
+
+class SwarmDiameter(AbstractConvergence):
+    def __init__(self, threshold: float = 1.0e-3):
+        """
+        Converges once the swarm (or ensemble) has collapsed, which is when the range of the particles' positions
+        along every parameter is below `threshold` times its range when the monitor was first updated.
+
+        Parameters
+        ----------
+        threshold
+            The fraction of the initial diameter of the swarm below which it is converged.
+        """
+        self.threshold = threshold
+
+        super().__init__()
+
+    def reset(self):
+        self.initial_diameter = None
+
+    @property
+    def state(self):
+        return {"initial_diameter": self.initial_diameter}
+
+    @staticmethod
+    def diameter_from(points: np.ndarray) -> np.ndarray:
+        """The range of every parameter over a single iteration of points with shape (particles, parameters)."""
+        return np.max(points, axis=0) - np.min(points, axis=0)
+
+    def update(self, points, log_posteriors):
+
+        if self.initial_diameter is None:
+            self.initial_diameter = self.diameter_from(points=points[0])
+
+        diameter = self.diameter_from(points=points[-1])
+
+        return bool(np.all(diameter <= self.threshold * self.initial_diameter))
+
+
+class BestStagnation(AbstractConvergence):
+    def __init__(self, iterations: int = 100, tolerance: float = 1.0e-4):
+        """
+        Converges once the best log posterior found by the search has not improved by more than `tolerance` for
+        `iterations` consecutive iterations.
+
+        Parameters
+        ----------
+        iterations
+            The number of consecutive iterations without improvement after which the search is converged.
+        tolerance
+            The increase in the best log posterior which counts as an improvement.
+        """
+        self.iterations = iterations
+        self.tolerance = tolerance
+
+        super().__init__()
+
+    def reset(self):
+        self.best_log_posterior = -np.inf
+        self.iterations_without_improvement = 0
+
+    @property
+    def state(self):
+        return {
+            "best_log_posterior": self.best_log_posterior,
+            "iterations_without_improvement": self.iterations_without_improvement,
+        }
+
+    def update(self, points, log_posteriors):
+
+        best_log_posteriors = np.max(
+            np.reshape(log_posteriors, (len(log_posteriors), -1)), axis=1
+        )
+
+        for log_posterior in best_log_posteriors:
+
+            if log_posterior > self.best_log_posterior + self.tolerance:
+                self.iterations_without_improvement = 0
+            else:
+                self.iterations_without_improvement += 1
+
+            self.best_log_posterior = max(self.best_log_posterior, log_posterior)
+
+        return self.iterations_without_improvement >= self.iterations
+
+
+class AbstractChainConvergence(AbstractConvergence):
+    """
+    A convergence monitor of an MCMC ensemble, which treats every walker as an independent chain.
+
+    Every update is stored as a batch holding the sum and sum of squares of every walker's parameters over the new
+    iterations, so convergence is computed from summary statistics without holding the chain in memory. Only the
+    batches in the latter half of the chain are used, so the burn-in of the walkers is discarded.
+    """
+
+    def reset(self):
+        self.shift = None
+        self.lengths = []
+        self.sums = []
+        self.squared_sums = []
+
+    @property
+    def state(self):
+        return {
+            "shift": self.shift,
+            "lengths": list(self.lengths),
+            "sums": list(self.sums),
+            "squared_sums": list(self.squared_sums),
+        }
+
+    def update(self, points, log_posteriors):
+
+        if self.shift is None:
+            self.shift = np.mean(points[0], axis=0)
+
+        shifted_points = points - self.shift
+
+        self.lengths.append(len(points))
+        self.sums.append(np.sum(shifted_points, axis=0))
+        self.squared_sums.append(np.sum(shifted_points ** 2, axis=0))
+
+        total_batches = len(self.lengths) - self.burn_in_batches
+
+        if total_batches < 2:
+            return False
+
+        return self.converged_from(
+            lengths=np.asarray(self.lengths[-total_batches:], dtype="float"),
+            sums=np.asarray(self.sums[-total_batches:]),
+            squared_sums=np.asarray(self.squared_sums[-total_batches:]),
+        )
+
+    @property
+    def burn_in_batches(self) -> int:
+        """The number of batches that lie entirely within the first half of the chain."""
+        total_length = sum(self.lengths)
+        length = 0
+
+        for index, batch_length in enumerate(self.lengths):
+            length += batch_length
+            if length > total_length / 2:
+                return index
+
+        return len(self.lengths)
+
+    def converged_from(
+            self, lengths: np.ndarray, sums: np.ndarray, squared_sums: np.ndarray
+    ) -> bool:
+        """
+        Whether the chain is converged given the lengths, with shape (batches,), and the sums and sums of squares,
+        with shape (batches, walkers, parameters), of the batches in the latter half of the chain.
+        """
+        raise NotImplementedError()
+
+
+class GelmanRubin(AbstractChainConvergence):
+    def __init__(self, threshold: float = 1.01):
+        """
+        Converges once the Gelman-Rubin potential scale reduction factor (R-hat) of every parameter, computed over the
+        latter half of the chain of every walker, is below `threshold`.
+
+        R-hat compares the variance of the means of the walkers to the variance within each walker, approaching 1 as
+        the walkers sample the same distribution.
+
+        Parameters
+        ----------
+        threshold
+            The value of R-hat every parameter must be below for the search to be converged.
+        """
+        self.threshold = threshold
+
+        super().__init__()
+
+    def r_hat_from(self, lengths, sums, squared_sums) -> np.ndarray:
+        """The R-hat of every parameter."""
+        length = np.sum(lengths)
+
+        means = np.sum(sums, axis=0) / length
+        variances = (np.sum(squared_sums, axis=0) - length * means ** 2) / (length - 1)
+
+        within = np.mean(variances, axis=0)
+        between = np.var(means, axis=0, ddof=1)
+
+        return np.sqrt(((length - 1) / length * within + between) / within)
+
+    def converged_from(self, lengths, sums, squared_sums):
+        r_hat = self.r_hat_from(lengths=lengths, sums=sums, squared_sums=squared_sums)
+        return bool(np.all(r_hat < self.threshold))
+
+
+class EffectiveSampleSize(AbstractChainConvergence):
+    def __init__(self, target: float = 1000.0):
+        """
+        Converges once the effective sample size of every parameter, computed over the latter half of the chain of
+        every walker, reaches `target`.
+
+        The effective sample size is estimated via batch means, using the iterations of every walker performed between
+        two updates as a batch. This requires `iterations_per_update` to be longer than the auto-correlation time of
+        the chains, otherwise the effective sample size is overestimated.
+
+        Parameters
+        ----------
+        target
+            The effective sample size every parameter must reach for the search to be converged.
+        """
+        self.target = target
+
+        super().__init__()
+
+    def effective_sample_size_from(self, lengths, sums, squared_sums) -> np.ndarray:
+        """The effective sample size of every parameter."""
+        walkers = sums.shape[1]
+        length = np.sum(lengths) * walkers
+
+        mean = np.sum(sums, axis=(0, 1)) / length
+        variance = np.sum(squared_sums, axis=(0, 1)) / length - mean ** 2
+
+        batch_means = sums / lengths[:, None, None]
+        batch_variance = np.sum(
+            lengths[:, None, None] * (batch_means - mean) ** 2, axis=(0, 1)
+        ) / (len(lengths) * walkers - 1)
+
+        return length * variance / batch_variance
+
+    def converged_from(self, lengths, sums, squared_sums):
+        effective_sample_size = self.effective_sample_size_from(
+            lengths=lengths, sums=sums, squared_sums=squared_sums
+        )
+        return bool(np.all(effective_sample_size >= self.target))
@@ -1,6 +1,6 @@
-import copy
+from itertools import chain, product
 from os import path
-from typing import List, Tuple, Union
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -9,7 +9,9 @@ from autofit import exc
 from autofit.mapper import model_mapper as mm
 from autofit.mapper.prior import prior as p
 from autofit.non_linear.abstract_search import Result
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.grid.manifest import GridManifest
+from autofit.non_linear.job_queue import DirectoryJobQueue
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, CoreBudget, JobFailure, JobScheduler
 from autofit.non_linear.paths import Paths
 
 
@@ -19,6 +21,7 @@ class GridSearchResult:
             results: List[Result],
             lower_limit_lists: List[List[float]],
             physical_lower_limits_lists: List[List[float]],
+            failures: Optional[Dict[int, str]] = None,
     ):
         """
         The result of a grid search.
@@ -26,16 +29,21 @@ class GridSearchResult:
         Parameters
         ----------
         results
-            The results of the non linear optimizations performed at each grid step
+            The results of the non linear optimizations performed at each grid step, which are None for steps whose
+            search failed
         lower_limit_lists
             A list of lists of values representing the lower bounds of the grid searched values at each step
         physical_lower_limits_lists
             A list of lists of values representing the lower physical bounds of the grid search values
             at each step.
+        failures
+            The message describing why the search failed for every step whose search failed, keyed by the index of
+            the step
         """
         self.lower_limit_lists = lower_limit_lists
         self.physical_lower_limits_lists = physical_lower_limits_lists
         self.results = results
+        self.failures = failures or {}
         self.no_dimensions = len(self.lower_limit_lists[0])
         self.no_steps = len(self.lower_limit_lists)
         self.side_length = int(self.no_steps ** (1 / self.no_dimensions))
@@ -73,6 +81,8 @@ class GridSearchResult:
         """
         best_result = None
         for result in self.results:
+            if result is None:
+                continue
             if (
                     best_result is None
                     or result.log_likelihood > best_result.log_likelihood
@@ -98,7 +108,7 @@ class GridSearchResult:
         all_models: [mm.ModelMapper]
             All model mapper instances used in the grid search
         """
-        return [result.model for result in self.results]
+        return [result.model for result in self.results if result is not None]
 
     @property
     def physical_step_sizes(self):
@@ -143,6 +153,10 @@ class GridSearchResult:
             for lower_limit in self.physical_lower_limits_lists
         ]
 
+    def _values(self, func: Callable) -> List:
+        """A value of the result of every step, which is NaN for steps whose search failed"""
+        return [np.nan if result is None else func(result) for result in self.results]
+
     @property
     def results_reshaped(self):
         """
@@ -167,7 +181,7 @@ class GridSearchResult:
             each entry being the figure of merit taken from the optimization performed at that point.
         """
         return np.reshape(
-            np.array([result.log_likelihood for result in self.results]),
+            np.array(self._values(lambda result: result.log_likelihood)),
             tuple(self.side_length for _ in range(self.no_dimensions)),
         )
 
@@ -181,25 +195,69 @@ class GridSearchResult:
             each entry being the figure of merit taken from the optimization performed at that point.
         """
         return np.reshape(
-            np.array([result.samples.log_evidence for result in self.results]),
+            np.array(self._values(lambda result: result.samples.log_evidence)),
             tuple(self.side_length for _ in range(self.no_dimensions)),
         )
 
 
 class GridSearch:
     # TODO: this should be using paths
-    def __init__(self, search, paths=None, number_of_steps=4, parallel=False):
+    def __init__(
+            self,
+            search,
+            paths=None,
+            number_of_steps=4,
+            parallel=False,
+            max_refinement_depth=0,
+            refinement_threshold=5.0,
+            refinement_gradient=None,
+            refinement_figure_of_merit="log_likelihood",
+            max_cells=None,
+            warm_start=False,
+    ):
         """
         Performs a non linear optimiser search for each square in a grid. The dimensionality of the search depends on
         the number of distinct priors passed to the fit function. (1 / step_size) ^ no_dimension steps are performed
         per an optimisation.
 
+        If `max_refinement_depth` is above 0 the grid is refined adaptively: after the coarse grid is searched, every
+        cell whose figure of merit is within `refinement_threshold` of the best cell's (or differs from a neighbouring
+        cell's by more than `refinement_gradient`) is subdivided into 2 ^ no_dimension cells which are then searched,
+        and so on until cells have been subdivided `max_refinement_depth` times or `max_cells` searches are performed.
+
+        If `warm_start` is True the search of each cell begins from the result of a neighbouring cell which has already
+        been searched: the priors of every parameter which is not on the grid are passed from the neighbour's result
+        via its `PriorPasser`, so the search's `Initializer` draws its initial points from the neighbour's posterior.
+        Sequential grid searches visit cells in a 'snake' order, so every cell after the first is seeded by the cell
+        searched before it. Parallel grid searches search alternate cells (like the black squares of a chessboard)
+        first and the remaining cells are each seeded by their best neighbour. Cells of an adaptive grid search are
+        seeded by the cell they were subdivided from.
+
+        A search which raises an exception, runs for longer than the `job_timeout` set in the GridSearch config or
+        whose process dies is retried `job_retries` times with a different random seed. If every attempt fails a
+        `JobException` is raised, unless `isolate_failures` is True in the GridSearch config (it is False by default).
+        An isolated failure is recorded in the manifest (so the cell is searched again if the grid search is resumed)
+        and in the `failures` of the result, whose result for the cell is None.
+
         Parameters
         ----------
         number_of_steps: int
             The number of steps to go in each direction
         search: class
             The class of the search that is run at each step
+        max_refinement_depth: int
+            The number of times cells of the coarse grid can be subdivided. If 0, a regular grid is searched.
+        refinement_threshold: float
+            Cells whose figure of merit is within this value of the best cell's are subdivided.
+        refinement_gradient: float or None
+            Cells whose figure of merit differs from a neighbouring cell's by more than this value are subdivided.
+        refinement_figure_of_merit: str
+            The figure of merit cells are compared using, either "log_likelihood" or "log_evidence".
+        max_cells: int or None
+            The maximum number of cells that are searched in total. The coarse grid is always searched, after which
+            cells are only subdivided whilst this is not exceeded, those with the highest figure of merit first.
+        warm_start: bool
+            If True, the search of each cell is seeded by the result of a neighbouring cell.
         """
 
         if paths is None:
@@ -209,10 +267,23 @@ class GridSearch:
 
         self.parallel = parallel
         self.number_of_cores = conf.instance["non_linear"]["GridSearch"]["general"]["number_of_cores"]
+        self.share_cores = conf.instance["non_linear"]["GridSearch"]["general"]["share_cores"]
+        self.blas_threads = conf.instance["non_linear"]["GridSearch"]["general"]["blas_threads"]
+        self.job_directory = conf.instance["non_linear"]["GridSearch"]["general"]["job_directory"]
+        self.job_timeout = conf.instance["non_linear"]["GridSearch"]["general"]["job_timeout"]
+        self.job_retries = conf.instance["non_linear"]["GridSearch"]["general"]["job_retries"]
+        self.isolate_failures = conf.instance["non_linear"]["GridSearch"]["general"]["isolate_failures"]
 
         self.number_of_steps = number_of_steps
         self.search = search
 
+        self.max_refinement_depth = max_refinement_depth
+        self.refinement_threshold = refinement_threshold
+        self.refinement_gradient = refinement_gradient
+        self.refinement_figure_of_merit = refinement_figure_of_merit
+        self.max_cells = max_cells
+        self.warm_start = warm_start
+
     @property
     def hyper_step_size(self):
         """
@@ -248,9 +319,12 @@ class GridSearch:
             len(grid_priors), step_size=self.hyper_step_size, centre_steps=False
         )
 
-    def make_arguments(self, values, grid_priors):
+    def make_arguments(self, values, grid_priors, step_sizes=None):
+        if step_sizes is None:
+            step_sizes = [self.hyper_step_size] * len(grid_priors)
+
         arguments = {}
-        for value, grid_prior in zip(values, grid_priors):
+        for value, grid_prior, step_size in zip(values, grid_priors, step_sizes):
             if (
                     float("-inf") == grid_prior.lower_limit
                     or float("inf") == grid_prior.upper_limit
@@ -261,7 +335,7 @@ class GridSearch:
             lower_limit = grid_prior.lower_limit + value * grid_prior.width
             upper_limit = (
                     grid_prior.lower_limit
-                    + (value + self.hyper_step_size) * grid_prior.width
+                    + (value + step_size) * grid_prior.width
             )
             prior = p.UniformPrior(lower_limit=lower_limit, upper_limit=upper_limit)
             arguments[grid_prior] = prior
@@ -292,7 +366,10 @@ class GridSearch:
         result: GridSearchResult
             An object that comprises the results from each individual fit
         """
-        func = self.fit_parallel if self.parallel else self.fit_sequential
+        if self.max_refinement_depth > 0:
+            func = self.fit_adaptive
+        else:
+            func = self.fit_parallel if self.parallel else self.fit_sequential
         return func(
             model=model,
             analysis=analysis,
@@ -322,42 +399,59 @@ class GridSearch:
         lists = self.make_lists(grid_priors)
         physical_lists = self.make_physical_lists(grid_priors)
 
-        results_list = [
-            ["index"]
-            + list(map(model.name_for_prior, grid_priors))
-            + ["likelihood_merit"]
-        ]
+        manifest = self.manifest_for(
+            header=["index"]
+                   + list(map(model.name_for_prior, grid_priors))
+                   + ["likelihood_merit"]
+        )
+
+        indices = list(product(range(self.number_of_steps), repeat=len(grid_priors)))
+
+        if self.warm_start:
+            waves = [
+                [index for index, cell in enumerate(indices) if sum(cell) % 2 == parity]
+                for parity in (0, 1)
+            ]
+        else:
+            waves = [list(range(len(indices)))]
 
-        jobs = list()
+        for wave in waves:
 
-        for index, values in enumerate(lists):
-            jobs.append(
+            completed = {
+                indices[result.index]: result.result for result in results if result.result is not None
+            }
+
+            jobs = (
                 self.job_for_analysis_grid_priors_and_values(
-                    analysis=copy.deepcopy(analysis),
-                    model=model,
+                    analysis=None,
+                    model=self.model_for_cell(
+                        model=model,
+                        grid_priors=grid_priors,
+                        neighbour_result=self.best_neighbour_result(
+                            cell=indices[index], results=completed
+                        ),
+                    ),
                     grid_priors=grid_priors,
-                    values=values,
+                    values=lists[index],
                     index=index,
                 )
+                for index in wave
             )
 
-        for result in Process.run_jobs(
-                jobs,
-                self.number_of_cores
-        ):
-            results.append(result)
-            results = sorted(results)
-            results_list.append(result.result_list_row)
-            self.write_results(results_list)
+            for result in self._perform_jobs(
+                    jobs=jobs, manifest=manifest, analysis=analysis, number_of_jobs=len(wave)
+            ):
+                results.append(result)
 
         return GridSearchResult(
             [
                 result.result
                 for result
-                in results
+                in sorted(results, key=lambda result: result.index)
             ],
             lists,
-            physical_lists
+            physical_lists,
+            failures=failures_of(results),
         )
 
     def fit_sequential(self, model, analysis, grid_priors):
@@ -383,62 +477,368 @@ class GridSearch:
         lists = self.make_lists(grid_priors)
         physical_lists = self.make_physical_lists(grid_priors)
 
-        results_list = [
-            ["index"]
-            + list(map(model.name_for_prior, grid_priors))
-            + ["max_log_likelihood"]
-        ]
+        manifest = self.manifest_for(
+            header=["index"]
+                   + list(map(model.name_for_prior, grid_priors))
+                   + ["max_log_likelihood"]
+        )
+
+        if self.warm_start:
+            order = [
+                int(np.ravel_multi_index(cell, (self.number_of_steps,) * len(grid_priors)))
+                for cell in snake_order(len(grid_priors), self.number_of_steps)
+            ]
+        else:
+            order = range(len(lists))
 
-        for index, values in enumerate(lists):
+        previous_result = None
+
+        for index in order:
             job = self.job_for_analysis_grid_priors_and_values(
                 analysis=analysis,
-                model=model,
+                model=self.model_for_cell(
+                    model=model, grid_priors=grid_priors, neighbour_result=previous_result
+                ),
                 grid_priors=grid_priors,
-                values=values,
+                values=lists[index],
                 index=index,
             )
 
-            result = job.perform()
+            for result in self._perform_jobs(jobs=[job], manifest=manifest, analysis=analysis):
+                results.append(result)
+                previous_result = result.result
+
+        return GridSearchResult(
+            [
+                result.result
+                for result
+                in sorted(results, key=lambda result: result.index)
+            ],
+            lists,
+            physical_lists,
+            failures=failures_of(results),
+        )
+
+    def fit_adaptive(self, model, analysis, grid_priors):
+        """
+        Perform the grid search adaptively, starting with the regular grid and subdividing the cells whose figure of
+        merit is close to the best cell's, or which differ greatly from a neighbour's. Searches are performed in
+        parallel if `parallel` is True.
+
+        Parameters
+        ----------
+        analysis
+            An analysis
+        grid_priors
+            Priors describing the position in the grid
+
+        Returns
+        -------
+        result: AdaptiveGridSearchResult
+            The result of the grid search, containing the tree of cells which were searched
+        """
+        grid_priors = list(sorted(set(grid_priors), key=lambda prior: prior.id))
+
+        manifest = self.manifest_for(
+            header=["index"]
+                   + list(map(model.name_for_prior, grid_priors))
+                   + ["max_log_likelihood"]
+        )
+
+        cells = [
+            GridCell(
+                lower_limits=values,
+                step_sizes=[self.hyper_step_size] * len(grid_priors),
+                index_path=(index,),
+            )
+            for index, values in enumerate(self.make_lists(grid_priors))
+        ]
+
+        total_cells = 0
+        new_cells = cells
+        failures = {}
+
+        for depth in range(self.max_refinement_depth + 1):
+
+            jobs = (
+                self.job_for_analysis_grid_priors_and_values(
+                    analysis=None if self.parallel else analysis,
+                    model=self.model_for_cell(
+                        model=model,
+                        grid_priors=grid_priors,
+                        neighbour_result=cell.parent.result if cell.parent is not None else None,
+                    ),
+                    grid_priors=grid_priors,
+                    values=cell.lower_limits,
+                    index=total_cells + index,
+                    step_sizes=cell.step_sizes,
+                    index_path=cell.index_path,
+                )
+                for index, cell in enumerate(new_cells)
+            )
+
+            for result in self._perform_jobs(
+                    jobs=jobs, manifest=manifest, analysis=analysis, number_of_jobs=len(new_cells)
+            ):
+                new_cells[result.index - total_cells].result = result.result
+                if result.failure is not None:
+                    failures[result.index] = result.failure
 
-            results.append(result.result)
-            results_list.append(result.result_list_row)
+            total_cells += len(new_cells)
 
-            self.write_results(results_list)
+            if depth == self.max_refinement_depth:
+                break
 
-        return GridSearchResult(results, lists, physical_lists)
+            refine = self.cells_to_refine(cells=cells)
 
-    def write_results(self, results_list):
+            if self.max_cells is not None:
+                refine = refine[:max(self.max_cells - total_cells, 0) // 2 ** len(grid_priors)]
 
-        with open(path.join(self.paths.output_path, "results"), "w+") as f:
-            f.write(
-                "\n".join(
-                    map(
-                        lambda ls: ", ".join(
-                            map(
-                                lambda value: "{:.2f}".format(value)
-                                if isinstance(value, float)
-                                else str(value),
-                                ls,
-                            )
-                        ),
-                        results_list,
+            if len(refine) == 0:
+                break
+
+            new_cells = [child for cell in refine for child in cell.subdivide()]
+
+        return AdaptiveGridSearchResult(
+            cells=cells,
+            grid_priors=grid_priors,
+            failures=failures,
+        )
+
+    def model_for_cell(self, model, grid_priors, neighbour_result=None):
+        """
+        The model searched in a cell of the grid, before the grid priors are replaced with the limits of the cell.
+
+        If this grid search warm starts cells and the result of a neighbouring cell is given, the priors of every
+        parameter which is not on the grid are replaced by the priors passed from the neighbour's result (the Gaussian
+        priors of its `model`, set by the `PriorPasser` of its search).
+
+        Parameters
+        ----------
+        model
+            The model of the grid search
+        grid_priors
+            The priors of the grid, which are not replaced
+        neighbour_result
+            The result of a neighbouring cell, or None if no neighbour has been searched
+        """
+        if not self.warm_start or neighbour_result is None:
+            return model
+
+        grid_prior_ids = {prior.id for prior in grid_priors}
+        passed_priors = dict(neighbour_result.model.path_priors_tuples)
+
+        return model.mapper_from_partial_prior_arguments(
+            {
+                prior: passed_priors[prior_path]
+                for prior_path, prior in model.path_priors_tuples
+                if prior.id not in grid_prior_ids and prior_path in passed_priors
+            }
+        )
+
+    @staticmethod
+    def best_neighbour_result(cell: Tuple[int, ...], results: dict):
+        """
+        The result with the highest log likelihood of the cells adjacent to a cell, or None if none have a result.
+
+        Parameters
+        ----------
+        cell
+            The integer position of the cell on the grid
+        results
+            The results of cells which have been searched, keyed by their integer positions
+        """
+        neighbours = [
+            results[neighbour]
+            for dimension in range(len(cell))
+            for step in (-1, 1)
+            for neighbour in [cell[:dimension] + (cell[dimension] + step,) + cell[dimension + 1:]]
+            if neighbour in results
+        ]
+
+        if len(neighbours) == 0:
+            return None
+
+        return max(neighbours, key=lambda result: result.log_likelihood)
+
+    def figure_of_merit(self, result) -> float:
+        if self.refinement_figure_of_merit == "log_evidence":
+            return result.samples.log_evidence
+        return result.log_likelihood
+
+    def cells_to_refine(self, cells: List["GridCell"]) -> List["GridCell"]:
+        """
+        The searched cells which are subdivided into finer cells, ordered from highest to lowest figure of merit.
+
+        A cell is refined if its figure of merit is within `refinement_threshold` of the best figure of merit of every
+        cell, or if it differs from that of a neighbouring cell by more than `refinement_gradient`. Only cells which
+        have not already been subdivided, and whose search did not fail, are refined.
+        """
+        leaves = [leaf for cell in cells for leaf in cell.leaves if leaf.result is not None]
+
+        if len(leaves) == 0:
+            return []
+
+        figures_of_merit = {
+            id(leaf): self.figure_of_merit(result=leaf.result) for leaf in leaves
+        }
+        best_figure_of_merit = max(figures_of_merit.values())
+
+        refine = []
+
+        for leaf in leaves:
+
+            figure_of_merit = figures_of_merit[id(leaf)]
+
+            if best_figure_of_merit - figure_of_merit <= self.refinement_threshold:
+                refine.append(leaf)
+                continue
+
+            if self.refinement_gradient is not None and any(
+                    abs(figures_of_merit[id(other)] - figure_of_merit) > self.refinement_gradient
+                    for other in leaves
+                    if other is not leaf and leaf.is_neighbour(other)
+            ):
+                refine.append(leaf)
+
+        return sorted(
+            refine, key=lambda leaf: figures_of_merit[id(leaf)], reverse=True
+        )
+
+    def manifest_for(self, header: List[str]) -> GridManifest:
+        return GridManifest(directory=self.paths.output_path, header=header)
+
+    def _perform_jobs(
+            self,
+            jobs: Iterable["Job"],
+            manifest: GridManifest,
+            analysis,
+            number_of_jobs: Optional[int] = None,
+    ):
+        """
+        Perform the jobs of cells which the manifest does not record as completed, in parallel if this grid search is
+        parallel or one after another if not, recording each in the manifest as it completes.
+
+        Jobs are taken from the input iterable as workers become free, so a generator of jobs is never built in full.
+        Parallel jobs do not carry the analysis; instead it is sent to every worker process once, when it starts.
+        If `share_cores` is True the grid's cores are a budget shared with the pools of the searches of the jobs.
+
+        A job which fails every attempt is recorded as failed in the manifest and, if failures are isolated, yields a
+        `JobResult` whose result is None and whose `failure` describes why it failed.
+
+        The results of completed cells are then loaded in this process from the output of their searches, which are not
+        run again.
+        """
+        completed = []
+
+        def missing_jobs():
+            for job in jobs:
+                if manifest.is_completed(job.cell):
+                    completed.append(job)
+                else:
+                    yield job
+
+        missing = missing_jobs()
+        first = next(missing, None)
+
+        if first is not None:
+
+            missing = chain([first], missing)
+
+            if self.parallel:
+                scheduler = self._scheduler(analysis=analysis)
+            else:
+                scheduler = JobScheduler(
+                    number_of_cores=1,
+                    retries=self.job_retries,
+                    raise_on_failure=not self.isolate_failures,
+                )
+
+            for result in scheduler.run(missing, number_of_jobs=number_of_jobs):
+                if isinstance(result, JobFailure):
+                    manifest.append_failure(
+                        cell=result.job.cell, message=result.message, name=result.job.name
+                    )
+                    yield JobResult(
+                        result=None,
+                        result_list_row=[result.job.index],
+                        number=result.job.number,
+                        name=result.job.name,
+                        cell=result.job.cell,
+                        failure=result.message,
                     )
+                    continue
+
+                manifest.append(
+                    cell=result.cell,
+                    name=result.name,
+                    row=result.result_list_row,
+                    log_likelihood=result.log_likelihood,
+                    log_evidence=result.log_evidence,
                 )
+                yield result
+
+        for job in completed:
+            job.analysis = analysis
+            yield job.perform()
+
+    def _scheduler(self, analysis) -> Union[JobScheduler, DirectoryJobQueue]:
+        """
+        The scheduler parallel jobs are performed by, which is a queue in the shared `job_directory` if one is set.
+        """
+        if self.job_directory is not None:
+            return DirectoryJobQueue(
+                directory=self.job_directory,
+                initializer=set_worker_analysis,
+                initargs=(analysis,),
+                retries=self.job_retries,
+                raise_on_failure=not self.isolate_failures,
+                timeout=self.job_timeout,
             )
 
+        return JobScheduler(
+            number_of_cores=self.number_of_cores,
+            initializer=set_worker_analysis,
+            initargs=(analysis,),
+            core_budget=CoreBudget(total_cores=self.number_of_cores) if self.share_cores else None,
+            blas_threads=self.blas_threads,
+            timeout=self.job_timeout,
+            retries=self.job_retries,
+            raise_on_failure=not self.isolate_failures,
+        )
+
     def job_for_analysis_grid_priors_and_values(
-            self, model, analysis, grid_priors, values, index
+            self, model, analysis, grid_priors, values, index, step_sizes=None, index_path=None
     ):
-        arguments = self.make_arguments(values=values, grid_priors=grid_priors)
+        """
+        The job which searches the cell of the grid whose grid priors have lower limits `values`.
+
+        The search of the cell is named after the limits of its grid priors to 2 decimal places. The cells of an
+        adaptive grid search are also named after their `index_path`, as the limits of small cells are not distinct
+        to 2 decimal places and cells with the same name would share the output of one search. The manifest identifies
+        the cell by its limits at full precision.
+        """
+        arguments = self.make_arguments(
+            values=values, grid_priors=grid_priors, step_sizes=step_sizes
+        )
         model = model.mapper_from_partial_prior_arguments(arguments=arguments)
 
         labels = []
+        limits = []
         for prior in sorted(arguments.values(), key=lambda pr: pr.id):
             labels.append(
                 "{}_{:.2f}_{:.2f}".format(
                     model.name_for_prior(prior), prior.lower_limit, prior.upper_limit
                 )
             )
+            limits.append(
+                "{}_{!r}_{!r}".format(
+                    model.name_for_prior(prior), float(prior.lower_limit), float(prior.upper_limit)
+                )
+            )
+
+        if index_path is not None:
+            labels.append("cell_{}".format("_".join(map(str, index_path))))
 
         name_path = path.join(
             self.paths.name,
@@ -455,6 +855,7 @@ class GridSearch:
             analysis=analysis,
             arguments=arguments,
             index=index,
+            cell="_".join(limits),
         )
 
     def search_instance(self, name_path):
@@ -476,25 +877,240 @@ class GridSearch:
         return search_instance
 
 
+class GridCell:
+    def __init__(
+            self,
+            lower_limits: List[float],
+            step_sizes: List[float],
+            depth: int = 0,
+            parent: Optional["GridCell"] = None,
+            index_path: Tuple[int, ...] = (),
+    ):
+        """
+        A cell of an adaptive grid search, spanning `step_sizes` from `lower_limits` in unit values of each grid prior.
+
+        Once it is searched a cell may be subdivided into 2 ^ no_dimension child cells which cover it at half the step
+        size, forming a tree of cells whose leaves tile the grid.
+
+        Parameters
+        ----------
+        lower_limits
+            The lower limit of the cell in each dimension, in unit values
+        step_sizes
+            The size of the cell in each dimension, in unit values
+        depth
+            The number of times the coarse grid was subdivided to create this cell
+        parent
+            The cell this cell was subdivided from
+        index_path
+            The index of the coarse cell this cell was subdivided from followed by the index of this cell among the
+            children of each subdivided cell above it, which uniquely identifies the cell
+        """
+        self.lower_limits = list(lower_limits)
+        self.step_sizes = list(step_sizes)
+        self.depth = depth
+        self.parent = parent
+        self.index_path = tuple(index_path)
+        self.result = None
+        self.children = []
+
+    @property
+    def upper_limits(self) -> List[float]:
+        return [
+            lower_limit + step_size
+            for lower_limit, step_size in zip(self.lower_limits, self.step_sizes)
+        ]
+
+    @property
+    def leaves(self) -> List["GridCell"]:
+        """The cells of the tree below this cell which have not been subdivided (including this cell if it has not)."""
+        if len(self.children) == 0:
+            return [self]
+        return [leaf for child in self.children for leaf in child.leaves]
+
+    def subdivide(self) -> List["GridCell"]:
+        step_sizes = [step_size / 2 for step_size in self.step_sizes]
+
+        self.children = [
+            GridCell(
+                lower_limits=[
+                    lower_limit + offset * step_size
+                    for lower_limit, offset, step_size in zip(self.lower_limits, offsets, step_sizes)
+                ],
+                step_sizes=step_sizes,
+                depth=self.depth + 1,
+                parent=self,
+                index_path=self.index_path + (index,),
+            )
+            for index, offsets in enumerate(product((0, 1), repeat=len(step_sizes)))
+        ]
+
+        return self.children
+
+    def contains(self, point: List[float]) -> bool:
+        return all(
+            lower_limit <= value < upper_limit
+            for value, lower_limit, upper_limit in zip(point, self.lower_limits, self.upper_limits)
+        )
+
+    def is_neighbour(self, other: "GridCell", tolerance: float = 1e-8) -> bool:
+        """Whether this cell shares a face with another cell."""
+        touching = 0
+
+        for lower, upper, other_lower, other_upper in zip(
+                self.lower_limits, self.upper_limits, other.lower_limits, other.upper_limits
+        ):
+            if lower > other_upper + tolerance or other_lower > upper + tolerance:
+                return False
+            if abs(upper - other_lower) < tolerance or abs(other_upper - lower) < tolerance:
+                touching += 1
+
+        return touching == 1
+
+
+class AdaptiveGridSearchResult(GridSearchResult):
+    def __init__(self, cells: List[GridCell], grid_priors, failures: Optional[Dict[int, str]] = None):
+        """
+        The result of an adaptive grid search, whose cells form a tree rather than a regular grid.
+
+        The `results`, `lower_limit_lists` and `physical_lower_limits_lists` are those of the leaves of the tree (the
+        cells which were not subdivided). Arrays of values over the grid (e.g. `max_log_likelihood_values`) are
+        resampled onto a regular grid at the resolution of the finest cells.
+
+        Parameters
+        ----------
+        cells
+            The cells of the coarse grid, which contain the cells they were subdivided into
+        grid_priors
+            The priors of the grid, in the order of the dimensions of the cells
+        failures
+            The message describing why the search failed for every cell whose search failed, keyed by its index
+        """
+        self.cells = cells
+        self.leaves = [leaf for cell in cells for leaf in cell.leaves]
+
+        super().__init__(
+            results=[leaf.result for leaf in self.leaves],
+            lower_limit_lists=[leaf.lower_limits for leaf in self.leaves],
+            physical_lower_limits_lists=[
+                [prior.value_for(value) for prior, value in zip(grid_priors, leaf.lower_limits)]
+                for leaf in self.leaves
+            ],
+            failures=failures,
+        )
+
+    @property
+    def shape(self):
+        return tuple(
+            int(round(1 / min(leaf.step_sizes[dim] for leaf in self.leaves)))
+            for dim in range(self.no_dimensions)
+        )
+
+    def leaf_containing(self, point: List[float]) -> GridCell:
+        for leaf in self.leaves:
+            if leaf.contains(point):
+                return leaf
+
+    def resample(
+            self,
+            func: Callable,
+            shape: Optional[Tuple[int, ...]] = None,
+            missing=np.nan,
+    ) -> np.ndarray:
+        """
+        Resample a value of the result of every cell onto a regular grid, where each element of the array takes the
+        value of the cell containing its centre.
+
+        Parameters
+        ----------
+        func
+            A function which returns the value for the result of a cell, e.g. `lambda result: result.log_likelihood`
+        shape
+            The shape of the regular grid, which defaults to the resolution of the finest cells
+        missing
+            The value of elements in cells whose search failed
+        """
+        shape = shape or self.shape
+
+        results = [
+            self.leaf_containing(point).result
+            for point in make_lists(
+                self.no_dimensions,
+                step_size=tuple(1 / side for side in shape),
+                centre_steps=True,
+            )
+        ]
+
+        values = [missing if result is None else func(result) for result in results]
+
+        return np.reshape(np.array(values), shape)
+
+    @property
+    def results_reshaped(self):
+        return self.resample(func=lambda result: result, missing=None)
+
+    @property
+    def max_log_likelihood_values(self):
+        return self.resample(func=lambda result: result.log_likelihood)
+
+    @property
+    def log_evidence_values(self):
+        return self.resample(func=lambda result: result.samples.log_evidence)
+
+
 class JobResult(AbstractJobResult):
-    def __init__(self, result, result_list_row, number):
+    def __init__(self, result, result_list_row, number, name=None, cell=None, failure=None):
         """
         The result of a job
 
         Parameters
         ----------
         result
-            The result of a grid search
+            The result of a grid search, or None if the search failed
         result_list_row
             A row in the result list
+        name
+            The name of the search of the job's cell
+        cell
+            The identifier of the job's cell, which is its limits at full precision
+        failure
+            The message describing why the search failed, if it did
         """
         super().__init__(number)
         self.result = result
         self.result_list_row = result_list_row
+        self.index = result_list_row[0]
+        self.name = name
+        self.cell = cell
+        self.failure = failure
+
+    @property
+    def log_likelihood(self) -> float:
+        return float(self.result.log_likelihood)
+
+    @property
+    def log_evidence(self) -> Optional[float]:
+        """The log evidence of the search, or None if the search does not compute one."""
+        log_evidence = getattr(self.result.samples, "log_evidence", None)
+        if log_evidence is None:
+            return None
+        return float(log_evidence)
+
+
+_worker_analysis = None
+
+
+def set_worker_analysis(analysis):
+    """
+    Set the analysis used by jobs which do not carry one. This is the initializer of each worker process of a parallel
+    grid search, so the analysis is sent to each worker once rather than with every job.
+    """
+    global _worker_analysis
+    _worker_analysis = analysis
 
 
 class Job(AbstractJob):
-    def __init__(self, search_instance, model, analysis, arguments, index):
+    def __init__(self, search_instance, model, analysis, arguments, index, cell=None):
         """
         A job to be performed in parallel.
 
@@ -503,9 +1119,11 @@ class Job(AbstractJob):
         search_instance
             An instance of an optimiser
         analysis
-            An analysis
+            An analysis, or None if the job is performed by a worker process whose analysis was set when it started
         arguments
             The grid search arguments
+        cell
+            The identifier of the job's cell in the manifest, which is its limits at full precision
         """
         super().__init__()
         self.search_instance = search_instance
@@ -513,31 +1131,69 @@ class Job(AbstractJob):
         self.model = model
         self.arguments = arguments
         self.index = index
+        self.cell = cell
+
+    @property
+    def name(self) -> str:
+        return self.search_instance.paths.name
 
     def perform(self):
-        result = self.search_instance.fit(model=self.model, analysis=self.analysis)
+        analysis = self.analysis if self.analysis is not None else _worker_analysis
+
+        if self.number_of_cores is not None:
+            self.search_instance.number_of_cores = self.number_of_cores
+
+        result = self.search_instance.fit(model=self.model, analysis=analysis)
         result_list_row = [
             self.index,
-            *[prior.lower_limit for prior in self.arguments.values()],
-            result.log_likelihood,
+            *[float(prior.lower_limit) for prior in self.arguments.values()],
+            float(result.log_likelihood),
         ]
 
-        return JobResult(result, result_list_row, self.number)
+        return JobResult(result, result_list_row, self.number, name=self.name, cell=self.cell)
 
 
-def grid(fitness_function, no_dimensions, step_size):
+def failures_of(results: List[JobResult]) -> Dict[int, str]:
+    """The failure message of every job which failed, keyed by the index of its cell"""
+    return {
+        result.index: result.failure
+        for result in results
+        if result.failure is not None
+    }
+
+
+def grid(
+        fitness_function,
+        no_dimensions,
+        step_size,
+        vectorized=False,
+        chunk_size=10000,
+        number_of_cores=1,
+):
     """
     Grid2D search using a fitness function over a given number of dimensions and a given step size between inclusive
     limits of 0 and 1.
 
+    Points are generated as arrays in chunks of `chunk_size` (see `grid_points`) and the best fitness is tracked as
+    each chunk is evaluated, so the grid is never held in memory and grids of many millions of points can be
+    searched.
+
     Parameters
     ----------
     fitness_function: function
-        A function that takes a tuple of floats as an argument
+        A function that takes a tuple of floats as an argument or, if `vectorized`, an array of shape
+        (number_of_points, no_dimensions) and returns an array of the fitness of every point
     no_dimensions: int
         The number of dimensions of the grid search
     step_size: float
         The step size of the grid search
+    vectorized: bool
+        If True, the fitness function is called once per chunk with an array of points
+    chunk_size: int
+        The number of points evaluated in each chunk
+    number_of_cores: int
+        The number of processes chunks are evaluated on. The fitness function is sent to each process once, when it
+        starts, and each chunk is sent as the range of the indices of its points.
 
     Returns
     -------
@@ -547,15 +1203,162 @@ def grid(fitness_function, no_dimensions, step_size):
     best_fitness = float("-inf")
     best_arguments = None
 
-    for arguments in make_lists(no_dimensions, step_size):
-        fitness = fitness_function(tuple(arguments))
+    if number_of_cores == 1:
+        results = (
+            best_of_points(
+                fitness_function=fitness_function,
+                points=points,
+                vectorized=vectorized,
+            )
+            for points in grid_points(no_dimensions, step_size, chunk_size=chunk_size)
+        )
+    else:
+        number_of_points = int(np.prod(number_of_grid_steps(no_dimensions, step_size)))
+        jobs = (
+            GridChunkJob(
+                no_dimensions=no_dimensions,
+                step_size=step_size,
+                start=start,
+                stop=min(start + chunk_size, number_of_points),
+                vectorized=vectorized,
+            )
+            for start in range(0, number_of_points, chunk_size)
+        )
+        results = (
+            (result.fitness, result.arguments)
+            for result in JobScheduler(
+                number_of_cores=number_of_cores,
+                ordered=True,
+                initializer=set_worker_fitness_function,
+                initargs=(fitness_function,),
+            ).run(jobs)
+        )
+
+    for fitness, arguments in results:
         if fitness > best_fitness:
             best_fitness = fitness
-            best_arguments = tuple(arguments)
+            best_arguments = arguments
 
     return best_arguments
 
 
+def best_of_points(
+        fitness_function: Callable,
+        points: np.ndarray,
+        vectorized: bool = False,
+) -> Tuple[float, Optional[Tuple[float, ...]]]:
+    """
+    The highest fitness of an array of points and the point that gave it, or (-inf, None) if no point has a fitness
+    above -inf. NaN fitnesses are ignored and the first point is taken if several share the highest fitness.
+
+    Parameters
+    ----------
+    fitness_function
+        A function that takes a tuple of floats or, if `vectorized`, an array of points
+    points
+        An array of shape (number_of_points, no_dimensions)
+    vectorized
+        If True, the fitness function is called once with every point
+    """
+    if vectorized:
+        fitness = np.asarray(fitness_function(points), dtype=float)
+    else:
+        fitness = np.array(
+            [fitness_function(tuple(map(float, point))) for point in points],
+            dtype=float,
+        )
+
+    if len(fitness) == 0:
+        return float("-inf"), None
+
+    fitness = np.where(np.isnan(fitness), float("-inf"), fitness)
+    index = int(np.argmax(fitness))
+
+    if fitness[index] == float("-inf"):
+        return float("-inf"), None
+
+    return float(fitness[index]), tuple(map(float, points[index]))
+
+
+class GridChunkResult(AbstractJobResult):
+    def __init__(self, number, fitness, arguments):
+        """
+        The best point of a chunk of a grid
+
+        Parameters
+        ----------
+        fitness
+            The highest fitness of the chunk
+        arguments
+            The point that gave the highest fitness
+        """
+        super().__init__(number)
+        self.fitness = fitness
+        self.arguments = arguments
+
+
+_worker_fitness_function = None
+
+
+def set_worker_fitness_function(fitness_function):
+    """
+    Set the fitness function evaluated by `GridChunkJob`s. This is the initializer of each worker process of a parallel
+    `grid`.
+    """
+    global _worker_fitness_function
+    _worker_fitness_function = fitness_function
+
+
+class GridChunkJob(AbstractJob):
+    def __init__(self, no_dimensions, step_size, start, stop, vectorized=False):
+        """
+        A job evaluating the fitness of a chunk of the points of a grid, given by the range of their indices, so the
+        points are generated by the process that evaluates them rather than being sent to it.
+        """
+        super().__init__()
+        self.no_dimensions = no_dimensions
+        self.step_size = step_size
+        self.start = start
+        self.stop = stop
+        self.vectorized = vectorized
+
+    def perform(self):
+        points = next(
+            grid_points(
+                self.no_dimensions,
+                self.step_size,
+                chunk_size=self.stop - self.start,
+                start=self.start,
+                stop=self.stop,
+            )
+        )
+        fitness, arguments = best_of_points(
+            fitness_function=_worker_fitness_function,
+            points=points,
+            vectorized=self.vectorized,
+        )
+        return GridChunkResult(self.number, fitness, arguments)
+
+
+def snake_order(no_dimensions: int, number_of_steps: int) -> List[Tuple[int, ...]]:
+    """
+    The integer positions of every cell of a grid, ordered such that every cell is adjacent to the cell before it.
+
+    The first dimension varies slowest, as in `make_lists`, but the order of the remaining dimensions reverses every
+    step so the grid is traversed back and forth like a snake.
+    """
+    if no_dimensions == 0:
+        return [()]
+
+    sub_order = snake_order(no_dimensions - 1, number_of_steps)
+
+    return [
+        (step, *sub_position)
+        for step in range(number_of_steps)
+        for sub_position in (sub_order if step % 2 == 0 else reversed(sub_order))
+    ]
+
+
 def make_lists(
         no_dimensions: int,
         step_size: Union[Tuple[float], float],
@@ -604,3 +1407,57 @@ def make_lists(
         for value in range(int((1 / step_size)))
         for sub_list in sub_lists
     ]
+
+
+def number_of_grid_steps(
+        no_dimensions: int,
+        step_size: Union[Tuple[float], float],
+) -> Tuple[int, ...]:
+    """The number of steps in each dimension of a grid, as used by `make_lists`"""
+    if isinstance(step_size, float):
+        step_size = tuple(step_size for _ in range(no_dimensions))
+    return tuple(int(1 / size) for size in step_size)
+
+
+def grid_points(
+        no_dimensions: int,
+        step_size: Union[Tuple[float], float],
+        chunk_size: int = 10000,
+        centre_steps: bool = True,
+        start: int = 0,
+        stop: Optional[int] = None,
+) -> Generator[np.ndarray, None, None]:
+    """
+    Generate the points of `make_lists` as arrays of shape (chunk_size, no_dimensions), in the same order, without
+    building a list of every point.
+
+    Parameters
+    ----------
+    no_dimensions
+        The number of dimensions of the grid
+    step_size
+        The step size. This can be a float or a tuple with the same number of dimensions
+    chunk_size
+        The maximum number of points in each array
+    centre_steps
+        If True, points are at the centre of each step rather than its lower limit
+    start
+        The index of the first point generated
+    stop
+        The index after the last point generated, which defaults to the number of points of the grid
+    """
+    steps = number_of_grid_steps(no_dimensions, step_size)
+    step_sizes = np.array(
+        step_size if isinstance(step_size, tuple) else [step_size] * no_dimensions,
+        dtype=float,
+    )
+    offset = 0.5 if centre_steps else 0.0
+
+    if stop is None:
+        stop = int(np.prod(steps))
+
+    for begin in range(start, stop, chunk_size):
+        indices = np.unravel_index(
+            np.arange(begin, min(begin + chunk_size, stop)), steps
+        )
+        yield (np.stack(indices, axis=-1) + offset) * step_sizes
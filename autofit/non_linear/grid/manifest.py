@@ -0,0 +1,168 @@
+import json
+import os
+from os import path
+from typing import Dict, List, Optional
+
+
+def format_row(row: List) -> str:
+    """A row of the grid search results file, with floats given to 2 decimal places."""
+    return ", ".join(
+        "{:.2f}".format(value)
+        if isinstance(value, float)
+        else str(value)
+        for value in row
+    )
+
+
+class GridManifest:
+    def __init__(self, directory: str, header: List[str]):
+        """
+        A record of the cells of a grid search which have been completed, which allows an interrupted grid search to
+        be resumed by scheduling only the cells which are missing.
+
+        Every time a cell completes an entry is appended to the manifest file (one JSON object per line), recording its
+        status and summary statistics (its max log likelihood and log evidence) alongside the row written to the
+        results file, which is also appended to rather than rewritten. If a grid search is killed only the cells in
+        progress are lost, and a partially written final line of the manifest is discarded when it is loaded.
+
+        Cells are identified by the limits of their grid priors at full precision, rather than the name of their search
+        (which gives the limits to 2 decimal places and may be shared by the small cells of an adaptive grid search). A
+        cell whose search failed is recorded with the status "failed" and the reason it failed, and is searched again
+        when the grid search is resumed.
+
+        Parameters
+        ----------
+        directory
+            The output directory of the grid search, which the manifest and results files are written to.
+        header
+            The header of the results file.
+        """
+        self.directory = directory
+        self.header = header
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.entries: Dict[str, dict] = self.load()
+        self.write_results()
+
+    @property
+    def manifest_path(self) -> str:
+        return path.join(self.directory, "grid_manifest.jsonl")
+
+    @property
+    def results_path(self) -> str:
+        return path.join(self.directory, "results")
+
+    def load(self) -> Dict[str, dict]:
+        """
+        The latest entry for every cell in the manifest file, keyed by the identifier of the cell.
+
+        If the final line was only partially written it is removed, so that the next entry is appended on a new line.
+        """
+        entries = {}
+
+        if not path.exists(self.manifest_path):
+            return entries
+
+        with open(self.manifest_path) as f:
+            text = f.read()
+
+        if not text.endswith("\n"):
+            text = text[:text.rfind("\n") + 1]
+            with open(self.manifest_path, "w") as f:
+                f.write(text)
+
+        for line in text.splitlines():
+            entry = json.loads(line)
+            entries[entry["cell"]] = entry
+
+        return entries
+
+    def status(self, cell: str) -> str:
+        """The status of a cell, which is "completed", "failed" or "missing" if it has not been searched."""
+        try:
+            return self.entries[cell]["status"]
+        except KeyError:
+            return "missing"
+
+    def is_completed(self, cell: str) -> bool:
+        return self.status(cell) == "completed"
+
+    @property
+    def completed(self) -> List[dict]:
+        return sorted(
+            (entry for entry in self.entries.values() if entry["status"] == "completed"),
+            key=lambda entry: entry["row"][0],
+        )
+
+    def write_results(self):
+        """Write the results file from the rows of every completed cell."""
+        with open(self.results_path, "w+") as f:
+            f.write(
+                "\n".join(
+                    map(format_row, [self.header] + [entry["row"] for entry in self.completed])
+                )
+            )
+
+    def append(
+            self,
+            cell: str,
+            row: List,
+            log_likelihood: float,
+            log_evidence: Optional[float] = None,
+            name: Optional[str] = None,
+    ):
+        """
+        Record that a cell has been completed, appending its entry to the manifest and its row to the results file.
+
+        Parameters
+        ----------
+        cell
+            The identifier of the cell
+        row
+            The row of the results file for the cell
+        log_likelihood
+            The maximum log likelihood of the cell's search
+        log_evidence
+            The log evidence of the cell's search, if it computes one
+        name
+            The name of the cell's search
+        """
+        entry = {
+            "cell": cell,
+            "name": name,
+            "status": "completed",
+            "row": row,
+            "log_likelihood": log_likelihood,
+            "log_evidence": log_evidence,
+        }
+        self._append_entry(entry)
+
+        with open(self.results_path, "a") as f:
+            f.write("\n" + format_row(row))
+
+    def append_failure(self, cell: str, message: str, name: Optional[str] = None):
+        """
+        Record that the search of a cell failed, appending its entry to the manifest.
+
+        Parameters
+        ----------
+        cell
+            The identifier of the cell
+        message
+            A description of why the search failed
+        name
+            The name of the cell's search
+        """
+        self._append_entry({
+            "cell": cell,
+            "name": name,
+            "status": "failed",
+            "message": message,
+        })
+
+    def _append_entry(self, entry: dict):
+        self.entries[entry["cell"]] = entry
+
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
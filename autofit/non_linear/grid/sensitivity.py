@@ -1,12 +1,17 @@
+import hashlib
+import pickle
 from copy import copy
 from copy import copy
 from itertools import count
 from os import path
-from typing import List, Generator, Callable, Type, Union, Tuple
+from typing import Dict, List, Generator, Callable, Optional, Type, Union, Tuple
+
+import numpy as np
 
 from autofit import AbstractPriorModel, ModelInstance, Paths, Result, Analysis, NonLinearSearch
 from autofit.non_linear.grid.grid_search import make_lists
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.job_queue import DirectoryJobQueue
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, JobFailure, JobScheduler
 
 
 class JobResult(AbstractJobResult):
@@ -41,7 +46,9 @@ class Job(AbstractJob):
             analysis: Analysis,
             model: AbstractPriorModel,
             perturbation_model: AbstractPriorModel,
-            search: NonLinearSearch
+            search: NonLinearSearch,
+            warm_start: bool = False,
+            dataset_fingerprint: Optional[str] = None,
     ):
         """
         Job to run non-linear searches comparing how well a model and a model with a perturbation
@@ -57,12 +64,22 @@ class Job(AbstractJob):
             A class definition which can compares instances of a model to a perturbed image
         search
             A non-linear search
+        warm_start
+            If True, the model fitted with the perturbation uses priors passed from the posterior of the fit without
+            the perturbation (see `Result.model`), rather than the priors of the base model.
+        dataset_fingerprint
+            A hash of the dataset the analysis fits (see `fingerprint_of`). If None, the analysis itself is hashed.
         """
         super().__init__()
         self.analysis = analysis
         self.model = model
+        self.dataset_fingerprint = dataset_fingerprint
+
+        # The result of the fit without the perturbation, if it was performed by another job fitting the same dataset
+        self.result = None
 
         self.perturbation_model = perturbation_model
+        self.warm_start = warm_start
 
         paths = search.paths
 
@@ -85,12 +102,19 @@ class Job(AbstractJob):
         -------
         An object comprising the results of the two fits
         """
-        result = self.search.fit(
-            model=self.model,
-            analysis=self.analysis
-        )
+        result = self.result
+
+        if result is None:
+            result = self.search.fit(
+                model=self.model,
+                analysis=self.analysis
+            )
+
+        if self.warm_start:
+            perturbed_model = copy(result.model)
+        else:
+            perturbed_model = copy(self.model)
 
-        perturbed_model = copy(self.model)
         perturbed_model.perturbation = self.perturbation_model
 
         perturbed_result = self.perturbed_search.fit(
@@ -103,10 +127,56 @@ class Job(AbstractJob):
             perturbed_result=perturbed_result
         )
 
+    @property
+    def base_fingerprint(self) -> str:
+        """
+        A hash of the dataset and base model of this job, which the fit without the perturbation depends on.
+
+        Jobs with the same base fingerprint (e.g. perturbations which leave the simulated dataset unchanged) share one
+        fit without the perturbation.
+        """
+        dataset_fingerprint = self.dataset_fingerprint
+
+        if dataset_fingerprint is None:
+            dataset_fingerprint = fingerprint_of(self.analysis)
+
+        return fingerprint_of((dataset_fingerprint, self.model))
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A hash of the dataset and every model of this job, which both of its fits depend on, so jobs with the same
+        fingerprint give the same results and only one of them needs to be performed.
+        """
+        return fingerprint_of((self.base_fingerprint, self.perturbation_model, self.warm_start))
+
+
+def fingerprint_of(obj) -> str:
+    """
+    A hash of an object, such as a simulated dataset. Numpy arrays are hashed from their data, without being pickled.
+    """
+    if isinstance(obj, np.ndarray):
+        return hashlib.sha1(
+            pickle.dumps((obj.dtype.str, obj.shape)) + np.ascontiguousarray(obj).tobytes()
+        ).hexdigest()
+
+    return hashlib.sha1(pickle.dumps(obj)).hexdigest()
+
 
 class SensitivityResult:
-    def __init__(self, results: List[JobResult]):
+    def __init__(self, results: List[JobResult], failures: Optional[List[JobFailure]] = None):
+        """
+        The results of sensitivity mapping.
+
+        Parameters
+        ----------
+        results
+            The result of every perturbation whose fits completed
+        failures
+            A failure for every perturbation whose fits failed, whose `job_number` is the number of its job
+        """
         self.results = sorted(results)
+        self.failures = sorted(failures or [], key=lambda failure: failure.job_number)
 
     def __getitem__(self, item):
         return self.results[item]
@@ -128,7 +198,13 @@ class Sensitivity:
             analysis_class: Type[Analysis],
             search: NonLinearSearch,
             step_size: Union[Tuple[float], float] = 0.1,
-            number_of_cores: int = 2
+            number_of_cores: int = 2,
+            share_fits: bool = True,
+            warm_start: bool = False,
+            job_directory: Optional[str] = None,
+            job_timeout: Optional[float] = None,
+            job_retries: int = 0,
+            isolate_failures: bool = False,
     ):
         """
         Perform sensitivity mapping to evaluate whether a perturbation
@@ -163,7 +239,24 @@ class Sensitivity:
             with a perturbation_model of dimension 3 would give (1 / 0.5) ^ 3 = 8
             distinct perturbations.
         number_of_cores
-            How many cores does this computer have? Minimum 2.
+            The number of processes jobs are performed on. If 1, jobs are performed in serial.
+        share_fits
+            If True, the fit without the perturbation is performed once for every distinct simulated dataset and
+            shared by the perturbations which simulate it. Perturbations whose dataset and models are all identical
+            share both fits.
+        warm_start
+            If True, each fit with the perturbation uses priors passed from the posterior of the fit without it.
+        job_directory
+            If given, jobs are submitted to a `DirectoryJobQueue` in this directory instead of being performed on
+            `number_of_cores` processes of this machine, so that worker processes on any machine sharing the directory
+            can perform them.
+        job_timeout
+            The number of seconds a job may run before it fails. If None, jobs are not timed out.
+        job_retries
+            The number of times a job which fails is performed again, with a different random seed.
+        isolate_failures
+            If True, a job which fails every attempt does not stop the other jobs: it is recorded in the `failures` of
+            the result. Otherwise a `JobException` is raised.
         """
         self.instance = base_instance
         self.model = base_model
@@ -175,19 +268,107 @@ class Sensitivity:
         self.perturbation_model = perturbation_model
         self.simulate_function = simulate_function
         self.number_of_cores = number_of_cores
+        self.share_fits = share_fits
+        self.warm_start = warm_start
+        self.job_directory = job_directory
+        self.job_timeout = job_timeout
+        self.job_retries = job_retries
+        self.isolate_failures = isolate_failures
 
     def run(self) -> SensitivityResult:
         """
         Run fits and comparisons for all perturbations, returning
         a list of results.
+
+        If fits are shared, the first job for every base fingerprint is performed first. The remaining jobs with that
+        base fingerprint are then performed using its fit without the perturbation, so they only perform the fit with
+        the perturbation (or both fits, if the first job failed). Jobs whose fingerprint repeats that of another job are
+        not performed and share its results.
         """
         results = list()
-        for result in Process.run_jobs(
-                self._make_jobs(),
-                number_of_cores=self.number_of_cores
-        ):
-            results.append(result)
-        return SensitivityResult(results)
+        failures = list()
+
+        fingerprints: Dict[int, str] = dict()
+        shared_jobs: Dict[str, List[int]] = dict()
+
+        base_fingerprints: Dict[int, str] = dict()
+        waiting_jobs: Dict[str, List[Job]] = dict()
+
+        def unique_jobs():
+            for job in self._make_jobs():
+                if not self.share_fits:
+                    yield job
+                    continue
+
+                fingerprint = job.fingerprint
+
+                if fingerprint in shared_jobs:
+                    shared_jobs[fingerprint].append(job.number)
+                    continue
+
+                fingerprints[job.number] = fingerprint
+                shared_jobs[fingerprint] = list()
+
+                base_fingerprint = job.base_fingerprint
+
+                if base_fingerprint in waiting_jobs:
+                    waiting_jobs[base_fingerprint].append(job)
+                    continue
+
+                base_fingerprints[job.number] = base_fingerprint
+                waiting_jobs[base_fingerprint] = list()
+                yield job
+
+        def jobs_sharing_base_fits():
+            base_results = {
+                base_fingerprints[result.number]: result.result
+                for result in results
+                if result.number in base_fingerprints
+            }
+            for base_fingerprint, jobs in waiting_jobs.items():
+                for job in jobs:
+                    job.result = base_results.get(base_fingerprint)
+                    yield job
+
+        if self.job_directory is not None:
+            scheduler = DirectoryJobQueue(
+                directory=self.job_directory,
+                retries=self.job_retries,
+                raise_on_failure=not self.isolate_failures,
+                timeout=self.job_timeout,
+            )
+        else:
+            scheduler = JobScheduler(
+                number_of_cores=self.number_of_cores,
+                timeout=self.job_timeout,
+                retries=self.job_retries,
+                raise_on_failure=not self.isolate_failures,
+            )
+
+        for jobs in (unique_jobs(), jobs_sharing_base_fits()):
+            for result in scheduler.run(jobs):
+                if isinstance(result, JobFailure):
+                    failures.append(result)
+                else:
+                    results.append(result)
+
+        for failure in list(failures):
+            for number in shared_jobs.get(fingerprints.get(failure.job_number), []):
+                failures.append(
+                    JobFailure(job_number=number, message=failure.message)
+                )
+
+        for result in list(results):
+            for number in shared_jobs.get(fingerprints.get(result.number), []):
+                results.append(
+                    JobResult(
+                        number=number,
+                        result=result.result,
+                        perturbed_result=result.perturbed_result
+                    )
+                )
+
+        return SensitivityResult(results, failures=failures)
 
     @property
     def _lists(self) -> List[List[float]]:
@@ -306,5 +487,7 @@ class Sensitivity:
                 ),
                 model=self.model,
                 perturbation_model=self.perturbation_model,
-                search=search
+                search=search,
+                warm_start=self.warm_start,
+                dataset_fingerprint=fingerprint_of(dataset) if self.share_fits else None,
             )
@@ -2,7 +2,7 @@ from copy import copy
 
 import autofit as af
 from autofit.mock.mock import MockSamples
-from autofit.non_linear.grid.grid_search import make_lists
+from autofit.non_linear.grid.grid_search import grid_points
 
 
 class GridSearch:
@@ -25,20 +25,21 @@ class GridSearch:
 
         likelihoods = list()
 
-        for list_ in make_lists(
+        for points in grid_points(
                 no_dimensions=model.prior_count,
                 step_size=self.step_size
         ):
-            instance = model.instance_from_unit_vector(
-                list_
-            )
-            likelihood = analysis.log_likelihood_function(
-                instance
-            )
-            likelihoods.append(likelihood)
-            if likelihood > best_likelihood:
-                best_likelihood = likelihood
-                best_instance = instance
+            for point in points:
+                instance = model.instance_from_unit_vector(
+                    list(map(float, point))
+                )
+                likelihood = analysis.log_likelihood_function(
+                    instance
+                )
+                likelihoods.append(likelihood)
+                if likelihood > best_likelihood:
+                    best_likelihood = likelihood
+                    best_instance = instance
 
         return af.Result(
             samples=MockSamples(
@@ -1,11 +1,27 @@
+from functools import partial
+
 from autoconf import conf
 from autofit import exc
 
 from autofit.non_linear.log import logger
+from autofit.non_linear.samples import MCMCSamples, PDFSamples
 
 import configparser
 import numpy as np
 
+
+# The lowest fraction of drawn points assumed to be within the prior limits when over-sampling a batch of points
+MINIMUM_ACCEPTANCE = 0.01
+
+
+def figure_of_merit_or_nan(fitness_function, parameters):
+    """The figure of merit of a point, or NaN if computing it raises a `FitException`."""
+    try:
+        return fitness_function.figure_of_merit_from_parameters(parameters=parameters)
+    except exc.FitException:
+        return np.nan
+
+
 class Initializer:
     def __init__(self, lower_limit, upper_limit):
         """
@@ -46,11 +62,17 @@ class Initializer:
                 lower_limit=ball_lower_limit, upper_limit=ball_upper_limit
             )
 
-    def initial_samples_from_model(self, total_points, model, fitness_function):
+    def initial_samples_from_model(self, total_points, model, fitness_function, pool=None):
         """
         Generate the initial points of the non-linear search, by randomly drawing unit values from a uniform
         distribution between the ball_lower_limit and ball_upper_limit values.
 
+        Points are drawn in batches, over-sampled by the fraction of the previous batch which was within the prior
+        limits, and points outside the limits are discarded with a vectorized check before any figure of merit is
+        computed. The figures of merit of the remaining points are computed on the `pool` of the search if it has
+        one, and points whose figure of merit is NaN or raises a `FitException` (e.g. because the instance fails an
+        assertion) are discarded. Batches are drawn until `total_points` points are found.
+
         Parameters
         ----------
         total_points : int
@@ -58,6 +80,10 @@ class Initializer:
         model : ModelMapper
             An object that represents possible instances of some model with a given dimensionality which is the number
             of free dimensions of the model.
+        fitness_function
+            The fitness function of the search, which must be picklable if a pool is given.
+        pool : multiprocessing.Pool or None
+            The pool the figures of merit are computed on, or None to compute them in this process.
         """
 
         if conf.instance["general"]["test"]["test_mode"]:
@@ -69,32 +95,62 @@ class Initializer:
         initial_parameters = []
         initial_figures_of_merit = []
 
-        point_index = 0
+        figures_of_merit_map = map if pool is None else pool.map
 
-        while point_index < total_points:
+        acceptance = 1.0
 
-            unit_parameters = model.random_unit_vector_within_limits(
-                lower_limit=self.lower_limit, upper_limit=self.upper_limit
+        while len(initial_parameters) < total_points:
+
+            required = total_points - len(initial_parameters)
+
+            unit_parameters, parameters = self.draws_from_model(
+                total_points=int(np.ceil(required / acceptance)), model=model
             )
-            parameters = model.vector_from_unit_vector(unit_vector=unit_parameters)
 
-            try:
-                figure_of_merit = fitness_function.figure_of_merit_from_parameters(
-                    parameters=parameters
-                )
+            within_limits = model.vectors_within_limits(vectors=parameters)
+            acceptance = max(float(np.mean(within_limits)), MINIMUM_ACCEPTANCE)
+
+            unit_parameters = unit_parameters[within_limits][:required].tolist()
+            parameters = parameters[within_limits][:required].tolist()
+
+            figures_of_merit = figures_of_merit_map(
+                partial(figure_of_merit_or_nan, fitness_function), parameters
+            )
+
+            for unit_vector, vector, figure_of_merit in zip(unit_parameters, parameters, figures_of_merit):
 
                 if np.isnan(figure_of_merit):
-                    raise exc.FitException
+                    continue
 
-                initial_unit_parameters.append(unit_parameters)
-                initial_parameters.append(parameters)
+                initial_unit_parameters.append(unit_vector)
+                initial_parameters.append(vector)
                 initial_figures_of_merit.append(figure_of_merit)
-                point_index += 1
-            except exc.FitException:
-                pass
 
         return initial_unit_parameters, initial_parameters, initial_figures_of_merit
 
+    def draws_from_model(self, total_points, model):
+        """
+        Draw candidate initial points, which are unit values drawn from a uniform distribution between the lower and
+        upper limits mapped to physical values via the priors.
+
+        Parameters
+        ----------
+        total_points : int
+            The number of points drawn.
+        model : ModelMapper
+            The model whose priors map the unit values to physical values.
+
+        Returns
+        -------
+        The unit values and physical values of the points, as arrays of shape (total_points, prior_count).
+        """
+        unit_parameters = np.random.uniform(
+            low=self.lower_limit,
+            high=self.upper_limit,
+            size=(total_points, model.prior_count),
+        )
+        return unit_parameters, model.vectors_from_unit_vectors(unit_vectors=unit_parameters)
+
     def initial_samples_in_test_mode(self, total_points, model):
         """
         Generate the initial points of the non-linear search in test mode. Like normal, test model draws points, by
@@ -172,3 +228,129 @@ class InitializerBall(Initializer):
         """
 
         super().__init__(lower_limit=lower_limit, upper_limit=upper_limit)
+
+
+class InitializerSamples(Initializer):
+    def __init__(self, samples, lower_limit=0.0, upper_limit=1.0, final_fraction=0.5):
+        """
+        The Initializer creates the initial set of samples in non-linear parameter space that can be passed into a
+        `NonLinearSearch` to define where to begin sampling.
+
+        The InitializerSamples class warm-starts a search from the samples of a previous search, for example the
+        `Result.samples` of the previous phase of a pipeline. Points are resampled from the previous samples according
+        to their weights, and every parameter of the model whose name (its `model_component_and_parameter_names`
+        entry) is a parameter of the previous model takes its value from the resampled point. Parameters which are new
+        to the model are drawn from their priors, between the unit values `lower_limit` and `upper_limit`.
+
+        The samples of an MCMC search are taken after its burn-in (see `MCMCSamples.samples_after_burn_in`) and the
+        samples of an optimizer are taken from its final iterations, so points are not drawn from the path the search
+        took towards the high likelihood regions. If the burn-in cannot be estimated (e.g. the chain is shorter than
+        it) the final samples of the chain are used instead.
+
+        A resampled point outside the limits of the model's priors (e.g. because the priors were narrowed between
+        phases) is replaced by a point drawn from the priors, so the search still initializes when few or none of the
+        previous samples are within the limits.
+
+        The exploration of parameter space by the previous search is therefore carried forward, rather than being
+        compressed into the independent Gaussian priors passed between phases. Nested samplers (e.g. Dynesty) require
+        their initial live points to be drawn from the prior and always use an `InitializerPrior`.
+
+        Parameters
+        ----------
+        samples : OptimizerSamples
+            The samples of the previous search, whose model names its parameters.
+        lower_limit : float
+            The lower limit of the uniform distribution unit values of new parameters are drawn from.
+        upper_limit : float
+            The upper limit of the uniform distribution unit values of new parameters are drawn from.
+        final_fraction : float
+            The fraction of the samples of an optimizer (or of an MCMC chain whose burn-in cannot be estimated), from
+            the final sample backwards, which points are resampled from.
+        """
+
+        super().__init__(lower_limit=lower_limit, upper_limit=upper_limit)
+
+        parameters = np.asarray(samples.parameters, dtype=float)
+        weights = np.asarray(samples.weights, dtype=float)
+
+        final_samples_only = not isinstance(samples, PDFSamples)
+
+        if isinstance(samples, MCMCSamples):
+
+            try:
+                samples_after_burn_in = np.asarray(samples.samples_after_burn_in, dtype=float)
+            except (ValueError, NotImplementedError):
+                samples_after_burn_in = np.zeros(0)
+
+            final_samples_only = samples_after_burn_in.size == 0
+
+            if not final_samples_only:
+                parameters = samples_after_burn_in.reshape(-1, parameters.shape[1])
+                weights = np.ones(len(parameters))
+
+        if final_samples_only:
+            final_samples = max(int(np.ceil(final_fraction * len(parameters))), 1)
+            parameters = parameters[-final_samples:]
+            weights = weights[-final_samples:]
+
+        self.weights = weights
+        self.parameters = dict(
+            zip(samples.model.model_component_and_parameter_names, parameters.T)
+        )
+
+    def initial_samples_from_model(self, total_points, model, fitness_function, pool=None):
+
+        names = model.model_component_and_parameter_names
+
+        logger.info(
+            f"Initializing {len([name for name in names if name in self.parameters])} of {len(names)} parameters "
+            f"from the samples of a previous search."
+        )
+
+        return super().initial_samples_from_model(
+            total_points=total_points, model=model, fitness_function=fitness_function, pool=pool
+        )
+
+    def resampled_indexes(self, total_points):
+        """
+        The indexes of the previous samples the points are taken from, drawn according to their weights. Samples are
+        drawn without replacement if there are enough samples with a non-zero weight, so that walkers or particles
+        do not begin at the same point.
+        """
+        probabilities = self.weights / np.sum(self.weights)
+
+        return np.random.choice(
+            len(probabilities),
+            size=total_points,
+            replace=total_points > np.count_nonzero(probabilities),
+            p=probabilities,
+        )
+
+    def draws_from_model(self, total_points, model):
+        """
+        Draw candidate initial points from the previous samples, with parameters which are new to the model drawn from
+        their priors. Resampled points outside the limits of the priors are replaced by points drawn from the priors,
+        and only the unit values of resampled parameters are computed by inverting their priors.
+        """
+        unit_parameters, parameters = super().draws_from_model(total_points=total_points, model=model)
+
+        indexes = self.resampled_indexes(total_points=total_points)
+
+        names = model.model_component_and_parameter_names
+        columns = [column for column, name in enumerate(names) if name in self.parameters]
+
+        resampled_parameters = parameters.copy()
+
+        for column in columns:
+            resampled_parameters[:, column] = self.parameters[names[column]][indexes]
+
+        within_limits = model.vectors_within_limits(vectors=resampled_parameters)
+
+        parameters[within_limits] = resampled_parameters[within_limits]
+
+        for column in columns:
+            unit_parameters[within_limits, column] = model.prior_tuples_ordered_by_id[column].prior.unit_value_for(
+                parameters[within_limits, column]
+            )
+
+        return unit_parameters, parameters
@@ -0,0 +1,529 @@
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+from os import path
+from typing import Callable, Dict, Generator, Iterable, List, Optional, Tuple
+
+import dill
+
+from autofit import exc
+from autofit.non_linear.log import logger
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, JobFailure, perform
+from autofit.non_linear.update_writer import atomic_file
+
+
+class DirectoryJobQueue:
+    def __init__(
+            self,
+            directory: str,
+            lease_timeout: float = 60.0,
+            poll_interval: float = 1.0,
+            perform_jobs: bool = True,
+            initializer: Optional[Callable] = None,
+            initargs: Tuple = (),
+            retries: int = 0,
+            raise_on_failure: bool = True,
+            max_pending_jobs: int = 64,
+            timeout: Optional[float] = None,
+    ):
+        """
+        A queue of `AbstractJob`s in a directory, which any number of independent processes on any number of hosts
+        sharing the directory can claim, perform and publish the results of. No service other than the file system is
+        required.
+
+        Jobs, claimed jobs, leases and results are files in subdirectories of the directory:
+
+        - A job is submitted by writing it to `jobs`. Its id begins with the time it was submitted and its number.
+        - A process claims a job by renaming it into `claimed`, which only one process can do, and creates a lease for
+          it in `leases` holding a token unique to the claim, whose modification time it updates whilst the job is
+          performed.
+        - The result (or a `JobFailure` if the job raised an exception) is written to `results`, and the claimed job
+          and lease are removed. A process only publishes the result of a job whose lease still holds its token, so a
+          process which lost its lease (see below) does not publish a second result or release the job whilst another
+          process performs it.
+
+        If a process dies whilst performing a job its lease stops being renewed. Once the lease is older than
+        `lease_timeout` seconds any process using the queue returns the job to `jobs`, so another process performs it.
+        The lease timeout should be longer than the difference between the clocks of the hosts sharing the directory.
+
+        A job submitted with a `timeout` which is still being performed once the timeout has passed fails: the process
+        performing it stops renewing its lease and publishes a `JobFailure` in place of its result. A job which hangs
+        cannot be stopped, so the process then exits (workers should therefore be restarted by whatever started them,
+        e.g. a loop in a batch script). For this reason, if a timeout is set the process which submits jobs through
+        `run` performs jobs in a child process, which it replaces whenever it exits.
+
+        Workers are started with `python -m autofit.non_linear.job_queue <directory>`.
+
+        Parameters
+        ----------
+        directory
+            The shared directory of the queue.
+        lease_timeout
+            The number of seconds after which a job whose lease has not been renewed is returned to the queue.
+        poll_interval
+            The number of seconds between checks of the directory for jobs or results.
+        perform_jobs
+            If True, the process which submits jobs through `run` also performs jobs whilst it waits for results.
+        initializer
+            A function called with `initargs` by every process before it performs a job submitted through `run`. It
+            is written to the directory once, so data shared by every job (e.g. a large dataset) is not sent with
+            every job.
+        retries
+            The number of times a job submitted through `run` which raises an exception is submitted again, with its
+            random number generators seeded differently, before it is considered to have failed.
+        raise_on_failure
+            If True, a job submitted through `run` which fails raises a `JobException`, otherwise its `JobFailure` is
+            returned in place of its result.
+        max_pending_jobs
+            The maximum number of jobs submitted through `run` whose results are not yet returned, so that a generator
+            of jobs is not exhausted (and every job written to the directory) before the first results are returned.
+            This should be at least the number of processes performing jobs from the directory, so none is idle.
+        timeout
+            The number of seconds a job submitted through `run` may be performed for before it fails. If None, jobs are
+            not timed out.
+        """
+        self.directory = directory
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.perform_jobs = perform_jobs
+        self.initializer = initializer
+        self.initargs = initargs
+        self.retries = retries
+        self.raise_on_failure = raise_on_failure
+        self.max_pending_jobs = max_pending_jobs
+        self.timeout = timeout
+
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._initializer_mtime = None
+        self._unleased: Dict[str, float] = {}
+
+        # The token written to the lease of every job this process has claimed but not yet published
+        self._claims: Dict[str, str] = {}
+
+        for subdirectory in ("jobs", "claimed", "leases", "results"):
+            os.makedirs(path.join(directory, subdirectory), exist_ok=True)
+
+    def _path(self, subdirectory: str, job_id: str) -> str:
+        return path.join(self.directory, subdirectory, job_id)
+
+    @property
+    def initializer_path(self) -> str:
+        return path.join(self.directory, "initializer")
+
+    def _ids(self, subdirectory: str) -> List[str]:
+        return sorted(
+            filename for filename in os.listdir(path.join(self.directory, subdirectory))
+            if not filename.endswith(".tmp")
+        )
+
+    @staticmethod
+    def _write(filename: str, obj):
+        with atomic_file(filename) as temporary_filename:
+            with open(temporary_filename, "wb") as f:
+                dill.dump(obj, f)
+
+    @staticmethod
+    def _read(filename: str):
+        with open(filename, "rb") as f:
+            return dill.load(f)
+
+    def submit(self, job: AbstractJob) -> str:
+        """
+        Add a job to the queue, returning its id. Ids are ordered by submission time, so jobs are claimed in roughly
+        the order they are submitted, and hold the number of the job so it is known even if the job cannot be read.
+        """
+        job_id = f"{time.time_ns():020d}_{job.number}_{uuid.uuid4().hex}"
+        self._write(self._path("jobs", job_id), job)
+        return job_id
+
+    @staticmethod
+    def job_number(job_id: str) -> int:
+        """The number of the job submitted with an id."""
+        return int(job_id.split("_")[1])
+
+    def claim(self) -> Optional[str]:
+        """
+        Claim the oldest job in the queue, returning its id, or None if the queue is empty.
+        """
+        for job_id in self._ids("jobs"):
+            try:
+                os.rename(self._path("jobs", job_id), self._path("claimed", job_id))
+            except FileNotFoundError:
+                continue
+
+            token = f"{self.name}:{uuid.uuid4().hex}"
+
+            with open(self._path("leases", job_id), "w") as f:
+                f.write(token)
+
+            self._claims[job_id] = token
+
+            return job_id
+
+        return None
+
+    @contextmanager
+    def lease(
+            self,
+            job_id: str,
+            job_number=None,
+            timeout: Optional[float] = None,
+            exit_on_timeout: bool = False,
+    ):
+        """
+        Renew the lease of a claimed job in a background thread whilst the body of the context performs it.
+
+        If the body is still running `timeout` seconds after the context is entered, the lease is no longer renewed
+        and a `JobFailure` is published in place of the job's result. The context yields an event which is set once
+        this has happened, after which the result of the job must not be published. If `exit_on_timeout` the process
+        then exits, as the job cannot be stopped.
+        """
+        stop = threading.Event()
+        timed_out = threading.Event()
+        lock = threading.Lock()
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        def renew():
+            while True:
+
+                interval = self.lease_timeout / 4
+
+                if deadline is not None:
+                    interval = max(0.0, min(interval, deadline - time.time()))
+
+                if stop.wait(interval):
+                    return
+
+                if deadline is not None and time.time() >= deadline:
+
+                    with lock:
+                        if stop.is_set():
+                            return
+                        timed_out.set()
+
+                    message = f"Job timed out after {timeout} seconds in process {self.name}"
+                    logger.error(message)
+
+                    self.publish(job_id, JobFailure(job_number=job_number, message=message))
+
+                    if exit_on_timeout:
+                        os._exit(1)
+
+                    return
+
+                try:
+                    os.utime(self._path("leases", job_id))
+                except FileNotFoundError:
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+
+        try:
+            yield timed_out
+        finally:
+            with lock:
+                stop.set()
+            thread.join()
+
+    def owns(self, job_id: str) -> bool:
+        """Whether the lease of a job is held by the claim of this process."""
+        try:
+            with open(self._path("leases", job_id)) as f:
+                return f.read() == self._claims.get(job_id)
+        except FileNotFoundError:
+            return False
+
+    def publish(self, job_id: str, result):
+        """
+        Write the result of a job claimed by this process and release the job.
+
+        If the lease of the job expired whilst it was performed the job has been returned to the queue (and may have
+        been claimed by another process), so the result is discarded and the job is left to be performed again.
+        """
+        if not self.owns(job_id):
+            self._claims.pop(job_id, None)
+            logger.info(f"Lease of job {job_id} was lost, discarding its result")
+            return
+
+        self._claims.pop(job_id)
+
+        self._write(self._path("results", job_id), result)
+
+        for subdirectory in ("claimed", "leases"):
+            try:
+                os.remove(self._path(subdirectory, job_id))
+            except FileNotFoundError:
+                pass
+
+    def requeue_expired(self):
+        """
+        Return every claimed job whose lease has expired to the queue.
+
+        A claimed job without a lease (because its process died between claiming it and creating the lease) is
+        returned once it has been seen without a lease for longer than the lease timeout.
+        """
+        now = time.time()
+
+        for job_id in self._ids("claimed"):
+
+            if path.exists(self._path("results", job_id)):
+                continue
+
+            lease_path = self._path("leases", job_id)
+
+            try:
+                lease_age = now - os.stat(lease_path).st_mtime
+            except FileNotFoundError:
+                if now - self._unleased.setdefault(job_id, now) <= self.lease_timeout:
+                    continue
+            else:
+                self._unleased.pop(job_id, None)
+
+                if lease_age <= self.lease_timeout:
+                    continue
+
+                # The lease is renamed before it is removed so only one process can expire it
+                expired_lease_path = f"{lease_path}.{uuid.uuid4().hex}.tmp"
+                try:
+                    os.rename(lease_path, expired_lease_path)
+                except FileNotFoundError:
+                    continue
+                os.remove(expired_lease_path)
+
+            try:
+                os.rename(self._path("claimed", job_id), self._path("jobs", job_id))
+            except FileNotFoundError:
+                continue
+
+            self._unleased.pop(job_id, None)
+
+            logger.info(f"Lease of job {job_id} expired, returning it to the queue")
+
+    def _initialize(self):
+        """
+        Call the initializer written to the directory, if it has been written or changed since it was last called.
+        """
+        try:
+            mtime = os.stat(self.initializer_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        if mtime == self._initializer_mtime:
+            return
+
+        initializer, initargs = self._read(self.initializer_path)
+        initializer(*initargs)
+
+        self._initializer_mtime = mtime
+
+    @staticmethod
+    def _failure(job_number) -> JobFailure:
+        """A `JobFailure` holding the traceback of the exception being handled."""
+        message = traceback.format_exc()
+        logger.error(message)
+        return JobFailure(job_number=job_number, message=message)
+
+    def perform_one(self, exit_on_timeout: bool = False) -> bool:
+        """
+        Claim and perform a single job, publishing its result. Returns False if the queue was empty.
+
+        If the job was submitted with a timeout and is still being performed once it passes, a `JobFailure` is
+        published in its place (see `lease`) and, if `exit_on_timeout`, the process exits.
+        """
+        self.requeue_expired()
+
+        job_id = self.claim()
+
+        if job_id is None:
+            return False
+
+        logger.info(f"{self.name} performing job {job_id}")
+
+        try:
+            job = self._read(self._path("claimed", job_id))
+        except Exception:
+            self.publish(job_id, self._failure(job_number=self.job_number(job_id)))
+            return True
+
+        with self.lease(
+                job_id, job_number=job.number, timeout=job.timeout, exit_on_timeout=exit_on_timeout
+        ) as timed_out:
+            try:
+                self._initialize()
+                result = perform(job)
+            except Exception:
+                result = self._failure(job_number=job.number)
+
+        if not timed_out.is_set():
+            self.publish(job_id, result)
+
+        return True
+
+    def work(self, stop_when_empty: bool = False):
+        """
+        Perform jobs from the queue until it is empty (if `stop_when_empty`) or forever.
+
+        The queue is only empty once no jobs are waiting or claimed, so a worker that stops when the queue is empty
+        still performs jobs whose lease expires after it has performed the last waiting job. The process exits if a
+        job it performs times out.
+        """
+        while True:
+            if self.perform_one(exit_on_timeout=True):
+                continue
+
+            if stop_when_empty and len(self._ids("jobs")) == 0 and len(self._ids("claimed")) == 0:
+                return
+
+            time.sleep(self.poll_interval)
+
+    def run(
+            self,
+            jobs: Iterable[AbstractJob],
+            number_of_jobs: Optional[int] = None,
+    ) -> Generator[AbstractJobResult, None, None]:
+        """
+        Submit every job to the queue and yield the result of each as it is published, in the same way as
+        `JobScheduler.run`.
+
+        Jobs are taken from the input iterable lazily: at most `max_pending_jobs` jobs are in the queue or being
+        performed at any time, and more are submitted as their results are returned.
+
+        A job which raises an exception is submitted again up to `retries` times. If it fails every attempt and
+        failures are raised a `JobException` is raised, and jobs which were submitted by this call but not yet claimed
+        are removed from the queue. `number_of_jobs` is accepted for compatibility with `JobScheduler.run`.
+
+        If an initializer is given it is written to the directory, replacing that of any previous call, so only one
+        call with an initializer should use a directory at a time.
+
+        If a timeout is set every job is submitted with it, and if this process performs jobs it does so in a child
+        process, so a job which hangs does not stop this process returning the results of other jobs.
+        """
+        if self.initializer is not None:
+            self._write(self.initializer_path, (self.initializer, self.initargs))
+
+        jobs = iter(jobs)
+        exhausted = False
+        worker = None
+
+        # The jobs submitted by this call whose results are not yet returned, keyed by id
+        outstanding: Dict[str, AbstractJob] = {}
+
+        # The ids of jobs whose results have been returned, whose results are removed if they are published again
+        # (e.g. by a process whose lease expired just as it published)
+        returned_ids = set()
+
+        try:
+            while True:
+
+                while not exhausted and len(outstanding) < self.max_pending_jobs:
+                    try:
+                        job = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    job.timeout = self.timeout
+                    outstanding[self.submit(job)] = job
+
+                if exhausted and len(outstanding) == 0:
+                    break
+
+                returned = False
+
+                for job_id in self._ids("results"):
+                    if job_id in returned_ids:
+                        try:
+                            os.remove(self._path("results", job_id))
+                        except FileNotFoundError:
+                            pass
+                        continue
+
+                    if job_id not in outstanding:
+                        continue
+
+                    result = self._read(self._path("results", job_id))
+                    os.remove(self._path("results", job_id))
+                    job = outstanding.pop(job_id)
+                    returned_ids.add(job_id)
+                    returned = True
+
+                    if isinstance(result, JobFailure):
+
+                        result.job_number = job.number
+
+                        if job.attempt < self.retries:
+                            job.attempt += 1
+                            logger.info(f"Retrying job {job.number} (attempt {job.attempt + 1} of {self.retries + 1})")
+                            outstanding[self.submit(job)] = job
+                            continue
+
+                        if self.raise_on_failure:
+                            raise exc.JobException(
+                                f"Job {result.job_number} failed:\n{result.message}"
+                            )
+
+                        result.job = job
+
+                    yield result
+
+                if returned:
+                    continue
+
+                if self.perform_jobs and self.timeout is not None:
+                    if worker is None or not worker.is_alive():
+                        worker = self._start_worker()
+                elif self.perform_jobs and self.perform_one():
+                    continue
+
+                self.requeue_expired()
+                time.sleep(self.poll_interval)
+        finally:
+            if worker is not None and worker.is_alive():
+                worker.terminate()
+                worker.join()
+
+            for job_id in outstanding:
+                try:
+                    os.remove(self._path("jobs", job_id))
+                except FileNotFoundError:
+                    pass
+
+    def _start_worker(self) -> multiprocessing.Process:
+        """Start a child process which performs jobs from the queue until it is stopped or a job it performs times
+        out."""
+        worker = multiprocessing.Process(target=self.work)
+        worker.start()
+        return worker
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Perform jobs from a DirectoryJobQueue in a shared directory"
+    )
+    parser.add_argument("directory", help="The shared directory of the queue")
+    parser.add_argument("--lease-timeout", type=float, default=60.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--stop-when-empty",
+        action="store_true",
+        help="Stop once no jobs are waiting or claimed, rather than waiting for more jobs",
+    )
+    args = parser.parse_args()
+
+    DirectoryJobQueue(
+        directory=args.directory,
+        lease_timeout=args.lease_timeout,
+        poll_interval=args.poll_interval,
+    ).work(stop_when_empty=args.stop_when_empty)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import json
 import os
-from typing import List
+import pickle
+from os import path
+from typing import List, Tuple
 
 import emcee
 import numpy as np
@@ -9,10 +11,16 @@ from autofit import exc
 from autofit.mapper.model_mapper import ModelMapper
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear import samples as samp
+from autofit.non_linear.convergence import (
+    convergence_states_from,
+    load_convergence_states,
+    update_convergence,
+)
 from autofit.non_linear.log import logger
 from autofit.non_linear.mcmc.abstract_mcmc import AbstractMCMC
 from autofit.non_linear.paths import convert_paths
 from autofit.non_linear.samples import MCMCSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
 
 
 class Emcee(AbstractMCMC):
@@ -29,6 +37,7 @@ class Emcee(AbstractMCMC):
             auto_correlation_check_size=None,
             auto_correlation_required_length=None,
             auto_correlation_change_threshold=None,
+            convergence_monitors=None,
             iterations_per_update=None,
             number_of_cores=None,
     ):
@@ -80,6 +89,9 @@ class Emcee(AbstractMCMC):
             sufficiently small to terminate sampling early.
         auto_correlation_change_threshold : float
             The threshold value by which if the change in auto_correlations is below sampling will be terminated early.
+        convergence_monitors : [non_linear.convergence.AbstractConvergence]
+            Monitors (e.g. `GelmanRubin`, `EffectiveSampleSize`) evaluated every update, which terminate sampling once
+            every monitor has converged (see autofit.non_linear.convergence).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
@@ -117,6 +129,10 @@ class Emcee(AbstractMCMC):
             else auto_correlation_change_threshold
         )
 
+        self.convergence_monitors = (
+            [] if convergence_monitors is None else list(convergence_monitors)
+        )
+
         super().__init__(
             paths=paths,
             prior_passer=prior_passer,
@@ -203,6 +219,7 @@ class Emcee(AbstractMCMC):
                 total_points=emcee_sampler.nwalkers,
                 model=model,
                 fitness_function=fitness_function,
+                pool=pool,
             )
 
             emcee_state = np.zeros(shape=(emcee_sampler.nwalkers, model.prior_count))
@@ -216,6 +233,30 @@ class Emcee(AbstractMCMC):
             total_iterations = 0
             iterations_remaining = self.nsteps
 
+        for monitor in self.convergence_monitors:
+            monitor.reset()
+
+        if len(self.convergence_monitors) > 0 and total_iterations > 0:
+
+            convergence_iteration, converged = self.load_convergence_states(total_iterations=total_iterations)
+
+            if converged:
+                iterations_remaining = 0
+
+            if convergence_iteration < total_iterations:
+
+                chain = emcee_sampler.get_chain(discard=convergence_iteration)
+                log_posteriors = emcee_sampler.get_log_prob(discard=convergence_iteration)
+
+                for iteration in range(0, len(chain), self.iterations_per_update):
+
+                    if update_convergence(
+                        convergence_monitors=self.convergence_monitors,
+                        points=chain[iteration:iteration + self.iterations_per_update],
+                        log_posteriors=log_posteriors[iteration:iteration + self.iterations_per_update],
+                    ):
+                        iterations_remaining = 0
+
         while iterations_remaining > 0:
 
             if self.iterations_per_update > iterations_remaining:
@@ -242,12 +283,71 @@ class Emcee(AbstractMCMC):
                 model=model, analysis=analysis, during_analysis=True
             )
 
-            if emcee_sampler.iteration % self.auto_correlation_check_size:
-                if samples.converged and self.auto_correlation_check_for_convergence:
-                    iterations_remaining = 0
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+            emcee_sampler.pool = pool
+
+            if self.auto_correlation_check_for_convergence and samples.converged:
+                iterations_remaining = 0
+
+            converged = update_convergence(
+                convergence_monitors=self.convergence_monitors,
+                points=emcee_sampler.get_chain(discard=emcee_sampler.iteration - iterations),
+                log_posteriors=emcee_sampler.get_log_prob(discard=emcee_sampler.iteration - iterations),
+            )
+
+            self.output_convergence_states(total_iterations=total_iterations, converged=converged)
+
+            if converged:
+                logger.info("Emcee convergence monitors converged, terminating non-linear search.")
+                iterations_remaining = 0
 
         logger.info("Emcee sampling complete.")
 
+    @property
+    def convergence_file(self) -> str:
+        return path.join(self.paths.samples_path, "convergence.pickle")
+
+    def output_convergence_states(self, total_iterations: int, converged: bool):
+        """
+        Output the state of the convergence monitors after `total_iterations` iterations, and whether they had
+        converged, so that a resumed search restores them rather than replaying the chain.
+        """
+        if len(self.convergence_monitors) == 0:
+            return
+
+        with atomic_file(self.convergence_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                pickle.dump(
+                    {
+                        "total_iterations": total_iterations,
+                        "converged": converged,
+                        "states": convergence_states_from(convergence_monitors=self.convergence_monitors),
+                    },
+                    f,
+                )
+
+    def load_convergence_states(self, total_iterations: int) -> Tuple[int, bool]:
+        """
+        Restore the convergence monitors from their most recent output state, returning the number of iterations
+        they have been updated with and whether they had converged. The iterations of the backend after these (e.g. if
+        the search was terminated between writing the backend and the monitors' state) are replayed by the search.
+
+        If there is no state for these monitors, or it is for more iterations than the backend holds, the monitors are
+        not restored and the whole chain is replayed.
+        """
+        if not path.exists(self.convergence_file):
+            return 0, False
+
+        with open(self.convergence_file, "rb") as f:
+            convergence = pickle.load(f)
+
+        if convergence["total_iterations"] > total_iterations or not load_convergence_states(
+                convergence_monitors=self.convergence_monitors, states=convergence["states"]
+        ):
+            return 0, False
+
+        return convergence["total_iterations"], convergence["converged"]
+
     @property
     def tag(self):
         """Tag the output folder of the PySwarms non-linear search, according to the number of particles and
@@ -274,6 +374,7 @@ class Emcee(AbstractMCMC):
         copy.auto_correlation_check_size = self.auto_correlation_check_size
         copy.auto_correlation_required_length = self.auto_correlation_required_length
         copy.auto_correlation_change_threshold = self.auto_correlation_change_threshold
+        copy.convergence_monitors = self.convergence_monitors
         copy.initializer = self.initializer
         copy.iterations_per_update = self.iterations_per_update
         copy.number_of_cores = self.number_of_cores
@@ -306,35 +407,56 @@ class Emcee(AbstractMCMC):
             etc.
         """
 
-        parameters = self.backend.get_chain(flat=True).tolist()
-        log_priors = [
-            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
-        ]
-        log_likelihoods = self.backend.get_log_prob(flat=True).tolist()
-        weights = len(log_likelihoods) * [1.0]
-        auto_correlation_time = self.backend.get_autocorr_time(tol=0)
-        total_walkers = len(self.backend.get_chain()[0, :, 0])
-        total_steps = len(self.backend.get_log_prob())
+        samples_cache = self.samples_cache_from_model(model=model)
+        samples_cache.update(backend=self.backend)
+
+        try:
+            previous_auto_correlation_times = samples_cache.previous_auto_correlation_times
+        except IndexError:
+            previous_auto_correlation_times = None
 
         return EmceeSamples(
             model=model,
-            samples=Sample.from_lists(
-                model=model,
-                parameters=parameters,
-                log_likelihoods=log_likelihoods,
-                log_priors=log_priors,
-                weights=weights
-            ),
-            total_walkers=total_walkers,
-            total_steps=total_steps,
-            auto_correlation_times=auto_correlation_time,
+            samples=list(samples_cache.samples),
+            total_walkers=samples_cache.total_walkers,
+            total_steps=samples_cache.total_steps,
+            auto_correlation_times=samples_cache.auto_correlation_times,
             auto_correlation_check_size=self.auto_correlation_check_size,
             auto_correlation_required_length=self.auto_correlation_required_length,
             auto_correlation_change_threshold=self.auto_correlation_change_threshold,
             backend=self.backend,
             time=self.timer.time,
+            previous_auto_correlation_times=previous_auto_correlation_times,
+            chain=list(samples_cache.chain_chunks),
         )
 
+    def samples_cache_from_model(self, model) -> "EmceeSamplesCache":
+        """The `EmceeSamplesCache` which incrementally extracts samples from this search's hdf5 backend.
+
+        The cache persists between updates, so that every call to `samples_via_sampler_from_model` only reads the
+        steps appended to the backend since the previous call. A new cache is created if the backend file or the
+        model's parameters change."""
+        filename = path.join(self.paths.samples_path, "emcee.hdf")
+
+        samples_cache = getattr(self, "_samples_cache", None)
+
+        if samples_cache is None or not samples_cache.is_for(filename=filename, model=model):
+            samples_cache = EmceeSamplesCache(
+                filename=filename,
+                model=model,
+                auto_correlation_check_size=self.auto_correlation_check_size,
+                auto_correlation_required_length=self.auto_correlation_required_length,
+            )
+            self._samples_cache = samples_cache
+
+        return samples_cache
+
+    def __getstate__(self):
+        """The samples cache holds the entire chain in memory, so it is not pickled alongside the search."""
+        state = super().__getstate__()
+        state.pop("_samples_cache", None)
+        return state
+
     def samples_via_csv_json_from_model(self, model):
 
         # TODO : Better design to remove repetition.
@@ -394,6 +516,8 @@ class EmceeSamples(MCMCSamples):
             backend: emcee.backends.HDFBackend,
             unconverged_sample_size: int = 100,
             time: float = None,
+            previous_auto_correlation_times: np.ndarray = None,
+            chain: List[np.ndarray] = None,
     ):
         """
         Attributes
@@ -403,6 +527,15 @@ class EmceeSamples(MCMCSamples):
         total_steps : int
             The total number of steps taken by each walker of this MCMC `NonLinearSearch` (the total samples is equal
             to the total steps * total walkers).
+        previous_auto_correlation_times : np.ndarray
+            The auto-correlation times of the chain excluding its last *auto_correlation_check_size* steps. If these
+            have already been computed (e.g. by an `EmceeSamplesCache`) they are used, otherwise they are computed
+            from the backend when required.
+        chain : [np.ndarray]
+            The chain of walker positions at the time the samples were extracted, as consecutive blocks of steps each
+            with shape (steps, walkers, parameters). If input, the samples after burn-in are computed from this chain
+            instead of the backend, so the samples are a snapshot which is unaffected by the sampler writing to the
+            backend (e.g. when they are output by a background `UpdateWriter`). The chain is not pickled.
         """
 
         super().__init__(
@@ -419,6 +552,13 @@ class EmceeSamples(MCMCSamples):
         )
 
         self.backend = backend
+        self._previous_auto_correlation_times = previous_auto_correlation_times
+        self.chain = chain
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["chain"] = None
+        return state
 
     @property
     def samples_after_burn_in(self) -> [list]:
@@ -427,10 +567,179 @@ class EmceeSamples(MCMCSamples):
         The burn-in period is estimated using the auto-correlation times of the parameters."""
         discard = int(3.0 * np.max(self.auto_correlation_times))
         thin = int(np.max(self.auto_correlation_times) / 2.0)
-        return self.backend.get_chain(discard=discard, thin=thin, flat=True)
+
+        if self.chain is None:
+            return self.backend.get_chain(discard=discard, thin=thin, flat=True)
+
+        chain = np.concatenate(self.chain)[discard + thin - 1::thin]
+        return chain.reshape(-1, chain.shape[2])
 
     @property
     def previous_auto_correlation_times(self) -> [float]:
+        if self._previous_auto_correlation_times is not None:
+            return self._previous_auto_correlation_times
         return emcee.autocorr.integrated_time(
             x=self.backend.get_chain()[: -self.auto_correlation_check_size, :, :], tol=0
         )
+
+
+class EmceeSamplesCache:
+
+    def __init__(
+            self,
+            filename: str,
+            model: AbstractPriorModel,
+            auto_correlation_check_size: int,
+            auto_correlation_required_length: int,
+    ):
+        """
+        Incrementally extracts the samples of an *Emcee* hdf5 backend, keeping the samples and chain already read in
+        memory so that each update only reads the steps appended to the backend since the previous update.
+
+        Auto-correlation times are estimated using *Emcee*'s FFT based estimator over a trailing window of the chain,
+        whose length is *auto_correlation_required_length* times the largest auto-correlation time found in the
+        previous update (and no shorter than *auto_correlation_check_size*). Estimates are stored for every update, so
+        the previous auto-correlation times used to check convergence are typically looked up rather than recomputed.
+        The cost of an update therefore scales with the new steps and window length, not the total chain length.
+
+        On the first update (or when resuming from an existing backend) the window spans the full chain, giving
+        identical auto-correlation times to the backend's `get_autocorr_time`.
+
+        Parameters
+        ----------
+        filename
+            The path to the *Emcee* hdf5 backend the samples are extracted from.
+        model
+            The model which maps the chain's parameter vectors to physical values and their log priors.
+        auto_correlation_check_size
+            The number of steps (from the latest step backwards) the previous auto-correlation times are computed
+            without.
+        auto_correlation_required_length
+            The number of auto-correlation times the window used to estimate the auto-correlation times spans.
+        """
+        self.filename = filename
+        self.model = model
+        self.parameter_names = model.model_component_and_parameter_names
+        self.auto_correlation_check_size = auto_correlation_check_size
+        self.auto_correlation_required_length = auto_correlation_required_length
+
+        self.total_steps = 0
+        self.total_walkers = 0
+        self.samples = []
+        self.chain_chunks = []
+        self.auto_correlation_times_history = {}
+
+    def is_for(self, filename: str, model: AbstractPriorModel) -> bool:
+        """Whether this cache extracts samples from the backend at `filename` for a model with the same parameters."""
+        return self.filename == filename and self.parameter_names == model.model_component_and_parameter_names
+
+    def reset(self):
+        self.total_steps = 0
+        self.samples = []
+        self.chain_chunks = []
+        self.auto_correlation_times_history = {}
+
+    def update(self, backend: emcee.backends.HDFBackend):
+        """Read the steps appended to the backend since the last update, converting them to `Sample`'s.
+
+        If the backend has fewer steps than have been read (e.g. it was overwritten by a new search) the cache is
+        reset and the backend is read from the beginning."""
+        if backend.iteration < self.total_steps:
+            self.reset()
+
+        if backend.iteration == self.total_steps:
+            return
+
+        self.append(
+            chain=backend.get_chain(discard=self.total_steps),
+            log_likelihoods=backend.get_log_prob(discard=self.total_steps),
+        )
+
+    def append(self, chain: np.ndarray, log_likelihoods: np.ndarray):
+        """Convert steps of a chain, with shape (steps, walkers, parameters), and their log likelihoods, with shape
+        (steps, walkers), to `Sample`'s and append them to the cache."""
+        parameters = chain.reshape(-1, chain.shape[2]).tolist()
+        log_priors = [
+            sum(self.model.log_priors_from_vector(vector=vector)) for vector in parameters
+        ]
+        log_likelihoods = log_likelihoods.reshape(-1).tolist()
+
+        self.samples += Sample.from_lists(
+            model=self.model,
+            parameters=parameters,
+            log_likelihoods=log_likelihoods,
+            log_priors=log_priors,
+            weights=len(log_likelihoods) * [1.0],
+        )
+
+        self.chain_chunks.append(chain)
+        self.total_steps += chain.shape[0]
+        self.total_walkers = chain.shape[1]
+
+    @property
+    def auto_correlation_times(self) -> np.ndarray:
+        return self.auto_correlation_times_at_step(step=self.total_steps)
+
+    @property
+    def previous_auto_correlation_times(self) -> np.ndarray:
+        return self.auto_correlation_times_at_step(
+            step=self.total_steps - self.auto_correlation_check_size
+        )
+
+    def auto_correlation_times_at_step(self, step: int) -> np.ndarray:
+        """The auto-correlation times of the chain up to (but not including) the input step.
+
+        The times are estimated over a window ending at `step`, whose length is set by the most recent estimate
+        at an earlier step. Estimates are stored, so repeated calls for the same step are free.
+
+        Raises an `IndexError` if `step` is not positive, as *Emcee* does for an empty chain."""
+        if step in self.auto_correlation_times_history:
+            return self.auto_correlation_times_history[step]
+
+        if step <= 0:
+            raise IndexError("The auto-correlation times of an empty chain are undefined")
+
+        earlier_steps = [
+            earlier_step for earlier_step in self.auto_correlation_times_history
+            if earlier_step < step
+        ]
+
+        window = step
+
+        if len(earlier_steps) > 0:
+
+            earlier_times = self.auto_correlation_times_history[max(earlier_steps)]
+
+            if np.all(np.isfinite(earlier_times)):
+                window = max(
+                    int(self.auto_correlation_required_length * np.max(earlier_times)),
+                    self.auto_correlation_check_size,
+                )
+
+        auto_correlation_times = emcee.autocorr.integrated_time(
+            x=self.chain_between_steps(start=max(step - window, 0), end=step), tol=0
+        )
+
+        self.auto_correlation_times_history[step] = auto_correlation_times
+
+        return auto_correlation_times
+
+    def chain_between_steps(self, start: int, end: int) -> np.ndarray:
+        """The cached chain between two steps, with shape (steps, walkers, parameters)."""
+        chain_parts = []
+        offset = 0
+
+        for chain in self.chain_chunks:
+
+            lower = max(start - offset, 0)
+            upper = min(end - offset, chain.shape[0])
+
+            if lower < upper:
+                chain_parts.append(chain[lower:upper])
+
+            offset += chain.shape[0]
+
+        if len(chain_parts) == 0:
+            return np.zeros(shape=(0, self.total_walkers, len(self.parameter_names)))
+
+        return np.concatenate(chain_parts)
@@ -0,0 +1,1049 @@
+import json
+import os
+from os import path
+from typing import Dict, List, Tuple
+
+import emcee
+import numpy as np
+
+from autofit import exc
+from autofit.mapper.model_mapper import ModelMapper
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear import samples as samp
+from autofit.non_linear.log import logger
+from autofit.non_linear.mcmc.abstract_mcmc import AbstractMCMC
+from autofit.non_linear.mcmc.emcee import EmceeSamplesCache
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import MCMCSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
+
+
+class ParallelTempering(AbstractMCMC):
+
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            nwalkers=None,
+            ntemps=None,
+            nsteps=None,
+            max_temperature=None,
+            adapt_temperatures=None,
+            adaptation_lag=None,
+            adaptation_time=None,
+            initializer=None,
+            auto_correlation_check_for_convergence=None,
+            auto_correlation_check_size=None,
+            auto_correlation_required_length=None,
+            auto_correlation_change_threshold=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        A parallel-tempered ensemble MCMC non-linear search, which is implemented natively in PyAutoFit.
+
+        An ensemble of walkers samples the tempered posterior, likelihood ** beta * prior, at each of `ntemps`
+        temperatures (with beta = 1 / temperature) using the affine-invariant stretch move of Goodman & Weare (2010).
+        After every step, walkers at adjacent temperatures propose to swap positions, so walkers which explore every
+        mode of the flattened hot posteriors move down the temperature ladder into the cold (temperature 1) chain,
+        which samples the posterior. This makes it far better suited to multimodal posteriors than *Emcee*.
+
+        The proposals of half the walkers at every temperature are independent of one another, so each step is
+        evaluated as two batches of `ntemps` * `nwalkers` / 2 points, on the search's pool of processes if
+        `number_of_cores` is above 1.
+
+        Extensions:
+
+        - The temperatures between 1 and `max_temperature` are adapted during sampling so that swaps between every pair
+          of adjacent temperatures are accepted at the same rate, following Vousden, Farr & Mandel (2016). Adaptation
+          decays over a timescale of `adaptation_lag` steps, so the ladder settles.
+
+        - The log evidence is estimated by thermodynamic integration of the mean log likelihood of every temperature
+          over beta at every step, using the temperature ladder of that step, averaged over the second half of the
+          chains. Whilst the temperatures adapt, the walkers at a temperature lag behind its latest beta, which biases
+          the mean log likelihoods paired with it; the bias shrinks as adaptation decays, so `adaptation_lag` should be
+          short compared to `nsteps` when the evidence is required.
+
+        - The chain of every temperature is appended to its own raw binary file at every update, and the state of the
+          walkers and numpy's random number generator is output alongside it, so runs can be terminated and resumed
+          exactly where they stopped.
+
+        The `MCMCSamples` of the search are the samples of the cold chain. As for *Emcee*, the auto-correlation
+        lengths of the cold chain may be used to terminate sampling early.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        nwalkers : int
+            The number of walkers in the ensemble at every temperature.
+        ntemps : int
+            The number of temperatures in the temperature ladder.
+        nsteps : int
+            The number of steps that must be taken by every walker.
+        max_temperature : float
+            The temperature of the hottest chain. The temperatures are initially spaced geometrically between 1 and this
+            value.
+        adapt_temperatures : bool
+            Whether the temperatures between 1 and `max_temperature` are adapted to equalize the swap acceptance rates.
+        adaptation_lag : int
+            The number of steps over which the rate at which the temperatures adapt decays.
+        adaptation_time : int
+            The number of steps over which the temperatures adapt initially.
+        initializer : non_linear.initializer.Initializer
+            Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        auto_correlation_check_for_convergence : bool
+            Whether the auto-correlation lengths of the cold chain are checked to determine the stopping criteria.
+        auto_correlation_check_size : int
+            The length of the samples used to check the auto-correlation lengths (from the latest sample backwards).
+        auto_correlation_required_length : int
+            The length an auto_correlation chain must be for it to be used to evaluate whether its change threshold is
+            sufficiently small to terminate sampling early.
+        auto_correlation_change_threshold : float
+            The threshold value by which if the change in auto_correlations is below sampling will be terminated early.
+        number_of_cores : int
+            The number of cores the steps are evaluated on using a Python multiprocessing Pool instance. If 1, a
+            pool instance is not created and the job runs in serial.
+        """
+
+        self.nwalkers = (
+            self._config("search", "nwalkers") if nwalkers is None else nwalkers
+        )
+        self.ntemps = (
+            self._config("search", "ntemps") if ntemps is None else ntemps
+        )
+        self.nsteps = (
+            self._config("search", "nsteps") if nsteps is None else nsteps
+        )
+        self.max_temperature = (
+            self._config("search", "max_temperature")
+            if max_temperature is None
+            else max_temperature
+        )
+
+        self.adapt_temperatures = (
+            self._config("temperatures", "adapt")
+            if adapt_temperatures is None
+            else adapt_temperatures
+        )
+        self.adaptation_lag = (
+            self._config("temperatures", "adaptation_lag")
+            if adaptation_lag is None
+            else adaptation_lag
+        )
+        self.adaptation_time = (
+            self._config("temperatures", "adaptation_time")
+            if adaptation_time is None
+            else adaptation_time
+        )
+
+        self.auto_correlation_check_for_convergence = (
+            self._config("auto_correlation", "check_for_convergence")
+            if auto_correlation_check_for_convergence is None
+            else auto_correlation_check_for_convergence
+        )
+        self.auto_correlation_check_size = (
+            self._config("auto_correlation", "check_size")
+            if auto_correlation_check_size is None
+            else auto_correlation_check_size
+        )
+        self.auto_correlation_required_length = (
+            self._config("auto_correlation", "required_length")
+            if auto_correlation_required_length is None
+            else auto_correlation_required_length
+        )
+        self.auto_correlation_change_threshold = (
+            self._config("auto_correlation", "change_threshold")
+            if auto_correlation_change_threshold is None
+            else auto_correlation_change_threshold
+        )
+
+        if self.nwalkers < 4:
+            raise ValueError("ParallelTempering requires at least 4 walkers at every temperature")
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=initializer,
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating ParallelTempering NLO")
+
+    class Fitness(AbstractMCMC.Fitness):
+        def __call__(self, parameters):
+            try:
+                return self.figure_of_merit_from_parameters(parameters=parameters)
+            except exc.FitException:
+                return self.resample_figure_of_merit
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space.
+            *ParallelTempering* uses the log posterior, from which the log likelihood tempered at every temperature is
+            computed."""
+            return self.log_posterior_from_parameters(parameters=parameters)
+
+    @property
+    def initial_betas(self) -> np.ndarray:
+        """The inverse temperatures of the ladder before adaptation, spaced geometrically from 1 to 1 /
+        `max_temperature`."""
+        return self.max_temperature ** -np.linspace(0.0, 1.0, self.ntemps)
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using parallel-tempered MCMC and the Analysis class which contains the data and returns the log
+        likelihood from instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+
+        Returns
+        -------
+        A result object comprising the Samples object that inclues the maximum log likelihood instance and full
+        chains used by the fit.
+        """
+        pool, pool_ids = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis, pool_ids=pool_ids
+        )
+
+        figures_of_merit_map = map if pool is None else pool.map
+
+        def log_likelihoods_and_priors_from(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """The log likelihoods and log priors of an array of points, evaluating only the points within the prior
+            limits as one batch."""
+            point_log_likelihoods = np.full(len(points), -np.inf)
+            point_log_priors = np.full(len(points), -np.inf)
+
+            within = np.flatnonzero(model.vectors_within_limits(points))
+
+            if len(within) > 0:
+                point_log_posteriors = np.asarray(
+                    list(figures_of_merit_map(fitness_function, points[within].tolist())), dtype=float
+                )
+                point_log_priors[within] = [
+                    sum(model.log_priors_from_vector(vector=vector)) for vector in points[within].tolist()
+                ]
+                point_log_likelihoods[within] = point_log_posteriors - point_log_priors[within]
+
+            return point_log_likelihoods, point_log_priors
+
+        checkpoint = self.checkpoint
+
+        if checkpoint.exists:
+
+            checkpoint.load()
+            checkpoint.restore_random_state()
+
+            state = checkpoint.state
+            positions = state["positions"]
+            log_likelihoods = state["log_likelihoods"]
+            log_priors = state["log_priors"]
+            betas = state["betas"]
+
+            logger.info("Existing ParallelTempering samples found, resuming non-linear search.")
+
+        else:
+
+            initial_unit_parameters, initial_parameters, initial_log_posteriors = self.initializer.initial_samples_from_model(
+                total_points=self.ntemps * self.nwalkers,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            positions = np.asarray(initial_parameters, dtype=float).reshape(
+                self.ntemps, self.nwalkers, model.prior_count
+            )
+            log_priors = np.asarray(
+                [sum(model.log_priors_from_vector(vector=vector)) for vector in initial_parameters]
+            ).reshape(self.ntemps, self.nwalkers)
+            log_likelihoods = np.asarray(initial_log_posteriors).reshape(self.ntemps, self.nwalkers) - log_priors
+            betas = self.initial_betas
+
+            logger.info("No ParallelTempering samples found, beginning new non-linear search.")
+
+        iterations_remaining = self.nsteps - checkpoint.total_steps
+
+        while iterations_remaining > 0:
+
+            iterations = min(self.iterations_per_update, iterations_remaining)
+
+            chains = np.zeros((iterations,) + positions.shape)
+            chain_log_likelihoods = np.zeros((iterations,) + log_likelihoods.shape)
+            chain_betas = np.zeros((iterations, self.ntemps))
+
+            for iteration in range(iterations):
+
+                for walkers, complement in self.walker_halves:
+
+                    proposals, log_stretches = self.stretch_proposals(
+                        positions=positions, walkers=walkers, complement=complement
+                    )
+
+                    proposal_log_likelihoods, proposal_log_priors = log_likelihoods_and_priors_from(
+                        points=proposals.reshape(-1, positions.shape[2])
+                    )
+                    proposal_log_likelihoods = proposal_log_likelihoods.reshape(log_stretches.shape)
+                    proposal_log_priors = proposal_log_priors.reshape(log_stretches.shape)
+
+                    with np.errstate(invalid="ignore"):
+                        log_acceptance = (
+                                log_stretches
+                                + betas[:, None] * (proposal_log_likelihoods - log_likelihoods[:, walkers])
+                                + proposal_log_priors - log_priors[:, walkers]
+                        )
+
+                    accepted = np.log(np.random.random(log_acceptance.shape)) < log_acceptance
+
+                    temperatures, accepted_walkers = np.nonzero(accepted)
+                    walker_indexes = walkers[accepted_walkers]
+
+                    positions[temperatures, walker_indexes] = proposals[accepted]
+                    log_likelihoods[temperatures, walker_indexes] = proposal_log_likelihoods[accepted]
+                    log_priors[temperatures, walker_indexes] = proposal_log_priors[accepted]
+
+                swap_acceptance = self.swap(
+                    positions=positions,
+                    log_likelihoods=log_likelihoods,
+                    log_priors=log_priors,
+                    betas=betas,
+                )
+
+                if self.adapt_temperatures:
+                    betas = self.adapted_betas(
+                        betas=betas,
+                        swap_acceptance=swap_acceptance,
+                        step=checkpoint.total_steps + iteration,
+                    )
+
+                chains[iteration] = positions
+                chain_log_likelihoods[iteration] = log_likelihoods
+                chain_betas[iteration] = betas
+
+            checkpoint.append(
+                chains=chains,
+                log_likelihoods=chain_log_likelihoods,
+                betas=chain_betas,
+                positions=positions,
+                current_log_likelihoods=log_likelihoods,
+                current_log_priors=log_priors,
+            )
+
+            iterations_remaining = self.nsteps - checkpoint.total_steps
+
+            samples = self.perform_update(
+                model=model, analysis=analysis, during_analysis=True
+            )
+
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+            figures_of_merit_map = map if pool is None else pool.map
+
+            if self.auto_correlation_check_for_convergence and samples.converged:
+                iterations_remaining = 0
+
+        logger.info("ParallelTempering sampling complete.")
+
+    @property
+    def walker_halves(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """The two halves the walkers at every temperature are split into, each paired with the other half, whose
+        positions its stretch moves are proposed from."""
+        first_half = np.arange(self.nwalkers // 2)
+        second_half = np.arange(self.nwalkers // 2, self.nwalkers)
+        return [(first_half, second_half), (second_half, first_half)]
+
+    @staticmethod
+    def stretch_proposals(
+            positions: np.ndarray, walkers: np.ndarray, complement: np.ndarray, stretch_scale: float = 2.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Propose a stretch move for a subset of the walkers at every temperature, towards or away from a walker chosen
+        at random from the complementary subset at the same temperature.
+
+        Parameters
+        ----------
+        positions
+            The positions of every walker at every temperature, with shape (ntemps, nwalkers, parameters).
+        walkers
+            The indexes of the walkers moves are proposed for.
+        complement
+            The indexes of the walkers the moves are proposed from.
+        stretch_scale
+            The scale of the distribution of stretch factors.
+
+        Returns
+        -------
+        The proposed positions, with shape (ntemps, len(walkers), parameters), and the log of the factor the
+        acceptance probability of each proposal is multiplied by.
+        """
+        ntemps, _, dimensions = positions.shape
+        shape = (ntemps, len(walkers))
+
+        stretches = ((stretch_scale - 1.0) * np.random.random(shape) + 1.0) ** 2 / stretch_scale
+        partners = complement[np.random.randint(len(complement), size=shape)]
+
+        partner_positions = positions[np.arange(ntemps)[:, None], partners]
+
+        proposals = partner_positions + stretches[:, :, None] * (positions[:, walkers] - partner_positions)
+
+        return proposals, (dimensions - 1.0) * np.log(stretches)
+
+    @staticmethod
+    def swap(
+            positions: np.ndarray, log_likelihoods: np.ndarray, log_priors: np.ndarray, betas: np.ndarray
+    ) -> np.ndarray:
+        """
+        Propose swapping the position of every walker with a randomly paired walker at the next colder temperature,
+        from the hottest pair of temperatures to the coldest, and perform the swaps which are accepted in place.
+
+        Returns
+        -------
+        The fraction of swaps accepted between every pair of adjacent temperatures, coldest first.
+        """
+        ntemps, nwalkers = log_likelihoods.shape
+
+        swap_acceptance = np.zeros(ntemps - 1)
+
+        for hot in range(ntemps - 1, 0, -1):
+
+            cold = hot - 1
+
+            hot_walkers = np.random.permutation(nwalkers)
+            cold_walkers = np.random.permutation(nwalkers)
+
+            with np.errstate(invalid="ignore"):
+                log_acceptance = (betas[cold] - betas[hot]) * (
+                        log_likelihoods[hot, hot_walkers] - log_likelihoods[cold, cold_walkers]
+                )
+
+            accepted = np.log(np.random.random(nwalkers)) < log_acceptance
+
+            hot_walkers = hot_walkers[accepted]
+            cold_walkers = cold_walkers[accepted]
+
+            for values in (positions, log_likelihoods, log_priors):
+                hot_values = values[hot, hot_walkers].copy()
+                values[hot, hot_walkers] = values[cold, cold_walkers]
+                values[cold, cold_walkers] = hot_values
+
+            swap_acceptance[cold] = np.mean(accepted)
+
+        return swap_acceptance
+
+    def adapted_betas(self, betas: np.ndarray, swap_acceptance: np.ndarray, step: int) -> np.ndarray:
+        """
+        Adapt the temperatures between the coldest and hottest, increasing the spacing between a pair of adjacent
+        temperatures whose swaps are accepted more often than those of the next hotter pair, and vice versa. The rate
+        of adaptation decays with the number of steps taken (Vousden, Farr & Mandel 2016).
+        """
+        if len(betas) < 3:
+            return betas
+
+        kappa = self.adaptation_lag / (step + self.adaptation_lag) / self.adaptation_time
+
+        temperature_spacings = np.diff(1.0 / betas[:-1]) * np.exp(
+            kappa * (swap_acceptance[:-1] - swap_acceptance[1:])
+        )
+
+        betas = betas.copy()
+        betas[1:-1] = 1.0 / (np.cumsum(temperature_spacings) + 1.0 / betas[0])
+
+        return betas
+
+    @property
+    def tag(self):
+        """Tag the output folder of the ParallelTempering non-linear search, according to the number of walkers and
+        temperatures."""
+
+        name_tag = self._config("tag", "name")
+        nwalkers_tag = f"{self._config('tag', 'nwalkers')}_{self.nwalkers}"
+        ntemps_tag = f"{self._config('tag', 'ntemps')}_{self.ntemps}"
+
+        return f"{name_tag}[{nwalkers_tag}_{ntemps_tag}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the ParallelTempering `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.nwalkers = self.nwalkers
+        copy.ntemps = self.ntemps
+        copy.nsteps = self.nsteps
+        copy.max_temperature = self.max_temperature
+        copy.adapt_temperatures = self.adapt_temperatures
+        copy.adaptation_lag = self.adaptation_lag
+        copy.adaptation_time = self.adaptation_time
+        copy.auto_correlation_check_for_convergence = (
+            self.auto_correlation_check_for_convergence
+        )
+        copy.auto_correlation_check_size = self.auto_correlation_check_size
+        copy.auto_correlation_required_length = self.auto_correlation_required_length
+        copy.auto_correlation_change_threshold = self.auto_correlation_change_threshold
+        copy.initializer = self.initializer
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+
+        return ParallelTempering.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            pool_ids=pool_ids,
+        )
+
+    @property
+    def checkpoint(self) -> "ParallelTemperingCheckpoint":
+        return ParallelTemperingCheckpoint(samples_path=self.paths.samples_path)
+
+    def remove_state_files(self):
+        self.checkpoint.remove()
+
+    def samples_via_sampler_from_model(self, model):
+        """Create a `ParallelTemperingSamples` object from this non-linear search's output files on the hard-disk and
+        model.
+
+        The samples are those of the cold chain, and the log evidence is estimated by thermodynamic integration.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        checkpoint = self.checkpoint
+        checkpoint.load()
+
+        samples_cache = self.samples_cache_from_model(model=model)
+        samples_cache.update(checkpoint=checkpoint)
+
+        try:
+            previous_auto_correlation_times = samples_cache.previous_auto_correlation_times
+        except IndexError:
+            previous_auto_correlation_times = None
+
+        return ParallelTemperingSamples(
+            model=model,
+            samples=list(samples_cache.samples),
+            auto_correlation_times=samples_cache.auto_correlation_times,
+            auto_correlation_check_size=self.auto_correlation_check_size,
+            auto_correlation_required_length=self.auto_correlation_required_length,
+            auto_correlation_change_threshold=self.auto_correlation_change_threshold,
+            total_walkers=samples_cache.total_walkers,
+            total_steps=samples_cache.total_steps,
+            log_evidence=samples_cache.log_evidence,
+            log_evidence_error=samples_cache.log_evidence_error,
+            time=self.timer.time,
+            previous_auto_correlation_times=previous_auto_correlation_times,
+        )
+
+    def samples_cache_from_model(self, model) -> "ParallelTemperingSamplesCache":
+        """The `ParallelTemperingSamplesCache` which incrementally extracts samples from this search's checkpoint.
+
+        The cache persists between updates, so that every call to `samples_via_sampler_from_model` only reads the
+        steps appended to the checkpoint since the previous call. A new cache is created if the samples path or the
+        model's parameters change."""
+        samples_cache = getattr(self, "_samples_cache", None)
+
+        if samples_cache is None or not samples_cache.is_for(filename=self.paths.samples_path, model=model):
+            samples_cache = ParallelTemperingSamplesCache(
+                samples_path=self.paths.samples_path,
+                model=model,
+                auto_correlation_check_size=self.auto_correlation_check_size,
+                auto_correlation_required_length=self.auto_correlation_required_length,
+            )
+            self._samples_cache = samples_cache
+
+        return samples_cache
+
+    def __getstate__(self):
+        """The samples cache holds the entire cold chain in memory, so it is not pickled alongside the search."""
+        state = super().__getstate__()
+        state.pop("_samples_cache", None)
+        return state
+
+    def samples_via_csv_json_from_model(self, model):
+
+        samples = samp.load_from_table(filename=self.paths.samples_file)
+
+        with open(self.paths.info_file) as infile:
+            samples_info = json.load(infile)
+
+        return ParallelTemperingSamples(
+            model=model,
+            samples=samples,
+            auto_correlation_times=np.asarray(samples_info["auto_correlation_times"]),
+            auto_correlation_check_size=samples_info["auto_correlation_check_size"],
+            auto_correlation_required_length=samples_info["auto_correlation_required_length"],
+            auto_correlation_change_threshold=samples_info["auto_correlation_change_threshold"],
+            total_walkers=samples_info["total_walkers"],
+            total_steps=samples_info["total_steps"],
+            log_evidence=samples_info["log_evidence"],
+            log_evidence_error=samples_info["log_evidence_error"],
+            time=samples_info["time"],
+        )
+
+
+def thermodynamic_integration_log_evidence(
+        betas: np.ndarray, mean_log_likelihoods: List[float]
+) -> Tuple[float, float]:
+    """
+    Estimate the log evidence by integrating the mean log likelihood of the chain at every inverse temperature over
+    the inverse temperature from 0 to 1, with the trapezium rule. The mean log likelihood at an inverse temperature of
+    0 is taken to be that of the hottest chain.
+
+    The error is estimated as the difference from the same integral using every other temperature.
+
+    Parameters
+    ----------
+    betas
+        The inverse temperatures, coldest (1) first.
+    mean_log_likelihoods
+        The mean log likelihood of the chain at every inverse temperature.
+    """
+    log_evidences, coarse_log_evidences = thermodynamic_integration_log_evidences(
+        betas=np.asarray(betas, dtype=float)[None],
+        mean_log_likelihoods=np.asarray(mean_log_likelihoods, dtype=float)[None],
+    )
+
+    return float(log_evidences[0]), float(np.abs(log_evidences[0] - coarse_log_evidences[0]))
+
+
+def thermodynamic_integration_log_evidences(
+        betas: np.ndarray, mean_log_likelihoods: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The thermodynamic integrals (see `thermodynamic_integration_log_evidence`) of many steps, each using the
+    temperature ladder of its own step, over every temperature and over every other temperature.
+
+    Parameters
+    ----------
+    betas
+        The inverse temperatures of every step, with shape (steps, temperatures), coldest (1) first.
+    mean_log_likelihoods
+        The mean log likelihood of the walkers at every inverse temperature of every step, with shape (steps,
+        temperatures).
+    """
+    hottest = np.zeros((betas.shape[0], 1))
+
+    betas = np.append(betas, hottest, axis=1)
+    mean_log_likelihoods = np.append(mean_log_likelihoods, mean_log_likelihoods[:, -1:], axis=1)
+
+    log_evidences = -np.trapz(mean_log_likelihoods, betas, axis=1)
+
+    coarse_betas = np.append(betas[:, :-1][:, ::2], hottest, axis=1)
+    coarse_mean_log_likelihoods = np.append(
+        mean_log_likelihoods[:, :-1][:, ::2], mean_log_likelihoods[:, -1:], axis=1
+    )
+
+    coarse_log_evidences = -np.trapz(coarse_mean_log_likelihoods, coarse_betas, axis=1)
+
+    return log_evidences, coarse_log_evidences
+
+
+class ParallelTemperingCheckpoint:
+
+    def __init__(self, samples_path: str):
+        """
+        The checkpoint of a `ParallelTempering` search, from which a terminated search is resumed and its samples are
+        created.
+
+        The chain and log likelihoods of every temperature are appended to their own raw binary files at every update,
+        so the cold chain is read without reading those of the hotter temperatures, and outputting an update only
+        writes the steps performed since the previous update. The inverse temperatures at every step are appended to
+        `betas.dat`. The current positions, log likelihoods and log priors of the walkers, the temperature ladder and
+        the state of numpy's random number generator are written to `walkers.npz`, which is replaced once the chains
+        are appended.
+
+        Parameters
+        ----------
+        samples_path
+            The folder the checkpoint is output to.
+        """
+        self.samples_path = samples_path
+
+        self.total_steps = 0
+
+    def chain_file(self, temperature: int) -> str:
+        return path.join(self.samples_path, f"chain_{temperature}.dat")
+
+    def log_likelihoods_file(self, temperature: int) -> str:
+        return path.join(self.samples_path, f"log_likelihoods_{temperature}.dat")
+
+    @property
+    def betas_file(self) -> str:
+        return path.join(self.samples_path, "betas.dat")
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.samples_path, "walkers.npz")
+
+    @property
+    def exists(self) -> bool:
+        return path.exists(self.state_file)
+
+    @property
+    def state(self) -> Dict[str, np.ndarray]:
+        """The state of the walkers when the checkpoint was last output."""
+        with np.load(self.state_file) as f:
+            return {key: f[key] for key in f.files}
+
+    @property
+    def ntemps(self) -> int:
+        return self.state["positions"].shape[0]
+
+    def _files_and_sizes(self, positions_shape) -> List[Tuple[str, int]]:
+        ntemps, nwalkers, dimensions = positions_shape
+
+        files_and_sizes = [(self.betas_file, ntemps)]
+
+        for temperature in range(ntemps):
+            files_and_sizes.append((self.chain_file(temperature), nwalkers * dimensions))
+            files_and_sizes.append((self.log_likelihoods_file(temperature), nwalkers))
+
+        return files_and_sizes
+
+    def load(self):
+        """
+        Load the checkpoint from the hard-disk.
+
+        Steps appended to the chains after the state of the walkers was last output (e.g. if the search was terminated
+        whilst outputting an update) are removed, so that the chains match the state.
+        """
+        state = self.state
+
+        self.total_steps = int(state["total_steps"])
+
+        for filename, size in self._files_and_sizes(positions_shape=state["positions"].shape):
+            with open(filename, "r+b") as f:
+                f.truncate(self.total_steps * size * np.dtype(np.float64).itemsize)
+
+    def _read(self, filename: str, shape, start: int = 0) -> np.ndarray:
+        """Read the steps of a raw binary file from step `start` onwards, without reading the earlier steps."""
+        if self.total_steps <= start:
+            return np.zeros(shape=(0,) + tuple(shape))
+
+        return np.array(
+            np.memmap(
+                filename,
+                dtype=np.float64,
+                mode="r",
+                offset=start * int(np.prod(shape)) * np.dtype(np.float64).itemsize,
+                shape=(self.total_steps - start,) + tuple(shape),
+            )
+        )
+
+    def chain(self, temperature: int, start: int = 0) -> np.ndarray:
+        """The chain of a temperature from step `start` onwards, with shape (steps, walkers, parameters)."""
+        return self._read(
+            filename=self.chain_file(temperature), shape=self.state["positions"].shape[1:], start=start
+        )
+
+    def log_likelihoods(self, temperature: int, start: int = 0) -> np.ndarray:
+        """The log likelihoods of the chain of a temperature from step `start` onwards, with shape (steps, walkers)."""
+        return self._read(
+            filename=self.log_likelihoods_file(temperature), shape=self.state["positions"].shape[1:2], start=start
+        )
+
+    @property
+    def betas(self) -> np.ndarray:
+        """The inverse temperatures at every step, with shape (steps, temperatures)."""
+        return self.betas_from_step(start=0)
+
+    def betas_from_step(self, start: int) -> np.ndarray:
+        """The inverse temperatures from step `start` onwards, with shape (steps, temperatures)."""
+        return self._read(filename=self.betas_file, shape=self.state["betas"].shape, start=start)
+
+    def append(
+            self,
+            chains: np.ndarray,
+            log_likelihoods: np.ndarray,
+            betas: np.ndarray,
+            positions: np.ndarray,
+            current_log_likelihoods: np.ndarray,
+            current_log_priors: np.ndarray,
+    ):
+        """
+        Append steps of a search to the checkpoint and output the current state of its walkers. The first steps
+        appended to a new checkpoint overwrite any chains left by a search which did not output a state.
+
+        Parameters
+        ----------
+        chains
+            The positions of the walkers at every step, with shape (steps, ntemps, nwalkers, parameters).
+        log_likelihoods
+            The log likelihoods of the walkers at every step, with shape (steps, ntemps, nwalkers).
+        betas
+            The inverse temperatures at every step, with shape (steps, ntemps).
+        positions
+            The current positions of the walkers, with shape (ntemps, nwalkers, parameters).
+        current_log_likelihoods
+            The current log likelihoods of the walkers, with shape (ntemps, nwalkers).
+        current_log_priors
+            The current log priors of the walkers, with shape (ntemps, nwalkers).
+        """
+        os.makedirs(self.samples_path, exist_ok=True)
+
+        mode = "ab" if self.total_steps > 0 else "wb"
+
+        with open(self.betas_file, mode) as f:
+            np.asarray(betas, dtype=np.float64).tofile(f)
+
+        for temperature in range(positions.shape[0]):
+
+            with open(self.chain_file(temperature), mode) as f:
+                np.asarray(chains[:, temperature], dtype=np.float64).tofile(f)
+
+            with open(self.log_likelihoods_file(temperature), mode) as f:
+                np.asarray(log_likelihoods[:, temperature], dtype=np.float64).tofile(f)
+
+        self.total_steps += len(chains)
+
+        random_state = np.random.get_state()
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                np.savez(
+                    f,
+                    positions=positions,
+                    log_likelihoods=current_log_likelihoods,
+                    log_priors=current_log_priors,
+                    betas=betas[-1],
+                    total_steps=self.total_steps,
+                    random_state_keys=random_state[1],
+                    random_state_values=np.asarray(random_state[2:], dtype=np.float64),
+                )
+
+    def restore_random_state(self):
+        """Set the state of numpy's random number generator to its state when the checkpoint was last output."""
+        state = self.state
+
+        position, has_gauss, cached_gaussian = state["random_state_values"]
+
+        np.random.set_state(
+            ("MT19937", state["random_state_keys"], int(position), int(has_gauss), cached_gaussian)
+        )
+
+    def remove(self):
+        """Remove the checkpoint from the hard-disk."""
+        if not self.exists:
+            return
+
+        for filename, _ in self._files_and_sizes(positions_shape=self.state["positions"].shape):
+            if path.exists(filename):
+                os.remove(filename)
+
+        os.remove(self.state_file)
+
+
+class ParallelTemperingSamplesCache(EmceeSamplesCache):
+
+    def __init__(
+            self,
+            samples_path: str,
+            model: AbstractPriorModel,
+            auto_correlation_check_size: int,
+            auto_correlation_required_length: int,
+    ):
+        """
+        Incrementally extracts the samples of the cold chain of a `ParallelTempering` checkpoint, in the same way as
+        the `EmceeSamplesCache`, so that each update only reads the steps appended since the previous update.
+
+        The thermodynamic integral of every step, using the mean log likelihoods of the walkers at every temperature
+        and the temperature ladder of that step, is also cached. The log evidence is the mean of these integrals over
+        the second half of the chain, so the chains of the hotter temperatures are only read once.
+
+        Parameters
+        ----------
+        samples_path
+            The folder of the checkpoint the samples are extracted from.
+        model
+            The model which maps the chain's parameter vectors to physical values and their log priors.
+        auto_correlation_check_size
+            The number of steps (from the latest step backwards) the previous auto-correlation times are computed
+            without.
+        auto_correlation_required_length
+            The number of auto-correlation times the window used to estimate the auto-correlation times spans.
+        """
+        super().__init__(
+            filename=samples_path,
+            model=model,
+            auto_correlation_check_size=auto_correlation_check_size,
+            auto_correlation_required_length=auto_correlation_required_length,
+        )
+
+        self.log_evidences = np.zeros(0)
+        self.coarse_log_evidences = np.zeros(0)
+
+    def reset(self):
+        super().reset()
+        self.log_evidences = np.zeros(0)
+        self.coarse_log_evidences = np.zeros(0)
+
+    def update(self, checkpoint: ParallelTemperingCheckpoint):
+        """Read the steps appended to the loaded checkpoint since the last update.
+
+        If the checkpoint has fewer steps than have been read (e.g. it was removed and a new search begun) the cache is
+        reset and the checkpoint is read from the beginning."""
+        if checkpoint.total_steps < self.total_steps:
+            self.reset()
+
+        if checkpoint.total_steps == self.total_steps:
+            return
+
+        start = self.total_steps
+
+        log_likelihoods = [
+            checkpoint.log_likelihoods(temperature=temperature, start=start)
+            for temperature in range(checkpoint.ntemps)
+        ]
+        mean_log_likelihoods = np.stack(
+            [np.mean(temperature_log_likelihoods, axis=1) for temperature_log_likelihoods in log_likelihoods], axis=1
+        )
+
+        log_evidences, coarse_log_evidences = thermodynamic_integration_log_evidences(
+            betas=checkpoint.betas_from_step(start=start), mean_log_likelihoods=mean_log_likelihoods
+        )
+
+        self.log_evidences = np.append(self.log_evidences, log_evidences)
+        self.coarse_log_evidences = np.append(self.coarse_log_evidences, coarse_log_evidences)
+
+        self.append(
+            chain=checkpoint.chain(temperature=0, start=start), log_likelihoods=log_likelihoods[0]
+        )
+
+    @property
+    def log_evidence(self) -> float:
+        """The mean thermodynamic integral of the steps in the second half of the chain."""
+        return float(np.mean(self.log_evidences[self.total_steps // 2:]))
+
+    @property
+    def log_evidence_error(self) -> float:
+        """The difference between the mean integrals over every temperature and every other temperature."""
+        return float(
+            np.abs(
+                np.mean(
+                    self.log_evidences[self.total_steps // 2:]
+                    - self.coarse_log_evidences[self.total_steps // 2:]
+                )
+            )
+        )
+
+
+class ParallelTemperingSamples(MCMCSamples):
+
+    def __init__(
+            self,
+            model: ModelMapper,
+            samples: List[Sample],
+            auto_correlation_times: np.ndarray,
+            auto_correlation_check_size: int,
+            auto_correlation_required_length: int,
+            auto_correlation_change_threshold: float,
+            total_walkers: int,
+            total_steps: int,
+            log_evidence: float,
+            log_evidence_error: float,
+            unconverged_sample_size: int = 100,
+            time: float = None,
+            previous_auto_correlation_times: np.ndarray = None,
+    ):
+        """
+        The samples of the cold chain of a `ParallelTempering` search.
+
+        Attributes
+        ----------
+        log_evidence : float
+            The log evidence estimated by thermodynamic integration.
+        log_evidence_error : float
+            An estimate of the error of the thermodynamic integration, from the difference to the integral using every
+            other temperature.
+        previous_auto_correlation_times : np.ndarray
+            The auto-correlation times of the cold chain excluding its last *auto_correlation_check_size* steps. If
+            these have already been computed (e.g. by a `ParallelTemperingSamplesCache`) they are used, otherwise they
+            are computed from the chain when required.
+        """
+
+        super().__init__(
+            model=model,
+            samples=samples,
+            auto_correlation_times=auto_correlation_times,
+            auto_correlation_check_size=auto_correlation_check_size,
+            auto_correlation_required_length=auto_correlation_required_length,
+            auto_correlation_change_threshold=auto_correlation_change_threshold,
+            total_walkers=total_walkers,
+            total_steps=total_steps,
+            unconverged_sample_size=unconverged_sample_size,
+            time=time,
+        )
+
+        self.log_evidence = log_evidence
+        self.log_evidence_error = log_evidence_error
+        self._previous_auto_correlation_times = previous_auto_correlation_times
+
+    def info_to_json(self, filename):
+
+        info = {
+            "auto_correlation_times": np.asarray(self.auto_correlation_times).tolist(),
+            "auto_correlation_check_size": self.auto_correlation_check_size,
+            "auto_correlation_required_length": self.auto_correlation_required_length,
+            "auto_correlation_change_threshold": self.auto_correlation_change_threshold,
+            "total_walkers": self.total_walkers,
+            "total_steps": self.total_steps,
+            "log_evidence": self.log_evidence,
+            "log_evidence_error": self.log_evidence_error,
+            "time": self.time,
+        }
+
+        with open(filename, 'w') as outfile:
+            json.dump(info, outfile)
+
+    @property
+    def chain(self) -> np.ndarray:
+        """The cold chain, with shape (steps, walkers, parameters)."""
+        return np.asarray(self.parameters).reshape(self.total_steps, self.total_walkers, -1)
+
+    @property
+    def samples_after_burn_in(self) -> [list]:
+        """The samples of the cold chain with the initial burn-in samples removed.
+
+        The burn-in period is estimated using the auto-correlation times of the parameters."""
+        discard = int(3.0 * np.max(self.auto_correlation_times))
+        thin = max(int(np.max(self.auto_correlation_times) / 2.0), 1)
+
+        chain = self.chain[discard::thin]
+
+        if len(chain) == 0:
+            raise ValueError("The cold chain is shorter than its burn-in period")
+
+        return chain.reshape(-1, chain.shape[2])
+
+    @property
+    def previous_auto_correlation_times(self) -> [float]:
+        if self._previous_auto_correlation_times is not None:
+            return self._previous_auto_correlation_times
+        return emcee.autocorr.integrated_time(
+            x=self.chain[: -self.auto_correlation_check_size], tol=0
+        )
@@ -1,10 +1,14 @@
+import copy
+import inspect
 import os
 import pickle
 import sys
+from os import path
 
 import numpy as np
 from dynesty import NestedSampler as StaticSampler
 from dynesty.dynesty import DynamicNestedSampler
+from dynesty.sampling import sample_unif
 
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear.abstract_search import Result
@@ -12,7 +16,7 @@ from autofit.non_linear.log import logger
 from autofit.non_linear.nest.abstract_nest import AbstractNest
 from autofit.non_linear.paths import convert_paths
 from autofit.non_linear.samples import NestSamples, Sample
-from autofit.text import samples_text
+from autofit.non_linear.update_writer import atomic_file
 
 
 class AbstractDynesty(AbstractNest):
@@ -42,6 +46,8 @@ class AbstractDynesty(AbstractNest):
             acceptance_ratio_threshold=None,
             iterations_per_update=None,
             number_of_cores=None,
+            queue_size=None,
+            chunk_size=None,
     ):
         """
         A Dynesty non-linear search.
@@ -146,11 +152,16 @@ class AbstractDynesty(AbstractNest):
             The acceptance ratio threshold below which sampling terminates if *terminate_at_acceptance_ratio* is
             `True` (see *Nest* for a full description of this feature).
         iterations_per_update : int
-            The number of iterations performed between every Dynesty back-up (via dumping the Dynesty instance as a
-            pickle).
+            The number of iterations performed between every Dynesty back-up (via a `DynestyCheckpoint`).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
+        queue_size : int
+            The number of points Dynesty proposes at once, whose prior transforms are computed in one vectorized call
+            and whose likelihoods are evaluated in parallel. If not positive, this is the number of cores.
+        chunk_size : int
+            The number of likelihood evaluations sent to each process of the pool at once. If not positive, the
+            default chunk size of the pool's `map` method is used.
         """
 
         self.n_live_points = (
@@ -247,6 +258,24 @@ class AbstractDynesty(AbstractNest):
             else number_of_cores
         )
 
+        self.queue_size = (
+            self._config("parallel", "queue_size")
+            if queue_size is None
+            else queue_size
+        )
+
+        if self.queue_size <= 0:
+            self.queue_size = self.number_of_cores
+
+        self.chunk_size = (
+            self._config("parallel", "chunk_size")
+            if chunk_size is None
+            else chunk_size
+        )
+
+        if self.chunk_size <= 0:
+            self.chunk_size = None
+
         logger.debug("Creating DynestyStatic NLO")
 
     class Fitness(AbstractNest.Fitness):
@@ -283,30 +312,24 @@ class AbstractDynesty(AbstractNest):
             model=model, analysis=analysis, pool_ids=pool_ids, log_likelihood_cap=log_likelihood_cap,
         )
 
-        if os.path.exists("{}/{}.pickle".format(self.paths.samples_path, "dynesty")):
+        self._checkpoint = None
+        checkpoint = self.checkpoint
+
+        if checkpoint.exists or path.exists(self.legacy_sampler_file):
 
             sampler = self.load_sampler
             sampler.loglikelihood = fitness_function
+            self.dynesty_pool_from(pool=pool).attach(sampler=sampler)
             logger.info("Existing Dynesty samples found, resuming non-linear search.")
 
         else:
 
             sampler = self.sampler_fom_model_and_fitness(
-                model=model, fitness_function=fitness_function
+                model=model, fitness_function=fitness_function, pool=pool
             )
 
             logger.info("No Dynesty samples found, beginning new non-linear search. ")
 
-        # These hacks are necessary to be able to pickle the sampler.
-
-        sampler.rstate = np.random
-        sampler.pool = pool
-
-        if self.number_of_cores == 1:
-            sampler.M = map
-        else:
-            sampler.M = pool.map
-
         finished = False
 
         while not finished:
@@ -323,36 +346,15 @@ class AbstractDynesty(AbstractNest):
 
             if iterations > 0:
 
-                for i in range(10):
-
-                    try:
-                        sampler.run_nested(
-                            maxcall=iterations,
-                            dlogz=self.evidence_tolerance,
-                            logl_max=self.logl_max,
-                            n_effective=self.n_effective,
-                            print_progress=not self.silence,
-                        )
+                self.run_sampler(sampler=sampler, maxcall=iterations)
 
-                        if i == 9:
-                            raise ValueError("Dynesty crashed due to repeated bounding errors")
-
-                        break
-
-                    except (ValueError, np.linalg.LinAlgError):
-
-                        continue
-
-            sampler_pickle = sampler
-            sampler_pickle.loglikelihood = None
-
-            with open(f"{self.paths.samples_path}/dynesty.pickle", "wb") as f:
-                pickle.dump(sampler_pickle, f)
-
-            sampler_pickle.loglikelihood = fitness_function
+            checkpoint.save(sampler=sampler)
 
             self.perform_update(model=model, analysis=analysis, during_analysis=True)
 
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+            self.dynesty_pool_from(pool=pool).attach(sampler=sampler)
+
             iterations_after_run = np.sum(sampler.results.ncall)
 
             if (
@@ -361,6 +363,80 @@ class AbstractDynesty(AbstractNest):
             ):
                 finished = True
 
+    def run_sampler(self, sampler, maxcall: int):
+        """
+        Run a Dynesty sampler for `maxcall` likelihood evaluations, or until it converges.
+
+        Dynesty raises a `ValueError` or `LinAlgError` when it fails to construct its bounding distribution, which
+        may leave the bound partially updated. A `DynestySnapshot` of the sampler's bound is therefore taken before
+        it is run; if sampling fails, the bound is rolled back, its settings are perturbed (see
+        `perturb_bounding`) and the remaining evaluations are run in chunks half the size. Samples accepted before
+        the error are kept, because Dynesty only adds a sample once its bound and proposal have succeeded.
+
+        Parameters
+        ----------
+        sampler : dynesty.sampler.Sampler
+            The sampler which performs the non-linear search.
+        maxcall
+            The number of likelihood evaluations to run the sampler for.
+        """
+        chunk_size = maxcall
+        failures = 0
+
+        while maxcall > 0:
+
+            snapshot = DynestySnapshot(sampler=sampler)
+            total_calls = sampler.ncall
+
+            try:
+                sampler.run_nested(
+                    maxcall=min(chunk_size, maxcall),
+                    dlogz=self.evidence_tolerance,
+                    logl_max=self.logl_max,
+                    n_effective=self.n_effective,
+                    print_progress=not self.silence,
+                )
+
+                if sampler.ncall - total_calls < min(chunk_size, maxcall):
+                    break
+
+            except (ValueError, np.linalg.LinAlgError) as error:
+
+                failures += 1
+
+                if failures == 10:
+                    raise ValueError("Dynesty crashed due to repeated bounding errors") from error
+
+                snapshot.restore(sampler=sampler)
+                self.perturb_bounding(sampler=sampler)
+                chunk_size = max(chunk_size // 2, 1)
+
+                logger.info(
+                    f"Dynesty bounding error ({error}), rolling back the bound and resuming with an enlargement of "
+                    f"{getattr(sampler, 'enlarge', None)} in chunks of {chunk_size} likelihood evaluations."
+                )
+
+            maxcall -= sampler.ncall - total_calls
+
+    @staticmethod
+    def perturb_bounding(sampler):
+        """
+        Make the bound of a sampler which raised an error more robust for the rest of the search: bootstrapping is
+        turned off, the bound is enlarged by 25% and, for multi-ellipsoid bounds, ellipsoids are only split when this
+        substantially decreases their volume, so that the bound tends towards a single ellipsoid.
+
+        The perturbed settings are attributes of the sampler and are therefore kept by its checkpoint.
+        """
+        if getattr(sampler, "bootstrap", 0) > 0:
+            sampler.bootstrap = 0
+
+        if hasattr(sampler, "enlarge"):
+            sampler.enlarge *= 1.25
+
+        if hasattr(sampler, "vol_dec"):
+            sampler.vol_dec *= 0.5
+            sampler.vol_check *= 2.0
+
     def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
         """Copy this instance of the dynesty `NonLinearSearch` with all associated attributes.
 
@@ -386,18 +462,61 @@ class AbstractDynesty(AbstractNest):
         copy.initializer = self.initializer
         copy.iterations_per_update = self.iterations_per_update
         copy.number_of_cores = self.number_of_cores
+        copy.queue_size = self.queue_size
+        copy.chunk_size = self.chunk_size
         copy.terminate_at_acceptance_ratio = self.terminate_at_acceptance_ratio
         copy.acceptance_ratio_threshold = self.acceptance_ratio_threshold
         copy.stagger_resampling_likelihood = self.stagger_resampling_likelihood
 
         return copy
 
+    @property
+    def checkpoint(self) -> "DynestyCheckpoint":
+        """The `DynestyCheckpoint` of this search's samples folder, which holds the sampler in memory once it has
+        been saved or loaded."""
+        checkpoint = getattr(self, "_checkpoint", None)
+
+        if checkpoint is None or checkpoint.samples_path != self.paths.samples_path:
+            checkpoint = DynestyCheckpoint(samples_path=self.paths.samples_path)
+            self._checkpoint = checkpoint
+
+        return checkpoint
+
+    def __getstate__(self):
+        """The checkpoint holds the sampler in memory, so it is not pickled alongside the search."""
+        state = super().__getstate__()
+        state.pop("_checkpoint", None)
+        return state
+
+    @property
+    def legacy_sampler_file(self) -> str:
+        """The pickle of the entire sampler, which was used to checkpoint searches before `DynestyCheckpoint`."""
+        return path.join(self.paths.samples_path, "dynesty.pickle")
+
     @property
     def load_sampler(self):
-        with open("{}/{}.pickle".format(self.paths.samples_path, "dynesty"), "rb") as f:
+        """The Dynesty sampler of this search, which is held in memory by its checkpoint or loaded from the
+        hard-disk.
+
+        Searches checkpointed as a single pickle of the entire sampler are also loaded, and are converted to the
+        checkpoint format the next time they are saved."""
+        checkpoint = self.checkpoint
+
+        if checkpoint.sampler is not None:
+            return checkpoint.sampler
+
+        if checkpoint.exists:
+            return checkpoint.load()
+
+        with open(self.legacy_sampler_file, "rb") as f:
             return pickle.load(f)
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def dynesty_pool_from(self, pool=None) -> "DynestyPool":
+        """The `DynestyPool` a sampler of this search proposes and evaluates points with, using the multiprocessing
+        pool of the search if it has one."""
+        return DynestyPool(pool=pool, size=self.queue_size, chunk_size=self.chunk_size)
+
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         return NotImplementedError()
 
     def samples_via_sampler_from_model(self, model):
@@ -487,13 +606,14 @@ class AbstractDynesty(AbstractNest):
         return f"{name_tag}[{n_live_points_tag}__{dynesty_tag}]"
 
     def initial_live_points_from_model_and_fitness_function(
-            self, model, fitness_function
+            self, model, fitness_function, pool=None
     ):
 
         unit_parameters, parameters, log_likelihoods = self.initializer.initial_samples_from_model(
             total_points=self.n_live_points,
             model=model,
             fitness_function=fitness_function,
+            pool=pool,
         )
 
         init_unit_parameters = np.zeros(shape=(self.n_live_points, model.prior_count))
@@ -509,7 +629,10 @@ class AbstractDynesty(AbstractNest):
         return [init_unit_parameters, init_parameters, init_log_likelihoods]
 
     def remove_state_files(self):
-        os.remove(f"{self.paths.samples_path}/dynesty.pickle")
+        self.checkpoint.remove()
+
+        if path.exists(self.legacy_sampler_file):
+            os.remove(self.legacy_sampler_file)
 
 
 class DynestyStatic(AbstractDynesty):
@@ -541,6 +664,8 @@ class DynestyStatic(AbstractDynesty):
         acceptance_ratio_threshold=None,
         iterations_per_update=None,
         number_of_cores=None,
+        queue_size=None,
+        chunk_size=None,
     ):
         """
         A Dynesty `NonLinearSearch` using a static number of live points.
@@ -643,11 +768,16 @@ class DynestyStatic(AbstractDynesty):
             The acceptance ratio threshold below which sampling terminates if *terminate_at_acceptance_ratio* is
             `True` (see *Nest* for a full description of this feature).
         iterations_per_update : int
-            The number of iterations performed between every Dynesty back-up (via dumping the Dynesty instance as a
-            pickle).
+            The number of iterations performed between every Dynesty back-up (via a `DynestyCheckpoint`).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
+        queue_size : int
+            The number of points Dynesty proposes at once, whose prior transforms are computed in one vectorized call
+            and whose likelihoods are evaluated in parallel. If not positive, this is the number of cores.
+        chunk_size : int
+            The number of likelihood evaluations sent to each process of the pool at once. If not positive, the
+            default chunk size of the pool's `map` method is used.
         """
 
         self.n_live_points = (
@@ -690,24 +820,28 @@ class DynestyStatic(AbstractDynesty):
             terminate_at_acceptance_ratio=terminate_at_acceptance_ratio,
             acceptance_ratio_threshold=acceptance_ratio_threshold,
             number_of_cores=number_of_cores,
+            queue_size=queue_size,
+            chunk_size=chunk_size,
         )
 
         logger.debug("Creating DynestyStatic NLO")
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         """Get the static Dynesty sampler which performs the non-linear search, passing it all associated input Dynesty
         variables."""
 
         live_points = self.initial_live_points_from_model_and_fitness_function(
-            model=model, fitness_function=fitness_function
+            model=model, fitness_function=fitness_function, pool=pool
         )
 
         return StaticSampler(
             loglikelihood=fitness_function,
-            prior_transform=AbstractDynesty.Fitness.prior,
+            prior_transform=DynestyPriorTransform(model=model),
             ndim=model.prior_count,
             logl_args=[model, fitness_function],
-            ptform_args=[model],
+            rstate=np.random,
+            queue_size=self.queue_size,
+            pool=self.dynesty_pool_from(pool=pool),
             nlive=self.n_live_points,
             bound=self.bound,
             sample=self.sample,
@@ -752,6 +886,8 @@ class DynestyDynamic(AbstractDynesty):
         acceptance_ratio_threshold=None,
         iterations_per_update=None,
         number_of_cores=None,
+        queue_size=None,
+        chunk_size=None,
     ):
         """
         A Dynesty non-linear search, using a dynamically changing number of live points.
@@ -859,6 +995,12 @@ class DynestyDynamic(AbstractDynesty):
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
+        queue_size : int
+            The number of points Dynesty proposes at once, whose prior transforms are computed in one vectorized call
+            and whose likelihoods are evaluated in parallel. If not positive, this is the number of cores.
+        chunk_size : int
+            The number of likelihood evaluations sent to each process of the pool at once. If not positive, the
+            default chunk size of the pool's `map` method is used.
         """
 
         n_live_points = (
@@ -901,19 +1043,23 @@ class DynestyDynamic(AbstractDynesty):
             acceptance_ratio_threshold=acceptance_ratio_threshold,
             iterations_per_update=iterations_per_update,
             number_of_cores=number_of_cores,
+            queue_size=queue_size,
+            chunk_size=chunk_size,
         )
 
         logger.debug("Creating DynestyDynamic NLO")
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         """Get the dynamic Dynesty sampler which performs the non-linear search, passing it all associated input Dynesty
         variables."""
         return DynamicNestedSampler(
             loglikelihood=fitness_function,
-            prior_transform=AbstractDynesty.Fitness.prior,
+            prior_transform=DynestyPriorTransform(model=model),
             ndim=model.prior_count,
             logl_args=[model, fitness_function],
-            ptform_args=[model],
+            rstate=np.random,
+            queue_size=self.queue_size,
+            pool=self.dynesty_pool_from(pool=pool),
             bound=self.bound,
             sample=self.sample,
             update_interval=self.update_interval,
@@ -928,80 +1074,14 @@ class DynestyDynamic(AbstractDynesty):
             max_move=self.max_move,
         )
 
-    def perform_update(self, model, analysis, during_analysis):
-        """Perform an update of the `NonLinearSearch` results, which occurs every *iterations_per_update* of the
-        non-linear search. The update performs the following tasks:
-
-        1) Visualize the maximum log likelihood model.
-        2) Output the model results to the model.reults file.
-
-        These task are performed every n updates, set by the relevent *task_every_update* variable, for example
-        *visualize_every_update*.
-
-        Parameters
-        ----------
-        model : ModelMapper
-            The model which generates instances for different points in parameter space.
-        analysis : Analysis
-            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
-            the log likelihood the `NonLinearSearch` maximizes.
-        during_analysis : bool
-            If the update is during a non-linear search, in which case tasks are only performed after a certain number
-             of updates and only a subset of visualization may be performed.
-        """
-        pass
-
-    def fit(self, model, analysis: "Analysis", info=None) -> "Result":
-        """ Fit a model, M with some function f that takes instances of the
-        class represented by model M and gives a score for their fitness.
-
-        A model which represents possible instances with some dimensionality is fit.
-
-        The analysis provides two functions. One visualises an instance of a model and the
-        other scores an instance based on how well it fits some data. The search
-        produces instances of the model by picking points in an N dimensional space.
-
-        Parameters
-        ----------
-        analysis : af.Analysis
-            An object that encapsulates the data and a log likelihood function.
-        model : ModelMapper
-            An object that represents possible instances of some model with a
-            given dimensionality which is the number of free dimensions of the
-            model.
-        info : dict
-            Optional dictionary containing information about the fit that can be loaded by the aggregator.
-
-        Returns
-        -------
-        An object encapsulating how well the model fit the data, the best fit instance
-        and an updated model with free parameters updated to represent beliefs
-        produced by this fit.
-        """
-
-        self.paths.restore()
-        self.setup_log_file()
-
-        self.save_model_info(model=model)
-        self.save_parameter_names_file(model=model)
-        self.save_metadata()
-        self.save_info(info=info)
-        self.save_search()
-        self.save_model(model=model)
-        # TODO : Better way to handle?
-        self.timer.paths = self.paths
-        self.timer.start()
-
-        samples = self._fit(model=model, analysis=analysis)
-        open(self.paths.has_completed_path, "w+").close()
-
-        return Result(samples=samples, previous_model=model, search=self)
-
-    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None) -> NestSamples:
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
         """
         Fit a model using Dynesty and the Analysis class which contains the data and returns the log likelihood from
         instances of the model, which the `NonLinearSearch` seeks to maximize.
 
+        The dynamic sampler is held in memory by the search (it is not checkpointed), so the samples of every update
+        are created from it and a terminated search begins again when it is resumed.
+
         Parameters
         ----------
         model : ModelMapper
@@ -1009,37 +1089,24 @@ class DynestyDynamic(AbstractDynesty):
         analysis : Analysis
             Contains the data and the log likelihood function which fits an instance of the model to the data, returning
             the log likelihood the `NonLinearSearch` maximizes.
-
-        Returns
-        -------
-        A result object comprising the Samples object that includes the maximum log likelihood instance and full
-        set of accepted ssamples of the fit.
         """
 
         pool, pool_ids = self.make_pool()
 
         fitness_function = self.fitness_function_from_model_and_analysis(
-            model=model, analysis=analysis, pool_ids=pool_ids
+            model=model, analysis=analysis, pool_ids=pool_ids, log_likelihood_cap=log_likelihood_cap,
         )
 
         sampler = self.sampler_fom_model_and_fitness(
-            model=model, fitness_function=fitness_function
+            model=model, fitness_function=fitness_function, pool=pool
         )
 
+        self._sampler = sampler
+
         logger.info(
             "No DynestyDynamic samples found, beginning new non-linear search. "
         )
 
-        # These hacks are necessary to be able to pickle the sampler.
-
-        sampler.rstate = np.random
-        sampler.pool = pool
-
-        if self.number_of_cores == 1:
-            sampler.M = map
-        else:
-            sampler.M = pool.map
-
         finished = False
 
         while not finished:
@@ -1065,6 +1132,8 @@ class DynestyDynamic(AbstractDynesty):
                     print_progress=not self.silence,
                 )
 
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
             iterations_after_run = np.sum(sampler.results.ncall)
 
             if (
@@ -1073,48 +1142,25 @@ class DynestyDynamic(AbstractDynesty):
             ):
                 finished = True
 
-        during_analysis = False
-
-        self.timer.update()
-
-        samples = self.samples_via_sampler_from_model(model=model, sampler=sampler)
-        samples.write_table(filename=self.paths.samples_file)
-        self.save_samples(samples=samples)
-
-        instance = samples.max_log_likelihood_instance
+    def __getstate__(self):
+        """The dynamic sampler is held in memory, so it is not pickled alongside the search."""
+        state = super().__getstate__()
+        state.pop("_sampler", None)
+        return state
 
-        if self.should_visualize() or not during_analysis:
-            analysis.visualize(instance=instance, during_analysis=during_analysis)
-
-        if self.should_output_model_results() or not during_analysis:
-
-            samples_text.results_to_file(
-                samples=samples,
-                filename=self.paths.file_results,
-                during_analysis=during_analysis,
-            )
-
-            samples_text.search_summary_to_file(
-                samples=samples, filename=self.paths.file_search_summary
-            )
-
-        self.paths.zip_remove()
-
-        return samples
-
-    def samples_via_sampler_from_model(self, model, sampler):
-        """Create a `Samples` object from this non-linear search's output files on the hard-disk and model.
+    def samples_via_sampler_from_model(self, model):
+        """Create a `Samples` object from this non-linear search's dynamic sampler and model.
 
-        For Dynesty, all information that we need is available from the instance of the dynesty sampler.
+        For Dynesty, all information that we need is available from the instance of the dynesty sampler, which
+        `_fit` holds in memory.
 
         Parameters
         ----------
         model
             The model which generates instances for different points in parameter space. This maps the points from unit
             cube values to physical values via the priors.
-        paths : af.Paths
-            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
         """
+        sampler = self._sampler
 
         parameters = sampler.results.samples.tolist()
         log_priors = [
@@ -1135,6 +1181,7 @@ class DynestyDynamic(AbstractDynesty):
         return NestSamples(
             model=model,
             samples=Sample.from_lists(
+                parameters=parameters,
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
                 weights=weights,
@@ -1145,3 +1192,336 @@ class DynestyDynamic(AbstractDynesty):
             number_live_points=self.n_live_points,
             time=self.timer.time,
         )
+
+
+class DynestyPriorTransform:
+
+    def __init__(self, model: AbstractPriorModel):
+        """
+        The prior transform of a Dynesty sampler, which maps points in the unit hypercube to physical parameters via
+        the priors of a model.
+
+        Dynesty transforms one point at a time, whereas a `DynestyPool` transforms every point of a queue at once
+        using `batch`.
+
+        Parameters
+        ----------
+        model
+            The model whose priors map unit values to physical values.
+        """
+        self.model = model
+
+    def __call__(self, cube: np.ndarray) -> np.ndarray:
+        return self.batch(cubes=np.asarray(cube)[None])[0]
+
+    def batch(self, cubes: np.ndarray) -> np.ndarray:
+        """Transform many unit hypercube points, of shape (number_of_points, prior_count), to physical parameters."""
+        return self.model.vectors_from_unit_vectors(unit_vectors=cubes)
+
+
+class DynestyPool:
+
+    def __init__(self, pool=None, size: int = 1, chunk_size: int = None):
+        """
+        The pool a Dynesty sampler maps its prior transforms, likelihoods and point proposals with.
+
+        When Dynesty samples uniformly within its bounds it maps `sample_unif` over a queue of `size` proposed
+        points, with every process transforming and evaluating one point at a time. These points are instead
+        transformed together by their `DynestyPriorTransform` and only their likelihoods are mapped over the
+        processes, in chunks of `chunk_size`. Every other function is mapped over the processes as normal.
+
+        Dynesty does not pickle its pool, so the pool of a sampler loaded from a checkpoint is set via `attach`.
+
+        Parameters
+        ----------
+        pool : multiprocessing.Pool
+            The pool likelihoods are evaluated on, or `None` to evaluate them in serial.
+        size
+            The number of points Dynesty proposes at once (its `queue_size`).
+        chunk_size
+            The number of evaluations sent to each process at once, where `None` uses the pool's default.
+        """
+        self.pool = pool
+        self.size = size
+        self.chunk_size = chunk_size
+
+    def map(self, function, iterable) -> list:
+        """Map a function over an iterable on the pool, batching the prior transforms of the points Dynesty
+        samples uniformly and the initial live points it draws."""
+        args = list(iterable)
+
+        if len(args) == 0:
+            return []
+
+        if isinstance(getattr(function, "func", None), DynestyPriorTransform):
+            return list(function.func.batch(cubes=np.asarray(args)))
+
+        if function is sample_unif and isinstance(getattr(args[0][4], "func", None), DynestyPriorTransform):
+            return self._sample_unif(args=args)
+
+        return self._map(function, args)
+
+    def _map(self, function, args: list) -> list:
+        if self.pool is None:
+            return list(map(function, args))
+        return self.pool.map(function, args, chunksize=self.chunk_size)
+
+    def _sample_unif(self, args: list) -> list:
+        """Perform Dynesty's `sample_unif` for a queue of points, transforming them in one call."""
+        cubes = np.asarray([arg[0] for arg in args])
+        prior_transform, log_likelihood = args[0][4], args[0][5]
+
+        parameters = prior_transform.func.batch(cubes=cubes)
+        log_likelihoods = self._map(log_likelihood, list(parameters))
+
+        return [
+            (cube, vector, log_likelihood, 1, None)
+            for cube, vector, log_likelihood in zip(cubes, parameters, log_likelihoods)
+        ]
+
+    def attach(self, sampler):
+        """Give a sampler loaded from a checkpoint this pool, its queue size and a random state."""
+        sampler.pool = self
+        sampler.M = self.map
+        sampler.queue_size = self.size
+
+        if sampler.rstate is None:
+            sampler.rstate = np.random
+
+
+class DynestySnapshot:
+
+    bound_keys = ("unitcube", "ell", "mell", "radfriends", "supfriends", "scale")
+
+    def __init__(self, sampler):
+        """
+        A copy of the bounding distribution of a Dynesty sampler and its proposal scale, to which the sampler is
+        rolled back if it raises an error.
+
+        Dynesty updates its bound in place, so an error raised part way through an update (e.g. when bootstrapping
+        the ellipsoids) can leave the sampler with a bound that is not enlarged and no longer encloses its live
+        points. Its samples and live points are only updated after a new point has been accepted, so they are
+        consistent and do not need to be copied.
+
+        Parameters
+        ----------
+        sampler : dynesty.sampler.Sampler
+            The sampler whose bound is copied.
+        """
+        self.state = {
+            key: copy.deepcopy(getattr(sampler, key))
+            for key in self.bound_keys
+            if hasattr(sampler, key)
+        }
+
+    def restore(self, sampler):
+        """Roll the bound of a sampler back to the snapshot, discarding any queued proposals if the error left the
+        queue incomplete."""
+        for key, value in self.state.items():
+            setattr(sampler, key, copy.deepcopy(value))
+
+        if sampler.nqueue != len(sampler.queue):
+            sampler.queue = []
+            sampler.nqueue = 0
+
+
+class SamplerMethod:
+
+    def __init__(self, name: str):
+        """The name of a method of a Dynesty sampler, which is stored in a `DynestyCheckpoint` in its place."""
+        self.name = name
+
+
+class DynestyCheckpoint:
+
+    def __init__(self, samples_path: str):
+        """
+        The checkpoint of a Dynesty sampler, from which a terminated search is resumed and its samples are created.
+
+        The dead points and bounding distributions of a sampler grow throughout a search, so rather than pickling the
+        entire sampler every update they are appended to `dynesty_dead_points.pickle` and `dynesty_bounds.pickle`,
+        where each update appends only the dead points and bounds added since the previous update. The rest of the
+        sampler (its live points, current bound, iteration counters, etc.) is pickled to `dynesty_state.pickle`,
+        which is replaced once the dead points and bounds are appended and records how much of those files belong
+        to the checkpoint.
+
+        After every `run_nested` call Dynesty adds its live points to the end of its saved samples, and removes them
+        again when sampling resumes. These points are therefore stored with the state rather than the dead points.
+
+        Parameters
+        ----------
+        samples_path
+            The folder the checkpoint is output to.
+        """
+        self.samples_path = samples_path
+
+        self.sampler = None
+
+        self.total_dead_points = 0
+        self.total_bounds = 0
+        self.dead_points_size = 0
+        self.bounds_size = 0
+
+    @property
+    def dead_points_file(self) -> str:
+        return path.join(self.samples_path, "dynesty_dead_points.pickle")
+
+    @property
+    def bounds_file(self) -> str:
+        return path.join(self.samples_path, "dynesty_bounds.pickle")
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.samples_path, "dynesty_state.pickle")
+
+    @property
+    def exists(self) -> bool:
+        return path.exists(self.state_file)
+
+    @staticmethod
+    def saved_keys(state: dict) -> list:
+        """The attributes of a sampler which store its samples (e.g. `saved_u`, `saved_logl`)."""
+        return [key for key in state if key.startswith("saved_")]
+
+    def save(self, sampler):
+        """
+        Save a sampler, appending the dead points and bounds added since the checkpoint was last saved or loaded.
+
+        Parameters
+        ----------
+        sampler : dynesty.sampler.Sampler
+            The sampler, whose dead points and bounds must extend those previously saved to the checkpoint.
+        """
+        os.makedirs(self.samples_path, exist_ok=True)
+
+        state = {
+            key: self._detach(value=value, sampler=sampler)
+            for key, value in sampler.__dict__.items()
+            if key not in ("loglikelihood", "rstate", "pool", "M")
+        }
+
+        total_dead_points = len(sampler.saved_id)
+
+        if sampler.added_live:
+            total_dead_points -= sampler.nlive
+
+        dead_points = {}
+
+        for key in self.saved_keys(state=state):
+            dead_points[key] = np.asarray(state[key][self.total_dead_points:total_dead_points])
+            state[key] = state[key][total_dead_points:]
+
+        bounds = sampler.bound[self.total_bounds:]
+        state["bound"] = []
+
+        self.dead_points_size = self._append(
+            filename=self.dead_points_file, obj=dead_points, size=self.dead_points_size
+        )
+        self.bounds_size = self._append(
+            filename=self.bounds_file, obj=bounds, size=self.bounds_size
+        )
+
+        self.total_dead_points = total_dead_points
+        self.total_bounds = len(sampler.bound)
+
+        state["checkpoint"] = {
+            "total_dead_points": self.total_dead_points,
+            "total_bounds": self.total_bounds,
+            "dead_points_size": self.dead_points_size,
+            "bounds_size": self.bounds_size,
+        }
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                pickle.dump((type(sampler), state), f)
+
+        self.sampler = sampler
+
+    @staticmethod
+    def _detach(value, sampler):
+        """Replace methods of the sampler (e.g. its `propose_point` method) with their names, as pickling a method
+        pickles the entire sampler it is bound to."""
+        if inspect.ismethod(value) and value.__self__ is sampler:
+            return SamplerMethod(name=value.__name__)
+        if isinstance(value, dict):
+            return {key: DynestyCheckpoint._detach(value=item, sampler=sampler) for key, item in value.items()}
+        return value
+
+    @staticmethod
+    def _attach(value, sampler):
+        """Bind the methods replaced by `_detach` to the loaded sampler."""
+        if isinstance(value, SamplerMethod):
+            return getattr(sampler, value.name)
+        if isinstance(value, dict):
+            return {key: DynestyCheckpoint._attach(value=item, sampler=sampler) for key, item in value.items()}
+        return value
+
+    @staticmethod
+    def _append(filename: str, obj, size: int) -> int:
+        """Append a pickled object to a file, overwriting anything after its first `size` bytes (which were not
+        recorded by a saved state), and return the file's new size."""
+        with open(filename, "r+b" if size > 0 else "wb") as f:
+            f.seek(size)
+            f.truncate()
+            pickle.dump(obj, f)
+            return f.tell()
+
+    @staticmethod
+    def _load(filename: str, size: int) -> list:
+        """Load every object appended to a file within its first `size` bytes."""
+        objs = []
+
+        with open(filename, "rb") as f:
+            while f.tell() < size:
+                objs.append(pickle.load(f))
+
+        return objs
+
+    def load(self):
+        """
+        Load the sampler from the checkpoint.
+
+        The sampler does not have a log likelihood function or random state, which must be set before it is used to
+        sample, and samples in serial unless it is given a pool (e.g. via `DynestyPool.attach`).
+        """
+        with open(self.state_file, "rb") as f:
+            cls, state = pickle.load(f)
+
+        checkpoint = state.pop("checkpoint")
+
+        self.total_dead_points = checkpoint["total_dead_points"]
+        self.total_bounds = checkpoint["total_bounds"]
+        self.dead_points_size = checkpoint["dead_points_size"]
+        self.bounds_size = checkpoint["bounds_size"]
+
+        saved = {key: [] for key in self.saved_keys(state=state)}
+
+        for dead_points in self._load(filename=self.dead_points_file, size=self.dead_points_size):
+            for key in saved:
+                saved[key] += list(dead_points[key])
+
+        for key in saved:
+            state[key] = saved[key] + state[key]
+
+        for bounds in self._load(filename=self.bounds_file, size=self.bounds_size):
+            state["bound"] += bounds
+
+        sampler = cls.__new__(cls)
+        sampler.__dict__.update(state)
+
+        sampler.loglikelihood = None
+        sampler.rstate = None
+        sampler.pool = None
+        sampler.M = map
+
+        for key, value in state.items():
+            setattr(sampler, key, self._attach(value=value, sampler=sampler))
+
+        self.sampler = sampler
+
+        return sampler
+
+    def remove(self):
+        for filename in (self.dead_points_file, self.bounds_file, self.state_file):
+            if path.exists(filename):
+                os.remove(filename)
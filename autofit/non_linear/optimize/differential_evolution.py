@@ -0,0 +1,385 @@
+import os
+from os import path
+from typing import Dict
+
+import numpy as np
+
+from autofit import exc
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear.log import logger
+from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import OptimizerSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
+
+
+class DifferentialEvolution(AbstractOptimizer):
+
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            population_size=None,
+            generations=None,
+            mutation=None,
+            recombination=None,
+            tol=None,
+            initializer=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        A Differential Evolution global non-linear search, which is implemented natively in PyAutoFit.
+
+        A population of points is evolved in the unit hypercube of the priors. Every generation, a trial point is
+        created for every member of the population by adding the scaled difference of two other randomly chosen
+        members to a third (with scale `mutation`) and mixing the result with the member's own values (each value is
+        taken from the mixture with probability `recombination`). A trial point replaces the member if its log
+        posterior is at least as high. This is the 'rand/1/bin' strategy of Storn & Price (1997).
+
+        Every trial point of a generation is independent of the others, so each generation is evaluated as one batch,
+        on the search's pool of processes if `number_of_cores` is above 1.
+
+        Extensions:
+
+        - The initial population is drawn by the search's `Initializer`, so the 'prior' and 'ball' initialization
+          methods are supported.
+
+        - Runs can be terminated and resumed exactly where they stopped, from a compact checkpoint of the current
+          population and the state of numpy's random number generator, which replaces the previous checkpoint every
+          `iterations_per_update` generations.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        population_size : int
+            The number of points in the population, which must be at least 4.
+        generations : int
+            The maximum number of generations the population is evolved for.
+        mutation : float
+            The scale of the difference of two members which is added to a third to create a trial point.
+        recombination : float
+            The probability that each value of a trial point is taken from the mutated point rather than the member.
+        tol : float
+            The search has converged once the standard deviation of the log posteriors of the population is below this
+            value. If -inf, every generation is performed.
+        initializer : non_linear.initializer.Initializer
+            Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        number_of_cores : int
+            The number of cores the generations are evaluated on using a Python multiprocessing Pool instance. If 1, a
+            pool instance is not created and the job runs in serial.
+        """
+
+        self.population_size = (
+            self._config("search", "population_size")
+            if population_size is None
+            else population_size
+        )
+        self.generations = (
+            self._config("search", "generations")
+            if generations is None
+            else generations
+        )
+        self.mutation = (
+            self._config("search", "mutation")
+            if mutation is None
+            else mutation
+        )
+        self.recombination = (
+            self._config("search", "recombination")
+            if recombination is None
+            else recombination
+        )
+        self.tol = self._config("search", "tol") if tol is None else tol
+
+        if self.population_size < 4:
+            raise ValueError(
+                "The population of DifferentialEvolution must have at least 4 members"
+            )
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=initializer,
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating DifferentialEvolution NLO")
+
+    class Fitness(AbstractOptimizer.Fitness):
+        def __call__(self, parameters):
+            try:
+                return self.figure_of_merit_from_parameters(parameters=parameters)
+            except exc.FitException:
+                return self.resample_figure_of_merit
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space.
+            *DifferentialEvolution* uses the log posterior."""
+            return self.log_posterior_from_parameters(parameters=parameters)
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using Differential Evolution and the Analysis class which contains the data and returns the log
+        likelihood from instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+
+        Returns
+        -------
+        A result object comprising the Samples object that inclues the maximum log likelihood instance and full
+        chains used by the fit.
+        """
+        pool, pool_ids = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis, pool_ids=pool_ids
+        )
+
+        figures_of_merit_map = map if pool is None else pool.map
+
+        if path.exists(self.state_file):
+
+            state = self.state
+            unit_population = state["unit_population"]
+            population = state["population"]
+            log_posteriors = state["log_posteriors"]
+            total_generations = int(state["total_generations"])
+
+            self.restore_random_state()
+
+            logger.info("Existing DifferentialEvolution samples found, resuming non-linear search.")
+
+        else:
+
+            initial_unit_parameters, initial_parameters, initial_log_posteriors = self.initializer.initial_samples_from_model(
+                total_points=self.population_size,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            unit_population = np.asarray(initial_unit_parameters, dtype=float)
+            population = np.asarray(initial_parameters, dtype=float)
+            log_posteriors = np.asarray(initial_log_posteriors, dtype=float)
+            total_generations = 0
+
+            logger.info("No DifferentialEvolution samples found, beginning new non-linear search. ")
+
+        converged = False
+
+        while total_generations < self.generations and not converged:
+
+            generations = min(self.iterations_per_update, self.generations - total_generations)
+
+            for _ in range(generations):
+
+                trial_unit_population = self.trial_population(unit_population=unit_population)
+                trial_population = model.vectors_from_unit_vectors(unit_vectors=trial_unit_population)
+
+                trial_log_posteriors = np.asarray(
+                    list(figures_of_merit_map(fitness_function, trial_population.tolist())),
+                    dtype=float,
+                )
+
+                improved = trial_log_posteriors >= log_posteriors
+
+                unit_population[improved] = trial_unit_population[improved]
+                population[improved] = trial_population[improved]
+                log_posteriors[improved] = trial_log_posteriors[improved]
+
+                total_generations += 1
+
+                converged = self.converged(log_posteriors=log_posteriors)
+
+                if converged:
+                    break
+
+            self.save_state(
+                unit_population=unit_population,
+                population=population,
+                log_posteriors=log_posteriors,
+                total_generations=total_generations,
+            )
+
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+            figures_of_merit_map = map if pool is None else pool.map
+
+        logger.info("DifferentialEvolution complete")
+
+    def trial_population(self, unit_population: np.ndarray) -> np.ndarray:
+        """
+        Create a trial point for every member of a population in the unit hypercube, using the 'rand/1/bin' strategy.
+
+        The three members combined for each trial point are distinct from one another and from the member. Values of
+        a trial point outside the unit hypercube are replaced by values drawn uniformly from it.
+        """
+        population_size, dimensions = unit_population.shape
+
+        # Random permutations of the other members of the population, which exclude each member by sorting it last
+        others = np.argsort(
+            np.random.random((population_size, population_size)) + np.eye(population_size), axis=1
+        )[:, :3]
+
+        mutants = unit_population[others[:, 0]] + self.mutation * (
+                unit_population[others[:, 1]] - unit_population[others[:, 2]]
+        )
+
+        crossover = np.random.random((population_size, dimensions)) < self.recombination
+        crossover[np.arange(population_size), np.random.randint(dimensions, size=population_size)] = True
+
+        trial_population = np.where(crossover, mutants, unit_population)
+
+        outside = (trial_population < 0.0) | (trial_population > 1.0)
+        trial_population[outside] = np.random.random(np.count_nonzero(outside))
+
+        return trial_population
+
+    def converged(self, log_posteriors: np.ndarray) -> bool:
+        """Whether the spread of the log posteriors of the population is below the tolerance of the search."""
+        if not np.all(np.isfinite(log_posteriors)):
+            return False
+        return bool(np.std(log_posteriors) < self.tol)
+
+    @property
+    def tag(self):
+        """Tag the output folder of the Differential Evolution non-linear search, according to the size of the
+        population and the parameters defining the search strategy."""
+
+        name_tag = self._config("tag", "name")
+        population_size_tag = f"{self._config('tag', 'population_size')}_{self.population_size}"
+        mutation_tag = f"{self._config('tag', 'mutation')}_{self.mutation}"
+        recombination_tag = f"{self._config('tag', 'recombination')}_{self.recombination}"
+
+        return f"{name_tag}[{population_size_tag}_{mutation_tag}_{recombination_tag}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the Differential Evolution `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.population_size = self.population_size
+        copy.generations = self.generations
+        copy.mutation = self.mutation
+        copy.recombination = self.recombination
+        copy.tol = self.tol
+        copy.initializer = self.initializer
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+
+        return DifferentialEvolution.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            pool_ids=pool_ids,
+        )
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.paths.samples_path, "population.npz")
+
+    @property
+    def state(self) -> Dict[str, np.ndarray]:
+        """The state of the population when it was last output."""
+        with np.load(self.state_file) as f:
+            return {key: f[key] for key in f.files}
+
+    def save_state(
+            self,
+            unit_population: np.ndarray,
+            population: np.ndarray,
+            log_posteriors: np.ndarray,
+            total_generations: int,
+    ):
+        """
+        Output the population, its log posteriors and the state of numpy's random number generator, replacing the
+        previous state, so a resumed search performs the same generations as a search which was not terminated.
+        """
+        os.makedirs(self.paths.samples_path, exist_ok=True)
+
+        random_state = np.random.get_state()
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                np.savez(
+                    f,
+                    unit_population=unit_population,
+                    population=population,
+                    log_posteriors=log_posteriors,
+                    total_generations=total_generations,
+                    random_state_keys=random_state[1],
+                    random_state_values=np.asarray(random_state[2:], dtype=np.float64),
+                )
+
+    def restore_random_state(self):
+        """Set the state of numpy's random number generator to its state when the population was last output."""
+        state = self.state
+
+        position, has_gauss, cached_gaussian = state["random_state_values"]
+
+        np.random.set_state(
+            ("MT19937", state["random_state_keys"], int(position), int(has_gauss), cached_gaussian)
+        )
+
+    def remove_state_files(self):
+        os.remove(self.state_file)
+
+    def samples_via_sampler_from_model(self, model):
+        """Create an *OptimizerSamples* object from this non-linear search's output files on the hard-disk and model.
+
+        For Differential Evolution, the samples are the members of the population when it was last output.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        state = self.state
+
+        parameters = state["population"].tolist()
+        log_priors = [
+            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
+        ]
+        log_posteriors = state["log_posteriors"].tolist()
+        log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
+        weights = len(log_likelihoods) * [1.0]
+
+        return OptimizerSamples(
+            model=model,
+            samples=Sample.from_lists(
+                parameters=parameters,
+                log_likelihoods=log_likelihoods,
+                log_priors=log_priors,
+                weights=weights,
+                model=model
+            ),
+            time=self.timer.time
+        )
@@ -0,0 +1,534 @@
+import json
+import os
+from os import path
+from typing import Dict, List
+
+import numpy as np
+from scipy.optimize import minimize
+
+from autofit import exc
+from autofit.mapper.model_mapper import ModelMapper
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear import samples as samp
+from autofit.non_linear.log import logger
+from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import OptimizerSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
+
+# The value scipy minimizes at a point whose log posterior is not finite (e.g. because it raised a FitException), as an
+# infinite value stalls its optimizers at the point
+PENALTY_FIGURE_OF_MERIT = 1.0e99
+
+# The distance from the edges of the unit hypercube within which local optimizations are bounded, as priors (e.g. a
+# GaussianPrior) may map a unit value of exactly 0 or 1 to an infinite physical value
+UNIT_EPSILON = 1.0e-8
+
+
+class MultiStart(AbstractOptimizer):
+
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            number_of_starts=None,
+            method=None,
+            maxiter=None,
+            tol=None,
+            duplicate_tolerance=None,
+            initializer=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        A multi-start local optimizer, which runs a scipy local optimization from many starting points and is
+        implemented natively in PyAutoFit.
+
+        For well-behaved problems with several basins, many cheap local optimizations from different starting points
+        can find the global maximum (and every other local maximum) for a fraction of the cost of a global sampler.
+
+        The starting points are drawn by the search's `Initializer`. Every local optimization maximizes the log
+        posterior in the unit hypercube of the priors (bounded to it) with `scipy.optimize.minimize`, so any bounded
+        scipy method (e.g. 'L-BFGS-B', 'Powell', 'Nelder-Mead', 'TNC') can be used.
+
+        Every `iterations_per_update` starts are run as one batch, whose local optimizations are run concurrently on
+        the search's pool of processes if `number_of_cores` is above 1.
+
+        The samples of the search are every point evaluated by every local optimization (its trajectory). The
+        maxima the local optimizations converge to are de-duplicated, giving the distinct solutions of the search,
+        which are available via the `solutions` of its samples. Local optimizations which scipy reports as
+        unsuccessful (e.g. because they reached `maxiter`) are not solutions, but their trajectories are samples.
+
+        Extensions:
+
+        - Runs can be terminated and resumed, with the search tracking which starts have finished so that only the
+          unfinished starts are run when it is resumed.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        number_of_starts : int
+            The number of starting points a local optimization is run from.
+        method : str
+            The scipy local optimization method (see `scipy.optimize.minimize`), which must support bounds.
+        maxiter : int
+            The maximum number of iterations of every local optimization.
+        tol : float
+            The tolerance of every local optimization, which scipy uses to determine when it has converged.
+        duplicate_tolerance : float
+            Two solutions are the same solution if none of their unit hypercube values differ by more than this value,
+            in which case only the solution with the highest log posterior is kept.
+        initializer : non_linear.initializer.Initializer
+            Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        number_of_cores : int
+            The number of cores the local optimizations are run on using a Python multiprocessing Pool instance. If 1,
+            a pool instance is not created and the job runs in serial.
+        """
+
+        self.number_of_starts = (
+            self._config("search", "number_of_starts")
+            if number_of_starts is None
+            else number_of_starts
+        )
+        self.method = self._config("search", "method") if method is None else method
+        self.maxiter = self._config("search", "maxiter") if maxiter is None else maxiter
+        self.tol = self._config("search", "tol") if tol is None else tol
+        self.duplicate_tolerance = (
+            self._config("search", "duplicate_tolerance")
+            if duplicate_tolerance is None
+            else duplicate_tolerance
+        )
+
+        if self.number_of_starts < 1:
+            raise ValueError("MultiStart must have at least 1 start")
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=initializer,
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating MultiStart NLO")
+
+    class Fitness(AbstractOptimizer.Fitness):
+        def __call__(self, parameters):
+            try:
+                return self.figure_of_merit_from_parameters(parameters=parameters)
+            except exc.FitException:
+                return self.resample_figure_of_merit
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space. *MultiStart*
+            uses the log posterior."""
+            return self.log_posterior_from_parameters(parameters=parameters)
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using multi-start local optimization and the Analysis class which contains the data and returns
+        the log likelihood from instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+
+        Returns
+        -------
+        A result object comprising the Samples object that inclues the maximum log likelihood instance and full
+        chains used by the fit.
+        """
+        pool, pool_ids = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis, pool_ids=pool_ids
+        )
+
+        local_optimization = LocalOptimization(
+            fitness_function=fitness_function,
+            model=model,
+            method=self.method,
+            maxiter=self.maxiter,
+            tol=self.tol,
+        )
+
+        if path.exists(self.state_file):
+
+            state = self.state
+
+            logger.info(
+                f"Existing MultiStart samples found, resuming non-linear search with "
+                f"{np.count_nonzero(~state['finished'])} of {len(state['finished'])} starts unfinished."
+            )
+
+        else:
+
+            initial_unit_parameters, initial_parameters, initial_log_posteriors = self.initializer.initial_samples_from_model(
+                total_points=self.number_of_starts,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            state = self.initial_state_from(
+                unit_starts=np.asarray(initial_unit_parameters, dtype=float)
+            )
+
+            logger.info("No MultiStart samples found, beginning new non-linear search. ")
+
+        while not np.all(state["finished"]):
+
+            indexes = np.flatnonzero(~state["finished"])[:self.iterations_per_update]
+            unit_starts = list(state["unit_starts"][indexes])
+
+            if pool is None:
+                results = list(map(local_optimization, unit_starts))
+            else:
+                results = pool.map(local_optimization, unit_starts, chunksize=1)
+
+            for index, result in zip(indexes, results):
+
+                state["finished"][index] = True
+                state["unit_solutions"][index] = result["unit_solution"]
+                state["solution_log_posteriors"][index] = result["solution_log_posterior"]
+                state["solution_successes"][index] = result["success"]
+
+                state["trajectory_starts"] = np.append(
+                    state["trajectory_starts"], np.full(len(result["log_posteriors"]), index)
+                )
+                state["trajectories"] = np.concatenate(
+                    (state["trajectories"], result["parameters"])
+                )
+                state["trajectory_log_posteriors"] = np.append(
+                    state["trajectory_log_posteriors"], result["log_posteriors"]
+                )
+
+            self.save_state(state=state)
+
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+
+        unsuccessful_starts = np.count_nonzero(~state["solution_successes"])
+
+        if unsuccessful_starts > 0:
+            logger.info(
+                f"{unsuccessful_starts} of {len(state['finished'])} MultiStart local optimizations were unsuccessful "
+                f"and are not solutions."
+            )
+
+        logger.info("MultiStart complete")
+
+    def initial_state_from(self, unit_starts: np.ndarray) -> Dict[str, np.ndarray]:
+        """The state of a search none of whose starts, at the input unit hypercube points, have finished."""
+        number_of_starts, dimensions = unit_starts.shape
+
+        return {
+            "unit_starts": unit_starts,
+            "finished": np.zeros(number_of_starts, dtype=bool),
+            "unit_solutions": np.full((number_of_starts, dimensions), np.nan),
+            "solution_log_posteriors": np.full(number_of_starts, -np.inf),
+            "solution_successes": np.zeros(number_of_starts, dtype=bool),
+            "trajectory_starts": np.zeros(0, dtype=int),
+            "trajectories": np.zeros((0, dimensions)),
+            "trajectory_log_posteriors": np.zeros(0),
+        }
+
+    def unique_solution_indexes(
+            self,
+            unit_solutions: np.ndarray,
+            solution_log_posteriors: np.ndarray,
+            solution_successes: np.ndarray = None,
+    ) -> List[int]:
+        """
+        The indexes of the distinct solutions of the local optimizations, ordered from the highest log posterior to
+        the lowest.
+
+        A solution is a duplicate of a solution with a higher log posterior if none of their unit hypercube values
+        differ by more than `duplicate_tolerance`. Solutions whose log posterior is not finite, or whose local
+        optimization was unsuccessful, are discarded before duplicates are removed, so they never replace a converged
+        solution.
+        """
+        if solution_successes is None:
+            solution_successes = np.ones(len(solution_log_posteriors), dtype=bool)
+
+        unique_indexes = []
+
+        for index in np.argsort(-solution_log_posteriors, kind="stable"):
+
+            if not np.isfinite(solution_log_posteriors[index]) or not solution_successes[index]:
+                continue
+
+            if all(
+                    np.max(np.abs(unit_solutions[index] - unit_solutions[unique_index])) > self.duplicate_tolerance
+                    for unique_index in unique_indexes
+            ):
+                unique_indexes.append(int(index))
+
+        return unique_indexes
+
+    @property
+    def tag(self):
+        """Tag the output folder of the MultiStart non-linear search, according to the number of starts and the local
+        optimization method."""
+
+        name_tag = self._config("tag", "name")
+        number_of_starts_tag = f"{self._config('tag', 'number_of_starts')}_{self.number_of_starts}"
+
+        return f"{name_tag}[{number_of_starts_tag}_{self.method}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the MultiStart `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.number_of_starts = self.number_of_starts
+        copy.method = self.method
+        copy.maxiter = self.maxiter
+        copy.tol = self.tol
+        copy.duplicate_tolerance = self.duplicate_tolerance
+        copy.initializer = self.initializer
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+
+        return MultiStart.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            pool_ids=pool_ids,
+        )
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.paths.samples_path, "multi_start.npz")
+
+    @property
+    def state(self) -> Dict[str, np.ndarray]:
+        """The starts, which of them have finished, their solutions and trajectories when they were last output."""
+        with np.load(self.state_file) as f:
+            return {key: f[key] for key in f.files}
+
+    def save_state(self, state: Dict[str, np.ndarray]):
+        """
+        Output the starts, which of them have finished and the solutions and trajectories of the finished starts,
+        replacing the previous state, so a resumed search only runs the unfinished starts.
+        """
+        os.makedirs(self.paths.samples_path, exist_ok=True)
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                np.savez(f, **state)
+
+    def remove_state_files(self):
+        os.remove(self.state_file)
+
+    def samples_via_sampler_from_model(self, model):
+        """Create a `MultiStartSamples` object from this non-linear search's output files on the hard-disk and model.
+
+        The samples are every point with a finite log posterior evaluated by the local optimizations which have
+        finished.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        state = self.state
+
+        finite = np.isfinite(state["trajectory_log_posteriors"])
+
+        parameters = state["trajectories"][finite].tolist()
+        log_priors = [
+            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
+        ]
+        log_posteriors = state["trajectory_log_posteriors"][finite].tolist()
+        log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
+        weights = len(log_likelihoods) * [1.0]
+
+        unique_indexes = self.unique_solution_indexes(
+            unit_solutions=state["unit_solutions"],
+            solution_log_posteriors=state["solution_log_posteriors"],
+            solution_successes=state["solution_successes"],
+        )
+
+        solutions = [
+            model.vector_from_unit_vector(unit_vector=state["unit_solutions"][index].tolist())
+            for index in unique_indexes
+        ]
+
+        return MultiStartSamples(
+            model=model,
+            samples=Sample.from_lists(
+                parameters=parameters,
+                log_likelihoods=log_likelihoods,
+                log_priors=log_priors,
+                weights=weights,
+                model=model
+            ),
+            solutions=[list(map(float, solution)) for solution in solutions],
+            solution_log_posteriors=state["solution_log_posteriors"][unique_indexes].tolist(),
+            total_starts=len(state["finished"]),
+            time=self.timer.time
+        )
+
+    def samples_via_csv_json_from_model(self, model):
+
+        samples = samp.load_from_table(filename=self.paths.samples_file)
+
+        with open(self.paths.info_file) as infile:
+            samples_info = json.load(infile)
+
+        return MultiStartSamples(
+            model=model,
+            samples=samples,
+            solutions=samples_info["solutions"],
+            solution_log_posteriors=samples_info["solution_log_posteriors"],
+            total_starts=samples_info["total_starts"],
+            time=samples_info["time"],
+        )
+
+
+class LocalOptimization:
+
+    def __init__(self, fitness_function, model: AbstractPriorModel, method: str, maxiter: int, tol: float):
+        """
+        Runs a scipy local optimization of the log posterior from a starting point in the unit hypercube, which is
+        passed to the pool of a `MultiStart` search so that every start is run on a process of the pool.
+
+        Parameters
+        ----------
+        fitness_function
+            The `Fitness` of the search, which returns the log posterior of a physical vector.
+        model
+            The model mapping unit hypercube vectors to physical vectors.
+        method
+            The scipy local optimization method.
+        maxiter
+            The maximum number of iterations of the local optimization.
+        tol
+            The tolerance of the local optimization.
+        """
+        self.fitness_function = fitness_function
+        self.model = model
+        self.method = method
+        self.maxiter = maxiter
+        self.tol = tol
+
+    def __call__(self, unit_start: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Run a local optimization from a starting point in the unit hypercube, returning its solution (in the unit
+        hypercube), the log posterior of the solution, whether scipy reports the optimization as successful and the
+        physical vector and log posterior of every point it evaluated.
+
+        The optimization is bounded to within `UNIT_EPSILON` of the edges of the unit hypercube, and scipy minimizes
+        `PENALTY_FIGURE_OF_MERIT` at points whose log posterior is not finite. A solution at such a point has a log
+        posterior of -inf and is unsuccessful.
+        """
+        parameters = []
+        log_posteriors = []
+
+        def figure_of_merit(unit_vector):
+
+            vector = self.model.vector_from_unit_vector(
+                unit_vector=np.clip(unit_vector, UNIT_EPSILON, 1.0 - UNIT_EPSILON).tolist()
+            )
+            log_posterior = self.fitness_function(vector)
+
+            parameters.append(vector)
+            log_posteriors.append(log_posterior)
+
+            if not np.isfinite(log_posterior):
+                return PENALTY_FIGURE_OF_MERIT
+
+            return -log_posterior
+
+        result = minimize(
+            figure_of_merit,
+            x0=np.clip(unit_start, UNIT_EPSILON, 1.0 - UNIT_EPSILON),
+            method=self.method,
+            bounds=[(UNIT_EPSILON, 1.0 - UNIT_EPSILON)] * len(unit_start),
+            tol=self.tol,
+            options={"maxiter": self.maxiter},
+        )
+
+        failed = not float(result.fun) < PENALTY_FIGURE_OF_MERIT
+
+        return {
+            "unit_solution": np.clip(result.x, UNIT_EPSILON, 1.0 - UNIT_EPSILON),
+            "solution_log_posterior": -np.inf if failed else -float(result.fun),
+            "success": bool(result.success) and not failed,
+            "parameters": np.reshape(np.asarray(parameters, dtype=float), (len(parameters), len(unit_start))),
+            "log_posteriors": np.asarray(log_posteriors, dtype=float),
+        }
+
+
+class MultiStartSamples(OptimizerSamples):
+
+    def __init__(
+            self,
+            model: ModelMapper,
+            samples: List[Sample],
+            solutions: List[List[float]],
+            solution_log_posteriors: List[float],
+            total_starts: int,
+            time: float = None,
+    ):
+        """
+        The samples of a `MultiStart` search, which are every point evaluated by its local optimizations.
+
+        Parameters
+        ----------
+        model : af.ModelMapper
+            Maps input vectors of unit parameter values to physical values and model instances via priors.
+        solutions : [[float]]
+            The parameters of the distinct solutions the local optimizations converged to, ordered from the highest
+            log posterior to the lowest.
+        solution_log_posteriors : [float]
+            The log posterior of every distinct solution.
+        total_starts : int
+            The number of starts of the search.
+        """
+        super().__init__(model=model, samples=samples, time=time)
+
+        self.solutions = solutions
+        self.solution_log_posteriors = solution_log_posteriors
+        self.total_starts = total_starts
+
+    @property
+    def solution_instances(self) -> list:
+        """The model instance of every distinct solution, ordered from the highest log posterior to the lowest."""
+        return [self.model.instance_from_vector(vector=vector) for vector in self.solutions]
+
+    def info_to_json(self, filename):
+        info = {
+            "solutions": self.solutions,
+            "solution_log_posteriors": self.solution_log_posteriors,
+            "total_starts": self.total_starts,
+            "time": self.time,
+        }
+
+        with open(filename, 'w') as outfile:
+            json.dump(info, outfile)
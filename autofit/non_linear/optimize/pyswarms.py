@@ -1,14 +1,22 @@
 import os
-import pickle
+from collections import deque
+from os import path
+from typing import Dict, List, Optional
 
 import numpy as np
 
 from autofit import exc
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear.convergence import (
+    convergence_states_from,
+    load_convergence_states,
+    update_convergence,
+)
 from autofit.non_linear.log import logger
 from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
 from autofit.non_linear.paths import convert_paths
 from autofit.non_linear.samples import OptimizerSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
 
 
 class AbstractPySwarms(AbstractOptimizer):
@@ -24,6 +32,8 @@ class AbstractPySwarms(AbstractOptimizer):
             ftol=None,
             initializer=None,
             iterations_per_update=None,
+            history_size=None,
+            convergence_monitors=None,
             number_of_cores=None,
     ):
         """
@@ -57,7 +67,8 @@ class AbstractPySwarms(AbstractOptimizer):
 
         Allows runs to be terminated and resumed from the point it was terminated. This is achieved by outputting
         the necessary results (e.g. the points of the particles) during the model-fit after an input number of
-        iterations.
+        iterations. The positions and velocities of the particles and their personal and global bests are all
+        output, so a resumed run continues exactly where the terminated run stopped (see `PySwarmsCheckpoint`).
 
         Different options for particle intialization, with the default 'prior' method starting all particles over
         the priors defined by each parameter.
@@ -89,6 +100,12 @@ class AbstractPySwarms(AbstractOptimizer):
             Relative error in objective_func(best_pos) acceptable for convergence.
         initializer : non_linear.initializer.Initializer
             Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        history_size : int or None
+            The number of most recent iterations whose particle positions are held in memory and used to create the
+            samples. If None, every iteration is used.
+        convergence_monitors : [non_linear.convergence.AbstractConvergence]
+            Monitors (e.g. `SwarmDiameter`, `BestStagnation`) evaluated every update, which terminate the search once
+            every monitor has converged (see autofit.non_linear.convergence).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
@@ -114,6 +131,16 @@ class AbstractPySwarms(AbstractOptimizer):
         )
         self.ftol = self._config("search", "ftol") if ftol is None else ftol
 
+        self.history_size = (
+            self._config("updates", "history_size")
+            if history_size is None
+            else history_size
+        )
+
+        self.convergence_monitors = (
+            [] if convergence_monitors is None else list(convergence_monitors)
+        )
+
         super().__init__(
             paths=paths,
             prior_passer=prior_passer,
@@ -179,10 +206,14 @@ class AbstractPySwarms(AbstractOptimizer):
             model=model, analysis=analysis, pool_ids=pool_ids
         )
 
-        if os.path.exists("{}/{}.pickle".format(self.paths.samples_path, "points")):
+        self._checkpoint = None
+        checkpoint = self.checkpoint
 
-            init_pos = self.load_points[-1]
-            total_iterations = self.load_total_iterations
+        if checkpoint.exists:
+
+            state = checkpoint.state
+            init_pos = state["position"]
+            total_iterations = checkpoint.total_iterations
 
             logger.info("Existing PySwarms samples found, resuming non-linear search.")
 
@@ -192,6 +223,7 @@ class AbstractPySwarms(AbstractOptimizer):
                 total_points=self.n_particles,
                 model=model,
                 fitness_function=fitness_function,
+                pool=pool,
             )
 
             init_pos = np.zeros(shape=(self.n_particles, model.prior_count))
@@ -200,6 +232,7 @@ class AbstractPySwarms(AbstractOptimizer):
 
                 init_pos[index, :] = np.asarray(parameters)
 
+            state = None
             total_iterations = 0
 
             logger.info("No PySwarms samples found, beginning new non-linear search. ")
@@ -213,17 +246,44 @@ class AbstractPySwarms(AbstractOptimizer):
 
         bounds = (np.asarray(lower_bounds), np.asarray(upper_bounds))
 
+        pso = self.sampler_fom_model_and_fitness(
+            model=model,
+            fitness_function=fitness_function,
+            bounds=bounds,
+            init_pos=init_pos,
+        )
+
+        if state is None:
+            pso.swarm.pbest_cost = np.full(self.n_particles, np.inf)
+        else:
+            pso.swarm.velocity = state["velocity"]
+            pso.swarm.pbest_pos = state["pbest_pos"]
+            pso.swarm.pbest_cost = state["pbest_cost"]
+            pso.swarm.best_pos = state["best_pos"]
+            pso.swarm.best_cost = state["best_cost"]
+
+            checkpoint.restore_random_state()
+
+        pso.bh.memory = pso.swarm.position
+        pso.vh.memory = pso.swarm.position
+
+        for monitor in self.convergence_monitors:
+            monitor.reset()
+
+        if state is not None and len(self.convergence_monitors) > 0:
+            if not load_convergence_states(
+                convergence_monitors=self.convergence_monitors,
+                states=state["convergence_states"].tobytes() if "convergence_states" in state else b"",
+            ):
+                logger.info(
+                    "The checkpoint has no state for the convergence monitors, which are updated with only the "
+                    "iterations performed after resuming."
+                )
+
         logger.info("Running PySwarmsGlobal Optimizer...")
 
         while total_iterations < self.iters:
 
-            pso = self.sampler_fom_model_and_fitness(
-                model=model,
-                fitness_function=fitness_function,
-                bounds=bounds,
-                init_pos=init_pos,
-            )
-
             iterations_remaining = self.iters - total_iterations
 
             if self.iterations_per_update > iterations_remaining:
@@ -231,30 +291,36 @@ class AbstractPySwarms(AbstractOptimizer):
             else:
                 iterations = self.iterations_per_update
 
-            if iterations > 0:
-
-                pso.optimize(objective_func=fitness_function.__call__, iters=iterations)
+            points, best_positions, log_posteriors, converged = self.iterate(
+                pso=pso, fitness_function=fitness_function, iterations=iterations
+            )
 
-                total_iterations += iterations
+            total_iterations += len(points)
 
-                with open(
-                        f"{self.paths.samples_path}/total_iterations.pickle", "wb"
-                ) as f:
-                    pickle.dump(total_iterations, f)
+            monitors_converged = update_convergence(
+                convergence_monitors=self.convergence_monitors,
+                points=points,
+                log_posteriors=log_posteriors,
+            )
 
-                with open(f"{self.paths.samples_path}/points.pickle", "wb") as f:
-                    pickle.dump(pso.pos_history, f)
+            checkpoint.append(
+                swarm=pso.swarm,
+                points=points,
+                best_positions=best_positions,
+                log_posteriors=log_posteriors,
+                convergence_states=convergence_states_from(convergence_monitors=self.convergence_monitors),
+            )
 
-                with open(
-                        f"{self.paths.samples_path}/log_posteriors.pickle", "wb"
-                ) as f:
-                    pickle.dump([-0.5 * cost for cost in pso.cost_history], f)
+            self.perform_update(
+                model=model, analysis=analysis, during_analysis=True
+            )
 
-                self.perform_update(
-                    model=model, analysis=analysis, during_analysis=True
-                )
+            if monitors_converged:
+                logger.info("PySwarms convergence monitors converged, terminating non-linear search.")
+                break
 
-                init_pos = self.load_points[-1]
+            if converged:
+                break
 
         logger.info("PySwarmsGlobal complete")
 
@@ -283,10 +349,12 @@ class AbstractPySwarms(AbstractOptimizer):
         copy.iters = self.iters
         copy.cognitive = self.cognitive
         copy.social = self.social
-        copy.intertia = self.inertia
+        copy.inertia = self.inertia
         copy.ftol = self.ftol
         copy.initializer = self.initializer
         copy.iterations_per_update = self.iterations_per_update
+        copy.history_size = self.history_size
+        copy.convergence_monitors = self.convergence_monitors
         copy.number_of_cores = self.number_of_cores
 
         return copy
@@ -305,10 +373,83 @@ class AbstractPySwarms(AbstractOptimizer):
     def sampler_fom_model_and_fitness(self, model, fitness_function):
         raise NotImplementedError()
 
+    def iterate(self, pso, fitness_function, iterations: int):
+        """
+        Perform iterations of a PySwarms optimizer, updating the positions, velocities and personal and global bests
+        of its swarm in place.
+
+        This performs the same steps as the PySwarms `optimize` method, which cannot be used to resume a search as it
+        resets the personal bests of the swarm every time it is called and stores the history of every iteration in
+        memory.
+
+        Returns the positions of the particles at every iteration, the position and log posterior of the global best
+        solution at every iteration and whether the search converged (according to `ftol`), in which case fewer
+        iterations may have been performed.
+        """
+        from pyswarms.backend.operators import compute_pbest
+
+        swarm = pso.swarm
+
+        points = []
+        best_positions = []
+        log_posteriors = []
+
+        for _ in range(iterations):
+
+            swarm.current_cost = fitness_function(swarm.position)
+            swarm.pbest_pos, swarm.pbest_cost = compute_pbest(swarm)
+
+            best_cost_yet_found = np.min(swarm.best_cost)
+
+            swarm.best_pos, swarm.best_cost = pso.top.compute_gbest(swarm, **pso.options)
+
+            points.append(np.array(swarm.position))
+            best_positions.append(np.array(swarm.best_pos))
+            log_posteriors.append(-0.5 * np.min(swarm.best_cost))
+
+            relative_measure = self.ftol * (1 + np.abs(best_cost_yet_found))
+
+            if np.abs(np.min(swarm.best_cost) - best_cost_yet_found) < relative_measure:
+                return points, best_positions, log_posteriors, True
+
+            swarm.velocity = pso.top.compute_velocity(
+                swarm, pso.velocity_clamp, pso.vh, pso.bounds
+            )
+            swarm.position = pso.top.compute_position(swarm, pso.bounds, pso.bh)
+
+        return points, best_positions, log_posteriors, False
+
+    @property
+    def checkpoint(self) -> "PySwarmsCheckpoint":
+        """The `PySwarmsCheckpoint` of this search's samples folder, which is loaded from the hard-disk the first time
+        it is used and then updated in memory as the search runs."""
+        checkpoint = getattr(self, "_checkpoint", None)
+
+        if checkpoint is None or checkpoint.samples_path != self.paths.samples_path:
+
+            checkpoint = PySwarmsCheckpoint(
+                samples_path=self.paths.samples_path,
+                history_size=self.history_size,
+            )
+
+            if checkpoint.exists:
+                checkpoint.load()
+
+            self._checkpoint = checkpoint
+
+        return checkpoint
+
+    def __getstate__(self):
+        """The checkpoint holds the particle history in memory, so it is not pickled alongside the search."""
+        state = super().__getstate__()
+        state.pop("_checkpoint", None)
+        return state
+
     def samples_via_sampler_from_model(self, model):
         """Create an *OptimizerSamples* object from this non-linear search's output files on the hard-disk and model.
 
-        For PySwarms, all quantities are extracted via pickled states of the particle and cost histories.
+        For PySwarms, the samples are the position and log posterior of the global best solution at every iteration,
+        which are held by the search's `PySwarmsCheckpoint`.
 
         Parameters
         ----------
@@ -316,21 +457,20 @@ class AbstractPySwarms(AbstractOptimizer):
             The model which generates instances for different points in parameter space. This maps the points from unit
             cube values to physical values via the priors.
         """
+        checkpoint = self.checkpoint
 
-        parameters = [
-            param.tolist() for parameters in self.load_points for param in parameters
-        ]
+        parameters = [best_position.tolist() for best_position in checkpoint.best_positions]
         log_priors = [
             sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
         ]
-        log_posteriors = self.load_log_posteriors
+        log_posteriors = list(checkpoint.log_posteriors)
         log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
         weights = len(log_likelihoods) * [1.0]
 
         return OptimizerSamples(
             model=model,
             samples=Sample.from_lists(
-                parameters=[parameters.tolist()[0] for parameters in self.load_points],
+                parameters=parameters,
                 log_likelihoods=log_likelihoods,
                 log_priors=log_priors,
                 weights=weights,
@@ -339,25 +479,6 @@ class AbstractPySwarms(AbstractOptimizer):
             time=self.timer.time
         )
 
-    @property
-    def load_total_iterations(self):
-        with open(
-                "{}/{}.pickle".format(self.paths.samples_path, "total_iterations"), "rb"
-        ) as f:
-            return pickle.load(f)
-
-    @property
-    def load_points(self):
-        with open("{}/{}.pickle".format(self.paths.samples_path, "points"), "rb") as f:
-            return pickle.load(f)
-
-    @property
-    def load_log_posteriors(self):
-        with open(
-                "{}/{}.pickle".format(self.paths.samples_path, "log_posteriors"), "rb"
-        ) as f:
-            return pickle.load(f)
-
 
 class PySwarmsGlobal(AbstractPySwarms):
 
@@ -374,6 +495,8 @@ class PySwarmsGlobal(AbstractPySwarms):
             ftol=None,
             initializer=None,
             iterations_per_update=None,
+            history_size=None,
+            convergence_monitors=None,
             remove_state_files_at_end=None,
             number_of_cores=None,
     ):
@@ -435,6 +558,12 @@ class PySwarmsGlobal(AbstractPySwarms):
             Relative error in objective_func(best_pos) acceptable for convergence.
         initializer : non_linear.initializer.Initializer
             Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        history_size : int or None
+            The number of most recent iterations whose particle positions are held in memory and used to create the
+            samples. If None, every iteration is used.
+        convergence_monitors : [non_linear.convergence.AbstractConvergence]
+            Monitors (e.g. `SwarmDiameter`, `BestStagnation`) evaluated every update, which terminate the search once
+            every monitor has converged (see autofit.non_linear.convergence).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
@@ -455,6 +584,8 @@ class PySwarmsGlobal(AbstractPySwarms):
             ftol=ftol,
             initializer=initializer,
             iterations_per_update=iterations_per_update,
+            history_size=history_size,
+            convergence_monitors=convergence_monitors,
             number_of_cores=number_of_cores,
         )
 
@@ -493,6 +624,8 @@ class PySwarmsLocal(AbstractPySwarms):
             ftol=None,
             initializer=None,
             iterations_per_update=None,
+            history_size=None,
+            convergence_monitors=None,
             remove_state_files_at_end=None,
             number_of_cores=None,
     ):
@@ -563,6 +696,12 @@ class PySwarmsLocal(AbstractPySwarms):
             Relative error in objective_func(best_pos) acceptable for convergence.
         initializer : non_linear.initializer.Initializer
             Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        history_size : int or None
+            The number of most recent iterations whose particle positions are held in memory and used to create the
+            samples. If None, every iteration is used.
+        convergence_monitors : [non_linear.convergence.AbstractConvergence]
+            Monitors (e.g. `SwarmDiameter`, `BestStagnation`) evaluated every update, which terminate the search once
+            every monitor has converged (see autofit.non_linear.convergence).
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
             pool instance is not created and the job runs in serial.
@@ -595,6 +734,8 @@ class PySwarmsLocal(AbstractPySwarms):
             ftol=ftol,
             initializer=initializer,
             iterations_per_update=iterations_per_update,
+            history_size=history_size,
+            convergence_monitors=convergence_monitors,
             number_of_cores=number_of_cores,
         )
 
@@ -620,3 +761,190 @@ class PySwarmsLocal(AbstractPySwarms):
             ftol=self.ftol,
             init_pos=init_pos,
         )
+
+
+class PySwarmsCheckpoint:
+
+    def __init__(self, samples_path: str, history_size: Optional[int] = None):
+        """
+        The checkpoint of a PySwarms search, from which a terminated search is resumed and its samples are created.
+
+        The positions of the particles and the position and log posterior of the global best solution at every
+        iteration are appended to raw binary files (`points.dat`, `best_positions.dat` and `log_posteriors.dat`), so
+        outputting an update only writes the iterations performed since the previous update. The current state of the
+        swarm (its positions, velocities and personal and global bests) is written to `swarm.npz`, which is replaced
+        once the history is appended. Resuming a search therefore only reads the swarm state, and continues exactly
+        where the terminated search stopped. The state of numpy's random number generator (which PySwarms uses to
+        update the velocities) is also output, so a resumed search performs the same iterations as a search which was
+        not terminated. The state of the search's
+        convergence monitors is output alongside the swarm, so they are restored without replaying the history.
+
+        The history of the most recent `history_size` iterations is also held in memory, so that samples can be
+        created during an update without reading the history from the hard-disk.
+
+        Parameters
+        ----------
+        samples_path
+            The folder the checkpoint is output to.
+        history_size
+            The number of most recent iterations held in memory. If None, every iteration is held.
+        """
+        self.samples_path = samples_path
+        self.history_size = history_size
+
+        self.total_iterations = 0
+        self.points = deque(maxlen=history_size)
+        self.best_positions = deque(maxlen=history_size)
+        self.log_posteriors = deque(maxlen=history_size)
+
+    @property
+    def points_file(self) -> str:
+        return path.join(self.samples_path, "points.dat")
+
+    @property
+    def best_positions_file(self) -> str:
+        return path.join(self.samples_path, "best_positions.dat")
+
+    @property
+    def log_posteriors_file(self) -> str:
+        return path.join(self.samples_path, "log_posteriors.dat")
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.samples_path, "swarm.npz")
+
+    @property
+    def exists(self) -> bool:
+        return path.exists(self.state_file)
+
+    @property
+    def state(self) -> Dict[str, np.ndarray]:
+        """The state of the swarm when the checkpoint was last output."""
+        with np.load(self.state_file) as f:
+            return {key: f[key] for key in f.files}
+
+    def load(self):
+        """
+        Load the checkpoint from the hard-disk, reading the history of the most recent `history_size` iterations.
+
+        Iterations appended to the history after the swarm state was last output (e.g. if the search was terminated
+        whilst outputting an update) are removed, so that the history matches the swarm state.
+        """
+        state = self.state
+
+        self.total_iterations = int(state["total_iterations"])
+
+        for filename, size in (
+                (self.points_file, state["position"].size),
+                (self.best_positions_file, state["best_pos"].size),
+                (self.log_posteriors_file, 1),
+        ):
+            with open(filename, "r+b") as f:
+                f.truncate(self.total_iterations * size * np.dtype(np.float64).itemsize)
+
+        history_size = self.total_iterations
+
+        if self.history_size is not None:
+            history_size = min(history_size, self.history_size)
+
+        self.points = deque(
+            self._read_history(
+                filename=self.points_file, shape=state["position"].shape, history_size=history_size
+            ),
+            maxlen=self.history_size,
+        )
+        self.best_positions = deque(
+            self._read_history(
+                filename=self.best_positions_file, shape=state["best_pos"].shape, history_size=history_size
+            ),
+            maxlen=self.history_size,
+        )
+        self.log_posteriors = deque(
+            self._read_history(
+                filename=self.log_posteriors_file, shape=(), history_size=history_size
+            ).tolist(),
+            maxlen=self.history_size,
+        )
+
+    def _read_history(self, filename: str, shape, history_size: int) -> np.ndarray:
+        """Read the last `history_size` iterations of a history file, without reading earlier iterations."""
+        if history_size == 0:
+            return np.zeros(shape=(0,) + tuple(shape))
+
+        history = np.memmap(
+            filename, dtype=np.float64, mode="r", shape=(self.total_iterations,) + tuple(shape)
+        )
+
+        return np.array(history[self.total_iterations - history_size:])
+
+    def append(
+            self,
+            swarm,
+            points: List[np.ndarray],
+            best_positions: List[np.ndarray],
+            log_posteriors: List[float],
+            convergence_states: bytes = b"",
+    ):
+        """
+        Append iterations of a search to the checkpoint and output the current state of its swarm. The first
+        iterations appended to a new checkpoint overwrite any history left by a search which did not output a state.
+
+        Parameters
+        ----------
+        swarm : pyswarms.backend.swarms.Swarm
+            The swarm of the search, whose state after the iterations is output.
+        points
+            The positions of the particles at every iteration.
+        best_positions
+            The position of the global best solution at every iteration.
+        log_posteriors
+            The log posterior of the global best solution at every iteration.
+        convergence_states
+            The pickled state of the convergence monitors of the search after the iterations (see
+            `convergence_states_from`).
+        """
+        os.makedirs(self.samples_path, exist_ok=True)
+
+        mode = "ab" if self.total_iterations > 0 else "wb"
+
+        with open(self.points_file, mode) as f:
+            np.asarray(points, dtype=np.float64).tofile(f)
+
+        with open(self.best_positions_file, mode) as f:
+            np.asarray(best_positions, dtype=np.float64).tofile(f)
+
+        with open(self.log_posteriors_file, mode) as f:
+            np.asarray(log_posteriors, dtype=np.float64).tofile(f)
+
+        self.total_iterations += len(points)
+        self.points.extend(points)
+        self.best_positions.extend(best_positions)
+        self.log_posteriors.extend(log_posteriors)
+
+        random_state = np.random.get_state()
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                np.savez(
+                    f,
+                    position=swarm.position,
+                    velocity=swarm.velocity,
+                    pbest_pos=swarm.pbest_pos,
+                    pbest_cost=swarm.pbest_cost,
+                    best_pos=swarm.best_pos,
+                    best_cost=swarm.best_cost,
+                    total_iterations=self.total_iterations,
+                    convergence_states=np.frombuffer(convergence_states, dtype=np.uint8),
+                    random_state_keys=random_state[1],
+                    random_state_values=np.asarray(random_state[2:], dtype=np.float64),
+                )
+
+    def restore_random_state(self):
+        """Set the state of numpy's random number generator to its state when the checkpoint was last output."""
+        state = self.state
+
+        position, has_gauss, cached_gaussian = state["random_state_values"]
+
+        np.random.set_state(
+            ("MT19937", state["random_state_keys"], int(position), int(has_gauss), cached_gaussian)
+        )
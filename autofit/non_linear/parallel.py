@@ -1,9 +1,17 @@
 import multiprocessing
+import os
+import random
+import time
+import traceback
 from abc import ABC, abstractmethod
+from collections import deque
 from itertools import count
-from time import sleep
-from typing import Iterable
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, Generator, Iterable, Optional, Tuple
 
+import numpy as np
+
+from autofit import exc
 from autofit.non_linear.log import logger
 
 
@@ -27,6 +35,18 @@ class AbstractJob(ABC):
     """
     _number = count()
 
+    # The number of cores a `CoreBudget` allocates the job, which it may use for its own pool of processes
+    number_of_cores = None
+
+    # The slot of the `CoreBudget` holding the number of cores the job is allowed whilst it is performed
+    core_slot = None
+
+    # The number of times the job has been retried by a `JobScheduler` after failing
+    attempt = 0
+
+    # The number of seconds a `DirectoryJobQueue` lets the job be performed for before it fails, if it has a limit
+    timeout = None
+
     def __init__(self):
         self.number = next(self._number)
 
@@ -37,91 +57,593 @@ class AbstractJob(ABC):
         """
 
 
-class Process(multiprocessing.Process):
-    def __init__(self, name: str, job_queue: multiprocessing.Queue):
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def limit_blas_threads(number_of_threads: int):
+    """
+    Limit the number of threads BLAS libraries use in this process and any process it starts.
+
+    The environment variables read by BLAS libraries when they are loaded are set, which limits processes started
+    afterwards. If threadpoolctl is installed the libraries already loaded by this process are limited too.
+    """
+    for variable in BLAS_THREAD_VARIABLES:
+        os.environ[variable] = str(number_of_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+
+    threadpool_limits(limits=number_of_threads)
+
+
+# The shared allowances of a `CoreBudget` and the slot of the job being performed by this process, if it has one
+_core_allowance = None
+
+
+def set_core_allowance(allowances, slot: Optional[int]):
+    """Set the slot of the `CoreBudget` allowances holding the cores of the job being performed by this process."""
+    global _core_allowance
+
+    if allowances is None or slot is None:
+        _core_allowance = None
+    else:
+        _core_allowance = (allowances, slot)
+
+
+def allowed_cores(number_of_cores: int) -> int:
+    """
+    The number of cores the job being performed by this process is allowed to use, which is never below
+    `number_of_cores`.
+
+    A job allocated cores by a `CoreBudget` may be allowed more cores whilst it is performed, once the budget hands it
+    the cores freed by completed jobs. If this process is not performing a job with a core budget, `number_of_cores`
+    is returned.
+    """
+    if _core_allowance is None:
+        return number_of_cores
+
+    allowances, slot = _core_allowance
+
+    return max(number_of_cores, allowances[slot])
+
+
+class CoreBudget:
+    def __init__(self, total_cores: int):
+        """
+        A fixed number of cores shared between the jobs of a `JobScheduler` and the pools of processes each job
+        creates (e.g. the pool of a `NonLinearSearch` whose `number_of_cores` is above 1), so that nested pools never
+        use more cores than the total.
+
+        Each job is allocated cores when it is submitted and they are released when its result is returned. The free
+        cores are split evenly between the jobs which can start at once: whilst jobs outnumber the free cores each job
+        is allocated one core, but towards the end of the jobs the cores freed by completed jobs are allocated to the
+        jobs which remain.
+
+        Once no jobs remain to be submitted, the cores freed by completed jobs are handed to the jobs still being
+        performed (see `rebalance`). The number of cores every job is allowed is held in shared memory, in the slot
+        of the job, which a search performed by the job reads via `allowed_cores` after every update to grow its pool.
+
+        Parameters
+        ----------
+        total_cores
+            The number of cores shared by every job
         """
-        A parallel process that consumes Jobs through the job queue and outputs results through its own queue.
+        self.total_cores = total_cores
+        self.allocated: Dict[int, int] = {}
+        self.slots: Dict[int, int] = {}
+        self.allowances = multiprocessing.Array("i", total_cores)
+
+    @property
+    def free_cores(self) -> int:
+        return self.total_cores - sum(self.allocated.values())
+
+    def allocate(self, index: int, startable_jobs: int) -> int:
+        """
+        Allocate cores to a job.
+
+        Parameters
+        ----------
+        index
+            The index of the job, used to release its cores
+        startable_jobs
+            The number of jobs (including this one) which could start now, which the free cores are split between
+        """
+        free_slots = [slot for slot in range(self.total_cores) if slot not in self.slots.values()]
+
+        if len(free_slots) == 0:
+            raise AssertionError("Every core of the budget is allocated")
+
+        cores = max(1, self.free_cores // max(1, startable_jobs))
+
+        self.allocated[index] = cores
+        self.slots[index] = free_slots[0]
+        self.allowances[free_slots[0]] = cores
+
+        return cores
+
+    def release(self, index: int):
+        self.allocated.pop(index, None)
+
+        slot = self.slots.pop(index, None)
+
+        if slot is not None:
+            self.allowances[slot] = 0
+
+    def rebalance(self):
+        """
+        Split the free cores evenly between the jobs being performed, which is called once no jobs remain to be
+        submitted so that the cores freed by completed jobs are used by the jobs still running.
+        """
+        indexes = sorted(self.allocated)
+        free_cores = self.free_cores
+
+        if len(indexes) == 0 or free_cores < 1:
+            return
+
+        for position, index in enumerate(indexes):
+            self.allocated[index] += free_cores // len(indexes) + (position < free_cores % len(indexes))
+            self.allowances[self.slots[index]] = self.allocated[index]
+
+
+class JobFailure:
+    def __init__(self, job_number: int, message: str):
+        """
+        Sent by a `Worker` in place of a result when performing a job raises an exception, or created by a
+        `JobScheduler` when a job exceeds its time limit or its worker dies. The exception itself is not sent, as it
+        may not be picklable.
+
+        If a `JobScheduler` does not raise on failures, the failure is returned in place of the job's result with
+        `job` set to the job which failed.
+
+        Parameters
+        ----------
+        job_number
+            The number of the job which failed.
+        message
+            The formatted traceback of the exception, or a description of the failure.
+        """
+        self.job_number = job_number
+        self.message = message
+        self.job = None
+
+    @property
+    def number(self):
+        return self.job_number
+
+
+def seed_for_attempt(job: AbstractJob):
+    """
+    Seed the random number generators for a job which is being retried, so that the retry does not repeat the random
+    draws of the attempt which failed.
+    """
+    if job.attempt > 0:
+        seed = (job.number * 1000003 + job.attempt) % 2 ** 32
+        random.seed(seed)
+        np.random.seed(seed)
+
+
+def perform(job: AbstractJob):
+    """Perform a job, returning a `JobFailure` in place of its result if it raises an exception."""
+    try:
+        seed_for_attempt(job)
+        return job.perform()
+    except Exception:
+        message = traceback.format_exc()
+        logger.error(message)
+        return JobFailure(job_number=job.number, message=message)
+
+
+class Worker(multiprocessing.Process):
+    def __init__(
+            self,
+            name: str,
+            connection: Connection,
+            initializer: Optional[Callable] = None,
+            initargs: Tuple = (),
+            blas_threads: Optional[int] = None,
+            core_allowances=None,
+    ):
+        """
+        A parallel process that performs the jobs sent to it through its end of a pipe and sends their results back
+        through the same pipe.
+
+        The worker sends `None` once it has started, then blocks until a job is sent and stops when it receives `None`,
+        so it uses no CPU whilst waiting. Every worker has its own pipe and is sent one job at a time, so the scheduler
+        knows which job each worker is performing without the worker reporting it, and stopping one worker (e.g. when
+        its job exceeds the time limit) cannot corrupt a queue shared with the other workers.
 
         Parameters
         ----------
-        name: str
+        name
             The name of the process
-        job_queue: multiprocessing.Queue
-            The queue through which jobs are submitted
+        connection
+            The worker's end of the pipe through which (index, job) pairs are received and (index, result) pairs are
+            sent
+        initializer
+            A function called with `initargs` when the process starts, before it performs any jobs
+        blas_threads
+            If not None, the number of threads BLAS libraries are limited to in this process
+        core_allowances
+            The shared allowances of the `CoreBudget` jobs are allocated cores from, if there is one, which the job
+            being performed reads via `allowed_cores`
         """
         super().__init__(name=name)
-        logger.info("created process {}".format(name))
 
-        self.job_queue = job_queue
-        self.queue = multiprocessing.Queue()
-        self.count = 0
-        self.max_count = 250
+        self.connection = connection
+        self.initializer = initializer
+        self.initargs = initargs
+        self.blas_threads = blas_threads
+        self.core_allowances = core_allowances
 
     def run(self):
-        """
-        Run this process, completing each job in the job_queue and
-        passing the result to the queue.
-        """
         logger.info("starting process {}".format(self.name))
+
+        if self.blas_threads is not None:
+            limit_blas_threads(self.blas_threads)
+
+        if self.initializer is not None:
+            self.initializer(*self.initargs)
+
+        self.connection.send(None)
+
         while True:
-            sleep(0.025)
-            if self.count >= self.max_count:
+
+            item = self.connection.recv()
+
+            if item is None:
                 break
-            if self.job_queue.empty():
-                self.count += 1
-            else:
-                self.count = 0
-                job = self.job_queue.get()
-                self.queue.put(job.perform())
+
+            index, job = item
+
+            set_core_allowance(self.core_allowances, job.core_slot)
+
+            result = perform(job)
+
+            set_core_allowance(None, None)
+
+            try:
+                self.connection.send((index, result))
+            except Exception:
+                message = traceback.format_exc()
+                logger.error(message)
+                self.connection.send((index, JobFailure(job_number=index, message=message)))
+
         logger.info("terminating process {}".format(self.name))
-        self.job_queue.close()
 
-    @classmethod
-    def run_jobs(
-            cls,
-            jobs: Iterable[AbstractJob],
-            number_of_cores: int
+
+class JobScheduler:
+    def __init__(
+            self,
+            number_of_cores: int,
+            ordered: bool = False,
+            max_pending_jobs: Optional[int] = None,
+            initializer: Optional[Callable] = None,
+            initargs: Tuple = (),
+            core_budget: Optional[CoreBudget] = None,
+            blas_threads: Optional[int] = None,
+            timeout: Optional[float] = None,
+            retries: int = 0,
+            raise_on_failure: bool = True,
     ):
         """
-        Run the collection of jobs across n - 1 other cores.
+        Performs `AbstractJob`s in parallel on a pool of `Worker` processes, one per core, and streams their results
+        back as they complete.
+
+        Jobs are taken from the input iterable lazily: at most `max_pending_jobs` jobs are submitted but not yet
+        returned at any time, so a generator of jobs is not exhausted (and its jobs are not all held in memory) before
+        the first results are returned.
+
+        A job fails if it raises an exception, takes longer than `timeout` seconds or its worker dies (e.g. because of
+        a segmentation fault in a native library). A worker which is stopped or dies is replaced by a new worker. A
+        failed job is retried up to `retries` times, with its random number generators seeded differently for every
+        attempt. A job which fails every attempt raises a `JobException`, or if `raise_on_failure` is False its
+        `JobFailure` is returned in place of its result, so one bad job does not stop the others.
+
+        If `number_of_cores` is 1 jobs are performed one after another in this process, unless a `timeout` is set, in
+        which case they are performed by a single worker process so that a job which hangs can be stopped.
 
         Parameters
         ----------
-        jobs
-            Serializable concrete children of the AbstractJob class
         number_of_cores
-            The number of cores this computer has. Must be at least 2.
+            The number of worker processes jobs are performed on.
+        ordered
+            If True, results are returned in the order their jobs were submitted, otherwise in the order they complete.
+        max_pending_jobs
+            The maximum number of jobs which are submitted but whose results are not yet returned. Defaults to twice
+            the number of cores, so that a worker is never idle waiting for a job to be submitted.
+        initializer
+            A function called with `initargs` by every worker when it starts (or once in this process if there is one
+            core). Data shared by every job (e.g. a large dataset) can be sent to each worker once this way, rather
+            than with every job.
+        core_budget
+            If given, every job is allocated cores from the budget when it is submitted (setting its `number_of_cores`)
+            and a job is only submitted when the budget has a free core. Jobs are submitted only when a worker is free,
+            so they are allocated cores when they start. Once every job is submitted, the cores freed by completed jobs
+            are handed to the jobs still being performed.
+        blas_threads
+            If not None, the number of threads BLAS libraries are limited to in every worker
+        timeout
+            The number of seconds a job may run before its worker is stopped and the job fails. If None, jobs are not
+            timed out.
+        retries
+            The number of times a failed job is performed again before it is considered to have failed.
+        raise_on_failure
+            If True, a job which fails raises a `JobException`, otherwise its `JobFailure` is returned.
         """
-        if number_of_cores < 2:
-            raise AssertionError(
-                "The number of cores available must be at least 2 for parallel to run"
+        if number_of_cores < 1:
+            raise AssertionError("The number of cores must be at least 1")
+
+        self.number_of_cores = number_of_cores
+        self.ordered = ordered
+        self.max_pending_jobs = max_pending_jobs or 2 * number_of_cores
+        self.initializer = initializer
+        self.initargs = initargs
+        self.core_budget = core_budget
+        self.blas_threads = blas_threads
+        self.timeout = timeout
+        self.retries = retries
+        self.raise_on_failure = raise_on_failure
+
+        if core_budget is not None:
+            self.max_pending_jobs = number_of_cores
+
+        self._worker_names = count()
+
+    def _failed(self, job: AbstractJob, failure: JobFailure) -> Optional[JobFailure]:
+        """
+        Handle a failed attempt at a job, returning None if the job should be retried and otherwise the failure
+        (or raising a `JobException` if failures are raised).
+        """
+        if job.attempt < self.retries:
+            job.attempt += 1
+            logger.info(f"Retrying job {job.number} (attempt {job.attempt + 1} of {self.retries + 1})")
+            return None
+
+        if self.raise_on_failure:
+            raise exc.JobException(
+                f"Job {failure.job_number} failed:\n{failure.message}"
             )
 
-        job_queue = multiprocessing.Queue()
+        failure.job = job
+        return failure
 
-        processes = [
-            Process(str(number), job_queue)
-            for number in range(number_of_cores - 1)
-        ]
+    def _run_serial(self, jobs: Iterable[AbstractJob]) -> Generator[AbstractJobResult, None, None]:
+        if self.initializer is not None:
+            self.initializer(*self.initargs)
 
-        total = 0
         for job in jobs:
-            job_queue.put(job)
-            total += 1
+            while True:
+                result = perform(job)
+                if isinstance(result, JobFailure):
+                    result = self._failed(job, result)
+                    if result is None:
+                        continue
+                yield result
+                break
+
+    def _start_worker(self) -> Tuple[Worker, Connection]:
+        """Start a worker, returning it and the scheduler's end of its pipe."""
+        connection, worker_connection = multiprocessing.Pipe()
+
+        worker = Worker(
+            name=str(next(self._worker_names)),
+            connection=worker_connection,
+            initializer=self.initializer,
+            initargs=self.initargs,
+            blas_threads=self.blas_threads,
+            core_allowances=None if self.core_budget is None else self.core_budget.allowances,
+        )
+        worker.start()
+        worker_connection.close()
+
+        return worker, connection
+
+    def run(
+            self,
+            jobs: Iterable[AbstractJob],
+            number_of_jobs: Optional[int] = None,
+    ) -> Generator[AbstractJobResult, None, None]:
+        """
+        Perform every job, yielding each job's result.
+
+        `number_of_jobs` is the number of jobs if it is known, which a core budget uses to allocate the cores freed
+        towards the end of the jobs to those which remain. Once the jobs are exhausted, the cores freed by completed
+        jobs are handed to the jobs still being performed.
+
+        If a job fails and failures are raised a `JobException` is raised, after which remaining jobs are not
+        performed. The workers are always stopped, including when the caller stops iterating over the results early.
+        """
+        if self.number_of_cores == 1 and self.timeout is None:
+            yield from self._run_serial(jobs)
+            return
+
+        workers: Dict[str, Worker] = {}
+        connections: Dict[str, Connection] = {}
+
+        for _ in range(self.number_of_cores):
+            worker, connection = self._start_worker()
+            workers[worker.name] = worker
+            connections[worker.name] = connection
+
+        jobs = iter(jobs)
+
+        submitted = 0
+        returned = 0
+        exhausted = False
+        pending: Dict[int, AbstractJob] = {}
+        completed: Dict[int, AbstractJobResult] = {}
+
+        # The indexes of pending jobs which have not been sent to a worker, the workers which are waiting for a job and
+        # the index of the job each busy worker is performing with the time it was sent
+        waiting = deque()
+        idle = set()
+        assigned: Dict[str, Tuple[int, float]] = {}
+
+        try:
+            while True:
+
+                while not exhausted and submitted - returned < self.max_pending_jobs:
+                    if self.core_budget is not None and self.core_budget.free_cores < 1:
+                        break
+                    try:
+                        job = next(jobs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if self.core_budget is not None:
+                        job.number_of_cores = self.core_budget.allocate(
+                            index=submitted,
+                            startable_jobs=self._startable_jobs(
+                                idle_workers=self.number_of_cores - (submitted - returned),
+                                remaining_jobs=None if number_of_jobs is None else number_of_jobs - submitted,
+                            )
+                        )
+                        job.core_slot = self.core_budget.slots[submitted]
+                    pending[submitted] = job
+                    waiting.append(submitted)
+                    submitted += 1
+
+                if exhausted and self.core_budget is not None:
+                    self.core_budget.rebalance()
+
+                if exhausted and returned == submitted:
+                    break
+
+                finished = []
+
+                while len(waiting) > 0 and len(idle) > 0:
+                    name = idle.pop()
+                    index = waiting.popleft()
+                    assigned[name] = (index, time.time())
+                    try:
+                        connections[name].send((index, pending[index]))
+                    except Exception:
+                        del assigned[name]
+                        if not workers[name].is_alive():
+                            waiting.appendleft(index)
+                            continue
+                        idle.add(name)
+                        message = traceback.format_exc()
+                        logger.error(message)
+                        finished.append((index, JobFailure(job_number=index, message=message)))
+
+                names = {connection: name for name, connection in connections.items()}
+
+                # One message is received at a time, so that jobs are submitted (and allocated cores) as each worker
+                # becomes free
+                for connection in wait(list(names), timeout=0.0 if len(finished) > 0 else 1.0)[:1]:
+                    name = names[connection]
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        workers[name].join()
+                        continue
+                    if message is not None:
+                        del assigned[name]
+                        finished.append(message)
+                    idle.add(name)
+
+                finished += self._lost_jobs(
+                    workers=workers,
+                    connections=connections,
+                    idle=idle,
+                    assigned=assigned,
+                )
+
+                for index, result in finished:
+
+                    if isinstance(result, JobFailure):
+                        result.job_number = pending[index].number
+                        result = self._failed(pending[index], result)
+                        if result is None:
+                            waiting.append(index)
+                            continue
+
+                    pending.pop(index)
+
+                    if self.core_budget is not None:
+                        self.core_budget.release(index)
+
+                    completed[index] = result
+
+                    if self.ordered:
+                        while returned in completed:
+                            result = completed.pop(returned)
+                            returned += 1
+                            yield result
+                    else:
+                        completed.pop(index)
+                        returned += 1
+                        yield result
+
+            for connection in connections.values():
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+
+            for worker in workers.values():
+                worker.join()
+
+        finally:
+            for worker in workers.values():
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+            for connection in connections.values():
+                connection.close()
+
+    def _lost_jobs(self, workers, connections, idle, assigned):
+        """
+        Stop workers whose job has exceeded the time limit and replace every worker which has died, returning a
+        `JobFailure` for the job each was performing.
+
+        A stopped worker may be part way through sending a result, but as the pipe it is sending through is its own
+        the pipe is closed with it and the other workers are unaffected.
+        """
+        lost = []
+        now = time.time()
+
+        for name, worker in list(workers.items()):
+
+            index, started = assigned.get(name, (None, 0.0))
+
+            if worker.is_alive():
+                if self.timeout is None or index is None or now - started <= self.timeout:
+                    continue
+                worker.terminate()
+                worker.join()
+                message = f"Job timed out after {self.timeout} seconds in process {name}"
+            else:
+                message = f"Process {name} died with exit code {worker.exitcode}"
+
+            logger.error(message)
 
-        for process in processes:
-            process.start()
+            del workers[name]
+            connections.pop(name).close()
+            idle.discard(name)
+            assigned.pop(name, None)
 
-        count = 0
+            worker, connection = self._start_worker()
+            workers[worker.name] = worker
+            connections[worker.name] = connection
 
-        while count < total:
-            for process in processes:
-                while not process.queue.empty():
-                    result = process.queue.get()
-                    count += 1
-                    yield result
+            if index is not None:
+                lost.append((index, JobFailure(job_number=index, message=message)))
 
-        job_queue.close()
+        return lost
 
-        for process in processes:
-            process.join(timeout=1.0)
+    @staticmethod
+    def _startable_jobs(idle_workers: int, remaining_jobs: Optional[int]) -> int:
+        if remaining_jobs is None:
+            return idle_workers
+        return min(idle_workers, remaining_jobs)
@@ -8,6 +8,7 @@ import copy
 
 from autoconf import conf
 from autofit.mapper import link
+from autofit.non_linear.archive import ZipArchive
 from autofit.non_linear.log import logger
 
 
@@ -120,6 +121,9 @@ class Paths:
             The name of the non-linear search, e.g. Emcee -> emcee. Phases automatically set up and use this variable.
         remove_files : bool
             If `True`, all output results except their ``.zip`` files are removed. If `False` they are not removed.
+
+        If *incremental_zip* is `True` in the general.ini config, the ``.zip`` file is kept when it is restored and is
+        updated incrementally (see `ZipArchive`), so that only output files which have changed are written to it.
         """
 
         self.path_prefix = path_prefix or ""
@@ -128,8 +132,11 @@ class Paths:
         self.non_linear_name = non_linear_name or ""
         self.non_linear_tag_function = non_linear_tag_function
 
+        self.incremental_zip = False
+
         try:
             self.remove_files = conf.instance["general"]["output"]["remove_files"]
+            self.incremental_zip = conf.instance["general"]["output"]["incremental_zip"]
 
             if conf.instance["general"]["hpc"]["hpc_mode"]:
                 self.remove_files = True
@@ -143,6 +150,7 @@ class Paths:
 
     def __setstate__(self, state):
         non_linear_tag = state.pop("non_linear_tag")
+        state.setdefault("incremental_zip", False)
         self.non_linear_tag_function = lambda: non_linear_tag
         self.__dict__.update(state)
 
@@ -190,6 +198,13 @@ class Paths:
     def zip_path(self) -> str:
         return f"{self.output_path}.zip"
 
+    @property
+    def zip_archive(self) -> ZipArchive:
+        """
+        The incrementally updated ``.zip`` archive of the output path.
+        """
+        return ZipArchive(zip_path=self.zip_path, directory=self.output_path)
+
     @property
     @make_path
     def output_path(self) -> str:
@@ -354,6 +369,11 @@ class Paths:
         """
 
         if path.exists(self.zip_path):
+
+            if self.incremental_zip:
+                self.zip_archive.extract()
+                return
+
             with zipfile.ZipFile(self.zip_path, "r") as f:
                 f.extractall(self.output_path)
 
@@ -361,6 +381,18 @@ class Paths:
 
     def zip(self):
 
+        if self.incremental_zip:
+
+            try:
+                self.zip_archive.update()
+            except FileNotFoundError:
+                return
+
+            if self.remove_files:
+                shutil.rmtree(self.output_path)
+
+            return
+
         try:
             with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as f:
                 for root, dirs, files in os.walk(self.output_path):
@@ -0,0 +1,583 @@
+import json
+import os
+from os import path
+from typing import Dict, List
+
+import numpy as np
+from scipy.special import logsumexp
+
+from autoconf import conf
+from autofit import exc
+from autofit.mapper.model_mapper import ModelMapper
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear import samples as samp
+from autofit.non_linear.abstract_search import NonLinearSearch
+from autofit.non_linear.initializer import InitializerPrior
+from autofit.non_linear.log import logger
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import PDFSamples, Sample
+from autofit.non_linear.update_writer import atomic_file
+
+
+class SequentialMonteCarlo(NonLinearSearch):
+
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            number_of_particles=None,
+            ess_threshold=None,
+            mcmc_steps=None,
+            target_acceptance=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        An adaptive-tempering Sequential Monte Carlo (SMC) non-linear search, which is implemented natively in
+        PyAutoFit.
+
+        A population of particles is drawn from the prior and moved through a sequence of tempered posteriors,
+        likelihood ** beta * prior, with beta increasing from 0 to 1. At every stage:
+
+        - The next value of beta is chosen by bisection, such that reweighting the particles to it reduces the
+          effective sample size (ESS) of their weights to `ess_threshold` times the number of particles.
+
+        - The particles are resampled (using systematic resampling) if their ESS is below this threshold.
+
+        - Every particle is moved by `mcmc_steps` random-walk Metropolis steps targeting the tempered posterior, with
+          proposals drawn from a Gaussian whose covariance is that of the particles, scaled such that the acceptance
+          rate of the moves approaches `target_acceptance`.
+
+        The moves of every particle are independent of one another, so every Metropolis step evaluates the proposals of
+        all particles as one batch, on the search's pool of processes if `number_of_cores` is above 1, and proposals
+        outside the prior limits are rejected without being evaluated. Unlike nested sampling, whose bound updates are
+        sequential, an SMC search therefore scales to as many cores as it has particles.
+
+        The log evidence is the sum over stages of the log of the mean reweighting of the particles, and the samples
+        of the search are the weighted particles once beta reaches 1.
+
+        The state of the particles is output after every stage, so runs can be terminated and resumed exactly where
+        they stopped.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        number_of_particles : int
+            The number of particles sampling parameter space.
+        ess_threshold : float
+            The fraction of the number of particles the ESS is reduced to by every stage, and below which the particles
+            are resampled.
+        mcmc_steps : int
+            The number of Metropolis steps every particle takes in every stage.
+        target_acceptance : float
+            The acceptance rate of the Metropolis steps the scale of their proposals is adapted towards.
+        iterations_per_update : int
+            The number of stages performed between every update.
+        number_of_cores : int
+            The number of cores the particles are evaluated on using a Python multiprocessing Pool instance. If 1, a
+            pool instance is not created and the job runs in serial.
+        """
+
+        self.number_of_particles = (
+            self._config("search", "number_of_particles")
+            if number_of_particles is None
+            else number_of_particles
+        )
+        self.ess_threshold = (
+            self._config("search", "ess_threshold")
+            if ess_threshold is None
+            else ess_threshold
+        )
+        self.mcmc_steps = (
+            self._config("search", "mcmc_steps")
+            if mcmc_steps is None
+            else mcmc_steps
+        )
+        self.target_acceptance = (
+            self._config("search", "target_acceptance")
+            if target_acceptance is None
+            else target_acceptance
+        )
+
+        if not 0.0 < self.ess_threshold < 1.0:
+            raise ValueError("The ess_threshold of SequentialMonteCarlo must be between 0 and 1")
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=InitializerPrior(),
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating SequentialMonteCarlo NLO")
+
+    @property
+    def config_type(self):
+        return conf.instance["non_linear"]["smc"]
+
+    class Fitness(NonLinearSearch.Fitness):
+        def __call__(self, parameters):
+            try:
+                return self.figure_of_merit_from_parameters(parameters=parameters)
+            except exc.FitException:
+                return self.resample_figure_of_merit
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space.
+            *SequentialMonteCarlo* uses the log likelihood, which is tempered at every stage."""
+            return self.log_likelihood_from_parameters(parameters=parameters)
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using Sequential Monte Carlo and the Analysis class which contains the data and returns the log
+        likelihood from instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+
+        Returns
+        -------
+        A result object comprising the Samples object that inclues the maximum log likelihood instance and full
+        chains used by the fit.
+        """
+        from autofit.graphical.sampling import effective_sample_size
+
+        pool, pool_ids = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis, pool_ids=pool_ids
+        )
+
+        figures_of_merit_map = map if pool is None else pool.map
+
+        if path.exists(self.state_file):
+
+            state = self.state
+            particles = state["particles"]
+            log_likelihoods = state["log_likelihoods"]
+            log_priors = state["log_priors"]
+            log_weights = state["log_weights"]
+            betas = list(state["betas"])
+            log_evidence = float(state["log_evidence"])
+            proposal_scale = float(state["proposal_scale"])
+            total_samples = int(state["total_samples"])
+
+            self.restore_random_state()
+
+            logger.info("Existing SequentialMonteCarlo samples found, resuming non-linear search.")
+
+        else:
+
+            initial_unit_parameters, initial_parameters, initial_log_likelihoods = self.initializer.initial_samples_from_model(
+                total_points=self.number_of_particles,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            particles = np.asarray(initial_parameters, dtype=float)
+            log_likelihoods = np.asarray(initial_log_likelihoods, dtype=float)
+            log_priors = self.log_priors_from(model=model, particles=particles)
+            log_weights = np.full(self.number_of_particles, -np.log(self.number_of_particles))
+            betas = [0.0]
+            log_evidence = 0.0
+            proposal_scale = 2.38 / np.sqrt(model.prior_count)
+            total_samples = self.number_of_particles
+
+            logger.info("No SequentialMonteCarlo samples found, beginning new non-linear search.")
+
+        while betas[-1] < 1.0:
+
+            for _ in range(self.iterations_per_update):
+
+                beta = self.next_beta(
+                    beta=betas[-1], log_likelihoods=log_likelihoods, log_weights=log_weights
+                )
+
+                with np.errstate(invalid="ignore"):
+                    log_reweights = np.where(
+                        np.isfinite(log_likelihoods), (beta - betas[-1]) * log_likelihoods, -np.inf
+                    )
+
+                log_evidence += logsumexp(log_weights + log_reweights)
+                log_weights = log_weights + log_reweights
+                log_weights -= logsumexp(log_weights)
+
+                betas.append(beta)
+
+                if effective_sample_size(np.exp(log_weights)) < self.ess_threshold * self.number_of_particles:
+
+                    indexes = systematic_resample(weights=np.exp(log_weights))
+
+                    particles = particles[indexes]
+                    log_likelihoods = log_likelihoods[indexes]
+                    log_priors = log_priors[indexes]
+                    log_weights = np.full(self.number_of_particles, -np.log(self.number_of_particles))
+
+                covariance = np.atleast_2d(
+                    np.cov(particles, rowvar=False, aweights=np.exp(log_weights))
+                )
+
+                accepted = 0
+
+                for _ in range(self.mcmc_steps):
+
+                    proposals = particles + np.random.multivariate_normal(
+                        mean=np.zeros(model.prior_count),
+                        cov=proposal_scale ** 2 * covariance,
+                        size=self.number_of_particles,
+                    )
+
+                    proposal_log_likelihoods = np.full(self.number_of_particles, -np.inf)
+                    proposal_log_priors = np.full(self.number_of_particles, -np.inf)
+
+                    within = np.flatnonzero(model.vectors_within_limits(proposals))
+
+                    if len(within) > 0:
+                        proposal_log_likelihoods[within] = list(
+                            figures_of_merit_map(fitness_function, proposals[within].tolist())
+                        )
+                        proposal_log_priors[within] = self.log_priors_from(
+                            model=model, particles=proposals[within]
+                        )
+
+                    total_samples += len(within)
+
+                    with np.errstate(invalid="ignore"):
+                        log_acceptance = (
+                                beta * (proposal_log_likelihoods - log_likelihoods)
+                                + proposal_log_priors - log_priors
+                        )
+
+                    moved = np.log(np.random.random(self.number_of_particles)) < log_acceptance
+
+                    particles[moved] = proposals[moved]
+                    log_likelihoods[moved] = proposal_log_likelihoods[moved]
+                    log_priors[moved] = proposal_log_priors[moved]
+
+                    accepted += np.count_nonzero(moved)
+
+                acceptance = accepted / (self.mcmc_steps * self.number_of_particles)
+
+                proposal_scale *= np.exp(acceptance - self.target_acceptance)
+
+                logger.info(
+                    f"SequentialMonteCarlo stage {len(betas) - 1}: beta = {beta:.4g}, "
+                    f"acceptance = {acceptance:.3f}, log evidence = {log_evidence:.4f}"
+                )
+
+                if beta >= 1.0:
+                    break
+
+            self.save_state(
+                particles=particles,
+                log_likelihoods=log_likelihoods,
+                log_priors=log_priors,
+                log_weights=log_weights,
+                betas=betas,
+                log_evidence=log_evidence,
+                proposal_scale=proposal_scale,
+                total_samples=total_samples,
+            )
+
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
+            pool = self.pool_with_allowed_cores(pool=pool, fitness_function=fitness_function)
+            figures_of_merit_map = map if pool is None else pool.map
+
+        logger.info("SequentialMonteCarlo sampling complete.")
+
+    @staticmethod
+    def log_priors_from(model: AbstractPriorModel, particles: np.ndarray) -> np.ndarray:
+        return np.asarray(
+            [sum(model.log_priors_from_vector(vector=vector)) for vector in particles.tolist()]
+        )
+
+    def next_beta(self, beta: float, log_likelihoods: np.ndarray, log_weights: np.ndarray) -> float:
+        """
+        The value of beta of the next stage, found by bisection such that reweighting the particles from the current
+        value of beta reduces the ESS of their weights to `ess_threshold` times the number of particles, or 1 if
+        reweighting to 1 does not reduce the ESS below this.
+
+        Parameters
+        ----------
+        beta
+            The value of beta of the current stage.
+        log_likelihoods
+            The log likelihoods of the particles.
+        log_weights
+            The normalized log weights of the particles at the current stage.
+        """
+        from autofit.graphical.sampling import effective_sample_size
+
+        target = self.ess_threshold * self.number_of_particles
+
+        finite = np.isfinite(log_likelihoods)
+
+        def ess(next_beta):
+            log_reweights = log_weights[finite] + (next_beta - beta) * log_likelihoods[finite]
+            return effective_sample_size(np.exp(log_reweights - np.max(log_reweights)))
+
+        if ess(1.0) >= target:
+            return 1.0
+
+        lower, upper = beta, 1.0
+
+        while upper - lower > 1.0e-8 * upper:
+
+            middle = 0.5 * (lower + upper)
+
+            if ess(middle) < target:
+                upper = middle
+            else:
+                lower = middle
+
+        return upper
+
+    @property
+    def tag(self):
+        """Tag the output folder of the SequentialMonteCarlo non-linear search, according to the number of particles and
+        the ESS threshold."""
+
+        name_tag = self._config("tag", "name")
+        number_of_particles_tag = f"{self._config('tag', 'number_of_particles')}_{self.number_of_particles}"
+        ess_threshold_tag = f"{self._config('tag', 'ess_threshold')}_{self.ess_threshold}"
+
+        return f"{name_tag}[{number_of_particles_tag}_{ess_threshold_tag}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the SequentialMonteCarlo `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.number_of_particles = self.number_of_particles
+        copy.ess_threshold = self.ess_threshold
+        copy.mcmc_steps = self.mcmc_steps
+        copy.target_acceptance = self.target_acceptance
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+
+        return SequentialMonteCarlo.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            pool_ids=pool_ids,
+        )
+
+    @property
+    def state_file(self) -> str:
+        return path.join(self.paths.samples_path, "particles.npz")
+
+    @property
+    def state(self) -> Dict[str, np.ndarray]:
+        """The state of the particles when they were last output."""
+        with np.load(self.state_file) as f:
+            return {key: f[key] for key in f.files}
+
+    def save_state(
+            self,
+            particles: np.ndarray,
+            log_likelihoods: np.ndarray,
+            log_priors: np.ndarray,
+            log_weights: np.ndarray,
+            betas: List[float],
+            log_evidence: float,
+            proposal_scale: float,
+            total_samples: int,
+    ):
+        """
+        Output the particles, the values of beta of every stage so far, the log evidence and the state of numpy's
+        random number generator, replacing the previous state, so a resumed search performs the same stages as a search
+        which was not terminated.
+        """
+        os.makedirs(self.paths.samples_path, exist_ok=True)
+
+        random_state = np.random.get_state()
+
+        with atomic_file(self.state_file) as temporary_file:
+            with open(temporary_file, "wb") as f:
+                np.savez(
+                    f,
+                    particles=particles,
+                    log_likelihoods=log_likelihoods,
+                    log_priors=log_priors,
+                    log_weights=log_weights,
+                    betas=betas,
+                    log_evidence=log_evidence,
+                    proposal_scale=proposal_scale,
+                    total_samples=total_samples,
+                    random_state_keys=random_state[1],
+                    random_state_values=np.asarray(random_state[2:], dtype=np.float64),
+                )
+
+    def restore_random_state(self):
+        """Set the state of numpy's random number generator to its state when the particles were last output."""
+        state = self.state
+
+        position, has_gauss, cached_gaussian = state["random_state_values"]
+
+        np.random.set_state(
+            ("MT19937", state["random_state_keys"], int(position), int(has_gauss), cached_gaussian)
+        )
+
+    def remove_state_files(self):
+        os.remove(self.state_file)
+
+    def samples_via_sampler_from_model(self, model):
+        """Create a `SequentialMonteCarloSamples` object from this non-linear search's output files on the hard-disk
+        and model.
+
+        The samples are the particles of the last stage which was output, weighted by their normalized weights.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        state = self.state
+
+        weights = np.exp(state["log_weights"] - logsumexp(state["log_weights"]))
+
+        return SequentialMonteCarloSamples(
+            model=model,
+            samples=Sample.from_lists(
+                model=model,
+                parameters=state["particles"].tolist(),
+                log_likelihoods=state["log_likelihoods"].tolist(),
+                log_priors=state["log_priors"].tolist(),
+                weights=weights.tolist(),
+            ),
+            number_of_particles=len(weights),
+            betas=state["betas"].tolist(),
+            log_evidence=float(state["log_evidence"]),
+            total_samples=int(state["total_samples"]),
+            time=self.timer.time,
+        )
+
+    def samples_via_csv_json_from_model(self, model):
+
+        samples = samp.load_from_table(filename=self.paths.samples_file)
+
+        with open(self.paths.info_file) as infile:
+            samples_info = json.load(infile)
+
+        return SequentialMonteCarloSamples(
+            model=model,
+            samples=samples,
+            number_of_particles=samples_info["number_of_particles"],
+            betas=samples_info["betas"],
+            log_evidence=samples_info["log_evidence"],
+            total_samples=samples_info["total_samples"],
+            unconverged_sample_size=samples_info["unconverged_sample_size"],
+            time=samples_info["time"],
+        )
+
+
+def systematic_resample(weights: np.ndarray) -> np.ndarray:
+    """
+    The indexes of the particles drawn by systematic resampling, which draws each particle a number of times within
+    one of its expected number (its normalized weight times the number of particles) using a single random number.
+
+    Parameters
+    ----------
+    weights
+        The weights of the particles, which need not be normalized.
+    """
+    number_of_particles = len(weights)
+
+    positions = (np.random.random() + np.arange(number_of_particles)) / number_of_particles
+
+    cumulative_weights = np.cumsum(weights) / np.sum(weights)
+    cumulative_weights[-1] = 1.0
+
+    return np.searchsorted(cumulative_weights, positions)
+
+
+class SequentialMonteCarloSamples(PDFSamples):
+
+    def __init__(
+            self,
+            model: ModelMapper,
+            samples: List[Sample],
+            number_of_particles: int,
+            betas: List[float],
+            log_evidence: float,
+            total_samples: int,
+            unconverged_sample_size: int = 100,
+            time: float = None,
+    ):
+        """
+        The samples of a `SequentialMonteCarlo` search, which are its weighted particles.
+
+        Parameters
+        ----------
+        model : af.ModelMapper
+            Maps input vectors of unit parameter values to physical values and model instances via priors.
+        number_of_particles : int
+            The number of particles of the search.
+        betas : [float]
+            The value of beta of every stage of the search, beginning at 0. The samples are of the posterior once the
+            last value is 1.
+        log_evidence : float
+            The log of the Bayesian evidence estimated by the search.
+        total_samples : int
+            The total number of times the log likelihood function was evaluated.
+        """
+
+        super().__init__(
+            model=model,
+            samples=samples,
+            unconverged_sample_size=unconverged_sample_size,
+            time=time,
+        )
+
+        self.number_of_particles = number_of_particles
+        self.betas = betas
+        self.log_evidence = log_evidence
+        self._total_samples = total_samples
+
+    @property
+    def total_samples(self):
+        return self._total_samples
+
+    @property
+    def total_stages(self) -> int:
+        return len(self.betas) - 1
+
+    def info_to_json(self, filename):
+        info = {
+            "log_evidence": self.log_evidence,
+            "total_samples": self.total_samples,
+            "unconverged_sample_size": self.unconverged_sample_size,
+            "time": self.time,
+            "number_of_particles": self.number_of_particles,
+            "betas": self.betas,
+        }
+
+        with open(filename, 'w') as outfile:
+            json.dump(info, outfile)
@@ -0,0 +1,133 @@
+import atexit
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from autofit.non_linear.log import logger
+
+
+@contextmanager
+def atomic_file(filename: str):
+    """
+    Write a file atomically, by yielding a temporary filename in the same directory which replaces `filename` once
+    the body of the context has finished writing it.
+
+    A reader (e.g. the aggregator, or a user inspecting a run) therefore only ever sees the complete previous or
+    complete new version of the file. If writing raises an exception the temporary file is removed and `filename` is
+    left unchanged.
+
+    Parameters
+    ----------
+    filename
+        The path of the file that is written.
+    """
+    temporary_filename = f"{filename}.tmp"
+
+    try:
+        yield temporary_filename
+        os.replace(temporary_filename, filename)
+    finally:
+        if os.path.exists(temporary_filename):
+            os.remove(temporary_filename)
+
+
+class UpdateWriter:
+    def __init__(self, max_pending_updates: int = 1):
+        """
+        Performs the output of `NonLinearSearch` updates (writing the samples, results, visualization, etc.) on a
+        background thread, so that sampling continues whilst the update is output.
+
+        Updates are performed in the order they are submitted by a single thread. At most `max_pending_updates` may
+        wait to be performed, after which `submit` blocks until the writer catches up, so that samples snapshots
+        cannot accumulate in memory if outputting an update is slower than sampling.
+
+        If an update raises an exception, subsequent updates are not performed and the exception is raised in the
+        calling thread the next time `submit`, `flush` or `close` is called.
+
+        Parameters
+        ----------
+        max_pending_updates
+            The maximum number of updates which can wait to be performed before `submit` blocks.
+        """
+        self.max_pending_updates = max_pending_updates
+
+        self._queue = None
+        self._thread = None
+        self._exception = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def submit(self, func, **kwargs):
+        """
+        Submit an update, which calls `func` with `kwargs` on the background thread once all previously submitted
+        updates are performed. The thread is started on the first submission.
+        """
+        self.raise_exception()
+
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.max_pending_updates)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+        self._queue.put((func, kwargs))
+
+    def _run(self):
+        while True:
+
+            update = self._queue.get()
+
+            try:
+
+                if update is None:
+                    return
+
+                func, kwargs = update
+
+                if self._exception is None:
+                    func(**kwargs)
+
+            except Exception as e:
+                logger.exception(e)
+                self._exception = e
+
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Block until every submitted update has been performed.
+        """
+        if self._queue is not None:
+            self._queue.join()
+
+        self.raise_exception()
+
+    def close(self):
+        """
+        Block until every submitted update has been performed and stop the background thread. A subsequent call to
+        `submit` starts a new thread.
+
+        This is registered to be called when the interpreter exits, so that updates submitted by a search which
+        did not finish are still output.
+        """
+        if self._thread is not None:
+
+            self._queue.put(None)
+            self._thread.join()
+
+            self._queue = None
+            self._thread = None
+
+            atexit.unregister(self.close)
+
+        self.raise_exception()
+
+    def raise_exception(self):
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
@@ -84,7 +84,7 @@ def format_string_for_parameter_name(parameter_name: str) -> str:
 
     logger.warning(
         "Could not find an entry for the parameter {} in the label_format.ini config at path {}".format(
-            parameter_name, conf.instance.path
+            parameter_name, conf.instance.paths
         )
     )
 
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+"""
+Benchmark the non-linear searches on analytic likelihoods, writing the metrics of every run to a JSON report.
+
+Usage
+./benchmark.py /path/to/report.json [number_of_cores ...]
+"""
+
+from sys import argv
+
+from autofit.benchmark import benchmark_suite
+
+if __name__ == "__main__":
+    try:
+        filename = argv[1]
+        number_of_cores_list = [int(number_of_cores) for number_of_cores in argv[2:]] or [1, 2]
+    except (IndexError, ValueError):
+        print("Usage: ./benchmark.py /path/to/report.json [number_of_cores ...]")
+        exit(1)
+
+    benchmark_suite(filename=filename, number_of_cores_list=number_of_cores_list)
@@ -24,6 +24,19 @@ class TestLoading:
         assert list(path_aggregator.values("non_linear"))[0]["name"] == "optimizer"
         assert list(path_aggregator.values("nonsense"))[0] is None
 
+    def test_read_from_zip(self, aggregator_directory):
+        aggregator = af.Aggregator(aggregator_directory, unzip=False)
+
+        assert len(aggregator) == 2
+        assert all(phase.archive is not None for phase in aggregator.phases)
+        assert list(aggregator.values("dataset"))[0]["name"] == "dataset"
+        assert list(aggregator.values("nonsense"))[0] is None
+
+        aggregator = af.Aggregator(aggregator_directory, completed_only=True, unzip=False)
+
+        assert len(aggregator) == 1
+        assert "completed" in aggregator[0].directory
+
 
 @pytest.fixture(name="aggregator_2")
 def make_aggregator_2():
@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+import pytest
+from scipy.special import logsumexp
+
+import autofit as af
+from autofit import benchmark
+from autofit.benchmark import targets
+
+
+def grid_log_evidence(target, points=301):
+    """The log evidence of a 2D target integrated over a grid of its priors."""
+    x = np.linspace(target.lower_limit, target.upper_limit, points)
+    spacing = x[1] - x[0]
+
+    log_likelihoods = [
+        target.log_likelihood_from(vector=np.array([x0, x1])) for x0 in x for x1 in x
+    ]
+
+    return logsumexp(log_likelihoods) + 2.0 * np.log(spacing) - target.log_prior_volume
+
+
+class TestTargets:
+    def test__model__one_parameter_per_dimension(self):
+        target = benchmark.Rosenbrock(dimensions=3)
+
+        instance = target.model.instance_from_vector(vector=[1.0, 2.0, 3.0])
+
+        assert target.model.prior_count == 3
+        assert [coordinate.value for coordinate in instance] == [1.0, 2.0, 3.0]
+        assert target.log_likelihood_function(instance=instance) == -(100.0 + 0.0) - (100.0 + 1.0)
+
+    def test__log_evidence__matches_integral_over_priors(self):
+        assert grid_log_evidence(benchmark.GaussianShells()) == pytest.approx(
+            benchmark.GaussianShells().log_evidence, abs=0.01
+        )
+        assert grid_log_evidence(benchmark.GaussianMixture()) == pytest.approx(
+            benchmark.GaussianMixture().log_evidence, abs=0.01
+        )
+        assert grid_log_evidence(benchmark.Gaussian(dimensions=2)) == pytest.approx(
+            benchmark.Gaussian(dimensions=2).log_evidence, abs=0.01
+        )
+        assert benchmark.Rosenbrock().log_evidence is None
+
+    def test__evaluations_counted_after_counters_reset(self):
+        target = benchmark.Gaussian(dimensions=2)
+        instance = target.model.instance_from_vector(vector=[0.0, 0.0])
+
+        targets.reset_counters()
+
+        target.log_likelihood_function(instance=instance)
+        target.log_likelihood_function(instance=instance)
+
+        evaluations, likelihood_time = targets.counters()
+
+        assert evaluations == 2
+        assert likelihood_time > 0.0
+
+
+class TestBenchmarkSuite:
+    def test__metrics_written_to_report__failed_search_skipped(self, tmp_path):
+        filename = str(tmp_path / "report.json")
+
+        def failing_search(paths, number_of_cores):
+            raise ModuleNotFoundError("No module named 'missing'")
+
+        results = benchmark.benchmark_suite(
+            filename=filename,
+            searches={
+                "Emcee": lambda paths, number_of_cores: af.Emcee(
+                    paths,
+                    nwalkers=10,
+                    nsteps=100,
+                    auto_correlation_check_for_convergence=False,
+                    number_of_cores=number_of_cores,
+                ),
+                "Missing": failing_search,
+            },
+            targets=[benchmark.Gaussian(dimensions=2)],
+            number_of_cores_list=[1],
+        )
+
+        with open(filename) as f:
+            report = json.load(f)
+
+        assert report["results"] == results
+        assert [result["search"] for result in results] == ["Emcee", "Missing"]
+
+        emcee_result = results[0]
+
+        assert emcee_result["target"] == "gaussian_2d"
+        assert emcee_result["evaluations"] > 10 * 100
+        assert emcee_result["evaluations_per_second"] == pytest.approx(
+            emcee_result["evaluations"] / emcee_result["wall_time"]
+        )
+        assert emcee_result["overhead_per_evaluation"] > 0.0
+        assert 0.0 < emcee_result["effective_sample_size"] < 10 * 100
+        assert emcee_result["log_evidence"] is None
+        assert emcee_result["analytic_log_evidence"] == pytest.approx(-2.0 * np.log(20.0))
+
+        assert results[1]["skipped"] == "ModuleNotFoundError: No module named 'missing'"
+
+    def test__dynesty_dynamic_benchmarked(self, tmp_path):
+        results = benchmark.benchmark_suite(
+            filename=str(tmp_path / "report.json"),
+            searches={
+                "DynestyDynamic": lambda paths, number_of_cores: af.DynestyDynamic(
+                    paths, maxcall=2000, number_of_cores=number_of_cores
+                ),
+            },
+            targets=[benchmark.Gaussian(dimensions=2)],
+            number_of_cores_list=[1],
+        )
+
+        assert "skipped" not in results[0]
+        assert results[0]["evaluations"] > 0
+        assert results[0]["log_evidence"] == pytest.approx(
+            -2.0 * np.log(20.0), abs=1.0
+        )
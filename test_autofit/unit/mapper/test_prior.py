@@ -1,5 +1,6 @@
 import math
 
+import numpy as np
 import pytest
 
 import autofit as af
@@ -259,6 +260,12 @@ class TestUniformPrior:
         assert prior.value_for(0.0) == -1
         assert prior.value_for(1.0) == 0.0
 
+    def test__unit_value_for__inverse_of_value_for(self):
+        uniform_half = af.UniformPrior(lower_limit=0.5, upper_limit=1.0)
+
+        assert uniform_half.unit_value_for(0.75) == 0.5
+        assert uniform_half.unit_value_for(np.array([0.5, 1.0])) == pytest.approx([0.0, 1.0])
+
     def test__log_prior_from_value(self):
 
         gaussian_simple = af.UniformPrior(lower_limit=-40, upper_limit=70)
@@ -288,6 +295,12 @@ class TestLogUniformPrior:
         assert log_uniform_half.value_for(1.0) == 1.0
         assert log_uniform_half.value_for(0.5) == pytest.approx(0.70710678118, 1.0e-4)
 
+    def test__unit_value_for__inverse_of_value_for(self):
+        log_uniform_simple = af.LogUniformPrior(lower_limit=1.0e-8, upper_limit=1.0)
+
+        assert log_uniform_simple.unit_value_for(0.0001) == pytest.approx(0.5)
+        assert log_uniform_simple.unit_value_for(1.0) == pytest.approx(1.0)
+
     def test__log_prior_from_value(self):
 
         gaussian_simple = af.LogUniformPrior(lower_limit=1e-8, upper_limit=1.0)
@@ -344,6 +357,13 @@ class TestGaussianPrior:
         assert gaussian_half.value_for(0.9) == pytest.approx(3.0631031, 1.0e-4)
         assert gaussian_half.value_for(0.5) == 0.5
 
+    def test__unit_value_for__inverse_of_value_for(self):
+        gaussian_half = af.GaussianPrior(mean=0.5, sigma=2.0)
+
+        assert gaussian_half.unit_value_for(-2.0631031) == pytest.approx(0.1, 1.0e-4)
+        assert gaussian_half.unit_value_for(0.5) == 0.5
+        assert gaussian_half.unit_value_for(np.array([3.0631031])) == pytest.approx([0.9], 1.0e-4)
+
     def test__log_prior_from_value(self):
 
         gaussian_simple = af.GaussianPrior(mean=0.0, sigma=1.0)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from autofit.non_linear.grid.grid_search import grid, grid_points, make_lists
+
+
+def fitness_function(arguments):
+    return -sum((argument - 0.3) ** 2 for argument in arguments)
+
+
+def vectorized_fitness_function(points):
+    return -np.sum((points - 0.3) ** 2, axis=1)
+
+
+@pytest.mark.parametrize("centre_steps", [True, False])
+def test_grid_points__same_as_make_lists(centre_steps):
+    step_size = (0.5, 0.25, 0.1)
+
+    points = np.concatenate(
+        list(grid_points(3, step_size, chunk_size=7, centre_steps=centre_steps))
+    )
+
+    assert np.allclose(points, make_lists(3, step_size, centre_steps=centre_steps))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(chunk_size=7),
+        dict(chunk_size=7, vectorized=True),
+        dict(chunk_size=7, number_of_cores=2),
+    ]
+)
+def test_grid__best_arguments(kwargs):
+    if kwargs.get("vectorized"):
+        function = vectorized_fitness_function
+    else:
+        function = fitness_function
+
+    assert grid(function, 2, 0.1, **kwargs) == pytest.approx((0.25, 0.25))
+
+
+def test_grid__nan_fitness_ignored():
+    def function(points):
+        fitness = vectorized_fitness_function(points)
+        fitness[np.all(np.isclose(points, 0.25), axis=1)] = np.nan
+        return fitness
+
+    assert grid(function, 2, 0.1, vectorized=True) == pytest.approx((0.25, 0.35))
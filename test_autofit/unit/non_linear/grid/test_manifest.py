@@ -0,0 +1,60 @@
+import pytest
+
+from autofit.non_linear.grid.manifest import GridManifest
+
+
+@pytest.fixture(name="manifest")
+def make_manifest(tmp_path):
+    return GridManifest(directory=str(tmp_path), header=["index", "centre", "max_log_likelihood"])
+
+
+def read_results(manifest):
+    with open(manifest.results_path) as f:
+        return f.read()
+
+
+class TestGridManifest:
+    def test__append__entry_and_results_row_written(self, manifest):
+        manifest.append(cell="cell_0", row=[0, 0.0, 1.0], log_likelihood=1.0, log_evidence=-2.0)
+
+        assert manifest.status("cell_0") == "completed"
+        assert manifest.status("cell_1") == "missing"
+        assert read_results(manifest) == "index, centre, max_log_likelihood\n0, 0.00, 1.00"
+
+        entry = GridManifest(directory=manifest.directory, header=manifest.header).entries["cell_0"]
+
+        assert entry["log_likelihood"] == 1.0
+        assert entry["log_evidence"] == -2.0
+
+    def test__reload__results_rewritten_in_index_order(self, manifest):
+        manifest.append(cell="cell_1", row=[1, 0.5, 2.0], log_likelihood=2.0)
+        manifest.append(cell="cell_0", row=[0, 0.0, 1.0], log_likelihood=1.0)
+
+        manifest = GridManifest(directory=manifest.directory, header=manifest.header)
+
+        assert read_results(manifest) == "index, centre, max_log_likelihood\n0, 0.00, 1.00\n1, 0.50, 2.00"
+
+    def test__cells_with_same_name__tracked_separately(self, manifest):
+        manifest.append(cell="centre_0.0_0.0125", name="centre_0.00_0.01", row=[0, 0.0, 1.0], log_likelihood=1.0)
+
+        assert not manifest.is_completed("centre_0.0_0.00625")
+
+        manifest.append(cell="centre_0.0_0.00625", name="centre_0.00_0.01", row=[1, 0.0, 2.0], log_likelihood=2.0)
+
+        manifest = GridManifest(directory=manifest.directory, header=manifest.header)
+
+        assert manifest.entries["centre_0.0_0.0125"]["name"] == "centre_0.00_0.01"
+        assert read_results(manifest) == "index, centre, max_log_likelihood\n0, 0.00, 1.00\n1, 0.00, 2.00"
+
+    def test__partially_written_line__discarded(self, manifest):
+        manifest.append(cell="cell_0", row=[0, 0.0, 1.0], log_likelihood=1.0)
+
+        with open(manifest.manifest_path, "a") as f:
+            f.write('{"cell": "cell_1", "sta')
+
+        manifest = GridManifest(directory=manifest.directory, header=manifest.header)
+        manifest.append(cell="cell_2", row=[2, 1.0, 3.0], log_likelihood=3.0)
+
+        manifest = GridManifest(directory=manifest.directory, header=manifest.header)
+
+        assert sorted(manifest.entries) == ["cell_0", "cell_2"]
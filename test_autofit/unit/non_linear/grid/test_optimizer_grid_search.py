@@ -1,11 +1,17 @@
+import os
 import pickle
+import shutil
 
+import numpy as np
 import pytest
 
 import autofit as af
 from autofit import exc
 from autofit.mock import mock
 from autofit.mock.mock import MockAnalysis
+from autofit.mock.mock_search import MockSamples, samples_with_log_likelihoods
+from autofit.non_linear.grid.grid_search import GridCell, snake_order
+from autofit.non_linear.parallel import JobScheduler
 
 
 @pytest.fixture(name="mapper")
@@ -252,6 +258,136 @@ class TestGridNLOBehaviour:
     #         # noinspection PyUnresolvedReferences
     #         assert instance.component.centre[1] == 2
 
+    def test_resume__only_missing_cells_scheduled(self, mapper, monkeypatch):
+        scheduled = []
+
+        def run(self, jobs, number_of_jobs=None):
+            self.initializer(*self.initargs)
+            for job in jobs:
+                scheduled.append(job.name)
+                yield job.perform()
+
+        monkeypatch.setattr(JobScheduler, "run", run)
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(),
+            number_of_steps=4,
+            paths=af.Paths(name="resume"),
+            parallel=True,
+        )
+        shutil.rmtree(grid_search.paths.output_path, ignore_errors=True)
+
+        def fit():
+            return grid_search.fit(
+                model=mapper,
+                analysis=MockAnalysis(),
+                grid_priors=[mapper.component.one_tuple.one_tuple_0],
+            )
+
+        fit()
+
+        assert len(scheduled) == 4
+
+        manifest_path = os.path.join(grid_search.paths.output_path, "grid_manifest.jsonl")
+        with open(manifest_path) as f:
+            lines = f.readlines()
+        with open(manifest_path, "w") as f:
+            f.writelines(lines[:3])
+
+        scheduled.clear()
+        result = fit()
+
+        assert len(scheduled) == 1
+        assert len(result.results) == 4
+
+        with open(os.path.join(grid_search.paths.output_path, "results")) as f:
+            assert len(f.read().split("\n")) == 5
+
+    def test_failed_cell__recorded_and_searched_on_resume(self, mapper, monkeypatch):
+        perform_update = MockOptimizer.perform_update
+
+        def failing_perform_update(self, model, analysis, during_analysis):
+            if "0.50_0.75" in self.paths.name:
+                raise ValueError("bounding error")
+            return perform_update(self, model, analysis, during_analysis)
+
+        monkeypatch.setattr(MockOptimizer, "perform_update", failing_perform_update)
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(),
+            number_of_steps=4,
+            paths=af.Paths(name="failure"),
+        )
+        shutil.rmtree(grid_search.paths.output_path, ignore_errors=True)
+
+        def fit():
+            return grid_search.fit(
+                model=mapper,
+                analysis=MockAnalysis(),
+                grid_priors=[mapper.component.one_tuple.one_tuple_0],
+            )
+
+        with pytest.raises(exc.JobException):
+            fit()
+
+        shutil.rmtree(grid_search.paths.output_path, ignore_errors=True)
+        grid_search.isolate_failures = True
+
+        result = fit()
+
+        assert list(result.failures) == [2]
+        assert "bounding error" in result.failures[2]
+        assert result.results[2] is None
+        assert np.isnan(result.max_log_likelihood_values[2])
+        assert result.best_result is not None
+
+        monkeypatch.setattr(MockOptimizer, "perform_update", perform_update)
+
+        result = fit()
+
+        assert result.failures == {}
+        assert result.results[2] is not None
+
+    @pytest.mark.parametrize("parallel", [False, True])
+    def test_warm_start(self, mapper, monkeypatch, parallel):
+        def run(self, jobs, number_of_jobs=None):
+            if self.initializer is not None:
+                self.initializer(*self.initargs)
+            for job in jobs:
+                yield job.perform()
+
+        monkeypatch.setattr(JobScheduler, "run", run)
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(),
+            number_of_steps=4,
+            paths=af.Paths(name=f"warm_start_{parallel}"),
+            parallel=parallel,
+            warm_start=True,
+        )
+        shutil.rmtree(grid_search.paths.output_path, ignore_errors=True)
+
+        result = grid_search.fit(
+            model=mapper,
+            analysis=MockAnalysis(),
+            grid_priors=[mapper.component.one_tuple.one_tuple_0],
+        )
+
+        prior_types = [
+            type(result.previous_model.component.one_tuple.one_tuple_0)
+            for result in result.results
+        ]
+        assert prior_types == [af.UniformPrior] * 4
+
+        prior_types = [
+            type(result.previous_model.component.one_tuple.one_tuple_1)
+            for result in result.results
+        ]
+        if parallel:
+            assert prior_types == [af.UniformPrior, af.GaussianPrior] * 2
+        else:
+            assert prior_types == [af.UniformPrior] + [af.GaussianPrior] * 3
+
     def test_passes_attributes(self):
         grid_search = af.SearchGridSearch(
             paths=af.Paths(name=""), number_of_steps=10, search=af.DynestyStatic()
@@ -326,3 +462,162 @@ class TestGridSearchResult:
             [2.0, 0.0],
             [2.0, 3.0],
         ]
+
+
+class PeakedAnalysis(MockAnalysis):
+    def log_likelihood_function(self, instance):
+        return -100 * (instance.component.one_tuple[0] - 0.3) ** 2
+
+
+@pytest.fixture(name="peaked_optimizer")
+def make_peaked_optimizer(monkeypatch):
+    def perform_update(self, model, analysis, during_analysis):
+        instance = model.instance_from_unit_vector(model.prior_count * [0.5])
+        return MockSamples(
+            samples=samples_with_log_likelihoods(
+                [analysis.log_likelihood_function(instance)]
+            ),
+        )
+
+    monkeypatch.setattr(MockOptimizer, "perform_update", perform_update)
+
+    return MockOptimizer()
+
+
+class TestAdaptiveGridSearch:
+    def test_refines_cells_near_best(self, mapper, peaked_optimizer):
+        grid_search = af.SearchGridSearch(
+            search=peaked_optimizer,
+            number_of_steps=4,
+            paths=af.Paths(name="sample_name"),
+            max_refinement_depth=2,
+            refinement_threshold=0.5,
+        )
+        result = grid_search.fit(
+            model=mapper,
+            analysis=PeakedAnalysis(),
+            grid_priors=[mapper.component.one_tuple.one_tuple_0],
+        )
+
+        assert isinstance(result, af.AdaptiveGridSearchResult)
+        assert result.shape == (16,)
+        assert result.lower_limit_lists[0] == [0.0]
+
+        depths = [leaf.depth for leaf in result.leaves]
+        assert max(depths) == 2
+        assert 0 in depths
+
+        assert sum(leaf.step_sizes[0] for leaf in result.leaves) == pytest.approx(1.0)
+        assert result.best_result.log_likelihood == max(
+            leaf.result.log_likelihood for leaf in result.leaves
+        )
+
+        values = result.max_log_likelihood_values
+        assert values.shape == (16,)
+        assert values[15] == values[12]
+
+    def test_max_cells(self, mapper, peaked_optimizer):
+        grid_search = af.SearchGridSearch(
+            search=peaked_optimizer,
+            number_of_steps=2,
+            paths=af.Paths(name="sample_name"),
+            max_refinement_depth=3,
+            refinement_threshold=float("inf"),
+            max_cells=5,
+        )
+        result = grid_search.fit(
+            model=mapper,
+            analysis=PeakedAnalysis(),
+            grid_priors=[mapper.component.one_tuple.one_tuple_0],
+        )
+
+        assert len(result.results) == 3
+        assert [leaf.depth for leaf in result.leaves] == [1, 1, 0]
+
+    def test_cell_names_unique_on_narrow_prior(self, mapper, peaked_optimizer, monkeypatch):
+        names = []
+
+        def run(self, jobs, number_of_jobs=None):
+            for job in jobs:
+                names.append(job.name)
+                yield job.perform()
+
+        monkeypatch.setattr(JobScheduler, "run", run)
+
+        mapper.component.one_tuple.one_tuple_0 = af.UniformPrior(lower_limit=0.0, upper_limit=0.05)
+
+        grid_search = af.SearchGridSearch(
+            search=peaked_optimizer,
+            number_of_steps=4,
+            paths=af.Paths(name="narrow"),
+            max_refinement_depth=3,
+            refinement_threshold=float("inf"),
+        )
+        shutil.rmtree(grid_search.paths.output_path, ignore_errors=True)
+
+        result = grid_search.fit(
+            model=mapper,
+            analysis=PeakedAnalysis(),
+            grid_priors=[mapper.component.one_tuple.one_tuple_0],
+        )
+
+        assert max(leaf.depth for leaf in result.leaves) == 3
+        assert len(names) == 4 + 8 + 16 + 32
+        assert len(set(names)) == len(names)
+        assert all(leaf.result is not None for leaf in result.leaves)
+
+        names.clear()
+        grid_search.fit(
+            model=mapper,
+            analysis=PeakedAnalysis(),
+            grid_priors=[mapper.component.one_tuple.one_tuple_0],
+        )
+
+        assert names == []
+
+        with open(os.path.join(grid_search.paths.output_path, "results")) as f:
+            assert len(f.read().split("\n")) == 1 + 60
+
+
+def test_snake_order():
+    order = snake_order(no_dimensions=2, number_of_steps=3)
+
+    assert sorted(order) == sorted(set(order))
+    assert len(order) == 9
+
+    for position, next_position in zip(order, order[1:]):
+        assert sum(abs(a - b) for a, b in zip(position, next_position)) == 1
+
+
+class TestGridCell:
+    def test_subdivide(self):
+        cell = GridCell(lower_limits=[0.5, 0.0], step_sizes=[0.5, 0.5])
+
+        children = cell.subdivide()
+
+        assert [child.lower_limits for child in children] == [
+            [0.5, 0.0], [0.5, 0.25], [0.75, 0.0], [0.75, 0.25]
+        ]
+        assert all(child.depth == 1 for child in children)
+        assert cell.leaves == children
+
+    def test_is_neighbour(self):
+        cell = GridCell(lower_limits=[0.0, 0.0], step_sizes=[0.5, 0.5])
+
+        assert cell.is_neighbour(GridCell([0.5, 0.25], [0.25, 0.25]))
+        assert not cell.is_neighbour(GridCell([0.5, 0.5], [0.25, 0.25]))
+        assert not cell.is_neighbour(GridCell([0.75, 0.0], [0.25, 0.25]))
+
+    def test_refine_on_gradient(self):
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(),
+            number_of_steps=4,
+            refinement_threshold=1.0,
+            refinement_gradient=5.0,
+        )
+
+        cells = [GridCell([value], [0.25]) for value in (0.0, 0.25, 0.5, 0.75)]
+        for cell, log_likelihood in zip(cells, (0.0, -1.0, -10.0, -11.0)):
+            cell.result = MockResult(log_likelihood)
+
+        assert grid_search.cells_to_refine(cells) == cells[:3]
@@ -62,6 +62,41 @@ def test_sensitivity(sensitivity):
         assert result.log_likelihood_difference > 0
 
 
+def test_sensitivity_job_directory(sensitivity, tmp_path):
+    sensitivity.job_directory = str(tmp_path / "queue")
+
+    results = sensitivity.run()
+    assert len(results) == 8
+
+    for result in results:
+        assert result.log_likelihood_difference > 0
+
+
+def test_failed_jobs_recorded(sensitivity, monkeypatch):
+    perform = s.Job.perform
+
+    def failing_perform(self):
+        if self.number % 2 == 0:
+            raise ValueError("failed")
+        return perform(self)
+
+    monkeypatch.setattr(s.Job, "perform", failing_perform)
+
+    sensitivity.number_of_cores = 1
+    sensitivity.share_fits = False
+
+    with pytest.raises(af.exc.JobException):
+        sensitivity.run()
+
+    sensitivity.isolate_failures = True
+
+    results = sensitivity.run()
+
+    assert len(results) == 4
+    assert len(results.failures) == 4
+    assert all(failure.job_number % 2 == 0 for failure in results.failures)
+
+
 def test_tuple_step_size(sensitivity):
     sensitivity.step_size = (0.5, 0.5, 0.25)
     assert len(sensitivity._lists) == 16
@@ -104,3 +139,88 @@ def test_job(perturbation_model):
     assert isinstance(result.perturbed_result, af.Result)
     assert isinstance(result.result, af.Result)
     assert result.log_likelihood_difference > 0
+
+
+class RecordingGridSearch(GridSearch):
+    models = list()
+
+    def fit(self, model, analysis):
+        self.models.append(model)
+        result = super().fit(model, analysis)
+        result.model = af.Collection(
+            gaussian=af.PriorModel(
+                Gaussian, centre=af.GaussianPrior(mean=1.0, sigma=0.1)
+            )
+        )
+        return result
+
+
+@pytest.fixture(name="recording_search")
+def make_recording_search():
+    RecordingGridSearch.models = list()
+    return RecordingGridSearch()
+
+
+def test_shared_fits(sensitivity, recording_search):
+    sensitivity.search = recording_search
+    sensitivity.number_of_cores = 1
+    sensitivity.simulate_function = lambda instance: instance.gaussian(x)
+
+    results = sensitivity.run()
+
+    assert len(results) == 8
+    assert len(recording_search.models) == 2
+    assert len({result.number for result in results}) == 8
+
+
+def test_shared_base_fits(sensitivity, recording_search, monkeypatch):
+    make_jobs = s.Sensitivity._make_jobs
+    other_perturbation_model = af.PriorModel(Gaussian, centre=0.5)
+
+    def jobs_with_different_perturbation_models(self):
+        for job in make_jobs(self):
+            if job.number % 2 == 0:
+                job.perturbation_model = other_perturbation_model
+            yield job
+
+    monkeypatch.setattr(s.Sensitivity, "_make_jobs", jobs_with_different_perturbation_models)
+
+    sensitivity.search = recording_search
+    sensitivity.number_of_cores = 1
+    sensitivity.simulate_function = lambda instance: instance.gaussian(x)
+
+    results = sensitivity.run()
+
+    assert len(results) == 8
+    assert len({result.number for result in results}) == 8
+    assert len(recording_search.models) == 3
+    assert len({id(result.result) for result in results}) == 1
+    assert len({id(result.perturbed_result) for result in results}) == 2
+
+
+def test_fingerprint_of_dataset():
+    assert s.fingerprint_of(x) == s.fingerprint_of(np.array(range(10)))
+    assert s.fingerprint_of(x) != s.fingerprint_of(x.astype(float))
+
+
+def test_warm_start(perturbation_model, recording_search):
+    instance = af.ModelInstance()
+    instance.gaussian = Gaussian()
+    instance.perturbation = Gaussian()
+    # noinspection PyTypeChecker
+    job = s.Job(
+        model=af.Collection(
+            gaussian=af.PriorModel(Gaussian)
+        ),
+        perturbation_model=perturbation_model,
+        analysis=Analysis(image_function(instance)),
+        search=recording_search,
+        warm_start=True,
+    )
+    job.perform()
+
+    base_model, perturbed_model = recording_search.models
+
+    assert isinstance(base_model.gaussian.centre, af.UniformPrior)
+    assert perturbed_model.gaussian.centre.mean == 1.0
+    assert perturbed_model.perturbation is perturbation_model
@@ -1,11 +1,14 @@
 from os import path
 import shutil
 
+import emcee
+import numpy as np
 import pytest
 
 import autofit as af
 from autoconf import conf
 from autofit.mock import mock
+from autofit.non_linear.mcmc.emcee import EmceeSamplesCache
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -164,6 +167,80 @@ class TestEmceeOutput:
         )
 
 
+class TestEmceeSamplesCache:
+    @staticmethod
+    def make_sampler(filename):
+        np.random.seed(1)
+
+        return emcee.EnsembleSampler(
+            nwalkers=10,
+            ndim=4,
+            log_prob_fn=lambda vector: -0.5 * np.sum((vector - 0.5) ** 2 / 0.01),
+            backend=emcee.backends.HDFBackend(filename=filename),
+        )
+
+    def test__update_reads_only_new_steps__matches_full_backend(self, tmp_path):
+        filename = str(tmp_path / "emcee.hdf")
+        sampler = self.make_sampler(filename=filename)
+        model = af.ModelMapper(mock_class=mock.MockClassx4)
+
+        samples_cache = EmceeSamplesCache(
+            filename=filename,
+            model=model,
+            auto_correlation_check_size=100,
+            auto_correlation_required_length=50,
+        )
+
+        sampler.run_mcmc(initial_state=np.random.uniform(0.4, 0.6, size=(10, 4)), nsteps=200)
+        samples_cache.update(backend=sampler.backend)
+
+        assert samples_cache.total_steps == 200
+        assert samples_cache.total_walkers == 10
+        assert samples_cache.auto_correlation_times == pytest.approx(
+            sampler.backend.get_autocorr_time(tol=0), 1.0e-8
+        )
+
+        first_auto_correlation_times = samples_cache.auto_correlation_times
+
+        sampler.run_mcmc(initial_state=None, nsteps=100)
+        samples_cache.update(backend=sampler.backend)
+
+        assert samples_cache.total_steps == 300
+        assert len(samples_cache.samples) == 3000
+        assert [
+            sample.parameters_for_model(model=model) for sample in samples_cache.samples
+        ] == sampler.backend.get_chain(flat=True).tolist()
+        assert [
+            sample.log_likelihood for sample in samples_cache.samples
+        ] == sampler.backend.get_log_prob(flat=True).tolist()
+        assert samples_cache.previous_auto_correlation_times is first_auto_correlation_times
+
+    def test__backend_overwritten__cache_resets(self, tmp_path):
+        filename = str(tmp_path / "emcee.hdf")
+        sampler = self.make_sampler(filename=filename)
+        model = af.ModelMapper(mock_class=mock.MockClassx4)
+
+        samples_cache = EmceeSamplesCache(
+            filename=filename,
+            model=model,
+            auto_correlation_check_size=100,
+            auto_correlation_required_length=50,
+        )
+
+        sampler.run_mcmc(initial_state=np.random.uniform(0.4, 0.6, size=(10, 4)), nsteps=50)
+        samples_cache.update(backend=sampler.backend)
+
+        sampler.backend.reset(nwalkers=10, ndim=4)
+        sampler.run_mcmc(initial_state=np.random.uniform(0.4, 0.6, size=(10, 4)), nsteps=20)
+        samples_cache.update(backend=sampler.backend)
+
+        assert samples_cache.total_steps == 20
+        assert len(samples_cache.samples) == 200
+
+        with pytest.raises(IndexError):
+            samples_cache.previous_auto_correlation_times
+
+
 class TestCopyWithNameExtension:
     @staticmethod
     def assert_non_linear_attributes_equal(copy):
@@ -192,4 +269,5 @@ class TestCopyWithNameExtension:
             copy.auto_correlation_change_threshold
             is search.auto_correlation_change_threshold
         )
+        assert copy.convergence_monitors is search.convergence_monitors
         assert copy.number_of_cores is search.number_of_cores
@@ -0,0 +1,287 @@
+import os
+
+import numpy as np
+import pytest
+from scipy.special import logsumexp
+
+import autofit as af
+from autofit.mock import mock
+from autofit.non_linear.mcmc.parallel_tempering import (
+    ParallelTempering,
+    ParallelTemperingCheckpoint,
+    ParallelTemperingSamplesCache,
+    thermodynamic_integration_log_evidence,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
+
+
+class BimodalAnalysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return logsumexp(
+            [-0.5 * ((instance.one + 3.0) / 0.5) ** 2, -0.5 * ((instance.one - 3.0) / 0.5) ** 2]
+        ) - 0.5 * instance.two ** 2
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx2)
+    model.one = af.UniformPrior(lower_limit=-10.0, upper_limit=10.0)
+    model.two = af.UniformPrior(lower_limit=-10.0, upper_limit=10.0)
+    return model
+
+
+class TestParallelTemperingConfig:
+    def test__loads_from_config_file_correct(self):
+        search = af.ParallelTempering(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            nwalkers=51,
+            ntemps=5,
+            nsteps=2001,
+            max_temperature=100.0,
+            adapt_temperatures=False,
+            adaptation_lag=1000,
+            adaptation_time=10,
+            initializer=af.InitializerBall(lower_limit=0.2, upper_limit=0.8),
+            auto_correlation_check_for_convergence=False,
+            auto_correlation_check_size=101,
+            auto_correlation_required_length=51,
+            auto_correlation_change_threshold=0.02,
+            number_of_cores=2,
+        )
+
+        assert search.prior_passer.sigma == 2.0
+        assert search.nwalkers == 51
+        assert search.ntemps == 5
+        assert search.nsteps == 2001
+        assert search.max_temperature == 100.0
+        assert search.adapt_temperatures is False
+        assert search.adaptation_lag == 1000
+        assert search.adaptation_time == 10
+        assert isinstance(search.initializer, af.InitializerBall)
+        assert search.auto_correlation_check_for_convergence is False
+        assert search.auto_correlation_check_size == 101
+        assert search.auto_correlation_required_length == 51
+        assert search.auto_correlation_change_threshold == 0.02
+        assert search.number_of_cores == 2
+
+        search = af.ParallelTempering()
+
+        assert search.prior_passer.sigma == 3.0
+        assert search.nwalkers == 20
+        assert search.ntemps == 4
+        assert search.nsteps == 200
+        assert search.max_temperature == 1000.0
+        assert search.adapt_temperatures is True
+        assert search.adaptation_lag == 10000
+        assert search.adaptation_time == 100
+        assert isinstance(search.initializer, af.InitializerBall)
+        assert search.iterations_per_update == 50
+        assert search.number_of_cores == 1
+
+    def test__tag(self):
+        search = af.ParallelTempering(nwalkers=51, ntemps=5)
+
+        assert search.tag == "parallel_tempering[nwalkers_51_ntemps_5]"
+
+    def test__copy_with_name_extension(self):
+        search = af.ParallelTempering(af.Paths("name"), ntemps=5, max_temperature=100.0)
+
+        copy = search.copy_with_name_extension("one")
+
+        assert isinstance(copy, af.ParallelTempering)
+        assert copy.prior_passer is search.prior_passer
+        assert copy.nwalkers == search.nwalkers
+        assert copy.ntemps == 5
+        assert copy.max_temperature == 100.0
+        assert copy.adapt_temperatures == search.adapt_temperatures
+        assert copy.initializer is search.initializer
+        assert copy.number_of_cores == search.number_of_cores
+
+
+class TestTemperatureLadder:
+    def test__initial_betas_geometric(self):
+        search = af.ParallelTempering(ntemps=3, max_temperature=100.0)
+
+        assert search.initial_betas == pytest.approx([1.0, 0.1, 0.01])
+
+    def test__equal_log_likelihoods__every_swap_accepted(self):
+        positions = np.arange(2 * 4 * 1, dtype=float).reshape(2, 4, 1)
+        log_likelihoods = np.zeros((2, 4))
+        log_priors = np.zeros((2, 4))
+
+        swap_acceptance = ParallelTempering.swap(
+            positions=positions,
+            log_likelihoods=log_likelihoods,
+            log_priors=log_priors,
+            betas=np.array([1.0, 0.5]),
+        )
+
+        assert swap_acceptance == pytest.approx([1.0])
+        assert sorted(positions[0, :, 0]) == [4.0, 5.0, 6.0, 7.0]
+
+    def test__hot_walkers_much_worse__no_swaps(self):
+        positions = np.zeros((2, 4, 1))
+        log_likelihoods = np.array([[0.0] * 4, [-1.0e8] * 4])
+
+        swap_acceptance = ParallelTempering.swap(
+            positions=positions,
+            log_likelihoods=log_likelihoods,
+            log_priors=np.zeros((2, 4)),
+            betas=np.array([1.0, 0.5]),
+        )
+
+        assert swap_acceptance == pytest.approx([0.0])
+        assert (log_likelihoods[0] == 0.0).all()
+
+    def test__adapted_betas__spacing_increased_where_swaps_accepted_more_often(self):
+        search = af.ParallelTempering(adaptation_lag=10, adaptation_time=1)
+
+        betas = np.array([1.0, 0.5, 0.25, 0.125])
+
+        adapted_betas = search.adapted_betas(
+            betas=betas, swap_acceptance=np.array([0.9, 0.1, 0.5]), step=0
+        )
+
+        assert adapted_betas[0] == 1.0
+        assert adapted_betas[-1] == 0.125
+        assert adapted_betas[1] < 0.5
+        assert (np.diff(adapted_betas) < 0.0).all()
+
+
+def test__thermodynamic_integration_log_evidence():
+    log_evidence, log_evidence_error = thermodynamic_integration_log_evidence(
+        betas=np.array([1.0, 0.5, 0.25]), mean_log_likelihoods=[-2.0, -2.0, -2.0]
+    )
+
+    assert log_evidence == pytest.approx(-2.0)
+    assert log_evidence_error == pytest.approx(0.0)
+
+    log_evidence, _ = thermodynamic_integration_log_evidence(
+        betas=np.array([1.0, 0.5, 0.0]), mean_log_likelihoods=[-1.0, -3.0, -5.0]
+    )
+
+    assert log_evidence == pytest.approx(-3.0)
+
+
+class TestParallelTemperingCheckpoint:
+    def test__append_and_load__chains_of_every_temperature_restored(self, tmp_path):
+        checkpoint = ParallelTemperingCheckpoint(samples_path=str(tmp_path))
+
+        chains = np.arange(3 * 2 * 4 * 2, dtype=float).reshape(3, 2, 4, 2)
+
+        checkpoint.append(
+            chains=chains,
+            log_likelihoods=chains[..., 0],
+            betas=np.tile([1.0, 0.5], (3, 1)),
+            positions=chains[-1],
+            current_log_likelihoods=chains[-1, ..., 0],
+            current_log_priors=np.zeros((2, 4)),
+        )
+
+        with open(checkpoint.chain_file(temperature=1), "ab") as f:
+            np.zeros(8).tofile(f)
+
+        checkpoint = ParallelTemperingCheckpoint(samples_path=str(tmp_path))
+        checkpoint.load()
+
+        assert checkpoint.total_steps == 3
+        assert checkpoint.ntemps == 2
+        assert (checkpoint.chain(temperature=0) == chains[:, 0]).all()
+        assert (checkpoint.chain(temperature=1) == chains[:, 1]).all()
+        assert (checkpoint.log_likelihoods(temperature=1) == chains[:, 1, :, 0]).all()
+        assert checkpoint.betas.shape == (3, 2)
+
+        checkpoint.remove()
+
+        assert os.listdir(str(tmp_path)) == []
+
+    def test__read_from_step__earlier_steps_skipped(self, tmp_path):
+        checkpoint = ParallelTemperingCheckpoint(samples_path=str(tmp_path))
+
+        chains = np.arange(3 * 2 * 4 * 2, dtype=float).reshape(3, 2, 4, 2)
+        betas = np.array([[1.0, 0.5], [1.0, 0.4], [1.0, 0.3]])
+
+        checkpoint.append(
+            chains=chains,
+            log_likelihoods=chains[..., 0],
+            betas=betas,
+            positions=chains[-1],
+            current_log_likelihoods=chains[-1, ..., 0],
+            current_log_priors=np.zeros((2, 4)),
+        )
+
+        assert (checkpoint.chain(temperature=1, start=1) == chains[1:, 1]).all()
+        assert (checkpoint.log_likelihoods(temperature=0, start=2) == chains[2:, 0, :, 0]).all()
+        assert (checkpoint.betas_from_step(start=1) == betas[1:]).all()
+        assert checkpoint.chain(temperature=0, start=3).shape == (0, 4, 2)
+
+
+class TestParallelTemperingSamplesCache:
+    def test__incremental_updates__match_single_update(self, tmp_path, model):
+        np.random.seed(1)
+
+        chains = np.random.uniform(-1.0, 1.0, size=(6, 2, 4, 2))
+        log_likelihoods = np.random.uniform(-3.0, -1.0, size=(6, 2, 4))
+        betas = np.array([[1.0, 0.5 - 0.05 * step] for step in range(6)])
+
+        checkpoint = ParallelTemperingCheckpoint(samples_path=str(tmp_path))
+        incremental_cache = ParallelTemperingSamplesCache(
+            samples_path=str(tmp_path), model=model, auto_correlation_check_size=2, auto_correlation_required_length=2
+        )
+
+        for steps in (slice(0, 4), slice(4, 6)):
+            checkpoint.append(
+                chains=chains[steps],
+                log_likelihoods=log_likelihoods[steps],
+                betas=betas[steps],
+                positions=chains[steps][-1],
+                current_log_likelihoods=log_likelihoods[steps][-1],
+                current_log_priors=np.zeros((2, 4)),
+            )
+            incremental_cache.update(checkpoint=checkpoint)
+
+        single_cache = ParallelTemperingSamplesCache(
+            samples_path=str(tmp_path), model=model, auto_correlation_check_size=2, auto_correlation_required_length=2
+        )
+        single_cache.update(checkpoint=checkpoint)
+
+        assert incremental_cache.total_steps == single_cache.total_steps == 6
+        assert incremental_cache.total_walkers == 4
+        assert [sample.kwargs for sample in incremental_cache.samples] == [
+            sample.kwargs for sample in single_cache.samples
+        ]
+        assert incremental_cache.samples[5].log_likelihood == log_likelihoods[1, 0, 1]
+
+        step_log_evidences = [
+            thermodynamic_integration_log_evidence(
+                betas=betas[step], mean_log_likelihoods=np.mean(log_likelihoods[step], axis=1)
+            )[0]
+            for step in range(3, 6)
+        ]
+
+        assert incremental_cache.log_evidence == pytest.approx(np.mean(step_log_evidences))
+        assert single_cache.log_evidence == pytest.approx(incremental_cache.log_evidence)
+
+
+class TestFit:
+    def test__bimodal_posterior__both_modes_in_cold_chain(self, model):
+        np.random.seed(1)
+
+        search = af.ParallelTempering(
+            af.Paths("parallel_tempering"),
+            nwalkers=10,
+            nsteps=100,
+            initializer=af.InitializerBall(lower_limit=0.6, upper_limit=0.7),
+            auto_correlation_check_for_convergence=False,
+        )
+
+        samples = search.fit(model=model, analysis=BimodalAnalysis()).samples
+
+        one = np.asarray(samples.parameters)[:, 0]
+        second_half = one[len(one) // 2:]
+
+        assert len(samples.parameters) == 100 * 10
+        assert np.mean(second_half < 0.0) > 0.2
+        assert np.mean(second_half > 0.0) > 0.2
+        assert np.isfinite(samples.log_evidence)
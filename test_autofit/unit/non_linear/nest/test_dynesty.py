@@ -8,6 +8,12 @@ import pytest
 import autofit as af
 from autoconf import conf
 from autofit.mock import mock
+from autofit.non_linear.nest.dynesty import (
+    DynestyCheckpoint,
+    DynestyPool,
+    DynestyPriorTransform,
+    DynestySnapshot,
+)
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -62,6 +68,8 @@ class TestDynestyConfig:
             terminate_at_acceptance_ratio=False,
             acceptance_ratio_threshold=0.5,
             number_of_cores=2,
+            queue_size=3,
+            chunk_size=4,
         )
 
         assert dynesty.prior_passer.sigma == 2.0
@@ -89,6 +97,8 @@ class TestDynestyConfig:
         assert dynesty.terminate_at_acceptance_ratio == False
         assert dynesty.acceptance_ratio_threshold == 0.5
         assert dynesty.number_of_cores == 2
+        assert dynesty.queue_size == 3
+        assert dynesty.chunk_size == 4
 
         dynesty = af.DynestyStatic()
 
@@ -117,6 +127,8 @@ class TestDynestyConfig:
         assert dynesty.terminate_at_acceptance_ratio == True
         assert dynesty.acceptance_ratio_threshold == 2.0
         assert dynesty.number_of_cores == 1
+        assert dynesty.queue_size == 2
+        assert dynesty.chunk_size is None
 
         dynesty = af.DynestyDynamic(
             prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
@@ -196,6 +208,8 @@ class TestDynestyConfig:
         assert dynesty.terminate_at_acceptance_ratio == True
         assert dynesty.acceptance_ratio_threshold == 2.0
         assert dynesty.number_of_cores == 4
+        assert dynesty.queue_size == 4
+        assert dynesty.chunk_size == 2
 
     def test__tag(self):
         dynesty = af.DynestyStatic(
@@ -366,6 +380,8 @@ class TestCopyWithNameExtension:
         assert copy.fmove == search.fmove
         assert copy.max_move == search.max_move
         assert copy.number_of_cores == search.number_of_cores
+        assert copy.queue_size == search.queue_size
+        assert copy.chunk_size == search.chunk_size
 
         search = af.DynestyDynamic(af.Paths("name"))
 
@@ -393,3 +409,184 @@ class TestCopyWithNameExtension:
         assert copy.fmove == search.fmove
         assert copy.max_move == search.max_move
         assert copy.number_of_cores == search.number_of_cores
+
+
+def log_likelihood(x):
+    return -0.5 * np.sum((x - 0.5) ** 2) / 0.01
+
+
+def prior_transform(u):
+    return u
+
+
+@pytest.fixture(name="sampler")
+def make_sampler():
+    from dynesty import NestedSampler
+
+    np.random.seed(1)
+
+    return NestedSampler(
+        log_likelihood, prior_transform, ndim=2, nlive=20, bound="multi", rstate=np.random
+    )
+
+
+class TestDynestyPool:
+    def test__prior_transform__batch_matches_each_point(self):
+        model = af.ModelMapper(mock_class=mock.MockClassx4)
+        model.mock_class.one = af.UniformPrior(lower_limit=-1.0, upper_limit=1.0)
+        model.mock_class.two = af.GaussianPrior(mean=1.0, sigma=2.0)
+        model.mock_class.three = af.LogUniformPrior(lower_limit=1e-2, upper_limit=10.0)
+
+        prior_transform = DynestyPriorTransform(model=model)
+
+        cubes = np.array([[0.5, 0.5, 0.5, 0.5], [0.25, 0.9, 0.1, 0.8]])
+
+        assert prior_transform.batch(cubes=cubes) == pytest.approx(
+            np.array([model.vector_from_unit_vector(unit_vector=cube) for cube in cubes])
+        )
+        assert prior_transform(cubes[1]) == pytest.approx(
+            model.vector_from_unit_vector(unit_vector=cubes[1])
+        )
+
+    def test__sample_unif__same_points_as_dynesty(self):
+        from dynesty.dynesty import _function_wrapper
+        from dynesty.sampling import sample_unif
+
+        model = af.ModelMapper(mock_class=mock.MockClassx4)
+
+        prior_transform = _function_wrapper(DynestyPriorTransform(model=model), [], {})
+        log_likelihood_wrapper = _function_wrapper(log_likelihood, [], {})
+
+        args = [
+            (cube, 0.0, None, 1.0, prior_transform, log_likelihood_wrapper, {})
+            for cube in np.random.random((5, 4))
+        ]
+
+        queue = DynestyPool(size=5).map(sample_unif, args)
+
+        for point, arg in zip(queue, args):
+            cube, vector, log_likelihood_value, ncall, blob = sample_unif(arg)
+
+            assert point[0] == pytest.approx(cube)
+            assert point[1] == pytest.approx(vector)
+            assert point[2] == pytest.approx(log_likelihood_value)
+            assert point[3] == 1
+
+    def test__attach__sampler_uses_pool_and_queue_size(self, sampler):
+        sampler.rstate = None
+
+        pool = DynestyPool(size=3)
+        pool.attach(sampler=sampler)
+
+        assert sampler.pool is pool
+        assert sampler.queue_size == 3
+        assert sampler.rstate is np.random
+
+        sampler.run_nested(maxcall=100, print_progress=False)
+
+        assert np.sum(sampler.results.ncall) >= 100
+
+
+def fail_bound_updates(sampler, updates):
+    """Make the bound updates of a sampler numbered in `updates` corrupt its bound and raise an error."""
+    update = sampler.update
+    total_updates = [0]
+
+    def failing_update(pointvol):
+        total_updates[0] += 1
+
+        if total_updates[0] in updates:
+            sampler.mell.ells = []
+            raise np.linalg.LinAlgError
+
+        return update(pointvol)
+
+    sampler.update = failing_update
+
+
+class TestRunSampler:
+    def test__snapshot__bound_restored(self, sampler):
+        sampler.run_nested(maxcall=200, print_progress=False)
+
+        snapshot = DynestySnapshot(sampler=sampler)
+        ells = sampler.mell.ells
+
+        sampler.mell.ells = []
+        sampler.nqueue = 1
+
+        snapshot.restore(sampler=sampler)
+
+        assert len(sampler.mell.ells) == len(ells)
+        assert sampler.queue == []
+        assert sampler.nqueue == 0
+
+    def test__bounding_error__bound_rolled_back_and_samples_kept(self, sampler):
+        dynesty = af.DynestyStatic(evidence_tolerance=0.5)
+
+        enlarge = sampler.enlarge
+
+        fail_bound_updates(sampler=sampler, updates=(1, 2))
+
+        dynesty.run_sampler(sampler=sampler, maxcall=5000)
+
+        assert sampler.enlarge == pytest.approx(enlarge * 1.25 ** 2)
+        assert sampler.vol_dec == pytest.approx(0.5 / 4)
+        assert len(sampler.mell.ells) > 0
+        assert sampler.ncall < 5000
+        assert sampler.results.logz[-1] == pytest.approx(np.log(2.0 * np.pi * 0.01), abs=0.5)
+
+    def test__repeated_bounding_errors__raises_exception(self, sampler):
+        dynesty = af.DynestyStatic()
+
+        fail_bound_updates(sampler=sampler, updates=range(1000))
+
+        with pytest.raises(ValueError):
+            dynesty.run_sampler(sampler=sampler, maxcall=5000)
+
+
+class TestDynestyCheckpoint:
+    def test__save_and_load__sampler_restored(self, sampler, tmp_path):
+        checkpoint = DynestyCheckpoint(samples_path=str(tmp_path))
+
+        sampler.run_nested(maxcall=200, print_progress=False)
+        checkpoint.save(sampler=sampler)
+
+        dead_points_size = checkpoint.dead_points_size
+
+        sampler.run_nested(maxcall=400, print_progress=False)
+        checkpoint.save(sampler=sampler)
+
+        assert checkpoint.dead_points_size > dead_points_size
+
+        loaded = DynestyCheckpoint(samples_path=str(tmp_path)).load()
+
+        assert loaded.saved_logl == pytest.approx(sampler.saved_logl)
+        assert np.asarray(loaded.saved_u) == pytest.approx(np.asarray(sampler.saved_u))
+        assert loaded.live_logl == pytest.approx(sampler.live_logl)
+        assert len(loaded.bound) == len(sampler.bound)
+        assert loaded.added_live is True
+        assert loaded.propose_point.__self__ is loaded
+
+        loaded.loglikelihood = sampler.loglikelihood
+        loaded.rstate = np.random
+        loaded.run_nested(maxcall=100, print_progress=False)
+
+        assert np.sum(loaded.results.ncall) > np.sum(sampler.results.ncall)
+
+    def test__dead_points_appended_after_state__ignored(self, sampler, tmp_path):
+        checkpoint = DynestyCheckpoint(samples_path=str(tmp_path))
+
+        sampler.run_nested(maxcall=200, print_progress=False)
+        checkpoint.save(sampler=sampler)
+
+        with open(checkpoint.dead_points_file, "ab") as f:
+            pickle.dump({"saved_logl": [1.0]}, f)
+
+        checkpoint = DynestyCheckpoint(samples_path=str(tmp_path))
+        loaded = checkpoint.load()
+
+        assert len(loaded.saved_logl) == len(sampler.saved_logl)
+
+        checkpoint.save(sampler=loaded)
+
+        assert path.getsize(checkpoint.dead_points_file) == checkpoint.dead_points_size
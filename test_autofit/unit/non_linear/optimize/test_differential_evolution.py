@@ -0,0 +1,151 @@
+import os
+from os import path
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock import mock
+
+
+class Analysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return -((instance.one - 1.0) ** 2 + (instance.two - 2.0) ** 2)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx2)
+    model.one = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    model.two = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    return model
+
+
+class TestDifferentialEvolutionConfig:
+    def test__loads_from_config_file_correct(self):
+
+        de = af.DifferentialEvolution(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            population_size=51,
+            generations=2001,
+            mutation=0.4,
+            recombination=0.5,
+            tol=1e-6,
+            initializer=af.InitializerBall(lower_limit=0.2, upper_limit=0.8),
+            iterations_per_update=10,
+            number_of_cores=2,
+        )
+
+        assert de.prior_passer.sigma == 2.0
+        assert de.prior_passer.use_errors == False
+        assert de.prior_passer.use_widths == False
+        assert de.population_size == 51
+        assert de.generations == 2001
+        assert de.mutation == 0.4
+        assert de.recombination == 0.5
+        assert de.tol == 1e-6
+        assert isinstance(de.initializer, af.InitializerBall)
+        assert de.initializer.lower_limit == 0.2
+        assert de.initializer.upper_limit == 0.8
+        assert de.iterations_per_update == 10
+        assert de.number_of_cores == 2
+
+        de = af.DifferentialEvolution()
+
+        assert de.prior_passer.sigma == 3.0
+        assert de.prior_passer.use_errors == True
+        assert de.prior_passer.use_widths == True
+        assert de.population_size == 20
+        assert de.generations == 100
+        assert de.mutation == 0.5
+        assert de.recombination == 0.9
+        assert de.tol == 1e-3
+        assert isinstance(de.initializer, af.InitializerPrior)
+        assert de.iterations_per_update == 10
+        assert de.number_of_cores == 1
+
+    def test__population_too_small__raises_exception(self):
+        with pytest.raises(ValueError):
+            af.DifferentialEvolution(population_size=3)
+
+    def test__tag(self):
+        de = af.DifferentialEvolution(population_size=51, mutation=0.4, recombination=0.5)
+
+        assert de.tag == "differential_evolution[population_51_F_0.4_CR_0.5]"
+
+
+class TestTrialPopulation:
+    def test__recombination_zero__one_value_of_each_member_changed(self):
+        de = af.DifferentialEvolution(population_size=10, recombination=0.0)
+
+        unit_population = np.random.random((10, 3))
+
+        trial_population = de.trial_population(unit_population=unit_population)
+
+        assert trial_population.shape == (10, 3)
+        assert ((trial_population != unit_population).sum(axis=1) == 1).all()
+
+    def test__trial_points_within_unit_hypercube(self):
+        de = af.DifferentialEvolution(population_size=10, mutation=10.0, recombination=1.0)
+
+        trial_population = de.trial_population(unit_population=np.random.random((10, 3)))
+
+        assert ((trial_population >= 0.0) & (trial_population <= 1.0)).all()
+
+
+class TestFit:
+    def test__maximum_found_and_samples_output(self, model):
+        np.random.seed(1)
+
+        de = af.DifferentialEvolution(af.Paths("differential_evolution"), tol=1e-8)
+
+        result = de.fit(model=model, analysis=Analysis())
+
+        assert result.samples.max_log_likelihood_vector == pytest.approx([1.0, 2.0], abs=1.0e-2)
+        assert len(result.samples.parameters) == 20
+        assert result.samples.weights[0] == 1.0
+        assert not path.exists(de.state_file)
+
+    def test__resumed__same_generations_performed(self, model):
+        de = af.DifferentialEvolution(
+            af.Paths("differential_evolution"), generations=20, tol=-np.inf
+        )
+        de.remove_state_files_at_end = False
+
+        def fit(generations):
+            de.generations = generations
+            de.fit(model=model, analysis=Analysis())
+            de.paths.restore()
+            os.remove(de.paths.has_completed_path)
+
+        np.random.seed(1)
+        fit(generations=20)
+        population = de.state["population"]
+
+        de.remove_state_files()
+
+        np.random.seed(1)
+        fit(generations=10)
+        fit(generations=20)
+
+        assert int(de.state["total_generations"]) == 20
+        assert de.state["population"] == pytest.approx(population)
+
+
+class TestCopyWithNameExtension:
+    def test__differential_evolution(self):
+        search = af.DifferentialEvolution(af.Paths("name"))
+
+        copy = search.copy_with_name_extension("one")
+
+        assert copy.paths.name == path.join("name", "one")
+        assert isinstance(copy, af.DifferentialEvolution)
+        assert copy.prior_passer is search.prior_passer
+        assert copy.population_size is search.population_size
+        assert copy.generations is search.generations
+        assert copy.mutation == search.mutation
+        assert copy.recombination == search.recombination
+        assert copy.tol == search.tol
+        assert copy.initializer is search.initializer
+        assert copy.iterations_per_update is search.iterations_per_update
+        assert copy.number_of_cores is search.number_of_cores
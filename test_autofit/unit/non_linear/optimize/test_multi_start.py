@@ -0,0 +1,225 @@
+from os import path
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock import mock
+from autofit.non_linear.optimize.multi_start import LocalOptimization
+
+
+class BimodalAnalysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return np.logaddexp(
+            -0.5 * ((instance.one + 3.0) / 0.5) ** 2, -0.5 * ((instance.one - 3.0) / 0.5) ** 2 - 1.0
+        ) - 0.5 * (instance.two - 1.0) ** 2
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx2)
+    model.one = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    model.two = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    return model
+
+
+class TestMultiStartConfig:
+    def test__loads_from_config_file_correct(self):
+        search = af.MultiStart(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            number_of_starts=51,
+            method="Powell",
+            maxiter=10,
+            tol=1e-4,
+            duplicate_tolerance=0.1,
+            initializer=af.InitializerBall(lower_limit=0.2, upper_limit=0.8),
+            iterations_per_update=2,
+            number_of_cores=2,
+        )
+
+        assert search.prior_passer.sigma == 2.0
+        assert search.number_of_starts == 51
+        assert search.method == "Powell"
+        assert search.maxiter == 10
+        assert search.tol == 1e-4
+        assert search.duplicate_tolerance == 0.1
+        assert isinstance(search.initializer, af.InitializerBall)
+        assert search.iterations_per_update == 2
+        assert search.number_of_cores == 2
+
+        search = af.MultiStart()
+
+        assert search.prior_passer.sigma == 3.0
+        assert search.number_of_starts == 10
+        assert search.method == "L-BFGS-B"
+        assert search.maxiter == 200
+        assert search.tol == 1e-8
+        assert search.duplicate_tolerance == 1e-2
+        assert isinstance(search.initializer, af.InitializerPrior)
+        assert search.iterations_per_update == 5
+        assert search.number_of_cores == 1
+
+    def test__no_starts__raises_exception(self):
+        with pytest.raises(ValueError):
+            af.MultiStart(number_of_starts=0)
+
+    def test__tag(self):
+        search = af.MultiStart(number_of_starts=51, method="Powell")
+
+        assert search.tag == "multi_start[starts_51_Powell]"
+
+    def test__copy_with_name_extension(self):
+        search = af.MultiStart(af.Paths("name"), method="Powell")
+
+        copy = search.copy_with_name_extension("one")
+
+        assert copy.paths.name == path.join("name", "one")
+        assert isinstance(copy, af.MultiStart)
+        assert copy.prior_passer is search.prior_passer
+        assert copy.number_of_starts == search.number_of_starts
+        assert copy.method == "Powell"
+        assert copy.maxiter == search.maxiter
+        assert copy.tol == search.tol
+        assert copy.duplicate_tolerance == search.duplicate_tolerance
+        assert copy.initializer is search.initializer
+        assert copy.number_of_cores == search.number_of_cores
+
+
+class TestSolutions:
+    def test__unique_solution_indexes__duplicates_and_non_finite_removed(self):
+        search = af.MultiStart(duplicate_tolerance=0.01)
+
+        unique_indexes = search.unique_solution_indexes(
+            unit_solutions=np.array([[0.2, 0.5], [0.8, 0.5], [0.205, 0.5], [0.5, 0.5]]),
+            solution_log_posteriors=np.array([-1.0, -2.0, -0.9, -np.inf]),
+        )
+
+        assert unique_indexes == [2, 1]
+
+    def test__unique_solution_indexes__unsuccessful_removed_before_duplicates(self):
+        search = af.MultiStart(duplicate_tolerance=0.01)
+
+        unique_indexes = search.unique_solution_indexes(
+            unit_solutions=np.array([[0.2, 0.5], [0.205, 0.5], [0.8, 0.5]]),
+            solution_log_posteriors=np.array([-1.0, -0.9, -2.0]),
+            solution_successes=np.array([True, False, True]),
+        )
+
+        assert unique_indexes == [0, 2]
+
+    def test__local_optimization__converges_to_nearest_maximum(self, model):
+        search = af.MultiStart()
+
+        local_optimization = LocalOptimization(
+            fitness_function=search.fitness_function_from_model_and_analysis(
+                model=model, analysis=BimodalAnalysis()
+            ),
+            model=model,
+            method="L-BFGS-B",
+            maxiter=200,
+            tol=1e-8,
+        )
+
+        result = local_optimization(np.array([0.9, 0.5]))
+
+        assert result["unit_solution"] == pytest.approx([0.8, 0.6], abs=1.0e-3)
+        assert result["solution_log_posterior"] == pytest.approx(np.max(result["log_posteriors"]))
+        assert result["parameters"][0] == pytest.approx([4.0, 0.0])
+        assert result["success"] is True
+
+    def test__local_optimization__start_at_edge_of_unit_cube__physical_values_finite(self, model):
+        model.one = af.GaussianPrior(mean=0.0, sigma=1.0)
+
+        search = af.MultiStart()
+
+        local_optimization = LocalOptimization(
+            fitness_function=search.fitness_function_from_model_and_analysis(
+                model=model, analysis=BimodalAnalysis()
+            ),
+            model=model,
+            method="L-BFGS-B",
+            maxiter=200,
+            tol=1e-8,
+        )
+
+        result = local_optimization(np.array([0.0, 1.0]))
+
+        assert np.isfinite(result["parameters"]).all()
+        assert np.isfinite(result["solution_log_posterior"])
+
+    def test__local_optimization__failed_points__penalized_and_unsuccessful(self, model):
+        class FailingAnalysis(af.Analysis):
+            def log_likelihood_function(self, instance):
+                raise af.exc.FitException
+
+        search = af.MultiStart()
+
+        local_optimization = LocalOptimization(
+            fitness_function=search.fitness_function_from_model_and_analysis(
+                model=model, analysis=FailingAnalysis()
+            ),
+            model=model,
+            method="L-BFGS-B",
+            maxiter=200,
+            tol=1e-8,
+        )
+
+        result = local_optimization(np.array([0.5, 0.5]))
+
+        assert result["solution_log_posterior"] == -np.inf
+        assert result["success"] is False
+        assert (result["log_posteriors"] == -np.inf).all()
+
+
+class TestFit:
+    def test__both_modes_found__best_mode_is_maximum(self, model):
+        np.random.seed(1)
+
+        search = af.MultiStart(af.Paths("multi_start"))
+
+        samples = search.fit(model=model, analysis=BimodalAnalysis()).samples
+
+        assert samples.total_starts == 10
+        assert len(samples.solutions) == 2
+        assert samples.solutions[0] == pytest.approx([-3.0, 1.0], abs=1.0e-3)
+        assert samples.solutions[1] == pytest.approx([3.0, 1.0], abs=1.0e-3)
+        assert samples.solution_log_posteriors[0] > samples.solution_log_posteriors[1]
+        assert samples.max_log_likelihood_vector == pytest.approx([-3.0, 1.0], abs=1.0e-3)
+        assert samples.total_samples > 10
+
+    def test__resumed__only_unfinished_starts_run(self, model, monkeypatch):
+        search = af.MultiStart(af.Paths("multi_start"))
+        search.remove_state_files_at_end = False
+
+        np.random.seed(1)
+        search.fit(model=model, analysis=BimodalAnalysis())
+        search.paths.restore()
+
+        trajectories = search.state["trajectories"]
+
+        search_terminated = af.MultiStart(af.Paths("multi_start_terminated"))
+        search_terminated.remove_state_files_at_end = False
+
+        perform_update = af.MultiStart.perform_update
+
+        def terminate_after_first_update(self, model, analysis, during_analysis):
+            perform_update(self, model=model, analysis=analysis, during_analysis=during_analysis)
+            raise KeyboardInterrupt
+
+        np.random.seed(1)
+
+        with monkeypatch.context() as m:
+            m.setattr(af.MultiStart, "perform_update", terminate_after_first_update)
+
+            with pytest.raises(KeyboardInterrupt):
+                search_terminated.fit(model=model, analysis=BimodalAnalysis())
+
+        search_terminated.paths.restore()
+
+        assert np.count_nonzero(search_terminated.state["finished"]) == 5
+
+        search_terminated.fit(model=model, analysis=BimodalAnalysis())
+        search_terminated.paths.restore()
+
+        assert search_terminated.state["finished"].all()
+        assert search_terminated.state["trajectories"] == pytest.approx(trajectories)
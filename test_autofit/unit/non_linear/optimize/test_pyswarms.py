@@ -1,9 +1,14 @@
 from os import path
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 
 from autoconf import conf
 import autofit as af
 from autofit.mock import mock
+from autofit.non_linear.convergence import BestStagnation, convergence_states_from, load_convergence_states
+from autofit.non_linear.optimize.pyswarms import PySwarmsCheckpoint
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -149,6 +154,25 @@ class TestPySwarmsGlobalConfig:
         assert len(samples.parameters) == 500
         assert len(samples.log_likelihoods) == 500
 
+    def test__samples_from_model__global_best_positions(self, tmp_path, monkeypatch):
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+
+        checkpoint.append(
+            swarm=make_swarm(0.3),
+            points=[np.full((2, 3), 0.9), np.full((2, 3), 0.8)],
+            best_positions=[np.full(3, 0.2), np.full(3, 0.3)],
+            log_posteriors=[-2.0, -1.0],
+        )
+
+        monkeypatch.setattr(af.PySwarmsGlobal, "checkpoint", checkpoint)
+
+        model = af.ModelMapper(mock_class=mock.MockClassx3)
+
+        samples = af.PySwarmsGlobal(paths=af.Paths()).samples_via_sampler_from_model(model=model)
+
+        assert samples.parameters == [[0.2, 0.2, 0.2], [0.3, 0.3, 0.3]]
+        assert samples.max_log_likelihood_vector == pytest.approx(list(checkpoint.state["best_pos"]))
+
 
 class TestCopyWithNameExtension:
     @staticmethod
@@ -170,4 +194,109 @@ class TestCopyWithNameExtension:
         assert copy.ftol is search.ftol
         assert copy.initializer is search.initializer
         assert copy.iterations_per_update is search.iterations_per_update
+        assert copy.convergence_monitors is search.convergence_monitors
         assert copy.number_of_cores is search.number_of_cores
+
+
+def make_swarm(value):
+    return SimpleNamespace(
+        position=np.full((2, 3), value),
+        velocity=np.full((2, 3), -value),
+        pbest_pos=np.full((2, 3), value),
+        pbest_cost=np.full(2, value),
+        best_pos=np.full(3, value),
+        best_cost=value,
+    )
+
+
+class TestPySwarmsCheckpoint:
+    def test__append_and_load__history_and_swarm_state_restored(self, tmp_path):
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+
+        checkpoint.append(
+            swarm=make_swarm(1.0),
+            points=[np.full((2, 3), 0.0), np.full((2, 3), 1.0)],
+            best_positions=[np.full(3, 0.5), np.full(3, 1.5)],
+            log_posteriors=[-2.0, -1.0],
+        )
+        checkpoint.append(
+            swarm=make_swarm(2.0),
+            points=[np.full((2, 3), 2.0)],
+            best_positions=[np.full(3, 2.5)],
+            log_posteriors=[0.0],
+        )
+
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+        checkpoint.load()
+
+        assert checkpoint.total_iterations == 3
+        assert [points[0, 0] for points in checkpoint.points] == [0.0, 1.0, 2.0]
+        assert [best_position[0] for best_position in checkpoint.best_positions] == [0.5, 1.5, 2.5]
+        assert list(checkpoint.log_posteriors) == [-2.0, -1.0, 0.0]
+
+        state = checkpoint.state
+
+        assert (state["position"] == 2.0).all()
+        assert (state["velocity"] == -2.0).all()
+        assert state["best_cost"] == 2.0
+
+    def test__convergence_states__output_with_swarm_state(self, tmp_path):
+        monitor = BestStagnation(iterations=3)
+        monitor.update(points=None, log_posteriors=[1.0, 1.0])
+
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+
+        checkpoint.append(
+            swarm=make_swarm(0.0),
+            points=[np.full((2, 3), 0.0)],
+            best_positions=[np.full(3, 0.0)],
+            log_posteriors=[-1.0],
+            convergence_states=convergence_states_from(convergence_monitors=[monitor]),
+        )
+
+        restored_monitor = BestStagnation(iterations=3)
+
+        assert load_convergence_states(
+            convergence_monitors=[restored_monitor], states=checkpoint.state["convergence_states"].tobytes()
+        ) is True
+        assert restored_monitor.best_log_posterior == 1.0
+        assert restored_monitor.iterations_without_improvement == 1
+
+    def test__history_size__only_latest_iterations_held(self, tmp_path):
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path), history_size=2)
+
+        checkpoint.append(
+            swarm=make_swarm(2.0),
+            points=[np.full((2, 3), value) for value in (0.0, 1.0, 2.0)],
+            best_positions=[np.full(3, value) for value in (0.0, 1.0, 2.0)],
+            log_posteriors=[-2.0, -1.0, 0.0],
+        )
+
+        assert list(checkpoint.log_posteriors) == [-1.0, 0.0]
+
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path), history_size=2)
+        checkpoint.load()
+
+        assert checkpoint.total_iterations == 3
+        assert [points[0, 0] for points in checkpoint.points] == [1.0, 2.0]
+        assert list(checkpoint.log_posteriors) == [-1.0, 0.0]
+
+    def test__history_appended_after_state__removed_on_load(self, tmp_path):
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+
+        checkpoint.append(
+            swarm=make_swarm(0.0),
+            points=[np.full((2, 3), 0.0)],
+            best_positions=[np.full(3, 0.0)],
+            log_posteriors=[-1.0],
+        )
+
+        with open(checkpoint.points_file, "ab") as f:
+            np.full((2, 3), 1.0).tofile(f)
+
+        checkpoint = PySwarmsCheckpoint(samples_path=str(tmp_path))
+        checkpoint.load()
+
+        assert checkpoint.total_iterations == 1
+        assert len(checkpoint.points) == 1
+        assert path.getsize(checkpoint.points_file) == 6 * 8
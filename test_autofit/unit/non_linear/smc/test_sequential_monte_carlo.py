@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.graphical.sampling import effective_sample_size
+from autofit.mock import mock
+from autofit.non_linear.smc.sequential_monte_carlo import systematic_resample
+
+
+class GaussianAnalysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return -0.5 * (instance.one ** 2 + instance.two ** 2) - np.log(2.0 * np.pi)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx2)
+    model.one = af.UniformPrior(lower_limit=-10.0, upper_limit=10.0)
+    model.two = af.UniformPrior(lower_limit=-10.0, upper_limit=10.0)
+    return model
+
+
+class TestSequentialMonteCarloConfig:
+    def test__loads_from_config_file_correct(self):
+        smc = af.SequentialMonteCarlo(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            number_of_particles=501,
+            ess_threshold=0.8,
+            mcmc_steps=3,
+            target_acceptance=0.3,
+            iterations_per_update=10,
+            number_of_cores=2,
+        )
+
+        assert smc.prior_passer.sigma == 2.0
+        assert smc.number_of_particles == 501
+        assert smc.ess_threshold == 0.8
+        assert smc.mcmc_steps == 3
+        assert smc.target_acceptance == 0.3
+        assert isinstance(smc.initializer, af.InitializerPrior)
+        assert smc.iterations_per_update == 10
+        assert smc.number_of_cores == 2
+
+        smc = af.SequentialMonteCarlo()
+
+        assert smc.prior_passer.sigma == 3.0
+        assert smc.number_of_particles == 200
+        assert smc.ess_threshold == 0.5
+        assert smc.mcmc_steps == 5
+        assert smc.target_acceptance == 0.234
+        assert smc.iterations_per_update == 2
+        assert smc.number_of_cores == 1
+
+    def test__ess_threshold_outside_unit_interval__raises_exception(self):
+        with pytest.raises(ValueError):
+            af.SequentialMonteCarlo(ess_threshold=1.0)
+
+    def test__tag(self):
+        smc = af.SequentialMonteCarlo(number_of_particles=501, ess_threshold=0.8)
+
+        assert smc.tag == "smc[particles_501_ess_0.8]"
+
+    def test__copy_with_name_extension(self):
+        search = af.SequentialMonteCarlo(af.Paths("name"), mcmc_steps=3)
+
+        copy = search.copy_with_name_extension("one")
+
+        assert isinstance(copy, af.SequentialMonteCarlo)
+        assert copy.prior_passer is search.prior_passer
+        assert copy.number_of_particles == search.number_of_particles
+        assert copy.ess_threshold == search.ess_threshold
+        assert copy.mcmc_steps == 3
+        assert copy.target_acceptance == search.target_acceptance
+        assert copy.number_of_cores == search.number_of_cores
+
+
+class TestTempering:
+    def test__next_beta__ess_reduced_to_threshold(self):
+        smc = af.SequentialMonteCarlo(number_of_particles=100, ess_threshold=0.5)
+
+        log_likelihoods = np.random.normal(scale=10.0, size=100)
+        log_weights = np.full(100, -np.log(100))
+
+        beta = smc.next_beta(beta=0.0, log_likelihoods=log_likelihoods, log_weights=log_weights)
+
+        assert 0.0 < beta < 1.0
+        assert effective_sample_size(
+            np.exp(beta * (log_likelihoods - log_likelihoods.max()))
+        ) == pytest.approx(50.0, rel=1.0e-4)
+
+    def test__next_beta__reweighting_to_one_keeps_ess__returns_one(self):
+        smc = af.SequentialMonteCarlo(number_of_particles=100, ess_threshold=0.5)
+
+        beta = smc.next_beta(
+            beta=0.5, log_likelihoods=np.full(100, -3.0), log_weights=np.full(100, -np.log(100))
+        )
+
+        assert beta == 1.0
+
+    def test__systematic_resample__counts_within_one_of_expected(self):
+        weights = np.array([0.5, 0.25, 0.125, 0.125, 0.0])
+
+        indexes = systematic_resample(weights=weights)
+
+        counts = np.bincount(indexes, minlength=5)
+
+        assert counts.sum() == 5
+        assert (np.abs(counts - 5 * weights) < 1.0).all()
+        assert counts[4] == 0
+
+
+class TestFit:
+    def test__gaussian__posterior_and_evidence(self, model):
+        np.random.seed(1)
+
+        smc = af.SequentialMonteCarlo(af.Paths("smc"), number_of_particles=300)
+
+        samples = smc.fit(model=model, analysis=GaussianAnalysis()).samples
+
+        assert samples.betas[0] == 0.0
+        assert samples.betas[-1] == 1.0
+        assert samples.log_evidence == pytest.approx(-np.log(400.0), abs=0.3)
+        assert sum(samples.weights) == pytest.approx(1.0)
+        assert samples.median_pdf_vector == pytest.approx([0.0, 0.0], abs=0.3)
+        assert samples.total_samples > 300
+
+    def test__resumed__same_stages_performed(self, model, monkeypatch):
+        smc = af.SequentialMonteCarlo(
+            af.Paths("smc"), number_of_particles=100, iterations_per_update=1
+        )
+        smc.remove_state_files_at_end = False
+
+        np.random.seed(1)
+        smc.fit(model=model, analysis=GaussianAnalysis())
+        smc.paths.restore()
+
+        betas = smc.state["betas"]
+        particles = smc.state["particles"]
+
+        np.random.seed(1)
+        smc_terminated = af.SequentialMonteCarlo(
+            af.Paths("smc_terminated"), number_of_particles=100, iterations_per_update=1
+        )
+        smc_terminated.remove_state_files_at_end = False
+
+        perform_update = af.SequentialMonteCarlo.perform_update
+
+        def terminate_after_second_stage(self, model, analysis, during_analysis):
+            perform_update(self, model=model, analysis=analysis, during_analysis=during_analysis)
+            if len(self.state["betas"]) == 3:
+                raise KeyboardInterrupt
+
+        with monkeypatch.context() as m:
+            m.setattr(af.SequentialMonteCarlo, "perform_update", terminate_after_second_stage)
+
+            with pytest.raises(KeyboardInterrupt):
+                smc_terminated.fit(model=model, analysis=GaussianAnalysis())
+
+        smc_terminated.paths.restore()
+        smc_terminated.fit(model=model, analysis=GaussianAnalysis())
+        smc_terminated.paths.restore()
+
+        assert smc_terminated.state["betas"] == pytest.approx(betas)
+        assert smc_terminated.state["particles"] == pytest.approx(particles)
@@ -0,0 +1,111 @@
+import os
+import zipfile
+from os import path
+
+import pytest
+
+from autofit.non_linear.archive import ZipArchive
+
+
+@pytest.fixture(name="directory")
+def make_directory(tmp_path):
+    directory = tmp_path / "output"
+    os.makedirs(directory / "samples")
+
+    with open(directory / "metadata", "w") as f:
+        f.write("name=phase")
+
+    with open(directory / "samples" / "samples.csv", "w") as f:
+        f.write("0.1,0.2")
+
+    with open(directory / "samples" / "emcee.hdf", "wb") as f:
+        f.write(b"0" * 1000)
+
+    return str(directory)
+
+
+@pytest.fixture(name="archive")
+def make_archive(directory):
+    return ZipArchive(zip_path=f"{directory}.zip", directory=directory)
+
+
+def write_with_new_mtime(filename, text):
+    mtime_ns = os.stat(filename).st_mtime_ns
+
+    with open(filename, "w") as f:
+        f.write(text)
+
+    os.utime(filename, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+
+
+class TestUpdate:
+    def test__new_archive__contains_files__compressed_files_stored(self, archive):
+        archive.update()
+
+        with zipfile.ZipFile(archive.zip_path) as f:
+            assert sorted(f.namelist()) == ["metadata", "samples/emcee.hdf", "samples/samples.csv"]
+            assert f.getinfo("samples/emcee.hdf").compress_type == zipfile.ZIP_STORED
+            assert f.getinfo("samples/samples.csv").compress_type == zipfile.ZIP_DEFLATED
+
+    def test__unchanged__archive_not_written(self, archive):
+        archive.update()
+        mtime_ns = os.stat(archive.zip_path).st_mtime_ns
+
+        archive.update()
+
+        assert os.stat(archive.zip_path).st_mtime_ns == mtime_ns
+
+    def test__changed_file__only_changed_file_appended(self, archive, directory):
+        archive.update()
+
+        write_with_new_mtime(path.join(directory, "samples", "samples.csv"), "0.3,0.4")
+
+        archive.update()
+
+        with zipfile.ZipFile(archive.zip_path) as f:
+            assert len(f.infolist()) == 4
+
+        assert archive.read("samples/samples.csv") == b"0.3,0.4"
+
+    def test__removed_file__archive_rewritten(self, archive, directory):
+        archive.update()
+
+        os.remove(path.join(directory, "samples", "emcee.hdf"))
+
+        archive.update()
+
+        assert sorted(archive.names) == ["metadata", "samples/samples.csv"]
+
+    def test__empty_directory__archive_unchanged(self, archive, directory):
+        archive.update()
+
+        for name in ("metadata", "samples/samples.csv", "samples/emcee.hdf"):
+            os.remove(path.join(directory, name))
+
+        archive.update()
+
+        assert len(archive.names) == 3
+
+
+class TestExtract:
+    def test__extracts_latest_files_with_mtimes(self, archive, directory):
+        archive.update()
+        write_with_new_mtime(path.join(directory, "samples", "samples.csv"), "0.3,0.4")
+        archive.update()
+
+        stamp = ZipArchive.stamp_from_file(path.join(directory, "samples", "samples.csv"))
+
+        os.remove(path.join(directory, "samples", "samples.csv"))
+
+        archive.extract()
+
+        with open(path.join(directory, "samples", "samples.csv")) as f:
+            assert f.read() == "0.3,0.4"
+
+        assert ZipArchive.stamp_from_file(path.join(directory, "samples", "samples.csv")) == stamp
+
+    def test__read_missing_file__raises_file_not_found(self, archive):
+        archive.update()
+
+        with pytest.raises(FileNotFoundError):
+            archive.read("nonsense")
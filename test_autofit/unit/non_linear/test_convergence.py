@@ -0,0 +1,202 @@
+import os
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock import mock
+from autofit.non_linear.convergence import (
+    BestStagnation,
+    EffectiveSampleSize,
+    GelmanRubin,
+    SwarmDiameter,
+    convergence_states_from,
+    load_convergence_states,
+    update_convergence,
+)
+
+
+pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
+
+
+class Analysis(af.Analysis):
+    def log_likelihood_function(self, instance):
+        return -0.5 * ((instance.one - 1.0) ** 2 + (instance.two - 2.0) ** 2)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.MockClassx2)
+    model.one = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    model.two = af.UniformPrior(lower_limit=-5.0, upper_limit=5.0)
+    return model
+
+
+class TestSwarmDiameter:
+    def test__converged_once_swarm_collapsed_relative_to_first_update(self):
+        monitor = SwarmDiameter(threshold=0.1)
+
+        points = np.random.uniform(-1.0, 1.0, size=(2, 10, 2))
+
+        assert monitor.update(points=points, log_posteriors=np.zeros(2)) is False
+        assert monitor.update(points=0.01 * points, log_posteriors=np.zeros(2)) is True
+
+        monitor.reset()
+
+        assert monitor.update(points=0.01 * points, log_posteriors=np.zeros(2)) is False
+
+
+class TestBestStagnation:
+    def test__converged_after_iterations_without_improvement(self):
+        monitor = BestStagnation(iterations=3, tolerance=0.1)
+
+        assert monitor.update(points=None, log_posteriors=[1.0, 2.0, 2.05]) is False
+        assert monitor.update(points=None, log_posteriors=[2.05, 1.0]) is True
+
+    def test__walker_log_posteriors__maximum_of_each_iteration_used(self):
+        monitor = BestStagnation(iterations=2, tolerance=0.0)
+
+        assert monitor.update(points=None, log_posteriors=[[0.0, 1.0], [2.0, 0.0]]) is False
+        assert monitor.update(points=None, log_posteriors=[[1.0, 2.0], [0.0, 0.0]]) is True
+
+
+class TestChainConvergence:
+    def test__independent_walkers_of_same_distribution__converged(self):
+        np.random.seed(1)
+
+        gelman_rubin = GelmanRubin(threshold=1.01)
+        effective_sample_size = EffectiveSampleSize(target=5000.0)
+
+        for _ in range(8):
+
+            converged = update_convergence(
+                convergence_monitors=[gelman_rubin, effective_sample_size],
+                points=np.random.normal(size=(250, 10, 2)),
+                log_posteriors=np.zeros((250, 10)),
+            )
+
+        assert converged is True
+        assert gelman_rubin.burn_in_batches == 4
+        assert effective_sample_size.effective_sample_size_from(
+            lengths=np.full(4, 250.0),
+            sums=np.asarray(effective_sample_size.sums[4:]),
+            squared_sums=np.asarray(effective_sample_size.squared_sums[4:]),
+        ) == pytest.approx([10000.0, 10000.0], rel=0.5)
+
+    def test__walkers_stuck_in_different_modes__not_converged(self):
+        np.random.seed(1)
+
+        monitor = GelmanRubin(threshold=1.1)
+
+        points = np.random.normal(size=(500, 10, 1))
+        points[:, :5] += 10.0
+
+        assert monitor.update(points=points, log_posteriors=None) is False
+        assert monitor.update(points=points, log_posteriors=None) is False
+
+    def test__first_half_of_chain_discarded(self):
+        monitor = GelmanRubin()
+
+        for length in [10, 10, 20, 20]:
+            monitor.update(points=np.random.normal(size=(length, 4, 1)), log_posteriors=None)
+
+        assert monitor.burn_in_batches == 2
+
+
+def test__update_convergence__no_monitors__not_converged():
+    assert update_convergence(convergence_monitors=[], points=np.zeros((1, 1, 1)), log_posteriors=[0.0]) is False
+
+
+class TestConvergenceStates:
+    def test__restored_monitors__continue_as_updated_monitors(self):
+        np.random.seed(1)
+
+        monitors = [SwarmDiameter(), BestStagnation(iterations=3), GelmanRubin(threshold=1.1)]
+
+        update_convergence(
+            convergence_monitors=monitors,
+            points=np.random.normal(size=(20, 4, 2)),
+            log_posteriors=np.random.normal(size=(20, 4)),
+        )
+
+        restored_monitors = [SwarmDiameter(), BestStagnation(iterations=3), GelmanRubin(threshold=1.1)]
+
+        assert load_convergence_states(
+            convergence_monitors=restored_monitors, states=convergence_states_from(convergence_monitors=monitors)
+        ) is True
+
+        points = np.random.normal(size=(20, 4, 2))
+        log_posteriors = np.random.normal(size=(20, 4))
+
+        for monitor, restored_monitor in zip(monitors, restored_monitors):
+            assert restored_monitor.update(points=points, log_posteriors=log_posteriors) == monitor.update(
+                points=points, log_posteriors=log_posteriors
+            )
+
+        assert restored_monitors[0].initial_diameter == pytest.approx(monitors[0].initial_diameter)
+        assert restored_monitors[1].iterations_without_improvement == monitors[1].iterations_without_improvement
+        assert restored_monitors[2].lengths == [20, 20]
+
+    def test__different_monitors__not_restored(self):
+        monitors = [BestStagnation()]
+        monitors[0].update(points=None, log_posteriors=[1.0])
+
+        restored_monitors = [SwarmDiameter()]
+
+        assert load_convergence_states(
+            convergence_monitors=restored_monitors, states=convergence_states_from(convergence_monitors=monitors)
+        ) is False
+        assert restored_monitors[0].initial_diameter is None
+        assert load_convergence_states(convergence_monitors=restored_monitors, states=b"") is False
+
+
+class TestFit:
+    def test__pyswarms__best_stagnation__terminates_before_iters(self, model):
+        np.random.seed(1)
+
+        search = af.PySwarmsGlobal(
+            af.Paths("convergence_pyswarms"),
+            n_particles=20,
+            iters=1000,
+            ftol=-np.inf,
+            iterations_per_update=10,
+            convergence_monitors=[BestStagnation(iterations=20, tolerance=1.0e-6)],
+        )
+
+        result = search.fit(model=model, analysis=Analysis())
+
+        assert search.checkpoint.total_iterations < 1000
+        assert result.samples.max_log_likelihood_vector == pytest.approx([1.0, 2.0], abs=0.1)
+
+    def test__emcee__gelman_rubin_and_effective_sample_size__terminates_before_nsteps(self, model):
+        np.random.seed(1)
+
+        search = af.Emcee(
+            af.Paths("convergence_emcee"),
+            nwalkers=20,
+            nsteps=5000,
+            iterations_per_update=100,
+            auto_correlation_check_for_convergence=False,
+            convergence_monitors=[GelmanRubin(threshold=1.05), EffectiveSampleSize(target=500.0)],
+        )
+
+        result = search.fit(model=model, analysis=Analysis())
+
+        assert len(result.samples.parameters) < 5000 * 20
+        assert result.samples.median_pdf_vector == pytest.approx([1.0, 2.0], abs=0.3)
+
+    def test__emcee__convergence_states_output_and_restored(self):
+        search = af.Emcee(
+            af.Paths("convergence_emcee_states"), convergence_monitors=[BestStagnation(iterations=3)]
+        )
+
+        search.convergence_monitors[0].update(points=None, log_posteriors=[1.0, 1.0])
+
+        os.makedirs(search.paths.samples_path, exist_ok=True)
+        search.output_convergence_states(total_iterations=2, converged=False)
+
+        search.convergence_monitors = [BestStagnation(iterations=3)]
+
+        assert search.load_convergence_states(total_iterations=1) == (0, False)
+        assert search.load_convergence_states(total_iterations=4) == (2, False)
+        assert search.convergence_monitors[0].iterations_without_improvement == 1
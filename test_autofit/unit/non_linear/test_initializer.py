@@ -1,5 +1,11 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
 import autofit as af
-from autofit.mock.mock import MockClassx4
+from autofit.mock.mock import MockClassx2, MockClassx4
+from autofit.non_linear.samples import Sample
 
 
 class MockFitness:
@@ -126,3 +132,231 @@ class TestInitializeBall:
         assert 3.199 < initial_parameters[1][3] < 3.201
 
         assert initial_figures_of_merit == 2 * [1.0]
+
+
+class MockFitnessWithException:
+    def figure_of_merit_from_parameters(self, parameters):
+        if parameters[0] > 0.5:
+            raise af.exc.FitException
+        return parameters[0]
+
+
+class TestInitializeBatches:
+    def test__vectors_from_unit_vectors__same_as_vector_from_unit_vector(self):
+        model = af.PriorModel(MockClassx4)
+        model.one = af.GaussianPrior(mean=1.0, sigma=2.0)
+        model.two = af.LogUniformPrior(lower_limit=1e-2, upper_limit=1e2)
+
+        unit_vectors = np.random.uniform(size=(5, 4))
+
+        assert model.vectors_from_unit_vectors(unit_vectors) == pytest.approx(
+            np.array([model.vector_from_unit_vector(list(unit_vector)) for unit_vector in unit_vectors])
+        )
+
+    def test__unit_vectors_from_vectors__inverse_of_vectors_from_unit_vectors(self):
+        model = af.PriorModel(MockClassx4)
+        model.one = af.GaussianPrior(mean=1.0, sigma=2.0)
+        model.two = af.LogUniformPrior(lower_limit=1e-2, upper_limit=1e2)
+
+        unit_vectors = np.random.uniform(size=(5, 4))
+
+        assert model.unit_vectors_from_vectors(
+            model.vectors_from_unit_vectors(unit_vectors)
+        ) == pytest.approx(unit_vectors)
+
+    def test__points_outside_limits_and_failed_fits_discarded(self):
+        model = af.PriorModel(MockClassx4)
+        for name in ("one", "two", "three", "four"):
+            setattr(model, name, af.GaussianPrior(mean=0.5, sigma=1.0, lower_limit=0.0, upper_limit=1.0))
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerPrior().initial_samples_from_model(
+            total_points=20, model=model, fitness_function=MockFitnessWithException()
+        )
+
+        assert len(initial_parameters) == 20
+        assert all(0.0 <= min(parameters) and max(parameters) <= 1.0 for parameters in initial_parameters)
+        assert all(parameters[0] <= 0.5 for parameters in initial_parameters)
+        assert initial_figures_of_merit == [parameters[0] for parameters in initial_parameters]
+
+    def test__figures_of_merit_computed_on_pool(self):
+        model = af.PriorModel(MockClassx4)
+
+        with multiprocessing.Pool(2) as pool:
+            initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerPrior().initial_samples_from_model(
+                total_points=10, model=model, fitness_function=MockFitnessWithException(), pool=pool
+            )
+
+        assert len(initial_parameters) == 10
+        assert all(parameters[0] <= 0.5 for parameters in initial_parameters)
+
+
+class TestInitializeSamples:
+    def test__parameters_of_previous_model_resampled__new_parameters_from_priors(self):
+        previous_model = af.PriorModel(MockClassx2)
+        previous_model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        previous_model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        samples = af.OptimizerSamples(
+            model=previous_model,
+            samples=Sample.from_lists(
+                model=previous_model,
+                parameters=[[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]],
+                log_likelihoods=[1.0, 2.0, 3.0],
+                log_priors=[0.0, 0.0, 0.0],
+                weights=[0.0, 0.5, 0.5],
+            ),
+        )
+
+        model = af.PriorModel(MockClassx4)
+        model.one = af.UniformPrior(lower_limit=0.0, upper_limit=2.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=2.0)
+        model.three = af.UniformPrior(lower_limit=10.0, upper_limit=11.0)
+        model.four = af.UniformPrior(lower_limit=20.0, upper_limit=21.0)
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples
+        ).initial_samples_from_model(total_points=2, model=model, fitness_function=MockFitness())
+
+        assert sorted(parameters[:2] for parameters in initial_parameters) == [[0.3, 0.4], [0.5, 0.6]]
+        assert all(10.0 < parameters[2] < 11.0 for parameters in initial_parameters)
+        assert all(20.0 < parameters[3] < 21.0 for parameters in initial_parameters)
+        assert np.asarray(initial_unit_parameters) == pytest.approx(
+            model.unit_vectors_from_vectors(initial_parameters)
+        )
+        assert initial_figures_of_merit == [1.0, 1.0]
+
+    def test__more_points_than_weighted_samples__resampled_with_replacement(self):
+        model = af.PriorModel(MockClassx2)
+        model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        samples = af.OptimizerSamples(
+            model=model,
+            samples=Sample.from_lists(
+                model=model,
+                parameters=[[0.1, 0.2], [0.3, 0.4]],
+                log_likelihoods=[1.0, 2.0],
+                log_priors=[0.0, 0.0],
+                weights=[0.0, 1.0],
+            ),
+        )
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples
+        ).initial_samples_from_model(total_points=3, model=model, fitness_function=MockFitness())
+
+        assert initial_parameters == 3 * [[0.3, 0.4]]
+
+    def test__optimizer_samples__final_samples_resampled(self):
+        model = af.PriorModel(MockClassx2)
+        model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        samples = af.OptimizerSamples(
+            model=model,
+            samples=Sample.from_lists(
+                model=model,
+                parameters=[[0.1, 0.2], [0.3, 0.4], [0.5, 0.6], [0.7, 0.8]],
+                log_likelihoods=[1.0, 2.0, 3.0, 4.0],
+                log_priors=4 * [0.0],
+                weights=4 * [1.0],
+            ),
+        )
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples, final_fraction=0.5
+        ).initial_samples_from_model(total_points=2, model=model, fitness_function=MockFitness())
+
+        assert sorted(initial_parameters) == [[0.5, 0.6], [0.7, 0.8]]
+
+    def test__mcmc_samples__burn_in_discarded(self):
+        from autofit.non_linear.mcmc.parallel_tempering import ParallelTemperingSamples
+
+        model = af.PriorModel(MockClassx2)
+        model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        parameters = [[0.1, 0.1], [0.2, 0.2], [0.1, 0.1], [0.2, 0.2], [0.1, 0.1], [0.2, 0.2], [0.8, 0.8], [0.9, 0.9]]
+
+        samples = ParallelTemperingSamples(
+            model=model,
+            samples=Sample.from_lists(
+                model=model,
+                parameters=parameters,
+                log_likelihoods=8 * [1.0],
+                log_priors=8 * [0.0],
+                weights=8 * [1.0],
+            ),
+            auto_correlation_times=np.array([1.0, 1.0]),
+            auto_correlation_check_size=1,
+            auto_correlation_required_length=1,
+            auto_correlation_change_threshold=0.01,
+            total_walkers=2,
+            total_steps=4,
+            log_evidence=0.0,
+            log_evidence_error=0.0,
+        )
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples
+        ).initial_samples_from_model(total_points=2, model=model, fitness_function=MockFitness())
+
+        assert sorted(initial_parameters) == [[0.8, 0.8], [0.9, 0.9]]
+
+    def test__no_samples_within_new_limits__points_drawn_from_priors(self):
+        previous_model = af.PriorModel(MockClassx2)
+        previous_model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        previous_model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        samples = af.OptimizerSamples(
+            model=previous_model,
+            samples=Sample.from_lists(
+                model=previous_model,
+                parameters=[[0.1, 0.2], [0.3, 0.4]],
+                log_likelihoods=[1.0, 2.0],
+                log_priors=[0.0, 0.0],
+                weights=[1.0, 1.0],
+            ),
+        )
+
+        model = af.PriorModel(MockClassx2)
+        model.one = af.UniformPrior(lower_limit=5.0, upper_limit=6.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples
+        ).initial_samples_from_model(total_points=3, model=model, fitness_function=MockFitness())
+
+        assert len(initial_parameters) == 3
+        assert all(5.0 < parameters[0] < 6.0 for parameters in initial_parameters)
+
+    def test__only_resampled_parameters_inverted(self, monkeypatch):
+        model = af.PriorModel(MockClassx2)
+        model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        model.two = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+
+        previous_model = af.PriorModel(MockClassx2)
+        previous_model.one = af.UniformPrior(lower_limit=0.0, upper_limit=1.0)
+        previous_model.two = 0.5
+
+        samples = af.OptimizerSamples(
+            model=previous_model,
+            samples=Sample.from_lists(
+                model=previous_model,
+                parameters=[[0.1], [0.3]],
+                log_likelihoods=[1.0, 2.0],
+                log_priors=[0.0, 0.0],
+                weights=[1.0, 1.0],
+            ),
+        )
+
+        def unit_value_for(value):
+            raise NotImplementedError()
+
+        monkeypatch.setattr(model.two, "unit_value_for", unit_value_for)
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = af.InitializerSamples(
+            samples=samples, final_fraction=1.0
+        ).initial_samples_from_model(total_points=2, model=model, fitness_function=MockFitness())
+
+        assert sorted(parameters[0] for parameters in initial_parameters) == [0.1, 0.3]
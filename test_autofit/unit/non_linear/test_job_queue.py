@@ -0,0 +1,212 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from autofit import exc
+from autofit.non_linear.job_queue import DirectoryJobQueue
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, JobFailure
+
+shared = None
+
+
+def set_shared(value):
+    global shared
+    shared = value
+
+
+class JobResult(AbstractJobResult):
+    def __init__(self, number, value, pid):
+        super().__init__(number)
+        self.value = value
+        self.pid = pid
+
+
+class Job(AbstractJob):
+    def __init__(self, value, sleep=0.0):
+        super().__init__()
+        self.value = value
+        self.sleep = sleep
+
+    def perform(self):
+        time.sleep(self.sleep)
+        if self.value is None:
+            raise ValueError("failed")
+        if self.value == "shared":
+            return JobResult(self.number, shared, os.getpid())
+        return JobResult(self.number, self.value, os.getpid())
+
+
+@pytest.fixture(name="directory")
+def make_directory(tmp_path):
+    return str(tmp_path / "queue")
+
+
+def start_worker(directory):
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "autofit.non_linear.job_queue", directory,
+            "--poll-interval", "0.05", "--stop-when-empty",
+        ],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([root, os.path.dirname(root)])},
+    )
+
+
+class TestDirectoryJobQueue:
+    def test__submitting_process_performs_jobs(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.01)
+
+        results = list(queue.run([Job(value) for value in range(3)]))
+
+        assert sorted(result.value for result in results) == [0, 1, 2]
+        assert os.listdir(os.path.join(directory, "results")) == []
+
+    def test__jobs_performed_by_worker_processes(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.05, perform_jobs=False)
+
+        for job in [Job(value, sleep=0.2) for value in range(6)]:
+            queue.submit(job)
+
+        workers = [start_worker(directory) for _ in range(2)]
+
+        for worker in workers:
+            assert worker.wait(timeout=60) == 0
+
+        results = [
+            queue._read(os.path.join(directory, "results", job_id))
+            for job_id in queue._ids("results")
+        ]
+
+        assert sorted(result.value for result in results) == list(range(6))
+        assert os.getpid() not in {result.pid for result in results}
+        assert queue._ids("jobs") == queue._ids("claimed") == []
+
+    def test__expired_lease__job_requeued(self, directory):
+        queue = DirectoryJobQueue(directory=directory, lease_timeout=1.0, poll_interval=0.01)
+
+        job_id = queue.submit(Job(1))
+        assert queue.claim() == job_id
+
+        queue.requeue_expired()
+        assert queue._ids("jobs") == []
+
+        os.utime(os.path.join(directory, "leases", job_id), (time.time() - 2, time.time() - 2))
+        queue.requeue_expired()
+
+        assert queue._ids("jobs") == [job_id]
+        assert queue._ids("leases") == []
+
+    def test__lost_lease__result_not_published(self, directory):
+        queue = DirectoryJobQueue(directory=directory, lease_timeout=1.0, poll_interval=0.01)
+        other_queue = DirectoryJobQueue(directory=directory, lease_timeout=1.0, poll_interval=0.01)
+
+        job_id = queue.submit(Job(1))
+        assert queue.claim() == job_id
+
+        os.utime(os.path.join(directory, "leases", job_id), (time.time() - 2, time.time() - 2))
+        queue.requeue_expired()
+
+        assert other_queue.claim() == job_id
+
+        queue.publish(job_id, "stale")
+
+        assert queue._ids("results") == []
+        assert queue._ids("claimed") == queue._ids("leases") == [job_id]
+
+        other_queue.publish(job_id, "result")
+
+        assert queue._read(os.path.join(directory, "results", job_id)) == "result"
+        assert queue._ids("claimed") == queue._ids("leases") == []
+
+    def test__unreadable_job__failure_has_job_number(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.01)
+
+        job = Job(1)
+        job_id = queue.submit(job)
+
+        with open(os.path.join(directory, "jobs", job_id), "wb") as f:
+            f.write(b"corrupt")
+
+        assert queue.perform_one()
+
+        failure = queue._read(os.path.join(directory, "results", job_id))
+
+        assert isinstance(failure, JobFailure)
+        assert failure.job_number == job.number
+
+    def test__result_published_twice__removed(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.01)
+
+        job_ids = []
+        submit = queue.submit
+
+        def recording_submit(job):
+            job_ids.append(submit(job))
+            return job_ids[-1]
+
+        queue.submit = recording_submit
+
+        results = queue.run([Job(1), Job(2)])
+        first = next(results)
+
+        job_id = next(job_id for job_id in job_ids if queue.job_number(job_id) == first.number)
+        queue._write(os.path.join(directory, "results", job_id), first)
+
+        assert len(list(results)) == 1
+        assert os.listdir(os.path.join(directory, "results")) == []
+
+    def test__initializer(self, directory):
+        queue = DirectoryJobQueue(
+            directory=directory, poll_interval=0.01, initializer=set_shared, initargs=("data",)
+        )
+
+        assert [result.value for result in queue.run([Job("shared")])] == ["data"]
+
+    def test__failure__job_exception_and_jobs_removed(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.01)
+
+        with pytest.raises(exc.JobException):
+            list(queue.run([Job(None), Job(1), Job(2)]))
+
+        assert queue._ids("jobs") == []
+
+    def test__jobs_submitted_lazily(self, directory):
+        queue = DirectoryJobQueue(directory=directory, poll_interval=0.01, max_pending_jobs=2)
+
+        generated = []
+
+        def jobs():
+            for value in range(5):
+                generated.append(value)
+                yield Job(value)
+
+        results = queue.run(jobs())
+
+        next(results)
+
+        assert len(generated) <= 3
+        assert len(queue._ids("jobs")) <= 2
+
+        assert len(list(results)) == 4
+        assert len(generated) == 5
+
+    def test__hung_job_times_out(self, directory):
+        queue = DirectoryJobQueue(
+            directory=directory, poll_interval=0.05, timeout=1.0, raise_on_failure=False
+        )
+
+        start = time.time()
+        results = list(queue.run([Job(1, sleep=60.0), Job(2)]))
+
+        assert time.time() - start < 30.0
+
+        failures = [result for result in results if isinstance(result, JobFailure)]
+
+        assert len(failures) == 1
+        assert "timed out" in failures[0].message
+        assert [result.value for result in results if not isinstance(result, JobFailure)] == [2]
+        assert queue._ids("claimed") == queue._ids("leases") == []
@@ -0,0 +1,290 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit import exc
+from autofit.non_linear.parallel import (
+    JobFailure,
+    AbstractJob,
+    AbstractJobResult,
+    BLAS_THREAD_VARIABLES,
+    CoreBudget,
+    JobScheduler,
+    allowed_cores,
+    limit_blas_threads,
+    set_core_allowance,
+)
+
+
+class JobResult(AbstractJobResult):
+    def __init__(self, number, value):
+        super().__init__(number)
+        self.value = value
+
+
+class Job(AbstractJob):
+    def __init__(self, value, sleep=0.0):
+        super().__init__()
+        self.value = value
+        self.sleep = sleep
+
+    def perform(self):
+        time.sleep(self.sleep)
+        if self.value is None:
+            raise ValueError("failed")
+        return JobResult(self.number, self.value)
+
+
+shared = None
+
+
+def set_shared(value):
+    global shared
+    shared = value
+
+
+class SharedJob(AbstractJob):
+    def perform(self):
+        return JobResult(self.number, shared)
+
+
+class FlakyJob(AbstractJob):
+    def __init__(self, failure):
+        super().__init__()
+        self.failure = failure
+
+    def perform(self):
+        if self.attempt == 0:
+            if self.failure == "raise":
+                raise ValueError("failed")
+            if self.failure == "hang":
+                time.sleep(60)
+            if self.failure == "die":
+                os._exit(1)
+        return JobResult(self.number, np.random.random())
+
+
+class UnpicklableResultJob(AbstractJob):
+    def perform(self):
+        return JobResult(self.number, lambda: None)
+
+
+class Fitness:
+    pool_ids = None
+
+
+class CoresJob(AbstractJob):
+    def perform(self):
+        return JobResult(self.number, self.number_of_cores)
+
+
+class RebalancedJob(AbstractJob):
+    def __init__(self, wait):
+        super().__init__()
+        self.wait = wait
+
+    def perform(self):
+        end = time.time() + self.wait
+        while time.time() < end and allowed_cores(self.number_of_cores) < 4:
+            time.sleep(0.05)
+        return JobResult(self.number, allowed_cores(self.number_of_cores))
+
+
+def make_jobs(values, sleeps=None):
+    sleeps = sleeps or [0.0] * len(values)
+    return [Job(value, sleep) for value, sleep in zip(values, sleeps)]
+
+
+class TestJobScheduler:
+    def test__ordered__results_in_submission_order(self):
+        jobs = make_jobs([0, 1, 2, 3], sleeps=[0.3, 0.0, 0.2, 0.0])
+
+        results = list(JobScheduler(number_of_cores=2, ordered=True).run(jobs))
+
+        assert [result.value for result in results] == [0, 1, 2, 3]
+
+    def test__unordered__results_as_completed(self):
+        jobs = make_jobs([0, 1], sleeps=[0.5, 0.0])
+
+        results = list(JobScheduler(number_of_cores=2).run(jobs))
+
+        assert [result.value for result in results] == [1, 0]
+
+    def test__single_core__jobs_performed_in_process(self):
+        results = list(JobScheduler(number_of_cores=1).run(make_jobs([0, 1, 2])))
+
+        assert [result.value for result in results] == [0, 1, 2]
+
+    def test__jobs_submitted_lazily(self):
+        submitted = []
+
+        def jobs():
+            for value in range(10):
+                submitted.append(value)
+                yield Job(value)
+
+        scheduler = JobScheduler(number_of_cores=2, max_pending_jobs=3)
+
+        results = scheduler.run(jobs())
+        next(results)
+
+        assert len(submitted) == 3
+
+        assert len(list(results)) == 9
+        assert len(submitted) == 10
+
+    def test__job_raises__job_exception(self):
+        with pytest.raises(exc.JobException):
+            list(JobScheduler(number_of_cores=2).run(make_jobs([0, None, 2])))
+
+    @pytest.mark.parametrize("number_of_cores", [1, 2])
+    def test__initializer__called_in_each_worker(self, number_of_cores):
+        scheduler = JobScheduler(
+            number_of_cores=number_of_cores,
+            initializer=set_shared,
+            initargs=("data",),
+        )
+
+        results = list(scheduler.run([SharedJob() for _ in range(4)]))
+
+        assert [result.value for result in results] == ["data"] * 4
+
+    @pytest.mark.parametrize(
+        "number_of_jobs, cores",
+        [
+            (1, [4]),
+            (2, [2, 2]),
+            (6, [1, 1, 1, 1, 1, 1]),
+        ]
+    )
+    def test__core_budget__cores_split_between_jobs(self, number_of_jobs, cores):
+        scheduler = JobScheduler(number_of_cores=4, core_budget=CoreBudget(total_cores=4))
+
+        results = scheduler.run(
+            [CoresJob() for _ in range(number_of_jobs)], number_of_jobs=number_of_jobs
+        )
+
+        assert sorted(result.value for result in results) == cores
+        assert scheduler.core_budget.free_cores == 4
+
+    def test__core_budget__freed_cores_handed_to_running_job(self):
+        scheduler = JobScheduler(number_of_cores=4, core_budget=CoreBudget(total_cores=4))
+
+        results = scheduler.run(
+            [RebalancedJob(wait=10.0)] + [RebalancedJob(wait=0.0) for _ in range(3)]
+        )
+
+        assert max(result.value for result in results) == 4
+
+    @pytest.mark.parametrize("failure", ["raise", "hang", "die"])
+    def test__failed_job_retried(self, failure):
+        scheduler = JobScheduler(number_of_cores=2, timeout=1.0, retries=1)
+
+        results = list(scheduler.run([FlakyJob(failure), Job(1)]))
+
+        assert len(results) == 2
+        assert not any(isinstance(result, JobFailure) for result in results)
+
+    def test__single_core__job_timed_out(self):
+        scheduler = JobScheduler(number_of_cores=1, timeout=1.0, raise_on_failure=False)
+
+        results = sorted(scheduler.run([Job(1, sleep=60.0), Job(2)]), key=lambda result: result.number)
+
+        assert isinstance(results[0], JobFailure)
+        assert "timed out" in results[0].message
+        assert results[1].value == 2
+
+    @pytest.mark.parametrize("number_of_cores", [1, 2])
+    def test__failure_isolated(self, number_of_cores):
+        scheduler = JobScheduler(number_of_cores=number_of_cores, raise_on_failure=False)
+
+        results = sorted(scheduler.run(make_jobs([0, None, 2])), key=lambda result: result.number)
+
+        assert isinstance(results[1], JobFailure)
+        assert results[1].job.value is None
+        assert [results[0].value, results[2].value] == [0, 2]
+
+    def test__unpicklable_result__failure_returned(self):
+        scheduler = JobScheduler(number_of_cores=2, raise_on_failure=False)
+
+        results = sorted(scheduler.run([UnpicklableResultJob(), Job(1)]), key=lambda result: result.number)
+
+        assert isinstance(results[0], JobFailure)
+        assert results[1].value == 1
+
+    def test__retry_seeded_differently(self):
+        first = FlakyJob(None)
+        retry = FlakyJob(None)
+        retry.number = first.number
+        retry.attempt = 1
+
+        np.random.seed(1)
+        first_value = list(JobScheduler(number_of_cores=1).run([first]))[0].value
+        np.random.seed(1)
+        retry_value = list(JobScheduler(number_of_cores=1).run([retry]))[0].value
+
+        assert first_value != retry_value
+
+
+class TestCoreBudget:
+    def test__freed_cores_allocated_to_remaining_jobs(self):
+        budget = CoreBudget(total_cores=4)
+
+        assert budget.allocate(index=0, startable_jobs=4) == 1
+        assert budget.allocate(index=1, startable_jobs=3) == 1
+        assert budget.free_cores == 2
+
+        budget.release(0)
+
+        assert budget.allocate(index=2, startable_jobs=1) == 3
+        assert budget.free_cores == 0
+
+    def test__rebalance__free_cores_split_between_running_jobs(self):
+        budget = CoreBudget(total_cores=5)
+
+        for index in range(5):
+            budget.allocate(index=index, startable_jobs=5)
+
+        budget.release(0)
+        budget.release(1)
+        budget.release(2)
+        budget.rebalance()
+
+        assert budget.allocated == {3: 3, 4: 2}
+        assert budget.free_cores == 0
+        assert sorted(budget.allowances[:]) == [0, 0, 0, 2, 3]
+
+
+def test__search_pool_grown_to_allowed_cores():
+    search = af.MockSearch()
+    fitness_function = Fitness()
+
+    budget = CoreBudget(total_cores=2)
+    budget.allocate(index=0, startable_jobs=2)
+    budget.rebalance()
+
+    assert search.pool_with_allowed_cores(pool=None, fitness_function=fitness_function) is None
+
+    set_core_allowance(budget.allowances, budget.slots[0])
+
+    try:
+        pool = search.pool_with_allowed_cores(pool=None, fitness_function=fitness_function)
+    finally:
+        set_core_allowance(None, None)
+
+    assert search.number_of_cores == 2
+    assert len(fitness_function.pool_ids) == 2
+
+    pool.terminate()
+
+
+def test_limit_blas_threads(monkeypatch):
+    for variable in BLAS_THREAD_VARIABLES:
+        monkeypatch.setenv(variable, "8")
+
+    limit_blas_threads(1)
+
+    assert os.environ["OMP_NUM_THREADS"] == "1"
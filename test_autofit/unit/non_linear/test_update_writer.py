@@ -0,0 +1,113 @@
+import pickle
+import threading
+from os import path
+
+import pytest
+
+import autofit as af
+from autofit.mock.mock import MockAnalysis
+from autofit.non_linear.update_writer import UpdateWriter, atomic_file
+
+
+class TestAtomicFile:
+    def test__file_replaced_on_exit(self, tmp_path):
+        filename = str(tmp_path / "file.txt")
+
+        with open(filename, "w") as f:
+            f.write("old")
+
+        with atomic_file(filename) as temporary_filename:
+            with open(temporary_filename, "w") as f:
+                f.write("new")
+
+            with open(filename) as f:
+                assert f.read() == "old"
+
+        with open(filename) as f:
+            assert f.read() == "new"
+
+        assert not path.exists(temporary_filename)
+
+    def test__exception__file_unchanged(self, tmp_path):
+        filename = str(tmp_path / "file.txt")
+
+        with open(filename, "w") as f:
+            f.write("old")
+
+        with pytest.raises(ValueError):
+            with atomic_file(filename) as temporary_filename:
+                with open(temporary_filename, "w") as f:
+                    f.write("new")
+                raise ValueError
+
+        with open(filename) as f:
+            assert f.read() == "old"
+
+        assert not path.exists(temporary_filename)
+
+
+class TestUpdateWriter:
+    def test__updates_performed_in_order_on_background_thread(self):
+        update_writer = UpdateWriter()
+
+        updates = []
+        threads = []
+
+        def update(value):
+            updates.append(value)
+            threads.append(threading.current_thread())
+
+        for value in range(5):
+            update_writer.submit(update, value=value)
+
+        update_writer.flush()
+
+        assert updates == [0, 1, 2, 3, 4]
+        assert threading.current_thread() not in threads
+
+        update_writer.close()
+
+        assert not update_writer.is_running
+
+    def test__exception_raised_in_caller__later_updates_skipped(self):
+        update_writer = UpdateWriter()
+
+        updates = []
+
+        def fail():
+            raise ValueError
+
+        update_writer.submit(fail)
+        update_writer.submit(lambda value: updates.append(value), value=1)
+
+        with pytest.raises(ValueError):
+            update_writer.close()
+
+        assert updates == []
+
+    def test__search_pickles_without_writer(self):
+        search = af.MockSearch()
+        search.update_writer.submit(lambda: None)
+
+        search = pickle.loads(pickle.dumps(search))
+
+        assert getattr(search, "_update_writer", None) is None
+
+        search.close_update_writer()
+
+    def test__search_failure_not_hidden_by_writer_failure(self, monkeypatch):
+        def fail():
+            raise ValueError
+
+        def _fit(self, model, analysis, log_likelihood_cap=None):
+            self.update_writer.submit(fail)
+            raise RuntimeError
+
+        monkeypatch.setattr(af.MockSearch, "_fit", _fit)
+
+        search = af.MockSearch(paths=af.Paths(name="update_writer_failure"))
+
+        with pytest.raises(RuntimeError):
+            search.fit(model=af.ModelMapper(), analysis=MockAnalysis())
+
+        assert not search.update_writer.is_running